@@ -0,0 +1,35 @@
+"""add content_hash to user_file
+
+Revision ID: 3f1c9a7e5b2d
+Revises: c8a93a2af083
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "3f1c9a7e5b2d"
+down_revision = "c8a93a2af083"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "user_file",
+        sa.Column("content_hash", sa.String(), nullable=True),
+    )
+    op.create_index(
+        op.f("ix_user_file_content_hash"),
+        "user_file",
+        ["content_hash"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_user_file_content_hash"), table_name="user_file")
+    op.drop_column("user_file", "content_hash")
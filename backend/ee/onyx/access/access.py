@@ -9,6 +9,7 @@ from onyx.access.access import (
     _get_access_for_documents as get_access_for_documents_without_groups,
 )
 from onyx.access.access import _get_acl_for_user as get_acl_for_user_without_groups
+from onyx.access.acl_cache import get_cached_acl
 from onyx.access.models import DocumentAccess
 from onyx.access.utils import prefix_external_group
 from onyx.access.utils import prefix_user_group
@@ -124,6 +125,15 @@ def _get_acl_for_user(user: User | None, db_session: Session) -> set[str]:
 
     NOTE: is imported in onyx.access.access by `fetch_versioned_implementation`
     DO NOT REMOVE."""
+    if user is None:
+        return _resolve_acl_for_user(user, db_session)
+
+    # resolving group memberships is a couple of queries per search (and per
+    # sub-search), cache the result until the next group sync
+    return get_cached_acl(str(user.id), lambda: _resolve_acl_for_user(user, db_session))
+
+
+def _resolve_acl_for_user(user: User | None, db_session: Session) -> set[str]:
     db_user_groups = fetch_user_groups_for_user(db_session, user.id) if user else []
     prefixed_user_groups = [
         prefix_user_group(db_user_group.name) for db_user_group in db_user_groups
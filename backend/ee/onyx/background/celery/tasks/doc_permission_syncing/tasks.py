@@ -22,7 +22,7 @@ from tenacity import stop_after_delay
 from tenacity import wait_random_exponential
 
 from ee.onyx.db.connector_credential_pair import get_all_auto_sync_cc_pairs
-from ee.onyx.db.document import upsert_document_external_perms
+from ee.onyx.db.document import upsert_document_external_perms_batch
 from ee.onyx.external_permissions.sync_params import get_source_perm_sync_config
 from onyx.access.models import DocExternalAccess
 from onyx.background.celery.apps.app_base import task_logger
@@ -31,6 +31,7 @@ from onyx.background.celery.celery_redis import celery_get_queue_length
 from onyx.background.celery.celery_redis import celery_get_queued_task_ids
 from onyx.background.celery.celery_redis import celery_get_unacked_task_ids
 from onyx.background.celery.tasks.beat_schedule import CLOUD_BEAT_MULTIPLIER_DEFAULT
+from onyx.configs.app_configs import DOC_PERMISSION_SYNC_DB_BATCH_SIZE
 from onyx.configs.app_configs import JOB_TIMEOUT
 from onyx.configs.constants import CELERY_GENERIC_BEAT_LOCK_TIMEOUT
 from onyx.configs.constants import CELERY_PERMISSIONS_SYNC_LOCK_TIMEOUT
@@ -77,6 +78,7 @@ from onyx.redis.redis_pool import get_redis_replica_client
 from onyx.redis.redis_pool import redis_lock_dump
 from onyx.server.runtime.onyx_runtime import OnyxRuntime
 from onyx.server.utils import make_short_id
+from onyx.utils.batching import batch_generator
 from onyx.utils.logger import doc_permission_sync_ctx
 from onyx.utils.logger import format_error_for_logging
 from onyx.utils.logger import LoggerContextVars
@@ -571,10 +573,13 @@ def connector_permission_sync_generator_task(
 
             tasks_generated = 0
             docs_with_errors = 0
-            for doc_external_access in document_external_accesses:
+            docs_changed = 0
+            for permissions_batch in batch_generator(
+                document_external_accesses, DOC_PERMISSION_SYNC_DB_BATCH_SIZE
+            ):
                 result = redis_connector.permissions.update_db(
                     lock=lock,
-                    new_permissions=[doc_external_access],
+                    new_permissions=permissions_batch,
                     source_string=source_type,
                     connector_id=cc_pair.connector.id,
                     credential_id=cc_pair.credential.id,
@@ -582,10 +587,12 @@ def connector_permission_sync_generator_task(
                 )
                 tasks_generated += result.num_updated
                 docs_with_errors += result.num_errors
+                docs_changed += result.num_changed
 
             task_logger.info(
                 f"RedisConnector.permissions.generate_tasks finished. "
-                f"cc_pair={cc_pair_id} tasks_generated={tasks_generated} docs_with_errors={docs_with_errors}"
+                f"cc_pair={cc_pair_id} tasks_generated={tasks_generated} "
+                f"docs_changed={docs_changed} docs_with_errors={docs_with_errors}"
             )
 
             complete_doc_permission_sync_attempt(
@@ -637,62 +644,66 @@ def connector_permission_sync_generator_task(
     ),
     stop=stop_after_delay(DOCUMENT_PERMISSIONS_UPDATE_STOP_AFTER),
 )
-def document_update_permissions(
+def document_update_permissions_batch(
     tenant_id: str,
-    permissions: DocExternalAccess,
+    permissions_batch: list[DocExternalAccess],
     source_type_str: str,
     connector_id: int,
     credential_id: int,
-) -> bool:
+) -> int:
+    """Writes the permissions of the documents whose permissions changed.
+    Returns the number of such documents."""
     start = time.monotonic()
 
-    doc_id = permissions.doc_id
-    external_access = permissions.external_access
-
     try:
         with get_session_with_tenant(tenant_id=tenant_id) as db_session:
             # Add the users to the DB if they don't exist
             batch_add_ext_perm_user_if_not_exists(
                 db_session=db_session,
-                emails=list(external_access.external_user_emails),
+                emails=list(
+                    {
+                        email
+                        for permissions in permissions_batch
+                        for email in permissions.external_access.external_user_emails
+                    }
+                ),
                 continue_on_error=True,
             )
-            # Then upsert the document's external permissions
-            created_new_doc = upsert_document_external_perms(
+            # Then upsert the external permissions of the documents that changed
+            result = upsert_document_external_perms_batch(
                 db_session=db_session,
-                doc_id=doc_id,
-                external_access=external_access,
+                doc_external_accesses=permissions_batch,
                 source_type=DocumentSource(source_type_str),
             )
 
-            if created_new_doc:
-                # If a new document was created, we associate it with the cc_pair
+            if result.new_doc_ids:
+                # If new documents were created, we associate them with the cc_pair
                 upsert_document_by_connector_credential_pair(
                     db_session=db_session,
                     connector_id=connector_id,
                     credential_id=credential_id,
-                    document_ids=[doc_id],
+                    document_ids=result.new_doc_ids,
                 )
 
             elapsed = time.monotonic() - start
             task_logger.info(
                 f"connector_id={connector_id} "
-                f"doc={doc_id} "
+                f"docs={len(permissions_batch)} "
+                f"changed={len(result.changed_doc_ids)} "
+                f"new={len(result.new_doc_ids)} "
                 f"action=update_permissions "
                 f"elapsed={elapsed:.2f}"
             )
     except Exception as e:
         task_logger.exception(
-            f"document_update_permissions exceptioned: "
-            f"connector_id={connector_id} doc_id={doc_id}"
+            f"document_update_permissions_batch exceptioned: "
+            f"connector_id={connector_id} "
+            f"first_doc_id={permissions_batch[0].doc_id if permissions_batch else None} "
+            f"docs={len(permissions_batch)}"
         )
         raise e
-    finally:
-        task_logger.info(
-            f"document_update_permissions completed: connector_id={connector_id} doc={doc_id}"
-        )
 
-    return True
+    return len(result.changed_doc_ids) + len(result.new_doc_ids)
 
 
 def validate_permission_sync_fences(
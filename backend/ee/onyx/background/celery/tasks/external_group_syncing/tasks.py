@@ -27,6 +27,7 @@ from ee.onyx.external_permissions.sync_params import (
     get_all_cc_pair_agnostic_group_sync_sources,
 )
 from ee.onyx.external_permissions.sync_params import get_source_perm_sync_config
+from onyx.access.acl_cache import invalidate_acl_cache
 from onyx.background.celery.apps.app_base import task_logger
 from onyx.background.celery.celery_redis import celery_find_task
 from onyx.background.celery.celery_redis import celery_get_unacked_task_ids
@@ -566,6 +567,8 @@ def _perform_external_group_sync(
             f"Removing stale external groups for {source_type} for cc_pair: {cc_pair_id}"
         )
         remove_stale_external_groups(db_session, cc_pair_id)
+        # group memberships changed, make searches pick up the new ACLs
+        invalidate_acl_cache(tenant_id)
 
         # Calculate total unique users processed
         total_users_processed = len(seen_users)
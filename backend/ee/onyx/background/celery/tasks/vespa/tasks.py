@@ -7,6 +7,7 @@ from ee.onyx.db.user_group import delete_user_group
 from ee.onyx.db.user_group import fetch_user_group
 from ee.onyx.db.user_group import mark_user_group_as_synced
 from ee.onyx.db.user_group import prepare_user_group_for_deletion
+from onyx.access.acl_cache import invalidate_acl_cache
 from onyx.background.celery.apps.app_base import task_logger
 from onyx.db.enums import SyncStatus
 from onyx.db.enums import SyncType
@@ -65,6 +66,7 @@ def monitor_usergroup_taskset(
                 mark_user_group_as_synced(db_session, user_group)
                 prepare_user_group_for_deletion(db_session, usergroup_id)
                 delete_user_group(db_session=db_session, user_group=user_group)
+                invalidate_acl_cache(tenant_id)
 
                 update_sync_record_status(
                     db_session=db_session,
@@ -79,6 +81,7 @@ def monitor_usergroup_taskset(
                 )
             else:
                 mark_user_group_as_synced(db_session=db_session, user_group=user_group)
+                invalidate_acl_cache(tenant_id)
 
                 update_sync_record_status(
                     db_session=db_session,
@@ -1,9 +1,14 @@
+import hashlib
+from collections.abc import Iterable
 from datetime import datetime
 from datetime import timezone
+from typing import NamedTuple
 
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
+from onyx.access.models import DocExternalAccess
 from onyx.access.models import ExternalAccess
 from onyx.access.utils import build_ext_group_name_for_onyx
 from onyx.configs.constants import DocumentSource
@@ -101,3 +106,123 @@ def upsert_document_external_perms(
         db_session.commit()
 
     return False
+
+
+class ExternalPermsBatchUpsertResult(NamedTuple):
+    # documents that didn't exist yet and were created to hold the permissions
+    new_doc_ids: list[str]
+    # existing documents whose permissions changed
+    changed_doc_ids: list[str]
+
+
+def external_access_fingerprint(
+    external_user_emails: Iterable[str],
+    external_user_group_ids: Iterable[str],
+    is_public: bool,
+) -> str:
+    """Order insensitive fingerprint of a document's external permissions."""
+    hasher = hashlib.sha256()
+    for values in (external_user_emails, external_user_group_ids):
+        for value in sorted(set(values)):
+            hasher.update(value.encode("utf-8"))
+            hasher.update(b"\x00")
+        hasher.update(b"\x01")
+    hasher.update(b"1" if is_public else b"0")
+    return hasher.hexdigest()
+
+
+def upsert_document_external_perms_batch(
+    db_session: Session,
+    doc_external_accesses: list[DocExternalAccess],
+    source_type: DocumentSource,
+) -> ExternalPermsBatchUpsertResult:
+    """
+    Batched version of `upsert_document_external_perms`. The permissions are compared
+    against the stored ones and only the documents whose permissions changed are
+    written (and get their last_modified bumped so that they are synced to the
+    document index), with a single multi-row upsert.
+    NOTE: this function is Postgres specific. Not all DBs support the ON CONFLICT clause.
+    """
+    # if a document shows up more than once, the last permissions win
+    doc_id_to_external_access: dict[str, ExternalAccess] = {
+        doc_external_access.doc_id: doc_external_access.external_access
+        for doc_external_access in doc_external_accesses
+    }
+    if not doc_id_to_external_access:
+        return ExternalPermsBatchUpsertResult(new_doc_ids=[], changed_doc_ids=[])
+
+    stored_fingerprints: dict[str, str] = {
+        row.id: external_access_fingerprint(
+            row.external_user_emails or [],
+            row.external_user_group_ids or [],
+            row.is_public,
+        )
+        for row in db_session.execute(
+            select(
+                DbDocument.id,
+                DbDocument.external_user_emails,
+                DbDocument.external_user_group_ids,
+                DbDocument.is_public,
+            ).where(DbDocument.id.in_(list(doc_id_to_external_access.keys())))
+        )
+    }
+
+    now = datetime.now(timezone.utc)
+    new_doc_ids: list[str] = []
+    changed_doc_ids: list[str] = []
+    rows_to_write: list[dict] = []
+    # sorted so that concurrent writers lock the rows in the same order
+    for doc_id in sorted(doc_id_to_external_access):
+        external_access = doc_id_to_external_access[doc_id]
+        prefixed_external_groups = {
+            build_ext_group_name_for_onyx(
+                ext_group_name=group_id,
+                source=source_type,
+            )
+            for group_id in external_access.external_user_group_ids
+        }
+        stored_fingerprint = stored_fingerprints.get(doc_id)
+        if stored_fingerprint == external_access_fingerprint(
+            external_access.external_user_emails,
+            prefixed_external_groups,
+            external_access.is_public,
+        ):
+            continue
+
+        if stored_fingerprint is None:
+            new_doc_ids.append(doc_id)
+        else:
+            changed_doc_ids.append(doc_id)
+
+        # If the document does not exist, still store the external access
+        # So that if the document is added later, the external access is already stored
+        # The upsert function in the indexing pipeline does not overwrite the permissions fields
+        rows_to_write.append(
+            {
+                "id": doc_id,
+                "semantic_id": "",
+                "external_user_emails": sorted(external_access.external_user_emails),
+                "external_user_group_ids": sorted(prefixed_external_groups),
+                "is_public": external_access.is_public,
+                "last_modified": now,
+            }
+        )
+
+    if rows_to_write:
+        insert_stmt = insert(DbDocument).values(rows_to_write)
+        db_session.execute(
+            insert_stmt.on_conflict_do_update(
+                index_elements=["id"],
+                set_={
+                    "external_user_emails": insert_stmt.excluded.external_user_emails,
+                    "external_user_group_ids": insert_stmt.excluded.external_user_group_ids,
+                    "is_public": insert_stmt.excluded.is_public,
+                    "last_modified": insert_stmt.excluded.last_modified,
+                },
+            )
+        )
+        db_session.commit()
+
+    return ExternalPermsBatchUpsertResult(
+        new_doc_ids=new_doc_ids, changed_doc_ids=changed_doc_ids
+    )
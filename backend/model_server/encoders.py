@@ -7,16 +7,25 @@ from typing import TYPE_CHECKING
 from fastapi import APIRouter
 from fastapi import HTTPException
 from fastapi import Request
+from fastapi import Response
 
+from model_server.micro_batching import EmbeddingMicroBatcher
 from model_server.utils import simple_log_function_time
 from onyx.utils.logger import setup_logger
 from shared_configs.configs import INDEXING_ONLY
+from shared_configs.configs import MODEL_SERVER_MICRO_BATCH_MAX_SIZE
+from shared_configs.configs import MODEL_SERVER_MICRO_BATCH_MAX_WAIT_MS
+from shared_configs.configs import MODEL_SERVER_MICRO_BATCHING_ENABLED
+from shared_configs.enums import EmbeddingResponseEncoding
 from shared_configs.enums import EmbedTextType
 from shared_configs.model_server_models import Embedding
 from shared_configs.model_server_models import EmbedRequest
 from shared_configs.model_server_models import EmbedResponse
 from shared_configs.model_server_models import RerankRequest
 from shared_configs.model_server_models import RerankResponse
+from shared_configs.utils import BINARY_EMBEDDINGS_MEDIA_TYPE
+from shared_configs.utils import EMBEDDING_DIM_HEADER
+from shared_configs.utils import encode_embeddings
 
 if TYPE_CHECKING:
     from sentence_transformers import CrossEncoder, SentenceTransformer
@@ -28,6 +37,10 @@ router = APIRouter(prefix="/encoder")
 
 _GLOBAL_MODELS_DICT: dict[str, "SentenceTransformer"] = {}
 _RERANK_MODEL: Optional["CrossEncoder"] = None
+_EMBEDDING_MICRO_BATCHER = EmbeddingMicroBatcher(
+    max_batch_size=MODEL_SERVER_MICRO_BATCH_MAX_SIZE,
+    max_wait_ms=MODEL_SERVER_MICRO_BATCH_MAX_WAIT_MS,
+)
 
 # If we are not only indexing, dont want retry very long
 _RETRY_DELAY = 10 if INDEXING_ONLY else 0.1
@@ -157,13 +170,24 @@ async def embed_text(
         local_model = get_embedding_model(
             model_name=model_name, max_context_length=max_context_length
         )
-        # Run CPU-bound embedding in a thread pool
-        embeddings_vectors = await asyncio.get_event_loop().run_in_executor(
-            None,
-            lambda: _concurrent_embedding(
-                prefixed_texts, local_model, normalize_embeddings
-            ),
-        )
+        if MODEL_SERVER_MICRO_BATCHING_ENABLED:
+            # The prefix is already applied to the texts, so requests with different
+            # prefixes can still share a forward pass
+            embeddings_vectors = await _EMBEDDING_MICRO_BATCHER.embed(
+                key=(model_name, max_context_length, normalize_embeddings),
+                texts=prefixed_texts,
+                encode=lambda batch_texts: _concurrent_embedding(
+                    batch_texts, local_model, normalize_embeddings
+                ),
+            )
+        else:
+            # Run CPU-bound embedding in a thread pool
+            embeddings_vectors = await asyncio.get_event_loop().run_in_executor(
+                None,
+                lambda: _concurrent_embedding(
+                    prefixed_texts, local_model, normalize_embeddings
+                ),
+            )
         embeddings = [
             embedding if isinstance(embedding, list) else embedding.tolist()
             for embedding in embeddings_vectors
@@ -199,12 +223,26 @@ async def local_rerank(query: str, docs: list[str], model_name: str) -> list[flo
     )
 
 
-@router.post("/bi-encoder-embed")
+@router.post("/bi-encoder-embed", response_model=EmbedResponse)
 async def route_bi_encoder_embed(
     request: Request,
     embed_request: EmbedRequest,
-) -> EmbedResponse:
-    return await process_embed_request(embed_request, request.app.state.gpu_type)
+) -> EmbedResponse | Response:
+    embed_response = await process_embed_request(
+        embed_request, request.app.state.gpu_type
+    )
+    if embed_request.response_encoding == EmbeddingResponseEncoding.JSON:
+        return embed_response
+
+    # skips serializing every float into JSON
+    buffer, dim = encode_embeddings(
+        embed_response.embeddings, embed_request.response_encoding
+    )
+    return Response(
+        content=buffer,
+        media_type=BINARY_EMBEDDINGS_MEDIA_TYPE,
+        headers={EMBEDDING_DIM_HEADER: str(dim)},
+    )
 
 
 async def process_embed_request(
@@ -0,0 +1,121 @@
+import asyncio
+import time
+from collections.abc import Callable
+from collections.abc import Hashable
+from dataclasses import dataclass
+from dataclasses import field
+
+from onyx.utils.logger import setup_logger
+from shared_configs.model_server_models import Embedding
+
+logger = setup_logger()
+
+
+@dataclass
+class _PendingRequest:
+    texts: list[str]
+    future: asyncio.Future[list[Embedding]]
+
+
+@dataclass
+class _PendingBatch:
+    requests: list[_PendingRequest] = field(default_factory=list)
+    num_texts: int = 0
+    flush_handle: asyncio.TimerHandle | None = None
+
+
+class EmbeddingMicroBatcher:
+    """Gathers concurrent embedding requests that can share a forward pass (same model,
+    context length and normalization) into one `encode` call.
+
+    A batch is flushed as soon as it holds `max_batch_size` texts, or `max_wait_ms`
+    after its first request arrived, whichever comes first. A request that doesn't fit
+    in the pending batch flushes it and starts the next one, so a batch never exceeds
+    `max_batch_size` texts. Requests that are already at least `max_batch_size` texts
+    are encoded on their own right away. The encode function is run on the default
+    executor so the event loop is never blocked."""
+
+    def __init__(self, max_batch_size: int, max_wait_ms: float):
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_ms / 1000
+        self._pending: dict[Hashable, _PendingBatch] = {}
+        # the event loop only keeps weak references to tasks, hold on to the running
+        # batches so they can't be garbage collected with requests still waiting
+        self._running_batches: set[asyncio.Task[None]] = set()
+
+    async def embed(
+        self,
+        key: Hashable,
+        texts: list[str],
+        encode: Callable[[list[str]], list[Embedding]],
+    ) -> list[Embedding]:
+        loop = asyncio.get_running_loop()
+        if len(texts) >= self.max_batch_size:
+            return await loop.run_in_executor(None, encode, texts)
+
+        pending_batch = self._pending.get(key)
+        if (
+            pending_batch is not None
+            and pending_batch.num_texts + len(texts) > self.max_batch_size
+        ):
+            self._flush(key, encode)
+
+        future: asyncio.Future[list[Embedding]] = loop.create_future()
+        batch = self._pending.setdefault(key, _PendingBatch())
+        batch.requests.append(_PendingRequest(texts=texts, future=future))
+        batch.num_texts += len(texts)
+
+        if batch.num_texts >= self.max_batch_size:
+            self._flush(key, encode)
+        elif batch.flush_handle is None:
+            batch.flush_handle = loop.call_later(
+                self.max_wait_seconds, self._flush, key, encode
+            )
+
+        return await future
+
+    def _flush(
+        self, key: Hashable, encode: Callable[[list[str]], list[Embedding]]
+    ) -> None:
+        batch = self._pending.pop(key, None)
+        if batch is None:
+            return
+        if batch.flush_handle is not None:
+            batch.flush_handle.cancel()
+
+        task = asyncio.get_running_loop().create_task(self._run_batch(batch, encode))
+        self._running_batches.add(task)
+        task.add_done_callback(self._running_batches.discard)
+
+    async def _run_batch(
+        self,
+        batch: _PendingBatch,
+        encode: Callable[[list[str]], list[Embedding]],
+    ) -> None:
+        all_texts = [text for request in batch.requests for text in request.texts]
+        start = time.monotonic()
+        try:
+            embeddings = await asyncio.get_running_loop().run_in_executor(
+                None, encode, all_texts
+            )
+            if len(embeddings) != len(all_texts):
+                raise RuntimeError(
+                    f"Expected {len(all_texts)} embeddings, got {len(embeddings)}"
+                )
+        except Exception as e:
+            for request in batch.requests:
+                if not request.future.done():
+                    request.future.set_exception(e)
+            return
+
+        logger.debug(
+            f"Micro-batched {len(batch.requests)} embedding requests "
+            f"({len(all_texts)} texts) in {time.monotonic() - start:.3f}s"
+        )
+
+        offset = 0
+        for request in batch.requests:
+            num_texts = len(request.texts)
+            if not request.future.done():
+                request.future.set_result(embeddings[offset : offset + num_texts])
+            offset += num_texts
@@ -0,0 +1,89 @@
+import json
+from collections.abc import Callable
+from typing import cast
+
+from onyx.configs.app_configs import ACL_CACHE_TTL_SECONDS
+from onyx.redis.redis_pool import get_redis_client
+from onyx.utils.cache import TTLCache
+from onyx.utils.logger import setup_logger
+from shared_configs.contextvars import get_current_tenant_id
+
+logger = setup_logger()
+
+# bumped whenever group memberships may have changed (user group edits and syncs,
+# external group sync), which implicitly invalidates every cached ACL of the tenant
+_ACL_GENERATION_KEY = "acl_generation"
+_ACL_KEY_PREFIX = "user_acl"
+
+# (tenant_id, user_id) -> (acl generation, acl)
+_acl_cache: TTLCache[tuple[str, str], tuple[int, frozenset[str]]] = TTLCache(
+    max_size=4096, ttl_seconds=ACL_CACHE_TTL_SECONDS
+)
+
+
+def _get_acl_generation(tenant_id: str) -> int | None:
+    try:
+        generation = get_redis_client(tenant_id=tenant_id).get(_ACL_GENERATION_KEY)
+    except Exception:
+        logger.warning("Failed to read the ACL generation", exc_info=True)
+        return None
+    return int(cast(bytes, generation)) if generation else 0
+
+
+def _redis_key(generation: int, user_id: str) -> str:
+    # the generation is part of the key, entries of older generations just expire
+    return f"{_ACL_KEY_PREFIX}:{generation}:{user_id}"
+
+
+def invalidate_acl_cache(tenant_id: str | None = None) -> None:
+    """Call after committing changes to user group or external group memberships so
+    that every process re-resolves user ACLs on their next search."""
+    tenant_id = tenant_id or get_current_tenant_id()
+    try:
+        get_redis_client(tenant_id=tenant_id).incrby(_ACL_GENERATION_KEY, 1)
+    except Exception:
+        logger.warning(
+            "Failed to bump the ACL generation, cached ACLs will be refreshed "
+            f"within {ACL_CACHE_TTL_SECONDS}s",
+            exc_info=True,
+        )
+
+
+def get_cached_acl(user_id: str, compute_acl: Callable[[], set[str]]) -> set[str]:
+    """Returns the ACL of the user from the in-process cache or Redis if it was resolved
+    since the last invalidation, otherwise computes (and caches) it with `compute_acl`.
+    Falls back to `compute_acl` if Redis is unavailable."""
+    if ACL_CACHE_TTL_SECONDS <= 0:
+        return compute_acl()
+
+    tenant_id = get_current_tenant_id()
+    generation = _get_acl_generation(tenant_id)
+    if generation is None:
+        return compute_acl()
+
+    cache_key = (tenant_id, user_id)
+    cached = _acl_cache.get(cache_key)
+    if cached is not None and cached[0] == generation:
+        return set(cached[1])
+
+    redis_client = get_redis_client(tenant_id=tenant_id)
+    redis_key = _redis_key(generation, user_id)
+    try:
+        raw_acl = redis_client.get(redis_key)
+    except Exception:
+        logger.warning("Failed to read the user ACL from Redis", exc_info=True)
+        raw_acl = None
+
+    if raw_acl:
+        acl = set(json.loads(cast(bytes, raw_acl)))
+    else:
+        acl = compute_acl()
+        try:
+            redis_client.set(
+                redis_key, json.dumps(sorted(acl)), ex=ACL_CACHE_TTL_SECONDS
+            )
+        except Exception:
+            logger.warning("Failed to write the user ACL to Redis", exc_info=True)
+
+    _acl_cache.set(cache_key, (generation, frozenset(acl)))
+    return acl
@@ -0,0 +1,143 @@
+import contextvars
+import hashlib
+import time
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import cast
+
+from onyx.agents.agent_search.dr.sub_agents.web_search.models import (
+    WebContent,
+)
+from onyx.agents.agent_search.dr.sub_agents.web_search.models import (
+    WebSearchProvider,
+)
+from onyx.configs.chat_configs import WEB_FETCH_CACHE_TTL_SECONDS
+from onyx.configs.chat_configs import WEB_FETCH_MAX_CONCURRENCY
+from onyx.configs.chat_configs import WEB_FETCH_TIMEOUT_SECONDS
+from onyx.connectors.web.crawl_frontier import normalize_url
+from onyx.redis.redis_pool import get_redis_client
+from onyx.utils.cache import RequestCoalescer
+from onyx.utils.logger import setup_logger
+from shared_configs.contextvars import get_current_tenant_id
+
+logger = setup_logger()
+
+_WEB_CONTENT_CACHE_KEY_PREFIX = "web_content"
+
+# Shared by all fetches of the process. Fetches that miss their deadline keep their
+# worker until the provider call returns, the caller just stops waiting for them.
+_fetch_executor = ThreadPoolExecutor(
+    max_workers=WEB_FETCH_MAX_CONCURRENCY, thread_name_prefix="web_fetch"
+)
+_coalescer: RequestCoalescer[str, WebContent] = RequestCoalescer()
+
+
+def _failed_content(url: str) -> WebContent:
+    return WebContent(
+        title="",
+        link=url,
+        full_content="",
+        published_date=None,
+        scrape_successful=False,
+    )
+
+
+def _cache_key(url: str) -> str:
+    url_hash = hashlib.sha256(normalize_url(url).encode()).hexdigest()
+    # tenant prefix is added by the redis client
+    return f"{_WEB_CONTENT_CACHE_KEY_PREFIX}:{url_hash}"
+
+
+def _get_cached_content(url: str) -> WebContent | None:
+    try:
+        raw_value = get_redis_client().get(_cache_key(url))
+    except Exception:
+        logger.warning(f"Failed to read cached web content for {url}", exc_info=True)
+        return None
+    return WebContent.model_validate_json(cast(bytes, raw_value)) if raw_value else None
+
+
+def _cache_content(url: str, content: WebContent) -> None:
+    try:
+        get_redis_client().set(
+            _cache_key(url),
+            content.model_dump_json(),
+            ex=WEB_FETCH_CACHE_TTL_SECONDS,
+        )
+    except Exception:
+        logger.warning(f"Failed to cache web content for {url}", exc_info=True)
+
+
+def _fetch_content(provider: WebSearchProvider, url: str) -> WebContent:
+    if WEB_FETCH_CACHE_TTL_SECONDS > 0:
+        cached_content = _get_cached_content(url)
+        if cached_content is not None:
+            return cached_content
+
+    def _compute() -> WebContent:
+        results = provider.contents([url])
+        normalized_url = normalize_url(url)
+        content = next(
+            (
+                result
+                for result in results
+                if normalize_url(result.link) == normalized_url
+            ),
+            results[0] if results else _failed_content(url),
+        )
+        # failed scrapes are retried the next time the url is opened
+        if (
+            WEB_FETCH_CACHE_TTL_SECONDS > 0
+            and content.scrape_successful
+            and content.full_content
+        ):
+            _cache_content(url, content)
+        return content
+
+    return _coalescer.get_or_compute(
+        f"{get_current_tenant_id()}:{normalize_url(url)}", _compute
+    )
+
+
+def fetch_web_contents(
+    provider: WebSearchProvider,
+    urls: list[str],
+    timeout: float = WEB_FETCH_TIMEOUT_SECONDS,
+) -> list[WebContent]:
+    """Fetches the content of the urls concurrently, one provider call per url.
+
+    Content is cached per tenant by normalized url (shared by all providers), and
+    concurrent fetches of the same url share a single provider call. Urls that fail
+    or aren't fetched within `timeout` seconds are returned as unsuccessful scrapes
+    instead of holding up the others, unless every url raised, in which case the first
+    error is raised. Results are in the order of `urls`, duplicate urls are only
+    returned once."""
+    futures: dict[str, Future[WebContent]] = {}
+    seen_urls: set[str] = set()
+    for url in urls:
+        normalized_url = normalize_url(url)
+        if normalized_url in seen_urls:
+            continue
+        seen_urls.add(normalized_url)
+        futures[url] = _fetch_executor.submit(
+            contextvars.copy_context().run, _fetch_content, provider, url
+        )
+
+    deadline = time.monotonic() + timeout
+    results: list[WebContent] = []
+    errors: list[Exception] = []
+    for url, future in futures.items():
+        try:
+            results.append(future.result(timeout=max(0, deadline - time.monotonic())))
+        except FutureTimeoutError:
+            logger.warning(f"Fetching {url} timed out after {timeout}s")
+            results.append(_failed_content(url))
+        except Exception as e:
+            logger.warning(f"Failed to fetch {url}: {e}")
+            errors.append(e)
+            results.append(_failed_content(url))
+
+    if errors and len(errors) == len(futures):
+        raise errors[0]
+    return results
@@ -4,6 +4,9 @@ from typing import cast
 from langchain_core.runnables import RunnableConfig
 from langgraph.types import StreamWriter
 
+from onyx.agents.agent_search.dr.sub_agents.web_search.content_fetcher import (
+    fetch_web_contents,
+)
 from onyx.agents.agent_search.dr.sub_agents.web_search.providers import (
     get_default_provider,
 )
@@ -49,7 +52,7 @@ def web_fetch(
     try:
         retrieved_docs = [
             dummy_inference_section_from_internet_content(result)
-            for result in provider.contents(state.urls_to_open)
+            for result in fetch_web_contents(provider, state.urls_to_open)
         ]
     except Exception as e:
         logger.error(f"Error fetching URLs: {e}")
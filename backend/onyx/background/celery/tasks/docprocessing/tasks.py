@@ -5,6 +5,7 @@ from datetime import datetime
 from datetime import timedelta
 from datetime import timezone
 from typing import Any
+from typing import cast
 
 from celery import Celery
 from celery import shared_task
@@ -13,7 +14,6 @@ from celery.exceptions import SoftTimeLimitExceeded
 from pydantic import BaseModel
 from redis import Redis
 from redis.lock import Lock as RedisLock
-from sqlalchemy import exists
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
@@ -25,8 +25,10 @@ from onyx.background.celery.tasks.beat_schedule import CLOUD_BEAT_MULTIPLIER_DEF
 from onyx.background.celery.tasks.docprocessing.heartbeat import start_heartbeat
 from onyx.background.celery.tasks.docprocessing.heartbeat import stop_heartbeat
 from onyx.background.celery.tasks.docprocessing.utils import IndexingCallback
-from onyx.background.celery.tasks.docprocessing.utils import is_in_repeated_error_state
-from onyx.background.celery.tasks.docprocessing.utils import should_index
+from onyx.background.celery.tasks.docprocessing.utils import IndexingScheduleState
+from onyx.background.celery.tasks.docprocessing.utils import (
+    load_indexing_schedule_state,
+)
 from onyx.background.celery.tasks.docprocessing.utils import (
     try_creating_docfetching_task,
 )
@@ -59,7 +61,7 @@ from onyx.db.connector_credential_pair import (
     fetch_indexable_user_file_connector_credential_pair_ids,
 )
 from onyx.db.connector_credential_pair import get_connector_credential_pair_from_id
-from onyx.db.connector_credential_pair import set_cc_pair_repeated_error_state
+from onyx.db.connector_credential_pair import set_cc_pairs_repeated_error_state
 from onyx.db.engine.sql_engine import get_session_with_current_tenant
 from onyx.db.engine.time_utils import get_db_current_time
 from onyx.db.enums import ConnectorCredentialPairStatus
@@ -76,8 +78,8 @@ from onyx.db.index_attempt import mark_attempt_succeeded
 from onyx.db.indexing_coordination import CoordinationStatus
 from onyx.db.indexing_coordination import INDEXING_PROGRESS_TIMEOUT_HOURS
 from onyx.db.indexing_coordination import IndexingCoordination
+from onyx.db.models import ConnectorCredentialPair
 from onyx.db.models import IndexAttempt
-from onyx.db.models import SearchSettings
 from onyx.db.search_settings import get_current_search_settings
 from onyx.db.search_settings import get_secondary_search_settings
 from onyx.db.swap_index import check_and_perform_index_swap
@@ -566,85 +568,40 @@ def check_indexing_completion(
     logger.info(f"Database coordination completed for attempt {index_attempt_id}")
 
 
-def active_indexing_attempt(
-    cc_pair_id: int,
-    search_settings_id: int,
-    db_session: Session,
-) -> bool:
-    """
-    Check if there's already an active indexing attempt for this CC pair + search settings.
-    This prevents race conditions where multiple indexing attempts could be created.
-    We check for any non-terminal status (NOT_STARTED, IN_PROGRESS).
-
-    Returns True if there's an active indexing attempt, False otherwise.
-    """
-    active_indexing_attempt = db_session.execute(
-        select(
-            exists().where(
-                IndexAttempt.connector_credential_pair_id == cc_pair_id,
-                IndexAttempt.search_settings_id == search_settings_id,
-                IndexAttempt.status.in_(
-                    [
-                        IndexingStatus.NOT_STARTED,
-                        IndexingStatus.IN_PROGRESS,
-                    ]
-                ),
-            )
-        )
-    ).scalar()
-
-    if active_indexing_attempt:
-        task_logger.debug(
-            f"active_indexing_attempt - Skipping due to active indexing attempt: "
-            f"cc_pair={cc_pair_id} search_settings={search_settings_id}"
-        )
-
-    return bool(active_indexing_attempt)
-
-
 def _kickoff_indexing_tasks(
     celery_app: Celery,
     db_session: Session,
-    search_settings: SearchSettings,
+    schedule_state: IndexingScheduleState,
     cc_pair_ids: list[int],
     secondary_index_building: bool,
     redis_client: Redis,
     lock_beat: RedisLock,
     tenant_id: str,
 ) -> int:
-    """Kick off indexing tasks for the given cc_pair_ids and search_settings.
+    """Kick off indexing tasks for the given cc_pair_ids and the search settings
+    of `schedule_state`. Which cc_pairs to index is decided up front from the
+    preloaded state, before any task is created.
 
     Returns the number of tasks successfully created.
     """
+    search_settings = schedule_state.search_settings
     tasks_created = 0
 
+    cc_pairs_to_index: list[ConnectorCredentialPair] = []
     for cc_pair_id in cc_pair_ids:
-        lock_beat.reacquire()
-
-        # Lightweight check prior to fetching cc pair
-        if active_indexing_attempt(
-            cc_pair_id=cc_pair_id,
-            search_settings_id=search_settings.id,
-            db_session=db_session,
-        ):
+        if schedule_state.has_active_attempt(cc_pair_id):
             continue
 
-        cc_pair = get_connector_credential_pair_from_id(
-            db_session=db_session,
-            cc_pair_id=cc_pair_id,
-        )
+        cc_pair = schedule_state.cc_pairs.get(cc_pair_id)
         if not cc_pair:
             task_logger.warning(
                 f"_kickoff_indexing_tasks - CC pair not found: cc_pair={cc_pair_id}"
             )
             continue
 
-        # Heavyweight check after fetching cc pair
-        if not should_index(
-            cc_pair=cc_pair,
-            search_settings_instance=search_settings,
+        if not schedule_state.should_index(
+            cc_pair_id=cc_pair_id,
             secondary_index_building=secondary_index_building,
-            db_session=db_session,
         ):
             task_logger.debug(
                 f"_kickoff_indexing_tasks - Not indexing cc_pair_id: {cc_pair_id} "
@@ -658,6 +615,10 @@ def _kickoff_indexing_tasks(
             f"search_settings={search_settings.id}, "
             f"secondary_index_building={secondary_index_building}"
         )
+        cc_pairs_to_index.append(cc_pair)
+
+    for cc_pair in cc_pairs_to_index:
+        lock_beat.reacquire()
 
         reindex = False
         # the indexing trigger is only checked and cleared with the current search settings
@@ -753,14 +714,20 @@ def check_for_indexing(self: Task, *, tenant_id: str) -> int | None:
             # build a lookup table of existing fences
             # this is just a migration concern and should be unnecessary once
             # lookup tables are rolled out
-            for key_bytes in redis_client_replica.scan_iter(
-                count=SCAN_ITER_COUNT_DEFAULT
-            ):
-                if is_fence(key_bytes) and not redis_client.sismember(
-                    OnyxRedisConstants.ACTIVE_FENCES, key_bytes
-                ):
-                    logger.warning(f"Adding {key_bytes} to the lookup table.")
-                    redis_client.sadd(OnyxRedisConstants.ACTIVE_FENCES, key_bytes)
+            fence_keys = {
+                key_bytes
+                for key_bytes in redis_client_replica.scan_iter(
+                    count=SCAN_ITER_COUNT_DEFAULT
+                )
+                if is_fence(key_bytes)
+            }
+            missing_fence_keys = fence_keys - cast(
+                set[bytes], redis_client.smembers(OnyxRedisConstants.ACTIVE_FENCES)
+            )
+            if missing_fence_keys:
+                for key_bytes in missing_fence_keys:
+                    logger.warning(f"Adding {key_bytes!r} to the lookup table.")
+                redis_client.sadd(OnyxRedisConstants.ACTIVE_FENCES, *missing_fence_keys)
 
             redis_client.set(
                 OnyxRedisSignals.BLOCK_BUILD_FENCE_LOOKUP_TABLE,
@@ -826,30 +793,51 @@ def check_for_indexing(self: Task, *, tenant_id: str) -> int | None:
 
                 secondary_cc_pair_ids = standard_cc_pair_ids + user_file_cc_pair_ids
 
-        # Flag CC pairs in repeated error state for primary/current search settings
+        # the scheduling state of all the cc pairs is loaded up front with a few
+        # set-based queries, which cc pairs to index is then decided in memory
+        lock_beat.reacquire()
+        time_kickoff_start = time.monotonic()
         with get_session_with_current_tenant() as db_session:
-            for cc_pair_id in primary_cc_pair_ids:
-                lock_beat.reacquire()
-
-                if is_in_repeated_error_state(
-                    cc_pair_id=cc_pair_id,
-                    search_settings_id=current_search_settings.id,
+            primary_schedule_state = load_indexing_schedule_state(
+                db_session=db_session,
+                search_settings=current_search_settings,
+                cc_pair_ids=primary_cc_pair_ids,
+            )
+            secondary_schedule_state = (
+                load_indexing_schedule_state(
                     db_session=db_session,
-                ):
-                    set_cc_pair_repeated_error_state(
-                        db_session=db_session,
-                        cc_pair_id=cc_pair_id,
+                    search_settings=secondary_search_settings,
+                    cc_pair_ids=secondary_cc_pair_ids,
+                )
+                if secondary_search_settings
+                and secondary_search_settings.background_reindex_enabled
+                and secondary_cc_pair_ids
+                else None
+            )
+            time_state_loaded = time.monotonic()
+
+            # Flag CC pairs in repeated error state for primary/current search settings.
+            # Written from a separate session so that the commit doesn't expire the
+            # loaded cc pairs.
+            repeated_error_cc_pair_ids = [
+                cc_pair_id
+                for cc_pair_id, cc_pair in primary_schedule_state.cc_pairs.items()
+                if not cc_pair.in_repeated_error_state
+                and primary_schedule_state.is_in_repeated_error_state(cc_pair_id)
+            ]
+            if repeated_error_cc_pair_ids:
+                with get_session_with_current_tenant() as error_state_db_session:
+                    set_cc_pairs_repeated_error_state(
+                        db_session=error_state_db_session,
+                        cc_pair_ids=repeated_error_cc_pair_ids,
                         in_repeated_error_state=True,
                     )
 
-        # NOTE: At this point, we haven't done heavy checks on whether or not the CC pairs should actually be indexed
-        # Heavy check, should_index(), is called in _kickoff_indexing_tasks
-        with get_session_with_current_tenant() as db_session:
             # Primary first
             tasks_created += _kickoff_indexing_tasks(
                 celery_app=self.app,
                 db_session=db_session,
-                search_settings=current_search_settings,
+                schedule_state=primary_schedule_state,
                 cc_pair_ids=primary_cc_pair_ids,
                 secondary_index_building=secondary_search_settings is not None,
                 redis_client=redis_client,
@@ -858,15 +846,11 @@ def check_for_indexing(self: Task, *, tenant_id: str) -> int | None:
             )
 
             # Secondary indexing (only if secondary search settings exist and background reindex is enabled)
-            if (
-                secondary_search_settings
-                and secondary_search_settings.background_reindex_enabled
-                and secondary_cc_pair_ids
-            ):
+            if secondary_schedule_state:
                 tasks_created += _kickoff_indexing_tasks(
                     celery_app=self.app,
                     db_session=db_session,
-                    search_settings=secondary_search_settings,
+                    schedule_state=secondary_schedule_state,
                     cc_pair_ids=secondary_cc_pair_ids,
                     secondary_index_building=True,
                     redis_client=redis_client,
@@ -883,6 +867,18 @@ def check_for_indexing(self: Task, *, tenant_id: str) -> int | None:
                     f"for search_settings={secondary_search_settings.id}"
                 )
 
+        time_kickoff_end = time.monotonic()
+        task_logger.info(
+            f"check_for_indexing - Kickoff finished: "
+            f"tenant={tenant_id} "
+            f"cc_pairs={len(primary_cc_pair_ids)} "
+            f"secondary_cc_pairs={len(secondary_cc_pair_ids)} "
+            f"repeated_error={len(repeated_error_cc_pair_ids)} "
+            f"tasks_created={tasks_created} "
+            f"load_state_elapsed={time_state_loaded - time_kickoff_start:.2f} "
+            f"kickoff_elapsed={time_kickoff_end - time_state_loaded:.2f}"
+        )
+
         # 2/3: VALIDATE
         # Check for inconsistent index attempts - active attempts without task IDs
         # This can happen if attempt creation fails partway through
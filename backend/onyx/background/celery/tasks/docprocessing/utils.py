@@ -1,4 +1,6 @@
 import time
+from collections.abc import Callable
+from dataclasses import dataclass
 from datetime import datetime
 from datetime import timezone
 from uuid import uuid4
@@ -18,15 +20,21 @@ from onyx.configs.constants import OnyxCeleryPriority
 from onyx.configs.constants import OnyxCeleryQueues
 from onyx.configs.constants import OnyxCeleryTask
 from onyx.db.connector_credential_pair import get_connector_credential_pair_from_id
+from onyx.db.connector_credential_pair import (
+    get_connector_credential_pairs_from_ids,
+)
 from onyx.db.engine.time_utils import get_db_current_time
 from onyx.db.enums import ConnectorCredentialPairStatus
 from onyx.db.enums import IndexingStatus
 from onyx.db.enums import IndexModelStatus
+from onyx.db.index_attempt import get_cc_pair_ids_with_active_attempts
 from onyx.db.index_attempt import get_last_attempt_for_cc_pair
 from onyx.db.index_attempt import get_recent_attempts_for_cc_pair
+from onyx.db.index_attempt import get_recent_attempts_for_cc_pairs
 from onyx.db.index_attempt import mark_attempt_failed
 from onyx.db.indexing_coordination import IndexingCoordination
 from onyx.db.models import ConnectorCredentialPair
+from onyx.db.models import IndexAttempt
 from onyx.db.models import SearchSettings
 from onyx.indexing.indexing_heartbeat import IndexingHeartbeatInterface
 from onyx.redis.redis_connector import RedisConnector
@@ -134,6 +142,35 @@ class IndexingCallback(IndexingHeartbeatInterface):
 # handled by validate_active_indexing_attempts in the main indexing tasks module.
 
 
+def _num_failed_attempts_for_repeated_error_state(
+    cc_pair: ConnectorCredentialPair,
+) -> int:
+    # if the connector doesn't have a refresh_freq, a single failed attempt is enough
+    return (
+        NUM_REPEAT_ERRORS_BEFORE_REPEATED_ERROR_STATE
+        if cc_pair.connector.refresh_freq is not None
+        else 1
+    )
+
+
+def _is_repeated_error_streak(
+    cc_pair: ConnectorCredentialPair, most_recent_index_attempts: list[IndexAttempt]
+) -> bool:
+    """`most_recent_index_attempts` are ordered most recent to least recent."""
+    number_of_failed_attempts_in_a_row_needed = (
+        _num_failed_attempts_for_repeated_error_state(cc_pair)
+    )
+    most_recent_index_attempts = most_recent_index_attempts[
+        :number_of_failed_attempts_in_a_row_needed
+    ]
+    return len(
+        most_recent_index_attempts
+    ) >= number_of_failed_attempts_in_a_row_needed and all(
+        attempt.status == IndexingStatus.FAILED
+        for attempt in most_recent_index_attempts
+    )
+
+
 def is_in_repeated_error_state(
     cc_pair_id: int, search_settings_id: int, db_session: Session
 ) -> bool:
@@ -147,25 +184,13 @@ def is_in_repeated_error_state(
             f"is_in_repeated_error_state - could not find cc_pair with id={cc_pair_id}"
         )
 
-    # if the connector doesn't have a refresh_freq, a single failed attempt is enough
-    number_of_failed_attempts_in_a_row_needed = (
-        NUM_REPEAT_ERRORS_BEFORE_REPEATED_ERROR_STATE
-        if cc_pair.connector.refresh_freq is not None
-        else 1
-    )
-
     most_recent_index_attempts = get_recent_attempts_for_cc_pair(
         cc_pair_id=cc_pair_id,
         search_settings_id=search_settings_id,
-        limit=number_of_failed_attempts_in_a_row_needed,
+        limit=_num_failed_attempts_for_repeated_error_state(cc_pair),
         db_session=db_session,
     )
-    return len(
-        most_recent_index_attempts
-    ) >= number_of_failed_attempts_in_a_row_needed and all(
-        attempt.status == IndexingStatus.FAILED
-        for attempt in most_recent_index_attempts
-    )
+    return _is_repeated_error_streak(cc_pair, most_recent_index_attempts)
 
 
 def should_index(
@@ -182,7 +207,6 @@ def should_index(
 
     Return True if we should try to index, False if not.
     """
-    connector = cc_pair.connector
     last_index_attempt = get_last_attempt_for_cc_pair(
         cc_pair_id=cc_pair.id,
         search_settings_id=search_settings_instance.id,
@@ -193,6 +217,27 @@ def should_index(
         search_settings_id=search_settings_instance.id,
         db_session=db_session,
     )
+    return _should_index(
+        cc_pair=cc_pair,
+        search_settings_instance=search_settings_instance,
+        secondary_index_building=secondary_index_building,
+        last_index_attempt=last_index_attempt,
+        all_recent_errored=all_recent_errored,
+        get_current_db_time=lambda: get_db_current_time(db_session),
+    )
+
+
+def _should_index(
+    cc_pair: ConnectorCredentialPair,
+    search_settings_instance: SearchSettings,
+    secondary_index_building: bool,
+    last_index_attempt: IndexAttempt | None,
+    all_recent_errored: bool,
+    get_current_db_time: Callable[[], datetime],
+) -> bool:
+    """should_index() on already loaded state, doesn't query anything itself
+    (other than through `get_current_db_time`)."""
+    connector = cc_pair.connector
 
     # uncomment for debugging
     # task_logger.debug(
@@ -288,7 +333,7 @@ def should_index(
     ):
         return True
 
-    current_db_time = get_db_current_time(db_session)
+    current_db_time = get_current_db_time()
     time_since_index = current_db_time - last_index_attempt.time_updated
     if time_since_index.total_seconds() < connector.refresh_freq:
         # print(
@@ -300,6 +345,69 @@ def should_index(
     return True
 
 
+@dataclass
+class IndexingScheduleState:
+    """The state should_index() looks at, loaded for many cc_pairs at once so that a
+    scheduler pass costs a handful of queries instead of several per cc_pair."""
+
+    search_settings: SearchSettings
+    cc_pairs: dict[int, ConnectorCredentialPair]
+    # most recent to least recent, only as many as the repeated error check needs
+    recent_attempts: dict[int, list[IndexAttempt]]
+    cc_pair_ids_with_active_attempts: set[int]
+    current_db_time: datetime
+
+    def has_active_attempt(self, cc_pair_id: int) -> bool:
+        return cc_pair_id in self.cc_pair_ids_with_active_attempts
+
+    def is_in_repeated_error_state(self, cc_pair_id: int) -> bool:
+        return _is_repeated_error_streak(
+            self.cc_pairs[cc_pair_id], self.recent_attempts.get(cc_pair_id, [])
+        )
+
+    def should_index(self, cc_pair_id: int, secondary_index_building: bool) -> bool:
+        recent_attempts = self.recent_attempts.get(cc_pair_id)
+        return _should_index(
+            cc_pair=self.cc_pairs[cc_pair_id],
+            search_settings_instance=self.search_settings,
+            secondary_index_building=secondary_index_building,
+            last_index_attempt=recent_attempts[0] if recent_attempts else None,
+            all_recent_errored=self.is_in_repeated_error_state(cc_pair_id),
+            get_current_db_time=lambda: self.current_db_time,
+        )
+
+
+def load_indexing_schedule_state(
+    db_session: Session,
+    search_settings: SearchSettings,
+    cc_pair_ids: list[int],
+) -> IndexingScheduleState:
+    """Loads the scheduling state of the cc_pairs with set-based queries.
+    cc_pairs that no longer exist are left out of `cc_pairs`."""
+    cc_pairs = {
+        cc_pair.id: cc_pair
+        for cc_pair in get_connector_credential_pairs_from_ids(
+            db_session, cc_pair_ids, eager_load_connector=True
+        )
+    }
+    return IndexingScheduleState(
+        search_settings=search_settings,
+        cc_pairs=cc_pairs,
+        recent_attempts=get_recent_attempts_for_cc_pairs(
+            cc_pair_ids=list(cc_pairs),
+            search_settings_id=search_settings.id,
+            limit=NUM_REPEAT_ERRORS_BEFORE_REPEATED_ERROR_STATE,
+            db_session=db_session,
+        ),
+        cc_pair_ids_with_active_attempts=get_cc_pair_ids_with_active_attempts(
+            cc_pair_ids=list(cc_pairs),
+            search_settings_id=search_settings.id,
+            db_session=db_session,
+        ),
+        current_db_time=get_db_current_time(db_session),
+    )
+
+
 def try_creating_docfetching_task(
     celery_app: Celery,
     cc_pair: ConnectorCredentialPair,
@@ -0,0 +1,97 @@
+import heapq
+import json
+import resource
+import sys
+import tempfile
+from collections.abc import Iterable
+from collections.abc import Iterator
+from types import TracebackType
+from typing import IO
+
+from onyx.configs.app_configs import PRUNING_STREAMING_MAX_IDS_IN_MEMORY
+
+
+class SortedIdSpool:
+    """Collects ids in bounded memory and iterates over them sorted and deduplicated.
+
+    Ids are buffered in memory until `max_ids_in_memory` is reached, the buffer is then
+    sorted and spilled to a temporary file as a run. Iterating merges the runs."""
+
+    def __init__(
+        self, max_ids_in_memory: int = PRUNING_STREAMING_MAX_IDS_IN_MEMORY
+    ) -> None:
+        self.max_ids_in_memory = max_ids_in_memory
+        self._buffer: set[str] = set()
+        self._runs: list[IO[str]] = []
+        self.max_buffered_ids = 0
+
+    @property
+    def num_runs(self) -> int:
+        return len(self._runs)
+
+    def add(self, ids: Iterable[str]) -> None:
+        for id in ids:
+            self._buffer.add(id)
+            if len(self._buffer) >= self.max_ids_in_memory:
+                self._spill()
+        self.max_buffered_ids = max(self.max_buffered_ids, len(self._buffer))
+
+    def _spill(self) -> None:
+        self.max_buffered_ids = max(self.max_buffered_ids, len(self._buffer))
+        run = tempfile.TemporaryFile(mode="w+", encoding="utf-8")
+        # json encoded so that ids containing newlines survive the round trip
+        run.writelines(f"{json.dumps(id)}\n" for id in sorted(self._buffer))
+        self._runs.append(run)
+        self._buffer = set()
+
+    def __iter__(self) -> Iterator[str]:
+        sorted_runs: list[Iterator[str]] = []
+        for run in self._runs:
+            run.seek(0)
+            sorted_runs.append(json.loads(line) for line in run)
+        sorted_runs.append(iter(sorted(self._buffer)))
+
+        previous_id: str | None = None
+        for id in heapq.merge(*sorted_runs):
+            if id != previous_id:
+                yield id
+                previous_id = id
+
+    def close(self) -> None:
+        for run in self._runs:
+            run.close()
+        self._runs = []
+        self._buffer = set()
+
+    def __enter__(self) -> "SortedIdSpool":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+
+def generate_ids_missing_from_source(
+    sorted_indexed_ids: Iterable[str], sorted_source_ids: Iterable[str]
+) -> Iterator[str]:
+    """Yields the indexed ids that aren't in the source. Both inputs must be sorted
+    and deduplicated, only the current id of each is held in memory."""
+    source_ids = iter(sorted_source_ids)
+    source_id = next(source_ids, None)
+    for indexed_id in sorted_indexed_ids:
+        while source_id is not None and source_id < indexed_id:
+            source_id = next(source_ids, None)
+
+        if source_id != indexed_id:
+            yield indexed_id
+
+
+def get_peak_rss_mb() -> float:
+    """High-water mark of this process' resident memory."""
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes on linux
+    return max_rss / (1024 * 1024) if sys.platform == "darwin" else max_rss / 1024
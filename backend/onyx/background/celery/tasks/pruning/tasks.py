@@ -1,4 +1,5 @@
 import time
+from collections.abc import Iterator
 from datetime import datetime
 from datetime import timedelta
 from datetime import timezone
@@ -21,10 +22,20 @@ from onyx.background.celery.celery_redis import celery_get_queue_length
 from onyx.background.celery.celery_redis import celery_get_queued_task_ids
 from onyx.background.celery.celery_redis import celery_get_unacked_task_ids
 from onyx.background.celery.celery_utils import extract_ids_from_runnable_connector
+from onyx.background.celery.celery_utils import (
+    generate_id_batches_from_runnable_connector,
+)
 from onyx.background.celery.tasks.beat_schedule import CLOUD_BEAT_MULTIPLIER_DEFAULT
 from onyx.background.celery.tasks.docprocessing.utils import IndexingCallbackBase
+from onyx.background.celery.tasks.pruning.streaming_diff import (
+    generate_ids_missing_from_source,
+)
+from onyx.background.celery.tasks.pruning.streaming_diff import get_peak_rss_mb
+from onyx.background.celery.tasks.pruning.streaming_diff import SortedIdSpool
 from onyx.configs.app_configs import ALLOW_SIMULTANEOUS_PRUNING
 from onyx.configs.app_configs import JOB_TIMEOUT
+from onyx.configs.app_configs import PRUNING_STREAMING_DELETION_BATCH_SIZE
+from onyx.configs.app_configs import PRUNING_STREAMING_DOC_THRESHOLD
 from onyx.configs.constants import CELERY_GENERIC_BEAT_LOCK_TIMEOUT
 from onyx.configs.constants import CELERY_PRUNING_LOCK_TIMEOUT
 from onyx.configs.constants import CELERY_TASK_WAIT_FOR_FENCE_TIMEOUT
@@ -36,12 +47,17 @@ from onyx.configs.constants import OnyxRedisConstants
 from onyx.configs.constants import OnyxRedisLocks
 from onyx.configs.constants import OnyxRedisSignals
 from onyx.connectors.factory import instantiate_connector
+from onyx.connectors.interfaces import BaseConnector
 from onyx.connectors.models import InputType
 from onyx.db.connector import mark_ccpair_as_pruned
 from onyx.db.connector_credential_pair import get_connector_credential_pair
 from onyx.db.connector_credential_pair import get_connector_credential_pair_from_id
 from onyx.db.connector_credential_pair import get_connector_credential_pairs
+from onyx.db.document import count_documents_for_connector_credential_pair
 from onyx.db.document import get_documents_for_connector_credential_pair
+from onyx.db.document import (
+    stream_sorted_document_ids_for_connector_credential_pair,
+)
 from onyx.db.engine.sql_engine import get_session_with_current_tenant
 from onyx.db.enums import ConnectorCredentialPairStatus
 from onyx.db.enums import SyncStatus
@@ -389,6 +405,140 @@ def try_creating_prune_generator_task(
     return payload_id
 
 
+def _generate_prune_tasks(
+    celery_app: Celery,
+    db_session: Session,
+    cc_pair: ConnectorCredentialPair,
+    runnable_connector: BaseConnector,
+    redis_connector: RedisConnector,
+    callback: PruneCallback,
+) -> int | None:
+    """Diffs the document ids of the source and of our index in memory, then generates
+    a deletion task for every indexed document no longer in the source."""
+    # a list of docs in the source
+    all_connector_doc_ids: set[str] = extract_ids_from_runnable_connector(
+        runnable_connector, callback
+    )
+
+    # a list of docs in our local index
+    all_indexed_document_ids = {
+        doc.id
+        for doc in get_documents_for_connector_credential_pair(
+            db_session=db_session,
+            connector_id=cc_pair.connector_id,
+            credential_id=cc_pair.credential_id,
+        )
+    }
+
+    # generate list of docs to remove (no longer in the source)
+    doc_ids_to_remove = list(all_indexed_document_ids - all_connector_doc_ids)
+
+    task_logger.info(
+        "Pruning set collected: "
+        f"cc_pair={cc_pair.id} "
+        f"connector_source={cc_pair.connector.source} "
+        f"docs_to_remove={len(doc_ids_to_remove)}"
+    )
+
+    task_logger.info(
+        f"RedisConnector.prune.generate_tasks starting. cc_pair={cc_pair.id}"
+    )
+    return redis_connector.prune.generate_tasks(
+        set(doc_ids_to_remove), celery_app, db_session, None
+    )
+
+
+def _generate_prune_tasks_streaming(
+    celery_app: Celery,
+    db_session: Session,
+    cc_pair: ConnectorCredentialPair,
+    runnable_connector: BaseConnector,
+    redis_connector: RedisConnector,
+    callback: PruneCallback,
+    lock: RedisLock,
+) -> int | None:
+    """Bounded memory version of _generate_prune_tasks for large cc pairs.
+
+    The source ids are spooled into sorted runs on disk, then merged and compared with
+    the sorted stream of indexed ids from Postgres. Deletion tasks are generated in
+    batches as the diff progresses."""
+    tasks_generated = 0
+    num_compared_ids = 0
+    doc_ids_to_remove: set[str] = set()
+
+    def _compared_ids(sorted_ids: Iterator[str]) -> Iterator[str]:
+        nonlocal num_compared_ids
+
+        for id in sorted_ids:
+            num_compared_ids += 1
+            # heartbeat, even when long stretches of the diff have nothing to remove
+            if num_compared_ids % PRUNING_STREAMING_DELETION_BATCH_SIZE == 0:
+                if callback.should_stop():
+                    raise RuntimeError(
+                        "_generate_prune_tasks_streaming: Stop signal detected"
+                    )
+                callback.progress("_generate_prune_tasks_streaming", num_compared_ids)
+
+            yield id
+
+    def _flush_doc_ids_to_remove() -> bool:
+        nonlocal tasks_generated
+
+        batch_tasks_generated = redis_connector.prune.generate_tasks(
+            doc_ids_to_remove, celery_app, db_session, lock
+        )
+        if batch_tasks_generated is None:
+            return False
+
+        tasks_generated += batch_tasks_generated
+        doc_ids_to_remove.clear()
+        return True
+
+    with SortedIdSpool() as source_ids:
+        for doc_batch_ids in generate_id_batches_from_runnable_connector(
+            runnable_connector, callback
+        ):
+            source_ids.add(doc_batch_ids)
+
+        task_logger.info(
+            "Pruning source ids spooled: "
+            f"cc_pair={cc_pair.id} "
+            f"connector_source={cc_pair.connector.source} "
+            f"spilled_runs={source_ids.num_runs} "
+            f"max_ids_in_memory={source_ids.max_buffered_ids} "
+            f"peak_rss_mb={get_peak_rss_mb():.1f}"
+        )
+
+        # a separate session since its server side cursor stays open during the diff,
+        # while deletion tasks are generated with the main one
+        with get_session_with_current_tenant() as ids_db_session:
+            indexed_ids = stream_sorted_document_ids_for_connector_credential_pair(
+                db_session=ids_db_session,
+                connector_id=cc_pair.connector_id,
+                credential_id=cc_pair.credential_id,
+            )
+            for doc_id in generate_ids_missing_from_source(
+                _compared_ids(indexed_ids), source_ids
+            ):
+                doc_ids_to_remove.add(doc_id)
+                if len(doc_ids_to_remove) >= PRUNING_STREAMING_DELETION_BATCH_SIZE:
+                    if not _flush_doc_ids_to_remove():
+                        return None
+
+    if doc_ids_to_remove:
+        if not _flush_doc_ids_to_remove():
+            return None
+
+    task_logger.info(
+        "Pruning streaming diff finished: "
+        f"cc_pair={cc_pair.id} "
+        f"connector_source={cc_pair.connector.source} "
+        f"compared_ids={num_compared_ids} "
+        f"docs_to_remove={tasks_generated}"
+    )
+    return tasks_generated
+
+
 @shared_task(
     name=OnyxCeleryTask.CONNECTOR_PRUNING_GENERATOR_TASK,
     acks_late=False,
@@ -525,43 +675,42 @@ def connector_pruning_generator_task(
                 r,
             )
 
-            # a list of docs in the source
-            all_connector_doc_ids: set[str] = extract_ids_from_runnable_connector(
-                runnable_connector, callback
+            num_indexed_docs = count_documents_for_connector_credential_pair(
+                db_session=db_session,
+                connector_id=connector_id,
+                credential_id=credential_id,
             )
-
-            # a list of docs in our local index
-            all_indexed_document_ids = {
-                doc.id
-                for doc in get_documents_for_connector_credential_pair(
+            if (
+                PRUNING_STREAMING_DOC_THRESHOLD >= 0
+                and num_indexed_docs >= PRUNING_STREAMING_DOC_THRESHOLD
+            ):
+                tasks_generated = _generate_prune_tasks_streaming(
+                    celery_app=self.app,
                     db_session=db_session,
-                    connector_id=connector_id,
-                    credential_id=credential_id,
+                    cc_pair=cc_pair,
+                    runnable_connector=runnable_connector,
+                    redis_connector=redis_connector,
+                    callback=callback,
+                    lock=lock,
+                )
+            else:
+                tasks_generated = _generate_prune_tasks(
+                    celery_app=self.app,
+                    db_session=db_session,
+                    cc_pair=cc_pair,
+                    runnable_connector=runnable_connector,
+                    redis_connector=redis_connector,
+                    callback=callback,
                 )
-            }
-
-            # generate list of docs to remove (no longer in the source)
-            doc_ids_to_remove = list(all_indexed_document_ids - all_connector_doc_ids)
-
-            task_logger.info(
-                "Pruning set collected: "
-                f"cc_pair={cc_pair_id} "
-                f"connector_source={cc_pair.connector.source} "
-                f"docs_to_remove={len(doc_ids_to_remove)}"
-            )
-
-            task_logger.info(
-                f"RedisConnector.prune.generate_tasks starting. cc_pair={cc_pair_id}"
-            )
-            tasks_generated = redis_connector.prune.generate_tasks(
-                set(doc_ids_to_remove), self.app, db_session, None
-            )
             if tasks_generated is None:
                 return None
 
             task_logger.info(
                 "RedisConnector.prune.generate_tasks finished. "
-                f"cc_pair={cc_pair_id} tasks_generated={tasks_generated}"
+                f"cc_pair={cc_pair_id} "
+                f"indexed_docs={num_indexed_docs} "
+                f"tasks_generated={tasks_generated} "
+                f"peak_rss_mb={get_peak_rss_mb():.1f}"
             )
 
             redis_connector.prune.generator_complete = tasks_generated
@@ -1,4 +1,5 @@
 import datetime
+import hashlib
 import time
 from collections.abc import Sequence
 from typing import Any
@@ -11,11 +12,15 @@ from celery import Task
 from redis.lock import Lock as RedisLock
 from retry import retry
 from sqlalchemy import select
+from sqlalchemy.orm import Session
 
+from onyx.access.access import get_access_for_user_files
 from onyx.background.celery.apps.app_base import task_logger
 from onyx.background.celery.celery_utils import httpx_init_vespa_pool
 from onyx.background.celery.tasks.shared.RetryDocumentIndex import RetryDocumentIndex
+from onyx.configs.app_configs import LARGE_CHUNK_RATIO
 from onyx.configs.app_configs import MANAGED_VESPA
+from onyx.configs.app_configs import USER_FILE_DEDUP_ENABLED
 from onyx.configs.app_configs import VESPA_CLOUD_CERT_PATH
 from onyx.configs.app_configs import VESPA_CLOUD_KEY_PATH
 from onyx.configs.constants import CELERY_GENERIC_BEAT_LOCK_TIMEOUT
@@ -37,15 +42,27 @@ from onyx.db.models import SearchDoc
 from onyx.db.models import UserFile
 from onyx.db.search_settings import get_active_search_settings
 from onyx.db.search_settings import get_active_search_settings_list
+from onyx.db.user_file import fetch_user_project_ids_for_user_files
+from onyx.db.user_file import get_processed_user_file_by_content_hash
+from onyx.document_index.document_index_utils import get_uuid_from_chunk_info
 from onyx.document_index.factory import get_default_document_index
 from onyx.document_index.interfaces import VespaDocumentFields
 from onyx.document_index.interfaces import VespaDocumentUserFields
+from onyx.document_index.vespa.deletion import delete_vespa_chunks
+from onyx.document_index.vespa.indexing_utils import batch_feed_vespa_chunk_fields
 from onyx.document_index.vespa.shared_utils.utils import (
     replace_invalid_doc_id_characters,
 )
+from onyx.document_index.vespa_constants import ACCESS_CONTROL_LIST
+from onyx.document_index.vespa_constants import CHUNK_ID
+from onyx.document_index.vespa_constants import DOCUMENT_ID
 from onyx.document_index.vespa_constants import DOCUMENT_ID_ENDPOINT
+from onyx.document_index.vespa_constants import DOCUMENT_SETS
+from onyx.document_index.vespa_constants import LARGE_CHUNK_REFERENCE_IDS
+from onyx.document_index.vespa_constants import USER_PROJECT
 from onyx.file_store.file_store import get_default_file_store
 from onyx.file_store.file_store import S3BackedFileStore
+from onyx.file_store.utils import store_user_file_plaintext
 from onyx.file_store.utils import user_file_id_to_plaintext_file_name
 from onyx.httpx.httpx_pool import HttpxPool
 from onyx.indexing.adapters.user_file_indexing_adapter import UserFileIndexingAdapter
@@ -120,6 +137,171 @@ def _get_document_chunk_count(
     return chunk_count
 
 
+def _compute_user_file_content_hash(file_id: str) -> str:
+    """sha256 of the uploaded file's bytes, read in blocks to bound memory."""
+    file_io = get_default_file_store().read_file(file_id, mode="b", use_tempfile=True)
+    hasher = hashlib.sha256()
+    for block in iter(lambda: file_io.read(1024 * 1024), b""):
+        hasher.update(block)
+    return hasher.hexdigest()
+
+
+def _build_copied_chunk_fields(
+    *,
+    donor_fields: dict[str, Any],
+    user_file_id: str,
+    acl: set[str],
+    project_ids: list[int],
+) -> dict[str, Any]:
+    """The donor chunk with only the per user file fields replaced, the text and
+    embeddings are kept as is."""
+    fields = dict(donor_fields)
+    fields[DOCUMENT_ID] = user_file_id
+    fields[ACCESS_CONTROL_LIST] = {acl_entry: 1 for acl_entry in acl}
+    fields[USER_PROJECT] = project_ids
+    fields[DOCUMENT_SETS] = {}
+    return fields
+
+
+def _get_copied_chunk_uuid(fields: dict[str, Any], tenant_id: str) -> UUID:
+    large_chunk_reference_ids = fields.get(LARGE_CHUNK_REFERENCE_IDS) or []
+    return get_uuid_from_chunk_info(
+        document_id=fields[DOCUMENT_ID],
+        chunk_id=fields[CHUNK_ID],
+        tenant_id=tenant_id,
+        large_chunk_id=(
+            large_chunk_reference_ids[0] // LARGE_CHUNK_RATIO
+            if large_chunk_reference_ids
+            else None
+        ),
+    )
+
+
+def _reuse_processed_duplicate(
+    *,
+    user_file: UserFile,
+    index_name: str,
+    tenant_id: str,
+    db_session: Session,
+) -> bool:
+    """If an identical upload (same bytes and name) was already processed, copy its
+    chunks, plaintext and token count to this user file instead of extracting,
+    chunking and embedding it again. Only the ACL and project fields of the chunks
+    are specific to the user file.
+
+    Returns False if there is nothing to reuse or the copy could not be completed,
+    in which case the file should go through the regular indexing pipeline."""
+    if not user_file.content_hash:
+        user_file.content_hash = _compute_user_file_content_hash(user_file.file_id)
+        db_session.commit()
+
+    # leftover chunks of an earlier attempt may not line up with the donor's
+    if user_file.chunk_count:
+        return False
+
+    donor = get_processed_user_file_by_content_hash(
+        content_hash=user_file.content_hash,
+        name=user_file.name,
+        exclude_user_file_id=user_file.id,
+        db_session=db_session,
+    )
+    if donor is None:
+        return False
+
+    http_client = HttpxPool.get("vespa")
+    donor_chunks: list[dict[str, Any]] = []
+    continuation = None
+    while True:
+        docs, continuation = _visit_chunks(
+            http_client=http_client,
+            index_name=index_name,
+            selection=f"{index_name}.document_id=='{donor.id}'",
+            continuation=continuation,
+        )
+        donor_chunks.extend(doc["fields"] for doc in docs)
+        if not docs or not continuation:
+            break
+
+    # the donor may have been indexed into an older index or be in the middle of
+    # being deleted, only copy a complete set of chunks
+    regular_chunk_ids = sorted(
+        fields[CHUNK_ID]
+        for fields in donor_chunks
+        if not fields.get(LARGE_CHUNK_REFERENCE_IDS)
+    )
+    if not regular_chunk_ids or regular_chunk_ids != list(
+        range(len(regular_chunk_ids))
+    ):
+        task_logger.info(
+            f"_reuse_processed_duplicate - Incomplete chunks for donor={donor.id}, "
+            f"processing id={user_file.id} from scratch"
+        )
+        return False
+
+    user_file_id = str(user_file.id)
+    acl = get_access_for_user_files([user_file_id], db_session)[user_file_id].to_acl()
+    project_ids = fetch_user_project_ids_for_user_files([user_file_id], db_session).get(
+        user_file_id, []
+    )
+    copied_chunks: dict[UUID, dict[str, Any]] = {}
+    for donor_fields in donor_chunks:
+        fields = _build_copied_chunk_fields(
+            donor_fields=donor_fields,
+            user_file_id=user_file_id,
+            acl=acl,
+            project_ids=project_ids,
+        )
+        copied_chunks[_get_copied_chunk_uuid(fields, tenant_id)] = fields
+
+    try:
+        batch_feed_vespa_chunk_fields(
+            chunk_fields=copied_chunks,
+            index_name=index_name,
+            http_client=http_client,
+        )
+    except Exception:
+        task_logger.exception(
+            f"_reuse_processed_duplicate - Failed to copy the chunks of donor={donor.id}, "
+            f"removing the copied chunks and processing id={user_file.id} from scratch"
+        )
+        # the regular pipeline may produce fewer chunks than were copied
+        delete_vespa_chunks(
+            doc_chunk_ids=list(copied_chunks),
+            index_name=index_name,
+            http_client=http_client,
+        )
+        return False
+
+    try:
+        plaintext_io = get_default_file_store().read_file(
+            user_file_id_to_plaintext_file_name(donor.id), mode="b"
+        )
+        store_user_file_plaintext(
+            user_file_id=user_file.id,
+            plaintext_content=plaintext_io.read().decode("utf-8"),
+        )
+    except Exception:
+        # the plaintext is only a cache, it is rebuilt from the chunks when missing
+        task_logger.warning(
+            f"_reuse_processed_duplicate - No plaintext to copy from donor={donor.id}"
+        )
+
+    db_session.refresh(user_file)
+    # don't update the status if the user file is being deleted
+    if user_file.status != UserFileStatus.DELETING:
+        user_file.status = UserFileStatus.COMPLETED
+    user_file.last_project_sync_at = datetime.datetime.now(datetime.timezone.utc)
+    user_file.chunk_count = donor.chunk_count
+    user_file.token_count = donor.token_count
+    db_session.commit()
+
+    task_logger.info(
+        f"_reuse_processed_duplicate - Copied {len(donor_chunks)} chunks "
+        f"from donor={donor.id} to id={user_file.id}"
+    )
+    return True
+
+
 @shared_task(
     name=OnyxCeleryTask.CHECK_FOR_USER_FILE_PROCESSING,
     soft_time_limit=300,
@@ -244,6 +426,29 @@ def process_single_user_file(self: Task, *, user_file_id: str, tenant_id: str) -
                 )
 
             try:
+                reused = False
+                if USER_FILE_DEDUP_ENABLED:
+                    try:
+                        reused = _reuse_processed_duplicate(
+                            user_file=uf,
+                            index_name=current_search_settings.index_name,
+                            tenant_id=tenant_id,
+                            db_session=db_session,
+                        )
+                    except Exception:
+                        # reusing is only an optimization, process the file normally
+                        task_logger.exception(
+                            f"process_single_user_file - Failed to reuse an identical upload id={user_file_id}"
+                        )
+                        db_session.rollback()
+
+                if reused:
+                    elapsed = time.monotonic() - start
+                    task_logger.info(
+                        f"process_single_user_file - Reused an identical upload id={user_file_id} elapsed={elapsed:.2f}s"
+                    )
+                    return None
+
                 for batch in connector.load_from_state():
                     documents.extend(batch)
 
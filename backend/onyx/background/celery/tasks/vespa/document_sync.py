@@ -8,6 +8,7 @@ from redis.lock import Lock as RedisLock
 from sqlalchemy.orm import Session
 
 from onyx.configs.app_configs import DB_YIELD_PER_DEFAULT
+from onyx.configs.app_configs import VESPA_SYNC_BATCH_SIZE
 from onyx.configs.constants import CELERY_VESPA_SYNC_BEAT_LOCK_TIMEOUT
 from onyx.configs.constants import OnyxCeleryPriority
 from onyx.configs.constants import OnyxCeleryQueues
@@ -84,12 +85,43 @@ def generate_document_sync_tasks(
         lock: Redis lock for coordination
         tenant_id: Tenant identifier
 
+    Documents are grouped into batches of VESPA_SYNC_BATCH_SIZE, one task per batch.
+
     Returns:
         tuple[int, int]: (tasks_generated, total_docs_found)
     """
     last_lock_time = time.monotonic()
     num_tasks_sent = 0
     num_docs = 0
+    pending_doc_ids: list[str] = []
+
+    def _send_task(doc_ids: list[str]) -> None:
+        # Create a unique task ID
+        custom_task_id = f"{DOCUMENT_SYNC_PREFIX}_{uuid4()}"
+
+        # Add to the tracking taskset in Redis BEFORE creating the celery task
+        r.sadd(DOCUMENT_SYNC_TASKSET_KEY, custom_task_id)
+
+        # Create the Celery task. Documents are synced in batches unless batching is
+        # disabled, progress is tracked per task either way
+        if VESPA_SYNC_BATCH_SIZE > 1:
+            celery_app.send_task(
+                OnyxCeleryTask.VESPA_METADATA_SYNC_BATCH_TASK,
+                kwargs=dict(document_ids=doc_ids, tenant_id=tenant_id),
+                queue=OnyxCeleryQueues.VESPA_METADATA_SYNC,
+                task_id=custom_task_id,
+                priority=OnyxCeleryPriority.MEDIUM,
+                ignore_result=True,
+            )
+        else:
+            celery_app.send_task(
+                OnyxCeleryTask.VESPA_METADATA_SYNC_TASK,
+                kwargs=dict(document_id=doc_ids[0], tenant_id=tenant_id),
+                queue=OnyxCeleryQueues.VESPA_METADATA_SYNC,
+                task_id=custom_task_id,
+                priority=OnyxCeleryPriority.MEDIUM,
+                ignore_result=True,
+            )
 
     # Get all documents that need syncing
     stmt = construct_document_id_select_by_needs_sync()
@@ -104,28 +136,21 @@ def generate_document_sync_tasks(
             last_lock_time = current_time
 
         num_docs += 1
+        pending_doc_ids.append(doc_id)
+        if len(pending_doc_ids) < VESPA_SYNC_BATCH_SIZE:
+            continue
 
-        # Create a unique task ID
-        custom_task_id = f"{DOCUMENT_SYNC_PREFIX}_{uuid4()}"
-
-        # Add to the tracking taskset in Redis BEFORE creating the celery task
-        r.sadd(DOCUMENT_SYNC_TASKSET_KEY, custom_task_id)
-
-        # Create the Celery task
-        celery_app.send_task(
-            OnyxCeleryTask.VESPA_METADATA_SYNC_TASK,
-            kwargs=dict(document_id=doc_id, tenant_id=tenant_id),
-            queue=OnyxCeleryQueues.VESPA_METADATA_SYNC,
-            task_id=custom_task_id,
-            priority=OnyxCeleryPriority.MEDIUM,
-            ignore_result=True,
-        )
-
+        _send_task(pending_doc_ids)
+        pending_doc_ids = []
         num_tasks_sent += 1
 
         if num_tasks_sent >= max_tasks:
             break
 
+    if pending_doc_ids:
+        _send_task(pending_doc_ids)
+        num_tasks_sent += 1
+
     return num_tasks_sent, num_docs
 
 
@@ -15,6 +15,8 @@ from sqlalchemy.orm import Session
 from tenacity import RetryError
 
 from onyx.access.access import get_access_for_document
+from onyx.access.access import get_access_for_documents
+from onyx.access.access import get_null_document_access
 from onyx.background.celery.apps.app_base import task_logger
 from onyx.background.celery.tasks.shared.RetryDocumentIndex import RetryDocumentIndex
 from onyx.background.celery.tasks.shared.tasks import LIGHT_SOFT_TIME_LIMIT
@@ -34,15 +36,19 @@ from onyx.configs.constants import OnyxCeleryTask
 from onyx.configs.constants import OnyxRedisConstants
 from onyx.configs.constants import OnyxRedisLocks
 from onyx.db.document import get_document
+from onyx.db.document import get_documents_by_ids
 from onyx.db.document import mark_document_as_synced
+from onyx.db.document import mark_documents_as_synced
 from onyx.db.document_set import delete_document_set
 from onyx.db.document_set import fetch_document_sets
 from onyx.db.document_set import fetch_document_sets_for_document
+from onyx.db.document_set import fetch_document_sets_for_documents
 from onyx.db.document_set import get_document_set_by_id
 from onyx.db.document_set import mark_document_set_as_synced
 from onyx.db.engine.sql_engine import get_session_with_current_tenant
 from onyx.db.enums import SyncStatus
 from onyx.db.enums import SyncType
+from onyx.db.models import Document
 from onyx.db.models import DocumentSet
 from onyx.db.models import UserGroup
 from onyx.db.search_settings import get_active_search_settings
@@ -58,6 +64,7 @@ from onyx.redis.redis_pool import get_redis_replica_client
 from onyx.redis.redis_pool import redis_lock_dump
 from onyx.redis.redis_usergroup import RedisUserGroup
 from onyx.utils.logger import setup_logger
+from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
 from onyx.utils.variable_functionality import fetch_versioned_implementation
 from onyx.utils.variable_functionality import (
     fetch_versioned_implementation_with_fallback,
@@ -67,6 +74,12 @@ from onyx.utils.variable_functionality import noop_fallback
 
 logger = setup_logger()
 
+# a batch task syncs up to VESPA_SYNC_BATCH_SIZE documents, give it more time than the
+# single document task
+VESPA_SYNC_BATCH_SOFT_TIME_LIMIT = LIGHT_SOFT_TIME_LIMIT * 3
+VESPA_SYNC_BATCH_TIME_LIMIT = VESPA_SYNC_BATCH_SOFT_TIME_LIMIT + 15
+_VESPA_SYNC_BATCH_MAX_WORKERS = 16
+
 
 # celery auto associates tasks created inside another task,
 # which bloats the result metadata considerably. trail=False prevents this.
@@ -450,6 +463,49 @@ def monitor_document_set_taskset(
     rds.reset()
 
 
+def _handle_vespa_metadata_sync_exception(
+    task: Task,
+    ex: Exception,
+    task_name: str,
+    context: str,
+    retry_kwargs: dict[str, Any] | None = None,
+) -> OnyxCeleryTaskCompletionStatus:
+    """Shared error handling of the metadata sync tasks. Schedules a retry (by raising
+    celery's Retry exception) unless the error can't be fixed by retrying. The retry
+    is called with `retry_kwargs` if given, otherwise with the original kwargs."""
+    e: Exception = ex
+    if isinstance(ex, RetryError):
+        task_logger.warning(
+            f"Tenacity retry failed: num_attempts={ex.last_attempt.attempt_number}"
+        )
+
+        # only set the inner exception if it is of type Exception
+        e_temp = ex.last_attempt.exception()
+        if isinstance(e_temp, Exception):
+            e = e_temp
+
+    if isinstance(e, httpx.HTTPStatusError):
+        if e.response.status_code == HTTPStatus.BAD_REQUEST:
+            task_logger.exception(
+                f"Non-retryable HTTPStatusError: "
+                f"{context} "
+                f"status={e.response.status_code}"
+            )
+        return OnyxCeleryTaskCompletionStatus.NON_RETRYABLE_EXCEPTION
+
+    task_logger.exception(f"{task_name} exceptioned: {context}")
+
+    completion_status = OnyxCeleryTaskCompletionStatus.RETRYABLE_EXCEPTION
+    if task.max_retries is not None and task.request.retries >= task.max_retries:
+        completion_status = OnyxCeleryTaskCompletionStatus.NON_RETRYABLE_EXCEPTION
+
+    # Exponential backoff from 2^4 to 2^6 ... i.e. 16, 32, 64
+    countdown = 2 ** (task.request.retries + 4)
+    # this will raise a celery exception
+    task.retry(exc=e, countdown=countdown, kwargs=retry_kwargs)
+    return completion_status  # we won't hit this, but it looks weird not to have it
+
+
 @shared_task(
     name=OnyxCeleryTask.VESPA_METADATA_SYNC_TASK,
     bind=True,
@@ -525,52 +581,154 @@ def vespa_metadata_sync_task(self: Task, document_id: str, *, tenant_id: str) ->
         task_logger.info(f"SoftTimeLimitExceeded exception. doc={document_id}")
         completion_status = OnyxCeleryTaskCompletionStatus.SOFT_TIME_LIMIT
     except Exception as ex:
-        e: Exception | None = None
-        while True:
-            if isinstance(ex, RetryError):
-                task_logger.warning(
-                    f"Tenacity retry failed: num_attempts={ex.last_attempt.attempt_number}"
-                )
+        completion_status = _handle_vespa_metadata_sync_exception(
+            self, ex, task_name="vespa_metadata_sync_task", context=f"doc={document_id}"
+        )
+    finally:
+        task_logger.info(
+            f"vespa_metadata_sync_task completed: status={completion_status.value} doc={document_id}"
+        )
 
-                # only set the inner exception if it is of type Exception
-                e_temp = ex.last_attempt.exception()
-                if isinstance(e_temp, Exception):
-                    e = e_temp
-            else:
-                e = ex
-
-            if isinstance(e, httpx.HTTPStatusError):
-                if e.response.status_code == HTTPStatus.BAD_REQUEST:
-                    task_logger.exception(
-                        f"Non-retryable HTTPStatusError: "
-                        f"doc={document_id} "
-                        f"status={e.response.status_code}"
+    return completion_status == OnyxCeleryTaskCompletionStatus.SUCCEEDED
+
+
+@shared_task(
+    name=OnyxCeleryTask.VESPA_METADATA_SYNC_BATCH_TASK,
+    bind=True,
+    soft_time_limit=VESPA_SYNC_BATCH_SOFT_TIME_LIMIT,
+    time_limit=VESPA_SYNC_BATCH_TIME_LIMIT,
+    max_retries=3,
+)
+def vespa_metadata_sync_batch_task(
+    self: Task,
+    document_ids: list[str],
+    *,
+    tenant_id: str,
+    skip_synced: bool = True,
+) -> bool:
+    """Batched version of `vespa_metadata_sync_task`. Document sets and access are
+    resolved for all documents at once and the Vespa updates run concurrently.
+
+    Documents are synced independently of each other. The ones that succeeded are
+    marked as synced even if others failed, and a retry only covers the failed ones.
+    With `skip_synced`, documents whose last sync is newer than their last modification
+    are skipped."""
+    start = time.monotonic()
+
+    completion_status = OnyxCeleryTaskCompletionStatus.UNDEFINED
+    context = f"docs={len(document_ids)} first_doc={document_ids[0] if document_ids else None}"
+    retry_kwargs: dict[str, Any] | None = None
+
+    try:
+        with get_session_with_current_tenant() as db_session:
+            # skip documents that are already in sync, e.g. because they were
+            # synced by another task in the meantime
+            docs = [
+                doc
+                for doc in get_documents_by_ids(db_session, document_ids)
+                if not skip_synced
+                or doc.last_synced is None
+                or doc.last_modified > doc.last_synced
+            ]
+            if not docs:
+                elapsed = time.monotonic() - start
+                task_logger.info(f"{context} action=no_operation elapsed={elapsed:.2f}")
+                completion_status = OnyxCeleryTaskCompletionStatus.SKIPPED
+                return False
+
+            active_search_settings = get_active_search_settings(db_session)
+            doc_index = get_default_document_index(
+                search_settings=active_search_settings.primary,
+                secondary_search_settings=active_search_settings.secondary,
+                httpx_client=HttpxPool.get("vespa"),
+            )
+            retry_index = RetryDocumentIndex(doc_index)
+
+            doc_ids = [doc.id for doc in docs]
+            doc_id_to_doc_sets = dict(
+                fetch_document_sets_for_documents(doc_ids, db_session)
+            )
+            doc_id_to_access = get_access_for_documents(doc_ids, db_session)
+
+            def _sync_document(doc: Document) -> int | Exception:
+                # one failing document must not keep the rest of the batch from syncing
+                try:
+                    return retry_index.update_single(
+                        doc.id,
+                        tenant_id=tenant_id,
+                        chunk_count=doc.chunk_count,
+                        fields=VespaDocumentFields(
+                            document_sets=set(doc_id_to_doc_sets.get(doc.id, [])),
+                            access=doc_id_to_access.get(
+                                doc.id, get_null_document_access()
+                            ),
+                            boost=doc.boost,
+                            hidden=doc.hidden,
+                        ),
+                        user_fields=None,
                     )
-                completion_status = (
-                    OnyxCeleryTaskCompletionStatus.NON_RETRYABLE_EXCEPTION
-                )
-                break
+                except Exception as e:
+                    return e
 
-            task_logger.exception(
-                f"vespa_metadata_sync_task exceptioned: doc={document_id}"
+            # update Vespa. OK if a doc doesn't exist
+            results: list[int | Exception] = run_functions_tuples_in_parallel(
+                [(_sync_document, (doc,)) for doc in docs],
+                max_workers=_VESPA_SYNC_BATCH_MAX_WORKERS,
+            )
+            synced_doc_ids = [
+                doc.id
+                for doc, result in zip(docs, results)
+                if not isinstance(result, Exception)
+            ]
+            failures = [
+                (doc.id, result)
+                for doc, result in zip(docs, results)
+                if isinstance(result, Exception)
+            ]
+            chunks_affected = sum(
+                result for result in results if not isinstance(result, Exception)
             )
 
-            completion_status = OnyxCeleryTaskCompletionStatus.RETRYABLE_EXCEPTION
-            if (
-                self.max_retries is not None
-                and self.request.retries >= self.max_retries
-            ):
-                completion_status = (
-                    OnyxCeleryTaskCompletionStatus.NON_RETRYABLE_EXCEPTION
+            # update db last. Worst case = we crash right before this and
+            # the sync might repeat again later
+            mark_documents_as_synced(synced_doc_ids, db_session)
+
+            elapsed = time.monotonic() - start
+            task_logger.info(
+                f"{context} "
+                f"action=sync "
+                f"synced_docs={len(synced_doc_ids)} "
+                f"failed_docs={len(failures)} "
+                f"chunks={chunks_affected} "
+                f"elapsed={elapsed:.2f}"
+            )
+            if failures:
+                failed_doc_id, failure = failures[0]
+                context = (
+                    f"{context} failed_docs={len(failures)} failed_doc={failed_doc_id}"
                 )
+                retry_kwargs = dict(
+                    document_ids=[doc_id for doc_id, _ in failures],
+                    tenant_id=tenant_id,
+                    skip_synced=skip_synced,
+                )
+                raise failure
 
-            # Exponential backoff from 2^4 to 2^6 ... i.e. 16, 32, 64
-            countdown = 2 ** (self.request.retries + 4)
-            self.retry(exc=e, countdown=countdown)  # this will raise a celery exception
-            break  # we won't hit this, but it looks weird not to have it
+            completion_status = OnyxCeleryTaskCompletionStatus.SUCCEEDED
+    except SoftTimeLimitExceeded:
+        task_logger.info(f"SoftTimeLimitExceeded exception. {context}")
+        completion_status = OnyxCeleryTaskCompletionStatus.SOFT_TIME_LIMIT
+    except Exception as ex:
+        completion_status = _handle_vespa_metadata_sync_exception(
+            self,
+            ex,
+            task_name="vespa_metadata_sync_batch_task",
+            context=context,
+            retry_kwargs=retry_kwargs,
+        )
     finally:
         task_logger.info(
-            f"vespa_metadata_sync_task completed: status={completion_status.value} doc={document_id}"
+            f"vespa_metadata_sync_batch_task completed: status={completion_status.value} {context}"
         )
 
     return completion_status == OnyxCeleryTaskCompletionStatus.SUCCEEDED
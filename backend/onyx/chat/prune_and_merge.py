@@ -1,6 +1,6 @@
+import hashlib
 import json
 from collections import defaultdict
-from copy import deepcopy
 from typing import TypeVar
 
 from pydantic import BaseModel
@@ -17,10 +17,12 @@ from onyx.configs.model_configs import DOC_EMBEDDING_CONTEXT_SIZE
 from onyx.context.search.models import InferenceChunk
 from onyx.context.search.models import InferenceSection
 from onyx.llm.interfaces import LLMConfig
+from onyx.natural_language_processing.utils import BaseTokenizer
 from onyx.natural_language_processing.utils import get_tokenizer
 from onyx.natural_language_processing.utils import tokenizer_trim_content
 from onyx.prompts.prompt_utils import build_doc_context_str
 from onyx.tools.tool_implementations.search.search_utils import section_to_dict
+from onyx.utils.cache import TTLCache
 from onyx.utils.logger import setup_logger
 
 
@@ -33,6 +35,13 @@ _METADATA_TOKEN_ESTIMATE = 75
 # this is only used to log a warning so we can be more forgiving with the buffer
 _OVERCOUNT_ESTIMATE = 256
 
+# The same retrieved sections get pruned again on every chat turn, so their (LLM) token
+# counts are memoized. Keyed by tokenizer, chunk and a hash of the exact text that was
+# counted, so any change to the content, metadata or document number is a miss.
+_section_token_count_cache: TTLCache[tuple[str, str, str, str], int] = TTLCache(
+    max_size=8192, ttl_seconds=60 * 60
+)
+
 
 class PruningError(Exception):
     pass
@@ -163,6 +172,28 @@ def _remove_sections_to_ignore(
     ]
 
 
+def _count_section_tokens(
+    section_str: str,
+    unique_id: str,
+    llm_config: LLMConfig,
+    llm_tokenizer: BaseTokenizer,
+) -> int:
+    content_hash = hashlib.blake2b(
+        section_str.encode("utf-8", errors="replace"), digest_size=16
+    ).hexdigest()
+    cache_key = (
+        llm_config.model_provider,
+        llm_config.model_name,
+        unique_id,
+        content_hash,
+    )
+    token_count = _section_token_count_cache.get(cache_key)
+    if token_count is None:
+        token_count = len(llm_tokenizer.encode(section_str))
+        _section_token_count_cache.set(cache_key, token_count)
+    return token_count
+
+
 def _apply_pruning(
     sections: list[InferenceSection],
     section_relevance_list: list[bool] | None,
@@ -178,8 +209,10 @@ def _apply_pruning(
         model_name=llm_config.model_name,
     )
 
-    # combine the section lists, making sure to add the keep_sections first
-    sections = deepcopy(keep_sections) + deepcopy(sections)
+    # combine the section lists, making sure to add the keep_sections first.
+    # Only `combined_content` is ever modified below, so shallow copies are enough
+    # to leave the caller's sections untouched
+    sections = [section.model_copy() for section in keep_sections + sections]
 
     # build combined relevance list, treating the keep_sections as relevant
     if section_relevance_list is not None:
@@ -220,7 +253,12 @@ def _apply_pruning(
             )
         )
 
-        section_token_count = len(llm_tokenizer.encode(section_str))
+        section_token_count = _count_section_tokens(
+            section_str=section_str,
+            unique_id=section.center_chunk.unique_id,
+            llm_config=llm_config,
+            llm_tokenizer=llm_tokenizer,
+        )
         # if not using sections (specifically, using Sections where each section maps exactly to the one center chunk),
         # truncate chunks that are way too long. This can happen if the embedding model tokenizer is different
         # than the LLM tokenizer
@@ -286,9 +324,10 @@ def _apply_pruning(
             amount_to_truncate = total_tokens - token_limit
             # NOTE: need to recalculate the length here, since the previous calculation included
             # overhead from JSON-fying the doc / the metadata
-            final_doc_content_length = len(
-                llm_tokenizer.encode(sections[final_section_ind].combined_content)
-            ) - (amount_to_truncate)
+            final_doc_tokens = llm_tokenizer.encode(
+                sections[final_section_ind].combined_content
+            )
+            final_doc_content_length = len(final_doc_tokens) - (amount_to_truncate)
             # this could occur if we only have space for the title / metadata
             # not ideal, but it's the most reasonable thing to do
             # NOTE: the frontend prevents documents from being selected if
@@ -301,10 +340,9 @@ def _apply_pruning(
                 )
                 sections.pop()
             else:
-                sections[final_section_ind].combined_content = tokenizer_trim_content(
-                    content=sections[final_section_ind].combined_content,
-                    desired_length=final_doc_content_length,
-                    tokenizer=llm_tokenizer,
+                # reuse the token ids from above rather than encoding the content again
+                sections[final_section_ind].combined_content = llm_tokenizer.decode(
+                    final_doc_tokens[:final_doc_content_length]
                 )
         else:
             # For search on chunk level (Section is just a chunk), don't truncate the final Chunk/Section unless it's the only one
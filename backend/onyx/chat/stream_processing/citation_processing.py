@@ -46,6 +46,58 @@ def in_code_block(llm_text: str) -> bool:
     return count % 2 != 0
 
 
+class CodeFenceTracker:
+    """Incrementally tracks whether a token stream is inside a code block.
+
+    Equivalent to calling `in_code_block` on the full text so far, but each token only
+    costs O(len(token)): a run of k backticks contains k // 3 (non-overlapping) fences, so
+    only the completed fence count and the length of the trailing backtick run are kept.
+    """
+
+    def __init__(self) -> None:
+        self._fence_count = 0
+        self._trailing_backticks = 0
+
+    def update(self, token: str) -> None:
+        if not token:
+            return
+
+        body = token.lstrip("`")
+        self._trailing_backticks += len(token) - len(body)
+        if not body:
+            return
+
+        # the trailing run from the previous tokens ended in this token
+        self._fence_count += self._trailing_backticks // 3
+        stripped_body = body.rstrip("`")
+        self._fence_count += stripped_body.count(TRIPLE_BACKTICK)
+        self._trailing_backticks = len(body) - len(stripped_body)
+
+    @property
+    def in_code_block(self) -> bool:
+        count = self._fence_count + self._trailing_backticks // 3
+        return count % 2 != 0
+
+
+# Matches what can follow the last '[' of a possible (partial) citation, e.g. '', '1',
+# '1,', '1, 2'. Possessive quantifiers keep the match linear, so the check stays cheap
+# even on long runs of digits.
+_POSSIBLE_CITATION_TAIL_PATTERN = re.compile(r"(?:\d++,?+ ?+)*+")
+# Same, also allowing 'D1', 'D1, D3' style references
+_POSSIBLE_CITATION_TAIL_PATTERN_GRAPH = re.compile(r"(?:(?:\d++|D\d++),?+ ?+)*+")
+
+
+def ends_with_possible_citation(text: str, tail_pattern: re.Pattern[str]) -> bool:
+    """Whether the text ends with something that could still become a citation,
+    e.g. '[', '[[', '[1', '[[1', '[1,', '[1, 2'."""
+    # like `$` in a regex, also allow a single trailing newline
+    end = len(text) - 1 if text.endswith("\n") else len(text)
+    last_bracket = text.rfind("[", 0, end)
+    if last_bracket == -1:
+        return False
+    return tail_pattern.fullmatch(text, last_bracket + 1, end) is not None
+
+
 class CitationProcessor:
     def __init__(
         self,
@@ -60,7 +112,8 @@ class CitationProcessor:
         self.max_citation_num = len(context_docs)
         self.stop_stream = stop_stream
 
-        self.llm_out = ""  # entire output so far
+        self._llm_out_pieces: list[str] = []  # entire output so far
+        self._code_fence_tracker = CodeFenceTracker()
         self.curr_segment = ""  # tokens held for citation processing
         self.hold = ""  # tokens held for stop token processing
 
@@ -69,12 +122,17 @@ class CitationProcessor:
         self.non_citation_count = 0
 
         # '[', '[[', '[1', '[[1', '[1,', '[1, ', '[1,2', '[1, 2,', etc.
-        self.possible_citation_pattern = re.compile(r"(\[+(?:\d+,? ?)*$)")
+        self.possible_citation_tail_pattern = _POSSIBLE_CITATION_TAIL_PATTERN
 
         # group 1: '[[1]]', [[2]], etc.
         # group 2: '[1]', '[1, 2]', '[1,2,16]', etc.
         self.citation_pattern = re.compile(r"(\[\[\d+\]\])|(\[\d+(?:, ?\d+)*\])")
 
+    @property
+    def llm_out(self) -> str:
+        """Entire output so far"""
+        return "".join(self._llm_out_pieces)
+
     def process_token(
         self, token: str | None
     ) -> Generator[OnyxAnswerPiece | CitationInfo, None, None]:
@@ -94,7 +152,8 @@ class CitationProcessor:
             self.hold = ""
 
         self.curr_segment += token
-        self.llm_out += token
+        self._llm_out_pieces.append(token)
+        self._code_fence_tracker.update(token)
 
         # Handle code blocks without language tags
         if "`" in self.curr_segment:
@@ -102,16 +161,19 @@ class CitationProcessor:
                 pass
             elif "```" in self.curr_segment:
                 piece_that_comes_after = self.curr_segment.split("```")[1][0]
-                if piece_that_comes_after == "\n" and in_code_block(self.llm_out):
+                if (
+                    piece_that_comes_after == "\n"
+                    and self._code_fence_tracker.in_code_block
+                ):
                     self.curr_segment = self.curr_segment.replace("```", "```plaintext")
 
         citation_matches = list(self.citation_pattern.finditer(self.curr_segment))
-        possible_citation_found = bool(
-            re.search(self.possible_citation_pattern, self.curr_segment)
+        possible_citation_found = ends_with_possible_citation(
+            self.curr_segment, self.possible_citation_tail_pattern
         )
 
         result = ""
-        if citation_matches and not in_code_block(self.llm_out):
+        if citation_matches and not self._code_fence_tracker.in_code_block:
             match_idx = 0
             for match in citation_matches:
                 match_span = match.span()
@@ -213,7 +275,8 @@ class CitationProcessorGraph:
         self.max_citation_num = len(context_docs)
         self.stop_stream = stop_stream
 
-        self.llm_out = ""  # entire output so far
+        self._llm_out_pieces: list[str] = []  # entire output so far
+        self._code_fence_tracker = CodeFenceTracker()
         self.curr_segment = ""  # tokens held for citation processing
         self.hold = ""  # tokens held for stop token processing
 
@@ -223,7 +286,7 @@ class CitationProcessorGraph:
 
         # '[', '[[', '[1', '[[1', '[1,', '[1, ', '[1,2', '[1, 2,', etc.
         # Also supports '[D1', '[D1, D3' type patterns
-        self.possible_citation_pattern = re.compile(r"(\[+(?:(?:\d+|D\d+),? ?)*$)")
+        self.possible_citation_tail_pattern = _POSSIBLE_CITATION_TAIL_PATTERN_GRAPH
 
         # group 1: '[[1]]', [[2]], etc.
         # group 2: '[1]', '[1, 2]', '[1,2,16]', etc.
@@ -232,6 +295,11 @@ class CitationProcessorGraph:
             r"(\[\[(?:\d+|D\d+)\]\])|(\[(?:\d+|D\d+)(?:, ?(?:\d+|D\d+))*\])"
         )
 
+    @property
+    def llm_out(self) -> str:
+        """Entire output so far"""
+        return "".join(self._llm_out_pieces)
+
     def process_token(
         self, token: str | None
     ) -> str | tuple[str, list[CitationInfo]] | None:
@@ -250,7 +318,8 @@ class CitationProcessorGraph:
             self.hold = ""
 
         self.curr_segment += token
-        self.llm_out += token
+        self._llm_out_pieces.append(token)
+        self._code_fence_tracker.update(token)
 
         # Handle code blocks without language tags
         if "`" in self.curr_segment:
@@ -258,16 +327,19 @@ class CitationProcessorGraph:
                 pass
             elif "```" in self.curr_segment:
                 piece_that_comes_after = self.curr_segment.split("```")[1][0]
-                if piece_that_comes_after == "\n" and in_code_block(self.llm_out):
+                if (
+                    piece_that_comes_after == "\n"
+                    and self._code_fence_tracker.in_code_block
+                ):
                     self.curr_segment = self.curr_segment.replace("```", "```plaintext")
 
         citation_matches = list(self.citation_pattern.finditer(self.curr_segment))
-        possible_citation_found = bool(
-            re.search(self.possible_citation_pattern, self.curr_segment)
+        possible_citation_found = ends_with_possible_citation(
+            self.curr_segment, self.possible_citation_tail_pattern
         )
 
         result = ""
-        if citation_matches and not in_code_block(self.llm_out):
+        if citation_matches and not self._code_fence_tracker.in_code_block:
             match_idx = 0
             citation_infos = []
             for match in citation_matches:
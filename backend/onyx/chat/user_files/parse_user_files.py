@@ -27,7 +27,8 @@ def parse_user_files(
 ) -> tuple[list[InMemoryChatFile], list[UserFile], SearchToolOverrideKwargs | None]:
     """
     Parse user files and project into in-memory chat files and create search tool override kwargs.
-    Only creates SearchToolOverrideKwargs if token overflow occurs.
+    Only creates SearchToolOverrideKwargs if token overflow occurs, in which case the
+    file contents are not loaded.
 
     Args:
         user_file_ids: List of user file IDs to load
@@ -39,7 +40,7 @@ def parse_user_files(
 
     Returns:
         Tuple of (
-            loaded user files,
+            loaded user files (empty on token overflow),
             user file models,
             search tool override kwargs if token
                 overflow
@@ -62,12 +63,6 @@ def parse_user_files(
     # Combine user-provided and project-derived user file IDs
     combined_user_file_ids = user_file_ids + project_user_file_ids or []
 
-    # Load user files from the database into memory
-    user_files = load_in_memory_chat_files(
-        combined_user_file_ids,
-        db_session,
-    )
-
     user_file_models = get_user_files_as_user(
         combined_user_file_ids,
         user_id,
@@ -89,6 +84,8 @@ def parse_user_files(
         compute_max_document_tokens_for_persona,
     )
 
+    # Decide from the stored token counts, the file contents are only loaded if they
+    # are going to be passed into the prompt
     # calculate_user_files_token_count now expects list[UUID]
     total_tokens = calculate_user_files_token_count(
         combined_user_file_ids,
@@ -113,6 +110,10 @@ def parse_user_files(
     # we can just pass them into the prompt directly
     if have_enough_tokens:
         # No search tool override needed - files can be passed directly
+        user_files = load_in_memory_chat_files(
+            combined_user_file_ids,
+            db_session,
+        )
         return user_files, user_file_models, None
 
     # Token overflow - need to use search tool
@@ -127,4 +128,5 @@ def parse_user_files(
         ),  # if the persona is not default, we don't want to use the project files
     )
 
-    return user_files, user_file_models, override_kwargs
+    # the files are found through search, so they are never loaded into memory
+    return [], user_file_models, override_kwargs
@@ -178,6 +178,12 @@ TRACK_EXTERNAL_IDP_EXPIRY = (
     os.environ.get("TRACK_EXTERNAL_IDP_EXPIRY", "").lower() == "true"
 )
 
+# How long a user's resolved ACL (own email, user groups, external groups) is cached for
+# search. The cache is also invalidated whenever a user group or external group sync
+# finishes, so this only bounds staleness for membership changes made in other ways.
+# 0 disables the cache
+ACL_CACHE_TTL_SECONDS = int(os.environ.get("ACL_CACHE_TTL_SECONDS") or 300)
+
 
 #####
 # DB Configs
@@ -403,6 +409,14 @@ CELERY_WORKER_USER_FILE_PROCESSING_CONCURRENCY = int(
 
 # The maximum number of tasks that can be queued up to sync to Vespa in a single pass
 VESPA_SYNC_MAX_TASKS = 8192
+# Number of stale documents synced to Vespa by a single (batched) sync task.
+# Set to 1 to fall back to one sync task per document
+VESPA_SYNC_BATCH_SIZE = int(os.environ.get("VESPA_SYNC_BATCH_SIZE") or 256)
+# Number of document permissions diffed against Postgres and written in a single
+# transaction by the doc permission sync
+DOC_PERMISSION_SYNC_DB_BATCH_SIZE = int(
+    os.environ.get("DOC_PERMISSION_SYNC_DB_BATCH_SIZE") or 500
+)
 
 DB_YIELD_PER_DEFAULT = 64
 
@@ -440,6 +454,22 @@ WEB_CONNECTOR_OAUTH_CLIENT_ID = os.environ.get("WEB_CONNECTOR_OAUTH_CLIENT_ID")
 WEB_CONNECTOR_OAUTH_CLIENT_SECRET = os.environ.get("WEB_CONNECTOR_OAUTH_CLIENT_SECRET")
 WEB_CONNECTOR_OAUTH_TOKEN_URL = os.environ.get("WEB_CONNECTOR_OAUTH_TOKEN_URL")
 WEB_CONNECTOR_VALIDATE_URLS = os.environ.get("WEB_CONNECTOR_VALIDATE_URLS")
+# Number of pages the web connector crawls concurrently, each with its own browser
+# context. Pages that render without JavaScript are fetched with plain HTTP requests.
+# 1 keeps the original sequential crawl
+WEB_CONNECTOR_CONCURRENCY = int(os.environ.get("WEB_CONNECTOR_CONCURRENCY") or 1)
+# Politeness limits of the concurrent crawl, per host
+WEB_CONNECTOR_MAX_REQUESTS_PER_HOST = int(
+    os.environ.get("WEB_CONNECTOR_MAX_REQUESTS_PER_HOST") or 4
+)
+WEB_CONNECTOR_MIN_HOST_REQUEST_INTERVAL_SECONDS = float(
+    os.environ.get("WEB_CONNECTOR_MIN_HOST_REQUEST_INTERVAL_SECONDS") or 0.0
+)
+# The concurrent crawl keeps the last result of each page (and its ETag / Last-Modified)
+# for this long, so re-crawls can use conditional requests. 0 disables
+WEB_CONNECTOR_PAGE_CACHE_TTL_SECONDS = int(
+    os.environ.get("WEB_CONNECTOR_PAGE_CACHE_TTL_SECONDS") or 60 * 60 * 24 * 30
+)
 
 HTML_BASED_CONNECTOR_TRANSFORM_LINKS_STRATEGY = os.environ.get(
     "HTML_BASED_CONNECTOR_TRANSFORM_LINKS_STRATEGY",
@@ -573,6 +603,14 @@ LINEAR_CLIENT_SECRET = os.getenv("LINEAR_CLIENT_SECRET")
 # Slack specific configs
 SLACK_NUM_THREADS = int(os.getenv("SLACK_NUM_THREADS") or 8)
 MAX_SLACK_QUERY_EXPANSIONS = int(os.environ.get("MAX_SLACK_QUERY_EXPANSIONS", "5"))
+# How long Slack user profiles / channel info and thread replies are cached (in Redis and
+# in-process) for federated search and the Slack connector's text cleaning
+SLACK_METADATA_CACHE_TTL_SECONDS = int(
+    os.environ.get("SLACK_METADATA_CACHE_TTL_SECONDS") or 60 * 60
+)
+SLACK_THREAD_CACHE_TTL_SECONDS = int(
+    os.environ.get("SLACK_THREAD_CACHE_TTL_SECONDS") or 5 * 60
+)
 
 DASK_JOB_CLIENT_ENABLED = (
     os.environ.get("DASK_JOB_CLIENT_ENABLED", "").lower() == "true"
@@ -598,6 +636,22 @@ MAX_PRUNING_DOCUMENT_RETRIEVAL_PER_MINUTE = int(
     os.environ.get("MAX_PRUNING_DOCUMENT_RETRIEVAL_PER_MINUTE", 0)
 )
 
+# cc pairs with at least this many documents are pruned by diffing sorted id streams from
+# the source and Postgres in bounded memory instead of holding both id sets in memory.
+# 0 always uses the streaming diff, -1 never does
+PRUNING_STREAMING_DOC_THRESHOLD = int(
+    os.environ.get("PRUNING_STREAMING_DOC_THRESHOLD") or 100_000
+)
+# number of source document ids held in memory by the streaming diff before a sorted
+# run is spilled to disk
+PRUNING_STREAMING_MAX_IDS_IN_MEMORY = int(
+    os.environ.get("PRUNING_STREAMING_MAX_IDS_IN_MEMORY") or 100_000
+)
+# the streaming diff emits deletion tasks in batches of this many documents
+PRUNING_STREAMING_DELETION_BATCH_SIZE = int(
+    os.environ.get("PRUNING_STREAMING_DELETION_BATCH_SIZE") or 1000
+)
+
 # comma delimited list of zendesk article labels to skip indexing for
 ZENDESK_CONNECTOR_SKIP_ARTICLE_LABELS = os.environ.get(
     "ZENDESK_CONNECTOR_SKIP_ARTICLE_LABELS", ""
@@ -658,6 +712,31 @@ INDEXING_EMBEDDING_MODEL_NUM_THREADS = int(
     os.environ.get("INDEXING_EMBEDDING_MODEL_NUM_THREADS") or 8
 )
 
+# When > 0, index_doc_batch splits each batch into sub-batches of this many documents
+# and runs chunking, embedding and the vector DB write as overlapping pipeline stages
+# (e.g. sub-batch N is embedded while sub-batch N-1 is written to the vector DB).
+# 0 disables the pipelined mode and is the default.
+INDEXING_PIPELINE_SUB_BATCH_SIZE = int(
+    os.environ.get("INDEXING_PIPELINE_SUB_BATCH_SIZE") or 0
+)
+# Max number of sub-batches buffered between two pipeline stages before the upstream
+# stage blocks (backpressure)
+INDEXING_PIPELINE_MAX_IN_FLIGHT = int(
+    os.environ.get("INDEXING_PIPELINE_MAX_IN_FLIGHT") or 1
+)
+
+# Cache passage embeddings in Redis keyed by the exact embedded text, so re-indexing
+# documents whose text (or part of whose text) didn't change skips the embedding model
+ENABLE_EMBEDDING_CACHE = os.environ.get("ENABLE_EMBEDDING_CACHE", "").lower() == "true"
+# Max number of cached embeddings per tenant + embedding model, least recently used
+# entries are evicted beyond this
+EMBEDDING_CACHE_MAX_ENTRIES = int(
+    os.environ.get("EMBEDDING_CACHE_MAX_ENTRIES") or 200_000
+)
+EMBEDDING_CACHE_TTL_SECONDS = int(
+    os.environ.get("EMBEDDING_CACHE_TTL_SECONDS") or 60 * 60 * 24 * 14  # 2 weeks
+)
+
 # During an indexing attempt, specifies the number of batches which are allowed to
 # exception without aborting the attempt.
 INDEXING_EXCEPTION_LIMIT = int(os.environ.get("INDEXING_EXCEPTION_LIMIT") or 0)
@@ -666,12 +745,43 @@ INDEXING_EXCEPTION_LIMIT = int(os.environ.get("INDEXING_EXCEPTION_LIMIT") or 0)
 # Setting this number too high may overload the indexing process
 USER_FILE_INDEXING_LIMIT = int(os.environ.get("USER_FILE_INDEXING_LIMIT") or 100)
 
+# Reuse the extracted text and chunk embeddings of an identical, already processed
+# upload (same bytes and name) instead of processing the user file from scratch
+USER_FILE_DEDUP_ENABLED = (
+    os.environ.get("USER_FILE_DEDUP_ENABLED", "true").lower() == "true"
+)
+
 # Maximum file size in a document to be indexed
 MAX_DOCUMENT_CHARS = int(os.environ.get("MAX_DOCUMENT_CHARS") or 5_000_000)
 MAX_FILE_SIZE_BYTES = int(
     os.environ.get("MAX_FILE_SIZE_BYTES") or 2 * 1024 * 1024 * 1024
 )  # 2GB in bytes
 
+# Number of worker processes parsing PDF / Office files for the connectors, with hard
+# per file time and memory limits. 0 parses files in the calling thread
+FILE_EXTRACTION_NUM_PROCESSES = int(
+    os.environ.get("FILE_EXTRACTION_NUM_PROCESSES") or 2
+)
+FILE_EXTRACTION_TIMEOUT_SECONDS = int(
+    os.environ.get("FILE_EXTRACTION_TIMEOUT_SECONDS") or 300
+)
+# Address space limit of each worker process, 0 for no limit
+FILE_EXTRACTION_MAX_MEMORY_MB = int(
+    os.environ.get("FILE_EXTRACTION_MAX_MEMORY_MB") or 4096
+)
+# PDFs larger than this are split into page ranges that are parsed in parallel
+FILE_EXTRACTION_PDF_SPLIT_MIN_BYTES = int(
+    os.environ.get("FILE_EXTRACTION_PDF_SPLIT_MIN_BYTES") or 10 * 1024 * 1024
+)
+FILE_EXTRACTION_PDF_PAGES_PER_TASK = int(
+    os.environ.get("FILE_EXTRACTION_PDF_PAGES_PER_TASK") or 100
+)
+# Extracted text is cached by content hash so that unchanged files are not parsed
+# again on re-syncs. 0 disables the cache
+FILE_EXTRACTION_CACHE_TTL_SECONDS = int(
+    os.environ.get("FILE_EXTRACTION_CACHE_TTL_SECONDS") or 60 * 60 * 24 * 7
+)
+
 # Use document summary for contextual rag
 USE_DOCUMENT_SUMMARY = os.environ.get("USE_DOCUMENT_SUMMARY", "true").lower() == "true"
 # Use chunk summary for contextual rag
@@ -757,6 +867,10 @@ CUSTOM_ANSWER_VALIDITY_CONDITIONS = json.loads(
 )
 
 VESPA_REQUEST_TIMEOUT = int(os.environ.get("VESPA_REQUEST_TIMEOUT") or "15")
+# Bounds for the number of in-flight document feed requests to Vespa. The actual limit
+# adapts between these based on whether Vespa is throttling (429 / 503) the feed
+VESPA_FEED_MIN_CONCURRENCY = int(os.environ.get("VESPA_FEED_MIN_CONCURRENCY") or 4)
+VESPA_FEED_MAX_CONCURRENCY = int(os.environ.get("VESPA_FEED_MAX_CONCURRENCY") or 128)
 
 SYSTEM_RECURSION_LIMIT = int(os.environ.get("SYSTEM_RECURSION_LIMIT") or "1000")
 
@@ -83,6 +83,13 @@ DISABLE_LLM_DOC_RELEVANCE = (
 # Stops streaming answers back to the UI if this pattern is seen:
 STOP_STREAM_PAT = os.environ.get("STOP_STREAM_PAT") or None
 
+# Stream chat responses from an async endpoint, with the blocking answer generation
+# advanced in a dedicated thread per response instead of the shared API threadpool.
+# Set to "false" to go back to the sync streaming endpoint
+CHAT_ASYNC_STREAMING_ENABLED = (
+    os.environ.get("CHAT_ASYNC_STREAMING_ENABLED", "true").lower() == "true"
+)
+
 # Set this to "true" to hard delete chats
 # This will make chats unviewable by admins after a user deletes them
 # As opposed to soft deleting them, which just hides them from non-admin users
@@ -92,6 +99,13 @@ HARD_DELETE_CHATS = os.environ.get("HARD_DELETE_CHATS", "").lower() == "true"
 EXA_API_KEY = os.environ.get("EXA_API_KEY") or None
 SERPER_API_KEY = os.environ.get("SERPER_API_KEY") or None
 
+# Deadline for fetching the pages opened by the web search, pages that take longer are
+# skipped instead of holding up the answer
+WEB_FETCH_TIMEOUT_SECONDS = float(os.environ.get("WEB_FETCH_TIMEOUT_SECONDS") or 30)
+WEB_FETCH_MAX_CONCURRENCY = int(os.environ.get("WEB_FETCH_MAX_CONCURRENCY") or 16)
+# Fetched pages are cached per tenant for this long, 0 disables the cache
+WEB_FETCH_CACHE_TTL_SECONDS = int(os.environ.get("WEB_FETCH_CACHE_TTL_SECONDS") or 3600)
+
 NUM_INTERNET_SEARCH_RESULTS = int(os.environ.get("NUM_INTERNET_SEARCH_RESULTS") or 10)
 NUM_INTERNET_SEARCH_CHUNKS = int(os.environ.get("NUM_INTERNET_SEARCH_CHUNKS") or 50)
 
@@ -100,6 +114,53 @@ ENABLE_CONNECTOR_CLASSIFIER = os.environ.get("ENABLE_CONNECTOR_CLASSIFIER", Fals
 
 VESPA_SEARCHER_THREADS = int(os.environ.get("VESPA_SEARCHER_THREADS") or 2)
 
+# Cache query embeddings in-process (keyed by search settings + query text) so repeated
+# queries (retries, query expansions, agent sub-searches) skip the model server
+QUERY_EMBEDDING_CACHE_ENABLED = (
+    os.environ.get("QUERY_EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+)
+QUERY_EMBEDDING_CACHE_MAX_SIZE = int(
+    os.environ.get("QUERY_EMBEDDING_CACHE_MAX_SIZE") or 2048
+)
+QUERY_EMBEDDING_CACHE_TTL_SECONDS = int(
+    os.environ.get("QUERY_EMBEDDING_CACHE_TTL_SECONDS") or 60 * 60  # 1 hour
+)
+# Also share cached query embeddings across processes / pods through Redis
+QUERY_EMBEDDING_CACHE_REDIS_ENABLED = (
+    os.environ.get("QUERY_EMBEDDING_CACHE_REDIS_ENABLED", "").lower() == "true"
+)
+# Upper bound on how long a process may keep using search settings it cached, in case
+# the invalidation signal sent on index swap is missed
+SEARCH_SETTINGS_CACHE_TTL_SECONDS = int(
+    os.environ.get("SEARCH_SETTINGS_CACHE_TTL_SECONDS") or 60
+)
+
+# Cache the (cleaned) content of chunks fetched by id, e.g. the surrounding chunks /
+# full documents used for section expansion. Entries are tied to the document's
+# last_modified / last_synced / chunk_count, access is always checked by the caller
+CHUNK_CONTENT_CACHE_ENABLED = (
+    os.environ.get("CHUNK_CONTENT_CACHE_ENABLED", "true").lower() == "true"
+)
+CHUNK_CONTENT_CACHE_MAX_SIZE = int(
+    os.environ.get("CHUNK_CONTENT_CACHE_MAX_SIZE") or 10_000  # chunks
+)
+CHUNK_CONTENT_CACHE_TTL_SECONDS = int(
+    os.environ.get("CHUNK_CONTENT_CACHE_TTL_SECONDS") or 15 * 60  # 15 minutes
+)
+
+# Cache the extracted plaintext of user / project files that are passed directly into
+# the prompt, so follow up messages in the same chat don't re-read them from the file
+# store. Entries are tied to the file's processing state, larger files aren't cached
+USER_FILE_PLAINTEXT_CACHE_MAX_SIZE = int(
+    os.environ.get("USER_FILE_PLAINTEXT_CACHE_MAX_SIZE") or 256  # files
+)
+USER_FILE_PLAINTEXT_CACHE_MAX_FILE_BYTES = int(
+    os.environ.get("USER_FILE_PLAINTEXT_CACHE_MAX_FILE_BYTES") or 1024 * 1024  # 1MB
+)
+USER_FILE_PLAINTEXT_CACHE_TTL_SECONDS = int(
+    os.environ.get("USER_FILE_PLAINTEXT_CACHE_TTL_SECONDS") or 30 * 60  # 30 minutes
+)
+
 # Whether or not to use the semantic & keyword search expansions for Basic Search
 USE_SEMANTIC_KEYWORD_EXPANSIONS_BASIC_SEARCH = (
     os.environ.get("USE_SEMANTIC_KEYWORD_EXPANSIONS_BASIC_SEARCH", "false").lower()
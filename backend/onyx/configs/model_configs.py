@@ -46,6 +46,15 @@ EMBEDDING_BATCH_SIZE = int(os.environ.get("EMBEDDING_BATCH_SIZE") or 0) or None
 BATCH_SIZE_ENCODE_CHUNKS = EMBEDDING_BATCH_SIZE or 8
 # don't send over too many chunks at once, as sending too many could cause timeouts
 BATCH_SIZE_ENCODE_CHUNKS_FOR_API_EMBEDDING_SERVICES = EMBEDDING_BATCH_SIZE or 512
+# For local embedding models, sort texts by token length before batching (and restore the
+# original order afterwards) so short texts (titles, mini-chunks) aren't padded up to the
+# length of the longest chunk in their batch
+EMBEDDING_LENGTH_BUCKETED_BATCHING = (
+    os.environ.get("EMBEDDING_LENGTH_BUCKETED_BATCHING", "").lower() == "true"
+)
+# With length bucketed batching, optionally cap batches by their padded token count
+# (batch size * longest text in the batch) instead of only by number of texts. 0 disables
+EMBEDDING_BATCH_TOKEN_BUDGET = int(os.environ.get("EMBEDDING_BATCH_TOKEN_BUDGET") or 0)
 # For score display purposes, only way is to know the expected ranges
 CROSS_ENCODER_RANGE_MAX = 1
 CROSS_ENCODER_RANGE_MIN = 0
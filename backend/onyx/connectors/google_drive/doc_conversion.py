@@ -30,12 +30,9 @@ from onyx.connectors.models import ImageSection
 from onyx.connectors.models import SlimDocument
 from onyx.connectors.models import TextSection
 from onyx.file_processing.extract_file_text import ALL_ACCEPTED_FILE_EXTENSIONS
-from onyx.file_processing.extract_file_text import docx_to_text_and_images
 from onyx.file_processing.extract_file_text import extract_file_text
 from onyx.file_processing.extract_file_text import get_file_ext
-from onyx.file_processing.extract_file_text import pptx_to_text
-from onyx.file_processing.extract_file_text import read_pdf_file
-from onyx.file_processing.extract_file_text import xlsx_to_text
+from onyx.file_processing.extraction_service import extract_text_and_images
 from onyx.file_processing.file_validation import is_valid_image_type
 from onyx.file_processing.image_utils import store_image_and_create_section
 from onyx.utils.logger import setup_logger
@@ -198,24 +195,34 @@ def _download_and_extract_sections_basic(
         mime_type
         == "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
     ):
-        text, _ = docx_to_text_and_images(io.BytesIO(response_call()))
+        text = extract_text_and_images(
+            io.BytesIO(response_call()), file_name, content_type=mime_type
+        ).text_content
         return [TextSection(link=link, text=text)]
 
     elif (
         mime_type == "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
     ):
-        text = xlsx_to_text(io.BytesIO(response_call()), file_name=file_name)
+        text = extract_text_and_images(
+            io.BytesIO(response_call()), file_name, content_type=mime_type
+        ).text_content
         return [TextSection(link=link, text=text)] if text else []
 
     elif (
         mime_type
         == "application/vnd.openxmlformats-officedocument.presentationml.presentation"
     ):
-        text = pptx_to_text(io.BytesIO(response_call()), file_name=file_name)
+        text = extract_text_and_images(
+            io.BytesIO(response_call()), file_name, content_type=mime_type
+        ).text_content
         return [TextSection(link=link, text=text)] if text else []
 
     elif mime_type == "application/pdf":
-        text, _pdf_meta, images = read_pdf_file(io.BytesIO(response_call()))
+        extraction_result = extract_text_and_images(
+            io.BytesIO(response_call()), file_name, content_type=mime_type
+        )
+        text = extraction_result.text_content
+        images = extraction_result.embedded_images
         pdf_sections: list[TextSection | ImageSection] = [
             TextSection(link=link, text=text)
         ]
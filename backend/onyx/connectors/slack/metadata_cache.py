@@ -0,0 +1,159 @@
+import hashlib
+import json
+from collections.abc import Callable
+from typing import Any
+from typing import cast
+
+from slack_sdk import WebClient
+
+from onyx.configs.app_configs import SLACK_METADATA_CACHE_TTL_SECONDS
+from onyx.configs.app_configs import SLACK_THREAD_CACHE_TTL_SECONDS
+from onyx.redis.redis_pool import get_redis_client
+from onyx.utils.cache import RequestCoalescer
+from onyx.utils.cache import TTLCache
+from onyx.utils.logger import setup_logger
+from shared_configs.contextvars import get_current_tenant_id
+
+logger = setup_logger()
+
+_SLACK_METADATA_KEY_PREFIX = "slack_metadata"
+
+# hash of the token -> id of the Slack workspace (team) it belongs to
+_workspace_ids: TTLCache[str, str] = TTLCache(
+    max_size=1024, ttl_seconds=SLACK_METADATA_CACHE_TTL_SECONDS
+)
+# "{tenant_id}:{redis key}" -> cached Slack object
+_local_cache: TTLCache[str, Any] = TTLCache(
+    max_size=10_000, ttl_seconds=SLACK_METADATA_CACHE_TTL_SECONDS
+)
+_coalescer: RequestCoalescer[str, Any] = RequestCoalescer()
+_workspace_id_coalescer: RequestCoalescer[str, str] = RequestCoalescer()
+
+
+def _get_workspace_id(client: WebClient) -> str:
+    token_hash = hashlib.sha256((client.token or "").encode()).hexdigest()
+    workspace_id = _workspace_ids.get(token_hash)
+    if workspace_id is not None:
+        return workspace_id
+
+    def _fetch() -> str:
+        workspace_id = cast(str, client.auth_test()["team_id"])
+        _workspace_ids.set(token_hash, workspace_id)
+        return workspace_id
+
+    return _workspace_id_coalescer.get_or_compute(token_hash, _fetch)
+
+
+class SlackMetadataCache:
+    """Read-through cache for Slack metadata that rarely changes (user profiles,
+    channel info) and for thread replies, shared by all users of the same workspace.
+
+    Lookups go through an in-process LRU, then Redis (scoped to the current tenant),
+    then the Slack API via the given client. Concurrent lookups of the same object in
+    this process share a single API call. Failed API calls are not cached, the
+    SlackApiError is raised to the caller.
+
+    Returned objects are shared between callers and must not be mutated."""
+
+    def __init__(self, client: WebClient) -> None:
+        self._client = client
+        self._tenant_id = get_current_tenant_id()
+        self._workspace_id: str | None = None
+
+    def get_user_info(self, user_id: str) -> dict[str, Any]:
+        """The `user` object of `users.info`."""
+
+        def _fetch() -> dict[str, Any]:
+            response = self._client.users_info(user=user_id)
+            response.validate()
+            return cast(dict[str, Any], response["user"])
+
+        return self._get("user_info", user_id, SLACK_METADATA_CACHE_TTL_SECONDS, _fetch)
+
+    def get_user_profile(self, user_id: str) -> dict[str, Any]:
+        """The `profile` object of `users.profile.get`."""
+
+        def _fetch() -> dict[str, Any]:
+            response = self._client.users_profile_get(user=user_id)
+            response.validate()
+            return cast(dict[str, Any], response.get("profile", {}))
+
+        return self._get(
+            "user_profile", user_id, SLACK_METADATA_CACHE_TTL_SECONDS, _fetch
+        )
+
+    def get_channel_info(self, channel_id: str) -> dict[str, Any]:
+        """The full `conversations.info` response."""
+
+        def _fetch() -> dict[str, Any]:
+            response = self._client.conversations_info(channel=channel_id)
+            response.validate()
+            return cast(dict[str, Any], response.data)
+
+        return self._get(
+            "channel_info", channel_id, SLACK_METADATA_CACHE_TTL_SECONDS, _fetch
+        )
+
+    def get_thread_replies(
+        self, channel_id: str, thread_ts: str
+    ) -> list[dict[str, Any]]:
+        """The `messages` of `conversations.replies` for the thread, starting with the
+        initial thread message."""
+
+        def _fetch() -> list[dict[str, Any]]:
+            response = self._client.conversations_replies(
+                channel=channel_id, ts=thread_ts
+            )
+            response.validate()
+            return cast(list[dict[str, Any]], response.get("messages", []))
+
+        return self._get(
+            "thread_replies",
+            f"{channel_id}:{thread_ts}",
+            SLACK_THREAD_CACHE_TTL_SECONDS,
+            _fetch,
+        )
+
+    def _get(
+        self, kind: str, object_id: str, ttl: int, fetch: Callable[[], Any]
+    ) -> Any:
+        if self._workspace_id is None:
+            self._workspace_id = _get_workspace_id(self._client)
+
+        # tenant prefix is added by the redis client
+        redis_key = (
+            f"{_SLACK_METADATA_KEY_PREFIX}:{self._workspace_id}:{kind}:{object_id}"
+        )
+        local_key = f"{self._tenant_id}:{redis_key}"
+        value = _local_cache.get(local_key)
+        if value is not None:
+            return value
+
+        def _compute(_: list[str]) -> list[Any]:
+            # whoever we waited for may have just cached it
+            value = _local_cache.get(local_key)
+            if value is None:
+                value = self._get_from_redis(redis_key)
+            if value is None:
+                value = fetch()
+                self._set_in_redis(redis_key, value, ttl)
+            _local_cache.set(local_key, value, ttl_seconds=ttl)
+            return [value]
+
+        return _coalescer.get_or_compute_many([local_key], _compute)[0]
+
+    def _get_from_redis(self, redis_key: str) -> Any:
+        try:
+            raw_value = get_redis_client(tenant_id=self._tenant_id).get(redis_key)
+        except Exception:
+            logger.warning("Failed to read Slack metadata from Redis", exc_info=True)
+            return None
+        return json.loads(cast(bytes, raw_value)) if raw_value else None
+
+    def _set_in_redis(self, redis_key: str, value: Any, ttl: int) -> None:
+        try:
+            get_redis_client(tenant_id=self._tenant_id).set(
+                redis_key, json.dumps(value), ex=ttl
+            )
+        except Exception:
+            logger.warning("Failed to write Slack metadata to Redis", exc_info=True)
@@ -11,6 +11,7 @@ from slack_sdk.errors import SlackApiError
 from slack_sdk.web import SlackResponse
 
 from onyx.connectors.models import BasicExpertInfo
+from onyx.connectors.slack.metadata_cache import SlackMetadataCache
 from onyx.connectors.slack.models import MessageType
 from onyx.utils.logger import setup_logger
 from onyx.utils.retry_wrapper import retry_builder
@@ -187,16 +188,17 @@ class SlackTextCleaner:
 
     def __init__(self, client: WebClient) -> None:
         self._client = client
+        # shared across connector runs and with federated search
+        self._metadata_cache = SlackMetadataCache(client)
         self._id_to_name_map: dict[str, str] = {}
 
     def _get_slack_name(self, user_id: str) -> str:
         if user_id not in self._id_to_name_map:
             try:
-                response = self._client.users_info(user=user_id)
+                user = self._metadata_cache.get_user_info(user_id)
                 # prefer display name if set, since that is what is shown in Slack
                 self._id_to_name_map[user_id] = (
-                    response["user"]["profile"]["display_name"]
-                    or response["user"]["profile"]["real_name"]
+                    user["profile"]["display_name"] or user["profile"]["real_name"]
                 )
             except SlackApiError as e:
                 logger.exception(
@@ -1,11 +1,17 @@
+import contextvars
 import io
 import ipaddress
 import random
 import socket
+import threading
 import time
+from dataclasses import dataclass
+from dataclasses import field
 from datetime import datetime
 from datetime import timezone
 from enum import Enum
+from queue import Empty
+from queue import Queue
 from typing import Any
 from typing import cast
 from typing import Tuple
@@ -16,15 +22,20 @@ import requests
 from bs4 import BeautifulSoup
 from oauthlib.oauth2 import BackendApplicationClient
 from playwright.sync_api import BrowserContext
+from playwright.sync_api import Page
 from playwright.sync_api import Playwright
 from playwright.sync_api import sync_playwright
 from requests_oauthlib import OAuth2Session  # type:ignore
 from urllib3.exceptions import MaxRetryError
 
 from onyx.configs.app_configs import INDEX_BATCH_SIZE
+from onyx.configs.app_configs import WEB_CONNECTOR_CONCURRENCY
+from onyx.configs.app_configs import WEB_CONNECTOR_MAX_REQUESTS_PER_HOST
+from onyx.configs.app_configs import WEB_CONNECTOR_MIN_HOST_REQUEST_INTERVAL_SECONDS
 from onyx.configs.app_configs import WEB_CONNECTOR_OAUTH_CLIENT_ID
 from onyx.configs.app_configs import WEB_CONNECTOR_OAUTH_CLIENT_SECRET
 from onyx.configs.app_configs import WEB_CONNECTOR_OAUTH_TOKEN_URL
+from onyx.configs.app_configs import WEB_CONNECTOR_PAGE_CACHE_TTL_SECONDS
 from onyx.configs.app_configs import WEB_CONNECTOR_VALIDATE_URLS
 from onyx.configs.constants import DocumentSource
 from onyx.connectors.exceptions import ConnectorValidationError
@@ -35,7 +46,13 @@ from onyx.connectors.interfaces import GenerateDocumentsOutput
 from onyx.connectors.interfaces import LoadConnector
 from onyx.connectors.models import Document
 from onyx.connectors.models import TextSection
+from onyx.connectors.web.crawl_frontier import CrawlFrontier
+from onyx.connectors.web.crawl_frontier import normalize_url
+from onyx.connectors.web.page_cache import CachedWebPage
+from onyx.connectors.web.page_cache import make_page_cache_namespace
+from onyx.connectors.web.page_cache import WebPageCache
 from onyx.file_processing.extract_file_text import read_pdf_file
+from onyx.file_processing.html_utils import ParsedHTML
 from onyx.file_processing.html_utils import web_html_cleanup
 from onyx.utils.logger import setup_logger
 from onyx.utils.sitemap import list_pages_for_site
@@ -86,6 +103,9 @@ WEB_CONNECTOR_MAX_SCROLL_ATTEMPTS = 20
 IFRAME_TEXT_LENGTH_THRESHOLD = 700
 # Message indicating JavaScript is disabled, which often appears when scraping fails
 JAVASCRIPT_DISABLED_MESSAGE = "You have JavaScript disabled in your browser"
+# Pages fetched without a browser with less text than this are assumed to be rendered
+# client side and are fetched again with the browser
+MIN_STATIC_PAGE_TEXT_LENGTH = 200
 
 # Define common headers that mimic a real browser
 DEFAULT_USER_AGENT = (
@@ -329,23 +349,44 @@ def start_playwright() -> Tuple[Playwright, BrowserContext]:
     """
     )
 
-    if (
+    oauth_headers = _get_oauth_headers()
+    if oauth_headers:
+        context.set_extra_http_headers(oauth_headers)
+
+    return playwright, context
+
+
+def _get_oauth_headers() -> dict[str, str]:
+    """Returns the Authorization header for the configured OAuth client credentials,
+    if any."""
+    if not (
         WEB_CONNECTOR_OAUTH_CLIENT_ID
         and WEB_CONNECTOR_OAUTH_CLIENT_SECRET
         and WEB_CONNECTOR_OAUTH_TOKEN_URL
     ):
-        client = BackendApplicationClient(client_id=WEB_CONNECTOR_OAUTH_CLIENT_ID)
-        oauth = OAuth2Session(client=client)
-        token = oauth.fetch_token(
-            token_url=WEB_CONNECTOR_OAUTH_TOKEN_URL,
-            client_id=WEB_CONNECTOR_OAUTH_CLIENT_ID,
-            client_secret=WEB_CONNECTOR_OAUTH_CLIENT_SECRET,
-        )
-        context.set_extra_http_headers(
-            {"Authorization": "Bearer {}".format(token["access_token"])}
-        )
+        return {}
+
+    client = BackendApplicationClient(client_id=WEB_CONNECTOR_OAUTH_CLIENT_ID)
+    oauth = OAuth2Session(client=client)
+    token = oauth.fetch_token(
+        token_url=WEB_CONNECTOR_OAUTH_TOKEN_URL,
+        client_id=WEB_CONNECTOR_OAUTH_CLIENT_ID,
+        client_secret=WEB_CONNECTOR_OAUTH_CLIENT_SECRET,
+    )
+    return {"Authorization": "Bearer {}".format(token["access_token"])}
 
-    return playwright, context
+
+def _make_http_session() -> requests.Session:
+    """Plain HTTP session with the same headers, auth and TLS settings as the browser
+    context of `start_playwright`."""
+    session = requests.Session()
+    session.headers.update(DEFAULT_HEADERS)
+    # requests can't decode brotli without the optional dependency
+    session.headers["Accept-Encoding"] = "gzip, deflate"
+    session.headers.update(_get_oauth_headers())
+    # the browser context is created with ignore_https_errors=True
+    session.verify = False
+    return session
 
 
 def extract_urls_from_sitemap(sitemap_url: str) -> list[str]:
@@ -406,47 +447,163 @@ def _get_datetime_from_last_modified_header(last_modified: str) -> datetime | No
         return None
 
 
+def _get_cookies(url: str) -> list[dict[str, str]]:
+    # Parse the URL to get the domain
+    parsed_url = urlparse(url)
+    domain = parsed_url.netloc
+
+    # Add some common cookies that might help with bot detection
+    return [
+        {
+            "name": "cookieconsent",
+            "value": "accepted",
+            "domain": domain,
+            "path": "/",
+        },
+        {
+            "name": "consent",
+            "value": "true",
+            "domain": domain,
+            "path": "/",
+        },
+        {
+            "name": "session",
+            "value": "random_session_id",
+            "domain": domain,
+            "path": "/",
+        },
+    ]
+
+
 def _handle_cookies(context: BrowserContext, url: str) -> None:
     """Handle cookies for the given URL to help with bot detection"""
     try:
-        # Parse the URL to get the domain
-        parsed_url = urlparse(url)
-        domain = parsed_url.netloc
-
-        # Add some common cookies that might help with bot detection
-        cookies: list[dict[str, str]] = [
-            {
-                "name": "cookieconsent",
-                "value": "accepted",
-                "domain": domain,
-                "path": "/",
-            },
-            {
-                "name": "consent",
-                "value": "true",
-                "domain": domain,
-                "path": "/",
-            },
-            {
-                "name": "session",
-                "value": "random_session_id",
-                "domain": domain,
-                "path": "/",
-            },
-        ]
+        cookies = _get_cookies(url)
 
         # Add cookies to the context
         for cookie in cookies:
             try:
                 context.add_cookies([cookie])  # type: ignore
             except Exception as e:
-                logger.debug(f"Failed to add cookie {cookie['name']} for {domain}: {e}")
+                logger.debug(
+                    f"Failed to add cookie {cookie['name']} for {cookie['domain']}: {e}"
+                )
     except Exception:
         logger.exception(
             f"Unexpected error while handling cookies for Web Connector with URL {url}"
         )
 
 
+def _handle_session_cookies(session: requests.Session, url: str) -> None:
+    """Same as `_handle_cookies`, for the plain HTTP session"""
+    for cookie in _get_cookies(url):
+        session.cookies.set(
+            cookie["name"],
+            cookie["value"],
+            domain=cookie["domain"],
+            path=cookie["path"],
+        )
+
+
+def _scroll_to_bottom(page: Page) -> None:
+    """Scrolls until no more content is loaded, for pages with infinite scrolling"""
+    scroll_attempts = 0
+    previous_height = page.evaluate("document.body.scrollHeight")
+    while scroll_attempts < WEB_CONNECTOR_MAX_SCROLL_ATTEMPTS:
+        page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+        # wait for the content to load if we scrolled
+        page.wait_for_load_state("networkidle", timeout=30000)
+        time.sleep(0.5)  # let javascript run
+
+        new_height = page.evaluate("document.body.scrollHeight")
+        if new_height == previous_height:
+            break  # Stop scrolling when no more content is loaded
+        previous_height = new_height
+        scroll_attempts += 1
+
+
+def _add_iframe_text(page: Page, parsed_html: ParsedHTML) -> None:
+    """For websites containing iframes that need to be scraped,
+    extracts the text from within these iframes."""
+    if JAVASCRIPT_DISABLED_MESSAGE not in parsed_html.cleaned_text:
+        return
+
+    iframe_count = page.frame_locator("iframe").locator("html").count()
+    if iframe_count > 0:
+        iframe_texts = page.frame_locator("iframe").locator("html").all_inner_texts()
+        document_text = "\n".join(iframe_texts)
+        """ 700 is the threshold value for the length of the text extracted
+        from the iframe based on the issue faced """
+        if len(parsed_html.cleaned_text) < IFRAME_TEXT_LENGTH_THRESHOLD:
+            parsed_html.cleaned_text = document_text
+        else:
+            parsed_html.cleaned_text += "\n" + document_text
+
+
+def _needs_javascript(parsed_html: ParsedHTML) -> bool:
+    """Whether a page fetched with a plain HTTP request has to be rendered in a browser
+    to get its content (client side rendered pages, JS-only fallbacks, iframes)."""
+    return (
+        JAVASCRIPT_DISABLED_MESSAGE in parsed_html.cleaned_text
+        or len(parsed_html.cleaned_text.strip()) < MIN_STATIC_PAGE_TEXT_LENGTH
+    )
+
+
+def _make_web_document(
+    url: str, parsed_html: ParsedHTML, last_modified: str | None
+) -> Document:
+    return Document(
+        id=url,
+        sections=[TextSection(link=url, text=parsed_html.cleaned_text)],
+        source=DocumentSource.WEB,
+        semantic_identifier=parsed_html.title or url,
+        metadata={},
+        doc_updated_at=(
+            _get_datetime_from_last_modified_header(last_modified)
+            if last_modified
+            else None
+        ),
+    )
+
+
+@dataclass
+class _CrawledPage:
+    url: str
+    final_url: str
+    doc: Document | None = None
+    links: list[str] = field(default_factory=list)
+    etag: str | None = None
+    last_modified: str | None = None
+    retry: bool = False
+    error: str | None = None
+
+
+class _CrawlWorkerState:
+    """Per worker thread state of the concurrent crawl. The playwright sync API is
+    bound to the thread that started it, so each worker has its own browser, which is
+    only started once a page actually needs one."""
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+        self._http_session: requests.Session | None = None
+        self.browser = ScrapeSessionContext(base_url, [])
+
+    def http_session(self) -> requests.Session:
+        if self._http_session is None:
+            self._http_session = _make_http_session()
+        return self._http_session
+
+    def playwright_context(self) -> BrowserContext:
+        if self.browser.playwright_context is None:
+            self.browser.initialize()
+        return cast(BrowserContext, self.browser.playwright_context)
+
+    def stop(self) -> None:
+        self.browser.stop()
+        if self._http_session is not None:
+            self._http_session.close()
+
+
 class WebConnector(LoadConnector):
     MAX_RETRIES = 3
 
@@ -530,12 +687,14 @@ class WebConnector(LoadConnector):
                 file=io.BytesIO(response.content)
             )
             last_modified = response.headers.get("Last-Modified")
+            # like HTML pages, PDFs are identified by the URL after redirects
+            final_url = response.url
 
             result.doc = Document(
-                id=initial_url,
-                sections=[TextSection(link=initial_url, text=page_text)],
+                id=final_url,
+                sections=[TextSection(link=final_url, text=page_text)],
                 source=DocumentSource.WEB,
-                semantic_identifier=initial_url.split("/")[-1],
+                semantic_identifier=final_url.split("/")[-1],
                 metadata=metadata,
                 doc_updated_at=(
                     _get_datetime_from_last_modified_header(last_modified)
@@ -574,19 +733,7 @@ class WebConnector(LoadConnector):
 
             # If we got here, the request was successful
             if self.scroll_before_scraping:
-                scroll_attempts = 0
-                previous_height = page.evaluate("document.body.scrollHeight")
-                while scroll_attempts < WEB_CONNECTOR_MAX_SCROLL_ATTEMPTS:
-                    page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                    # wait for the content to load if we scrolled
-                    page.wait_for_load_state("networkidle", timeout=30000)
-                    time.sleep(0.5)  # let javascript run
-
-                    new_height = page.evaluate("document.body.scrollHeight")
-                    if new_height == previous_height:
-                        break  # Stop scrolling when no more content is loaded
-                    previous_height = new_height
-                    scroll_attempts += 1
+                _scroll_to_bottom(page)
 
             content = page.content()
             soup = BeautifulSoup(content, "html.parser")
@@ -607,26 +754,10 @@ class WebConnector(LoadConnector):
 
             # after this point, we don't need the caller to retry
             parsed_html = web_html_cleanup(soup, self.mintlify_cleanup)
-
-            """For websites containing iframes that need to be scraped,
-            the code below can extract text from within these iframes.
-            """
             logger.debug(
                 f"{index}: Length of cleaned text {len(parsed_html.cleaned_text)}"
             )
-            if JAVASCRIPT_DISABLED_MESSAGE in parsed_html.cleaned_text:
-                iframe_count = page.frame_locator("iframe").locator("html").count()
-                if iframe_count > 0:
-                    iframe_texts = (
-                        page.frame_locator("iframe").locator("html").all_inner_texts()
-                    )
-                    document_text = "\n".join(iframe_texts)
-                    """ 700 is the threshold value for the length of the text extracted
-                    from the iframe based on the issue faced """
-                    if len(parsed_html.cleaned_text) < IFRAME_TEXT_LENGTH_THRESHOLD:
-                        parsed_html.cleaned_text = document_text
-                    else:
-                        parsed_html.cleaned_text += "\n" + document_text
+            _add_iframe_text(page, parsed_html)
 
             # Sometimes pages with #! will serve duplicate content
             # There are also just other ways this can happen
@@ -639,18 +770,7 @@ class WebConnector(LoadConnector):
 
             session_ctx.content_hashes.add(hashed_text)
 
-            result.doc = Document(
-                id=initial_url,
-                sections=[TextSection(link=initial_url, text=parsed_html.cleaned_text)],
-                source=DocumentSource.WEB,
-                semantic_identifier=parsed_html.title or initial_url,
-                metadata={},
-                doc_updated_at=(
-                    _get_datetime_from_last_modified_header(last_modified)
-                    if last_modified
-                    else None
-                ),
-            )
+            result.doc = _make_web_document(initial_url, parsed_html, last_modified)
         finally:
             page.close()
 
@@ -663,6 +783,10 @@ class WebConnector(LoadConnector):
         if not self.to_visit_list:
             raise ValueError("No URLs to visit")
 
+        if WEB_CONNECTOR_CONCURRENCY > 1:
+            yield from self._load_concurrently()
+            return
+
         base_url = self.to_visit_list[0]  # For the recursive case
         check_internet_connection(base_url)  # make sure we can connect to the base url
 
@@ -732,6 +856,361 @@ class WebConnector(LoadConnector):
 
         session_ctx.stop()
 
+    def _crawl_page(
+        self,
+        url: str,
+        worker: _CrawlWorkerState,
+        page_cache: WebPageCache | None,
+    ) -> _CrawledPage:
+        """Crawls a single page for the concurrent crawl. Unlike `_do_scrape`, doesn't
+        touch any shared crawl state, the coordinating thread deduplicates the results
+        and queues the links.
+
+        Pages are first fetched with a plain (conditional) HTTP request, the browser is
+        used if the page doesn't render without JavaScript or the request failed."""
+        cached_page = page_cache.get(url) if page_cache else None
+
+        crawled_page: _CrawledPage | None = None
+        try:
+            crawled_page = self._crawl_page_with_http(url, worker, cached_page)
+        except Exception as e:
+            logger.info(
+                f"Fetching {url} without a browser failed, retrying with one: {e}"
+            )
+
+        if crawled_page is None:
+            crawled_page = self._crawl_page_with_browser(url, worker)
+        elif crawled_page.final_url != url:
+            protected_url_check(crawled_page.final_url)
+
+        if page_cache and crawled_page.doc is not None:
+            page_cache.set(
+                url,
+                CachedWebPage(
+                    etag=crawled_page.etag,
+                    last_modified=crawled_page.last_modified,
+                    final_url=crawled_page.final_url,
+                    doc=crawled_page.doc,
+                    links=crawled_page.links,
+                ),
+            )
+        return crawled_page
+
+    def _crawl_page_with_http(
+        self,
+        url: str,
+        worker: _CrawlWorkerState,
+        cached_page: CachedWebPage | None,
+    ) -> _CrawledPage | None:
+        """Returns None if the page has to be rendered in the browser."""
+        http_session = worker.http_session()
+        _handle_session_cookies(http_session, url)
+        response = http_session.get(
+            url,
+            headers=WebPageCache.conditional_headers(cached_page),
+            timeout=30,
+            allow_redirects=True,
+        )
+        if response.status_code == 304 and cached_page is not None:
+            logger.debug(f"{url} not modified since the last crawl")
+            return _CrawledPage(
+                url=url,
+                final_url=cached_page.final_url,
+                doc=cached_page.doc,
+                links=cached_page.links,
+                etag=cached_page.etag,
+                last_modified=cached_page.last_modified,
+            )
+
+        final_url = response.url
+        if is_pdf_content(response) or url.lower().endswith(".pdf"):
+            # PDF files are not checked for links
+            response.raise_for_status()
+            page_text, metadata, _ = read_pdf_file(file=io.BytesIO(response.content))
+            last_modified = response.headers.get("Last-Modified")
+            return _CrawledPage(
+                url=url,
+                final_url=final_url,
+                doc=Document(
+                    id=final_url,
+                    sections=[TextSection(link=final_url, text=page_text)],
+                    source=DocumentSource.WEB,
+                    semantic_identifier=final_url.split("/")[-1],
+                    metadata=metadata,
+                    doc_updated_at=(
+                        _get_datetime_from_last_modified_header(last_modified)
+                        if last_modified
+                        else None
+                    ),
+                ),
+                etag=response.headers.get("ETag"),
+                last_modified=last_modified,
+            )
+
+        if (
+            not response.ok
+            or self.scroll_before_scraping
+            or "html" not in response.headers.get("content-type", "").lower()
+        ):
+            return None
+
+        soup = BeautifulSoup(response.text, "html.parser")
+        # collect the links before the cleanup strips navigation elements
+        links = (
+            sorted(get_internal_links(worker.base_url, final_url, soup))
+            if self.recursive
+            else []
+        )
+        parsed_html = web_html_cleanup(soup, self.mintlify_cleanup)
+        if _needs_javascript(parsed_html):
+            return None
+
+        last_modified = response.headers.get("Last-Modified")
+        return _CrawledPage(
+            url=url,
+            final_url=final_url,
+            doc=_make_web_document(final_url, parsed_html, last_modified),
+            links=links,
+            etag=response.headers.get("ETag"),
+            last_modified=last_modified,
+        )
+
+    def _crawl_page_with_browser(
+        self, url: str, worker: _CrawlWorkerState
+    ) -> _CrawledPage:
+        context = worker.playwright_context()
+        _handle_cookies(context, url)
+
+        page = context.new_page()
+        try:
+            # Can't use wait_until="networkidle" because it interferes with the scrolling behavior
+            page_response = page.goto(
+                url,
+                timeout=30000,  # 30 seconds
+                wait_until="domcontentloaded",  # Wait for DOM to be ready
+            )
+            final_url = page.url
+            if final_url != url:
+                protected_url_check(final_url)
+
+            if self.scroll_before_scraping:
+                _scroll_to_bottom(page)
+
+            soup = BeautifulSoup(page.content(), "html.parser")
+            links = (
+                sorted(get_internal_links(worker.base_url, final_url, soup))
+                if self.recursive
+                else []
+            )
+
+            if page_response and str(page_response.status)[0] in ("4", "5"):
+                error = f"Skipped indexing {final_url} due to HTTP {page_response.status} response"
+                logger.info(error)
+                return _CrawledPage(
+                    url=url, final_url=final_url, links=links, retry=True, error=error
+                )
+
+            parsed_html = web_html_cleanup(soup, self.mintlify_cleanup)
+            _add_iframe_text(page, parsed_html)
+
+            last_modified = (
+                page_response.header_value("Last-Modified") if page_response else None
+            )
+            return _CrawledPage(
+                url=url,
+                final_url=final_url,
+                doc=_make_web_document(final_url, parsed_html, last_modified),
+                links=links,
+                etag=page_response.header_value("ETag") if page_response else None,
+                last_modified=last_modified,
+            )
+        finally:
+            page.close()
+
+    def _crawl_page_with_retries(
+        self,
+        url: str,
+        worker: _CrawlWorkerState,
+        page_cache: WebPageCache | None,
+    ) -> _CrawledPage:
+        crawled_page = _CrawledPage(url=url, final_url=url)
+        for retry_count in range(self.MAX_RETRIES):
+            if retry_count > 0:
+                # Add a random delay between retries (exponential backoff)
+                delay = min(2**retry_count + random.uniform(0, 1), 10)
+                logger.info(
+                    f"Retry {retry_count}/{self.MAX_RETRIES} for {url} after {delay:.2f}s delay"
+                )
+                time.sleep(delay)
+
+            try:
+                crawled_page = self._crawl_page(url, worker, page_cache)
+            except Exception as e:
+                error = f"Failed to fetch '{url}': {e}"
+                logger.exception(error)
+                crawled_page = _CrawledPage(url=url, final_url=url, error=error)
+                # the browser is restarted when it is needed next
+                worker.browser.stop()
+                continue
+
+            if not crawled_page.retry:
+                break
+        return crawled_page
+
+    def _crawl_worker(
+        self,
+        base_url: str,
+        work_queue: Queue[str | None],
+        result_queue: Queue[_CrawledPage],
+        page_cache: WebPageCache | None,
+    ) -> None:
+        worker = _CrawlWorkerState(base_url)
+        try:
+            while (url := work_queue.get()) is not None:
+                result_queue.put(self._crawl_page_with_retries(url, worker, page_cache))
+        finally:
+            worker.stop()
+
+    def _load_concurrently(self) -> GenerateDocumentsOutput:
+        """Same as the sequential crawl of `load_from_state`, but with up to
+        WEB_CONNECTOR_CONCURRENCY pages in flight, handed out by a deduplicating
+        frontier that enforces per host politeness limits."""
+        base_url = self.to_visit_list[0]  # For the recursive case
+        check_internet_connection(base_url)  # make sure we can connect to the base url
+
+        page_cache = (
+            WebPageCache(
+                namespace=make_page_cache_namespace(
+                    base_url,
+                    self.web_connector_type,
+                    self.mintlify_cleanup,
+                    self.scroll_before_scraping,
+                ),
+                ttl_seconds=WEB_CONNECTOR_PAGE_CACHE_TTL_SECONDS,
+            )
+            if WEB_CONNECTOR_PAGE_CACHE_TTL_SECONDS > 0
+            else None
+        )
+
+        frontier = CrawlFrontier(
+            max_in_flight_per_host=WEB_CONNECTOR_MAX_REQUESTS_PER_HOST,
+            min_host_interval_seconds=WEB_CONNECTOR_MIN_HOST_REQUEST_INTERVAL_SECONDS,
+        )
+        for url in self.to_visit_list:
+            frontier.add(url)
+
+        work_queue: Queue[str | None] = Queue()
+        result_queue: Queue[_CrawledPage] = Queue()
+        workers = [
+            threading.Thread(
+                target=contextvars.copy_context().run,
+                args=(
+                    self._crawl_worker,
+                    base_url,
+                    work_queue,
+                    result_queue,
+                    page_cache,
+                ),
+                daemon=True,
+            )
+            for _ in range(WEB_CONNECTOR_CONCURRENCY)
+        ]
+        for worker in workers:
+            worker.start()
+
+        content_hashes: set[int] = set()
+        doc_batch: list[Document] = []
+        at_least_one_doc = False
+        last_error: str | None = None
+        num_visited = 0
+        num_in_flight = 0
+        try:
+            while True:
+                while num_in_flight < len(workers):
+                    url = frontier.next_url()
+                    if url is None:
+                        break
+                    try:
+                        protected_url_check(url)
+                    except Exception as e:
+                        last_error = f"Invalid URL {url} due to {e}"
+                        logger.warning(last_error)
+                        frontier.release(url)
+                        continue
+
+                    num_visited += 1
+                    logger.info(f"{num_visited}: Visiting {url}")
+                    work_queue.put(url)
+                    num_in_flight += 1
+
+                if num_in_flight == 0 and not frontier.has_pending():
+                    break
+
+                try:
+                    crawled_page = result_queue.get(
+                        # wake up when a host is allowed to be requested again
+                        timeout=(
+                            None
+                            if num_in_flight >= len(workers)
+                            else frontier.seconds_until_ready()
+                        )
+                    )
+                except Empty:
+                    continue
+
+                num_in_flight -= 1
+                frontier.release(crawled_page.url)
+                for link in crawled_page.links:
+                    frontier.add(link)
+                if crawled_page.error:
+                    last_error = crawled_page.error
+
+                doc = crawled_page.doc
+                if doc is None:
+                    continue
+
+                if normalize_url(crawled_page.final_url) != normalize_url(
+                    crawled_page.url
+                ):
+                    if not frontier.mark_seen(crawled_page.final_url):
+                        logger.info(
+                            f"{crawled_page.url} redirected to {crawled_page.final_url} - already indexed"
+                        )
+                        continue
+                    logger.info(
+                        f"{crawled_page.url} redirected to {crawled_page.final_url}"
+                    )
+
+                # Sometimes pages with #! will serve duplicate content
+                # There are also just other ways this can happen
+                hashed_text = hash((doc.semantic_identifier, doc.get_text_content()))
+                if hashed_text in content_hashes:
+                    logger.info(
+                        f"Skipping duplicate title + content for {crawled_page.final_url}"
+                    )
+                    continue
+                content_hashes.add(hashed_text)
+
+                doc_batch.append(doc)
+                if len(doc_batch) >= self.batch_size:
+                    at_least_one_doc = True
+                    yield doc_batch
+                    doc_batch = []
+
+            if doc_batch:
+                at_least_one_doc = True
+                yield doc_batch
+        finally:
+            for _ in workers:
+                work_queue.put(None)
+            for worker in workers:
+                worker.join()
+
+        if not at_least_one_doc:
+            if last_error:
+                raise RuntimeError(last_error)
+            raise RuntimeError("No valid pages found.")
+
     def validate_connector_settings(self) -> None:
         # Make sure we have at least one valid URL to check
         if not self.to_visit_list:
@@ -0,0 +1,121 @@
+import time
+from collections import Counter
+from collections import deque
+from urllib.parse import parse_qsl
+from urllib.parse import urlencode
+from urllib.parse import urlparse
+from urllib.parse import urlunparse
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form of a URL used to deduplicate the crawl: lowercased scheme and host,
+    no default port, no fragment (except hashbang routes), no trailing slash and
+    sorted query parameters."""
+    parsed = urlparse(url)
+    scheme = parsed.scheme.lower()
+    netloc = (parsed.hostname or "").lower()
+    try:
+        port = parsed.port
+    except ValueError:  # invalid port, keep the URL as is
+        return url
+    if port and port != _DEFAULT_PORTS.get(scheme):
+        netloc = f"{netloc}:{port}"
+
+    path = parsed.path or "/"
+    if path != "/":
+        path = path.rstrip("/")
+
+    query = urlencode(sorted(parse_qsl(parsed.query, keep_blank_values=True)))
+    # "#!" indicates client-side routing, the fragment identifies the page
+    fragment = parsed.fragment if parsed.fragment.startswith("!") else ""
+    return urlunparse((scheme, netloc, path, parsed.params, query, fragment))
+
+
+class CrawlFrontier:
+    """URLs left to crawl, deduplicated on their normalized form, handed out with
+    per-host politeness limits (max concurrent requests and min delay between request
+    starts per host). Hosts are served round robin.
+
+    Not thread-safe, meant to be driven by the single thread coordinating the crawl."""
+
+    def __init__(
+        self, max_in_flight_per_host: int, min_host_interval_seconds: float = 0.0
+    ):
+        self.max_in_flight_per_host = max(1, max_in_flight_per_host)
+        self.min_host_interval_seconds = min_host_interval_seconds
+
+        self._pending_by_host: dict[str, deque[str]] = {}
+        self._seen: set[str] = set()
+        self._in_flight_by_host: Counter[str] = Counter()
+        self._last_request_by_host: dict[str, float] = {}
+
+    @staticmethod
+    def _host(url: str) -> str:
+        return (urlparse(url).hostname or "").lower()
+
+    def add(self, url: str) -> bool:
+        """Queues the URL unless it (or an equivalent URL) was seen before."""
+        if not self.mark_seen(url):
+            return False
+        self._pending_by_host.setdefault(self._host(url), deque()).append(url)
+        return True
+
+    def mark_seen(self, url: str) -> bool:
+        """Marks the URL as seen without queueing it (e.g. the target of a redirect).
+        Returns False if it was already seen."""
+        normalized = normalize_url(url)
+        if normalized in self._seen:
+            return False
+        self._seen.add(normalized)
+        return True
+
+    def has_pending(self) -> bool:
+        return bool(self._pending_by_host)
+
+    def num_seen(self) -> int:
+        return len(self._seen)
+
+    def next_url(self) -> str | None:
+        """Next URL whose host is below its politeness limits, None if there is none
+        right now (either nothing is pending or all pending hosts are busy)."""
+        now = time.monotonic()
+        for host in list(self._pending_by_host):
+            if self._in_flight_by_host[host] >= self.max_in_flight_per_host:
+                continue
+            last_request = self._last_request_by_host.get(host)
+            if (
+                last_request is not None
+                and now - last_request < self.min_host_interval_seconds
+            ):
+                continue
+
+            pending = self._pending_by_host.pop(host)
+            url = pending.popleft()
+            if pending:
+                # re-insert at the end for round robin between hosts
+                self._pending_by_host[host] = pending
+            self._in_flight_by_host[host] += 1
+            self._last_request_by_host[host] = now
+            return url
+        return None
+
+    def seconds_until_ready(self) -> float | None:
+        """Time until a host that is only held back by the request interval can be
+        requested again, None if all pending hosts are waiting on in-flight requests."""
+        now = time.monotonic()
+        waits = [
+            self.min_host_interval_seconds
+            - (now - self._last_request_by_host.get(host, float("-inf")))
+            for host in self._pending_by_host
+            if self._in_flight_by_host[host] < self.max_in_flight_per_host
+        ]
+        return max(0.0, min(waits)) if waits else None
+
+    def release(self, url: str) -> None:
+        """Called once a URL handed out by `next_url` has been crawled."""
+        host = self._host(url)
+        self._in_flight_by_host[host] -= 1
+        if self._in_flight_by_host[host] <= 0:
+            del self._in_flight_by_host[host]
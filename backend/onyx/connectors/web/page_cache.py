@@ -0,0 +1,82 @@
+import gzip
+import hashlib
+import json
+from typing import cast
+
+from pydantic import BaseModel
+
+from onyx.connectors.models import Document
+from onyx.connectors.web.crawl_frontier import normalize_url
+from onyx.redis.redis_pool import get_redis_client
+from onyx.utils.logger import setup_logger
+
+logger = setup_logger()
+
+_WEB_PAGE_CACHE_KEY_PREFIX = "web_page_cache"
+
+
+class CachedWebPage(BaseModel):
+    etag: str | None = None
+    last_modified: str | None = None
+    final_url: str
+    doc: Document | None = None
+    links: list[str] = []
+
+
+class WebPageCache:
+    """Last crawl result of each page plus its HTTP validators (ETag / Last-Modified),
+    stored in Redis so that re-crawls can send conditional requests and reuse the
+    previous result when the server answers 304 Not Modified.
+
+    The result must be reused rather than skipped, the pruning job re-runs the crawl
+    to find out which pages still exist. Redis errors are logged and treated as
+    cache misses."""
+
+    def __init__(self, namespace: str, ttl_seconds: int):
+        self._namespace = namespace
+        self._ttl_seconds = ttl_seconds
+
+    def _key(self, url: str) -> str:
+        url_hash = hashlib.sha256(normalize_url(url).encode()).hexdigest()
+        return f"{_WEB_PAGE_CACHE_KEY_PREFIX}:{self._namespace}:{url_hash}"
+
+    def get(self, url: str) -> CachedWebPage | None:
+        try:
+            raw_value = get_redis_client().get(self._key(url))
+        except Exception:
+            logger.warning(f"Failed to read cached page for {url}", exc_info=True)
+            return None
+        if not raw_value:
+            return None
+        return CachedWebPage.model_validate_json(
+            gzip.decompress(cast(bytes, raw_value))
+        )
+
+    def set(self, url: str, page: CachedWebPage) -> None:
+        if not page.etag and not page.last_modified:
+            # can't be revalidated
+            return
+        try:
+            get_redis_client().set(
+                self._key(url),
+                gzip.compress(page.model_dump_json().encode()),
+                ex=self._ttl_seconds,
+            )
+        except Exception:
+            logger.warning(f"Failed to cache page {url}", exc_info=True)
+
+    @staticmethod
+    def conditional_headers(page: CachedWebPage | None) -> dict[str, str]:
+        if page is None:
+            return {}
+        headers: dict[str, str] = {}
+        if page.etag:
+            headers["If-None-Match"] = page.etag
+        if page.last_modified:
+            headers["If-Modified-Since"] = page.last_modified
+        return headers
+
+
+def make_page_cache_namespace(*settings: object) -> str:
+    """Pages are only reusable by crawls with the same settings"""
+    return hashlib.sha256(json.dumps(settings, default=str).encode()).hexdigest()[:16]
@@ -0,0 +1,187 @@
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+
+from onyx.configs.chat_configs import CHUNK_CONTENT_CACHE_ENABLED
+from onyx.configs.chat_configs import CHUNK_CONTENT_CACHE_MAX_SIZE
+from onyx.configs.chat_configs import CHUNK_CONTENT_CACHE_TTL_SECONDS
+from onyx.context.search.models import IndexFilters
+from onyx.context.search.models import InferenceChunk
+from onyx.context.search.postprocessing.postprocessing import cleanup_chunks
+from onyx.db.document import fetch_synced_document_versions
+from onyx.document_index.interfaces import DocumentIndex
+from onyx.document_index.interfaces import VespaChunkRequest
+from onyx.document_index.vespa.shared_utils.utils import (
+    replace_invalid_doc_id_characters,
+)
+from onyx.utils.cache import TTLCache
+from onyx.utils.logger import setup_logger
+from shared_configs.contextvars import get_current_tenant_id
+
+logger = setup_logger()
+
+# (last_modified, last_synced, chunk_count) of a document, any change to the document
+# or its metadata in the index changes it
+DocumentGeneration = tuple[datetime | None, datetime | None, int | None]
+
+# (tenant_id, index name, document_id, chunk_id) -> (document generation, chunk)
+_chunk_cache: TTLCache[
+    tuple[str, str, str, int], tuple[DocumentGeneration, InferenceChunk]
+] = TTLCache(
+    max_size=CHUNK_CONTENT_CACHE_MAX_SIZE,
+    ttl_seconds=CHUNK_CONTENT_CACHE_TTL_SECONDS,
+)
+# (tenant_id, index name, document_id) -> (document generation, id of its last chunk)
+# only known once a fetch has run past the end of the document
+_last_chunk_id_cache: TTLCache[tuple[str, str, str], tuple[DocumentGeneration, int]] = (
+    TTLCache(
+        max_size=CHUNK_CONTENT_CACHE_MAX_SIZE,
+        ttl_seconds=CHUNK_CONTENT_CACHE_TTL_SECONDS,
+    )
+)
+
+
+def _get_cached_chunks(
+    tenant_id: str,
+    index_name: str,
+    chunk_request: VespaChunkRequest,
+    generation: DocumentGeneration,
+) -> list[InferenceChunk] | None:
+    """Returns None unless every chunk of the request is cached for this generation."""
+    document_id = chunk_request.document_id
+    min_chunk_ind = chunk_request.min_chunk_ind or 0
+    max_chunk_ind = chunk_request.max_chunk_ind
+
+    last_chunk = _last_chunk_id_cache.get((tenant_id, index_name, document_id))
+    last_chunk_id = (
+        last_chunk[1] if last_chunk is not None and last_chunk[0] == generation else None
+    )
+    if max_chunk_ind is None or (
+        last_chunk_id is not None and max_chunk_ind > last_chunk_id
+    ):
+        if last_chunk_id is None:
+            return None
+        max_chunk_ind = last_chunk_id
+
+    chunks: list[InferenceChunk] = []
+    for chunk_id in range(min_chunk_ind, max_chunk_ind + 1):
+        entry = _chunk_cache.get((tenant_id, index_name, document_id, chunk_id))
+        if entry is None or entry[0] != generation:
+            return None
+        # callers overwrite scores on the returned chunks
+        chunks.append(entry[1].model_copy())
+    return chunks
+
+
+def _cache_fetched_chunks(
+    tenant_id: str,
+    index_name: str,
+    chunk_requests: list[VespaChunkRequest],
+    chunks: list[InferenceChunk],
+    generations: dict[str, DocumentGeneration],
+) -> None:
+    doc_id_to_chunk_ids: dict[str, set[int]] = {}
+    for chunk in chunks:
+        generation = generations.get(chunk.document_id)
+        if generation is None:
+            continue
+        _chunk_cache.set(
+            (tenant_id, index_name, chunk.document_id, chunk.chunk_id),
+            (generation, chunk.model_copy()),
+        )
+        doc_id_to_chunk_ids.setdefault(chunk.document_id, set()).add(chunk.chunk_id)
+
+    # chunk ids of a document are contiguous, so a fetch that returned a contiguous run
+    # of chunks ending before the end of the requested range found the last chunk
+    for chunk_request in chunk_requests:
+        generation = generations.get(chunk_request.document_id)
+        if generation is None:
+            continue
+
+        min_chunk_ind = chunk_request.min_chunk_ind or 0
+        max_chunk_ind = chunk_request.max_chunk_ind
+        fetched_ids = sorted(
+            chunk_id
+            for chunk_id in doc_id_to_chunk_ids.get(chunk_request.document_id, set())
+            if chunk_id >= min_chunk_ind
+            and (max_chunk_ind is None or chunk_id <= max_chunk_ind)
+        )
+        if not fetched_ids or fetched_ids != list(
+            range(min_chunk_ind, fetched_ids[-1] + 1)
+        ):
+            continue
+        if max_chunk_ind is None or fetched_ids[-1] < max_chunk_ind:
+            _last_chunk_id_cache.set(
+                (tenant_id, index_name, chunk_request.document_id),
+                (generation, fetched_ids[-1]),
+            )
+
+
+def cached_id_based_retrieval(
+    document_index: DocumentIndex,
+    chunk_requests: list[VespaChunkRequest],
+    filters: IndexFilters,
+    db_session: Session,
+    batch_retrieval: bool = False,
+) -> list[InferenceChunk]:
+    """Same as `document_index.id_based_retrieval` followed by `cleanup_chunks`, but
+    serves the content of recently fetched chunks from an in-process cache.
+
+    Only content is cached. Requests with an access control list are always sent to
+    the document index so that it makes the access decision; callers without one
+    must have already checked access to the requested documents."""
+    if not CHUNK_CONTENT_CACHE_ENABLED or filters.access_control_list is not None:
+        return cleanup_chunks(
+            document_index.id_based_retrieval(
+                chunk_requests=chunk_requests,
+                filters=filters,
+                batch_retrieval=batch_retrieval,
+            )
+        )
+
+    tenant_id = get_current_tenant_id()
+    index_name = document_index.index_name
+    generations: dict[str, DocumentGeneration] = {
+        document_id: generation
+        for document_id, generation in fetch_synced_document_versions(
+            document_ids=list(
+                {chunk_request.document_id for chunk_request in chunk_requests}
+            ),
+            db_session=db_session,
+        ).items()
+        # the index stores these under a different id, don't risk mixing them up
+        if replace_invalid_doc_id_characters(document_id) == document_id
+    }
+
+    chunks: list[InferenceChunk] = []
+    missing_requests: list[VespaChunkRequest] = []
+    for chunk_request in chunk_requests:
+        generation = generations.get(chunk_request.document_id)
+        cached_chunks = (
+            _get_cached_chunks(tenant_id, index_name, chunk_request, generation)
+            if generation is not None
+            else None
+        )
+        if cached_chunks is None:
+            missing_requests.append(chunk_request)
+        else:
+            chunks.extend(cached_chunks)
+
+    logger.debug(
+        f"Chunk content cache: requests={len(chunk_requests)} "
+        f"hits={len(chunk_requests) - len(missing_requests)}"
+    )
+    if not missing_requests:
+        return chunks
+
+    fetched_chunks = cleanup_chunks(
+        document_index.id_based_retrieval(
+            chunk_requests=missing_requests,
+            filters=filters,
+            batch_retrieval=batch_retrieval,
+        )
+    )
+    _cache_fetched_chunks(
+        tenant_id, index_name, missing_requests, fetched_chunks, generations
+    )
+    return chunks + fetched_chunks
@@ -14,6 +14,7 @@ from onyx.configs.chat_configs import DOC_TIME_DECAY
 from onyx.configs.model_configs import DOC_EMBEDDING_CONTEXT_SIZE
 from onyx.connectors.models import IndexingDocument
 from onyx.connectors.models import TextSection
+from onyx.connectors.slack.metadata_cache import SlackMetadataCache
 from onyx.context.search.federated.models import SlackMessage
 from onyx.context.search.models import InferenceChunk
 from onyx.context.search.models import SearchQuery
@@ -56,12 +57,11 @@ def _should_skip_channel(
         try:
             # Use bot token if available (has full permissions), otherwise fall back to user token
             token_to_use = bot_token or access_token
-            channel_client = WebClient(token=token_to_use)
-            channel_info = channel_client.conversations_info(channel=channel_id)
+            channel_info = SlackMetadataCache(
+                WebClient(token=token_to_use)
+            ).get_channel_info(channel_id)
 
-            if isinstance(channel_info.data, dict) and not _is_public_channel(
-                channel_info.data
-            ):
+            if not _is_public_channel(channel_info):
                 # This is a private channel - filter it out
                 if channel_id != allowed_private_channel:
                     logger.debug(
@@ -295,14 +295,9 @@ def get_contextualized_thread_text(message: SlackMessage, access_token: str) ->
         return message.text
 
     # get the thread messages
-    slack_client = WebClient(token=access_token)
+    metadata_cache = SlackMetadataCache(WebClient(token=access_token))
     try:
-        response = slack_client.conversations_replies(
-            channel=channel_id,
-            ts=thread_id,
-        )
-        response.validate()
-        messages: list[dict[str, Any]] = response.get("messages", [])
+        messages = metadata_cache.get_thread_replies(channel_id, thread_id)
     except SlackApiError as e:
         logger.error(f"Slack API error in get_contextualized_thread_text: {e}")
         return message.text
@@ -351,9 +346,7 @@ def get_contextualized_thread_text(message: SlackMessage, access_token: str) ->
     userids: set[str] = set(re.findall(r"<@([A-Z0-9]+)>", thread_text))
     for userid in userids:
         try:
-            response = slack_client.users_profile_get(user=userid)
-            response.validate()
-            profile: dict[str, Any] = response.get("profile", {})
+            profile = metadata_cache.get_user_profile(userid)
             name: str | None = profile.get("real_name") or profile.get("email")
         except SlackApiError as e:
             logger.error(f"Slack API error in get_contextualized_thread_text: {e}")
@@ -13,6 +13,7 @@ from onyx.chat.prune_and_merge import ChunkRange
 from onyx.chat.prune_and_merge import merge_chunk_intervals
 from onyx.chat.prune_and_merge import prune_and_merge_sections
 from onyx.configs.chat_configs import DISABLE_LLM_DOC_RELEVANCE
+from onyx.context.search.chunk_content_cache import cached_id_based_retrieval
 from onyx.context.search.enums import LLMEvaluationType
 from onyx.context.search.enums import QueryFlow
 from onyx.context.search.enums import SearchType
@@ -23,7 +24,6 @@ from onyx.context.search.models import RerankMetricsContainer
 from onyx.context.search.models import RetrievalMetricsContainer
 from onyx.context.search.models import SearchQuery
 from onyx.context.search.models import SearchRequest
-from onyx.context.search.postprocessing.postprocessing import cleanup_chunks
 from onyx.context.search.postprocessing.postprocessing import search_postprocessing
 from onyx.context.search.preprocessing.preprocessing import retrieval_preprocessing
 from onyx.context.search.retrieval.search_runner import (
@@ -223,11 +223,11 @@ class SearchPipeline:
                     )
 
             inference_chunks.extend(
-                cleanup_chunks(
-                    self.document_index.id_based_retrieval(
-                        chunk_requests=chunk_requests,
-                        filters=IndexFilters(access_control_list=None),
-                    )
+                cached_id_based_retrieval(
+                    document_index=self.document_index,
+                    chunk_requests=chunk_requests,
+                    filters=IndexFilters(access_control_list=None),
+                    db_session=self.db_session,
                 )
             )
 
@@ -297,12 +297,12 @@ class SearchPipeline:
 
         if chunk_requests:
             inference_chunks.extend(
-                cleanup_chunks(
-                    self.document_index.id_based_retrieval(
-                        chunk_requests=chunk_requests,
-                        filters=IndexFilters(access_control_list=None),
-                        batch_retrieval=True,
-                    )
+                cached_id_based_retrieval(
+                    document_index=self.document_index,
+                    chunk_requests=chunk_requests,
+                    filters=IndexFilters(access_control_list=None),
+                    db_session=self.db_session,
+                    batch_retrieval=True,
                 )
             )
 
@@ -0,0 +1,198 @@
+import hashlib
+from typing import cast
+
+from sqlalchemy.orm import Session
+
+from onyx.configs.chat_configs import QUERY_EMBEDDING_CACHE_MAX_SIZE
+from onyx.configs.chat_configs import QUERY_EMBEDDING_CACHE_REDIS_ENABLED
+from onyx.configs.chat_configs import QUERY_EMBEDDING_CACHE_TTL_SECONDS
+from onyx.configs.chat_configs import SEARCH_SETTINGS_CACHE_TTL_SECONDS
+from onyx.db.search_settings import get_current_search_settings
+from onyx.indexing.embedding_cache import deserialize_embedding
+from onyx.indexing.embedding_cache import serialize_embedding
+from onyx.natural_language_processing.search_nlp_models import EmbeddingModel
+from onyx.redis.redis_pool import get_redis_client
+from onyx.utils.cache import RequestCoalescer
+from onyx.utils.cache import TTLCache
+from onyx.utils.logger import setup_logger
+from shared_configs.configs import MODEL_SERVER_HOST
+from shared_configs.configs import MODEL_SERVER_PORT
+from shared_configs.contextvars import get_current_tenant_id
+from shared_configs.enums import EmbedTextType
+from shared_configs.model_server_models import Embedding
+
+logger = setup_logger()
+
+# bumped whenever the current search settings change (e.g. index swap), so that every
+# process drops the query embedding model it built from the old settings
+_SEARCH_SETTINGS_GENERATION_KEY = "search_settings_generation"
+_QUERY_EMBEDDING_KEY_PREFIX = "query_embedding"
+
+# tenant_id -> (settings generation, search settings id, embedding model)
+_query_model_cache: TTLCache[str, tuple[int, int, EmbeddingModel]] = TTLCache(
+    max_size=1024, ttl_seconds=SEARCH_SETTINGS_CACHE_TTL_SECONDS
+)
+# (tenant_id, search settings id, query) -> embedding
+_query_embedding_cache: TTLCache[tuple[str, int, str], Embedding] = TTLCache(
+    max_size=QUERY_EMBEDDING_CACHE_MAX_SIZE,
+    ttl_seconds=QUERY_EMBEDDING_CACHE_TTL_SECONDS,
+)
+_query_embedding_coalescer: RequestCoalescer[tuple[str, int, str], Embedding] = (
+    RequestCoalescer()
+)
+
+
+def _get_search_settings_generation(tenant_id: str) -> int:
+    try:
+        generation = get_redis_client(tenant_id=tenant_id).get(
+            _SEARCH_SETTINGS_GENERATION_KEY
+        )
+    except Exception:
+        logger.warning("Failed to read the search settings generation", exc_info=True)
+        return 0
+    return int(cast(bytes, generation)) if generation else 0
+
+
+def invalidate_search_settings_cache(tenant_id: str | None = None) -> None:
+    """Call after the current search settings change so cached query embedding
+    models are rebuilt in every process."""
+    tenant_id = tenant_id or get_current_tenant_id()
+    _query_model_cache.delete(tenant_id)
+    try:
+        get_redis_client(tenant_id=tenant_id).incrby(_SEARCH_SETTINGS_GENERATION_KEY, 1)
+    except Exception:
+        logger.warning(
+            "Failed to bump the search settings generation, other processes will "
+            f"pick up the new search settings within {SEARCH_SETTINGS_CACHE_TTL_SECONDS}s",
+            exc_info=True,
+        )
+
+
+def _get_query_embedding_model(
+    tenant_id: str, db_session: Session
+) -> tuple[int, EmbeddingModel]:
+    generation = _get_search_settings_generation(tenant_id)
+    cached = _query_model_cache.get(tenant_id)
+    if cached is not None and cached[0] == generation:
+        return cached[1], cached[2]
+
+    search_settings = get_current_search_settings(db_session)
+    model = EmbeddingModel.from_db_model(
+        search_settings=search_settings,
+        # The below are globally set, this flow always uses the indexing one
+        server_host=MODEL_SERVER_HOST,
+        server_port=MODEL_SERVER_PORT,
+    )
+    _query_model_cache.set(tenant_id, (generation, search_settings.id, model))
+    return search_settings.id, model
+
+
+def _redis_key(tenant_id: str, search_settings_id: int, query: str) -> str:
+    query_hash = hashlib.sha256(query.encode("utf-8", errors="replace")).hexdigest()
+    # pipelines don't automatically add the tenant_id prefix
+    return (
+        f"{tenant_id}:{_QUERY_EMBEDDING_KEY_PREFIX}:{search_settings_id}:{query_hash}"
+    )
+
+
+def _get_from_redis(
+    tenant_id: str, search_settings_id: int, queries: list[str]
+) -> list[Embedding | None]:
+    try:
+        pipeline = get_redis_client(tenant_id=tenant_id).pipeline()
+        for query in queries:
+            pipeline.get(_redis_key(tenant_id, search_settings_id, query))
+        raw_values = cast(list[bytes | None], pipeline.execute())
+    except Exception:
+        logger.warning("Failed to read query embeddings from Redis", exc_info=True)
+        return [None] * len(queries)
+
+    return [deserialize_embedding(raw) if raw else None for raw in raw_values]
+
+
+def _set_in_redis(
+    tenant_id: str,
+    search_settings_id: int,
+    queries: list[str],
+    embeddings: list[Embedding],
+) -> None:
+    try:
+        pipeline = get_redis_client(tenant_id=tenant_id).pipeline()
+        for query, embedding in zip(queries, embeddings):
+            pipeline.set(
+                _redis_key(tenant_id, search_settings_id, query),
+                serialize_embedding(embedding),
+                ex=QUERY_EMBEDDING_CACHE_TTL_SECONDS,
+            )
+        pipeline.execute()
+    except Exception:
+        logger.warning("Failed to write query embeddings to Redis", exc_info=True)
+
+
+def get_cached_query_embeddings(
+    queries: list[str], db_session: Session
+) -> list[Embedding]:
+    """Same as embedding the queries with the current search settings' model, but
+    served from the in-process (and optionally Redis) query embedding cache when possible.
+    Concurrent requests for the same query share a single model server call."""
+    tenant_id = get_current_tenant_id()
+    search_settings_id, model = _get_query_embedding_model(tenant_id, db_session)
+
+    def _encode(keys: list[tuple[str, int, str]]) -> list[Embedding]:
+        # another caller may have finished computing these while we were waiting
+        embeddings: list[Embedding | None] = [
+            _query_embedding_cache.get(key) for key in keys
+        ]
+        missing_queries = [
+            key[2] for key, embedding in zip(keys, embeddings) if embedding is None
+        ]
+        if missing_queries and QUERY_EMBEDDING_CACHE_REDIS_ENABLED:
+            redis_embeddings = iter(
+                _get_from_redis(tenant_id, search_settings_id, missing_queries)
+            )
+            embeddings = [
+                embedding if embedding is not None else next(redis_embeddings)
+                for embedding in embeddings
+            ]
+            missing_queries = [
+                key[2] for key, embedding in zip(keys, embeddings) if embedding is None
+            ]
+
+        if missing_queries:
+            new_embeddings = model.encode(
+                missing_queries, text_type=EmbedTextType.QUERY
+            )
+            if QUERY_EMBEDDING_CACHE_REDIS_ENABLED:
+                _set_in_redis(
+                    tenant_id, search_settings_id, missing_queries, new_embeddings
+                )
+            query_to_new_embedding = dict(zip(missing_queries, new_embeddings))
+            embeddings = [
+                (embedding if embedding is not None else query_to_new_embedding[key[2]])
+                for key, embedding in zip(keys, embeddings)
+            ]
+
+        for key, embedding in zip(keys, embeddings):
+            _query_embedding_cache.set(key, cast(Embedding, embedding))
+        return cast(list[Embedding], embeddings)
+
+    keys = [(tenant_id, search_settings_id, query) for query in queries]
+    embeddings: list[Embedding | None] = [
+        _query_embedding_cache.get(key) for key in keys
+    ]
+    missing_keys = [
+        key for key, embedding in zip(keys, embeddings) if embedding is None
+    ]
+    if missing_keys:
+        computed = dict(
+            zip(
+                missing_keys,
+                _query_embedding_coalescer.get_or_compute_many(missing_keys, _encode),
+            )
+        )
+        embeddings = [
+            embedding if embedding is not None else computed[key]
+            for key, embedding in zip(keys, embeddings)
+        ]
+
+    return cast(list[Embedding], embeddings)
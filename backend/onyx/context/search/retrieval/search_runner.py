@@ -5,6 +5,7 @@ from uuid import UUID
 from sqlalchemy.orm import Session
 
 from onyx.agents.agent_search.shared_graph_utils.models import QueryExpansionType
+from onyx.context.search.chunk_content_cache import cached_id_based_retrieval
 from onyx.context.search.enums import SearchType
 from onyx.context.search.models import ChunkMetric
 from onyx.context.search.models import IndexFilters
@@ -251,7 +252,7 @@ def doc_index_retrieval(
     logger.info(f"Overall number of top initial retrieval chunks: {len(top_chunks)}")
 
     retrieval_requests: list[VespaChunkRequest] = []
-    normal_chunks: list[InferenceChunkUncleaned] = []
+    normal_chunks_uncleaned: list[InferenceChunkUncleaned] = []
     referenced_chunk_scores: dict[tuple[str, int], float] = {}
     for chunk in top_chunks:
         if chunk.large_chunk_reference_ids:
@@ -270,16 +271,24 @@ def doc_index_retrieval(
                     referenced_chunk_scores.get(key, 0), chunk.score or 0
                 )
         else:
-            normal_chunks.append(chunk)
+            normal_chunks_uncleaned.append(chunk)
+
+    normal_chunks = cleanup_chunks(normal_chunks_uncleaned)
 
     # If there are no large chunks, just return the normal chunks
     if not retrieval_requests:
-        return cleanup_chunks(normal_chunks)
+        return normal_chunks
 
-    # Retrieve and return the referenced normal chunks from the large chunks
-    retrieved_inference_chunks = document_index.id_based_retrieval(
+    # Retrieve and return the referenced normal chunks from the large chunks.
+    # The large chunks already passed the access filters of the search above and access
+    # is per document, so the chunks they reference don't need to be checked again
+    retrieved_inference_chunks = cached_id_based_retrieval(
+        document_index=document_index,
         chunk_requests=retrieval_requests,
-        filters=query.filters,
+        filters=IndexFilters(
+            access_control_list=None, tenant_id=query.filters.tenant_id
+        ),
+        db_session=db_session,
         batch_retrieval=True,
     )
 
@@ -298,7 +307,7 @@ def doc_index_retrieval(
     for reference in referenced_chunk_scores.keys():
         logger.error(f"Chunk {reference} not found in retrieved chunks")
 
-    unique_chunks: dict[tuple[str, int], InferenceChunkUncleaned] = {
+    unique_chunks: dict[tuple[str, int], InferenceChunk] = {
         (chunk.document_id, chunk.chunk_id): chunk for chunk in normal_chunks
     }
 
@@ -314,7 +323,7 @@ def doc_index_retrieval(
     # Deduplicate the chunks
     deduped_chunks = list(unique_chunks.values())
     deduped_chunks.sort(key=lambda chunk: chunk.score or 0, reverse=True)
-    return cleanup_chunks(deduped_chunks)
+    return deduped_chunks
 
 
 def _simplify_text(text: str) -> str:
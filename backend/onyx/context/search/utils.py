@@ -5,11 +5,13 @@ from typing import TypeVar
 from sqlalchemy.orm import Session
 
 from onyx.chat.models import SectionRelevancePiece
+from onyx.configs.chat_configs import QUERY_EMBEDDING_CACHE_ENABLED
 from onyx.context.search.models import InferenceChunk
 from onyx.context.search.models import InferenceSection
 from onyx.context.search.models import SavedSearchDoc
 from onyx.context.search.models import SavedSearchDocWithContent
 from onyx.context.search.models import SearchDoc
+from onyx.context.search.query_embedding_cache import get_cached_query_embeddings
 from onyx.db.models import SearchDoc as DBSearchDoc
 from onyx.db.search_settings import get_current_search_settings
 from onyx.natural_language_processing.search_nlp_models import EmbeddingModel
@@ -137,6 +139,9 @@ def remove_stop_words_and_punctuation(keywords: list[str]) -> list[str]:
 
 
 def get_query_embeddings(queries: list[str], db_session: Session) -> list[Embedding]:
+    if QUERY_EMBEDDING_CACHE_ENABLED:
+        return get_cached_query_embeddings(queries, db_session)
+
     search_settings = get_current_search_settings(db_session)
 
     model = EmbeddingModel.from_db_model(
@@ -309,6 +309,20 @@ def get_connector_credential_pair_from_id(
     return result.scalar_one_or_none()
 
 
+def get_connector_credential_pairs_from_ids(
+    db_session: Session,
+    cc_pair_ids: list[int],
+    eager_load_connector: bool = False,
+) -> list[ConnectorCredentialPair]:
+    stmt = select(ConnectorCredentialPair).where(
+        ConnectorCredentialPair.id.in_(cc_pair_ids)
+    )
+    if eager_load_connector:
+        stmt = stmt.options(joinedload(ConnectorCredentialPair.connector))
+
+    return list(db_session.scalars(stmt).unique().all())
+
+
 def get_connector_credential_pairs_for_source(
     db_session: Session,
     source: DocumentSource,
@@ -451,6 +465,23 @@ def set_cc_pair_repeated_error_state(
     db_session.commit()
 
 
+def set_cc_pairs_repeated_error_state(
+    db_session: Session,
+    cc_pair_ids: list[int],
+    in_repeated_error_state: bool,
+) -> None:
+    if not cc_pair_ids:
+        return
+
+    stmt = (
+        update(ConnectorCredentialPair)
+        .where(ConnectorCredentialPair.id.in_(cc_pair_ids))
+        .values(in_repeated_error_state=in_repeated_error_state)
+    )
+    db_session.execute(stmt)
+    db_session.commit()
+
+
 def delete_connector_credential_pair__no_commit(
     db_session: Session,
     connector_id: int,
@@ -2,6 +2,7 @@ import contextlib
 import time
 from collections.abc import Generator
 from collections.abc import Iterable
+from collections.abc import Iterator
 from collections.abc import Sequence
 from datetime import datetime
 from datetime import timedelta
@@ -162,6 +163,40 @@ def get_document_ids_for_connector_credential_pair(
     return list(db_session.execute(doc_ids_stmt).scalars().all())
 
 
+def count_documents_for_connector_credential_pair(
+    db_session: Session, connector_id: int, credential_id: int
+) -> int:
+    stmt = select(func.count()).where(
+        and_(
+            DocumentByConnectorCredentialPair.connector_id == connector_id,
+            DocumentByConnectorCredentialPair.credential_id == credential_id,
+        )
+    )
+    return db_session.execute(stmt).scalar_one()
+
+
+def stream_sorted_document_ids_for_connector_credential_pair(
+    db_session: Session,
+    connector_id: int,
+    credential_id: int,
+    batch_size: int = 10_000,
+) -> Iterator[str]:
+    """Streams the ids in batches with a server side cursor. The ids are ordered by
+    their bytes ("C" collation), which is the same order as python's str comparison."""
+    stmt = (
+        select(DocumentByConnectorCredentialPair.id)
+        .where(
+            and_(
+                DocumentByConnectorCredentialPair.connector_id == connector_id,
+                DocumentByConnectorCredentialPair.credential_id == credential_id,
+            )
+        )
+        .order_by(DocumentByConnectorCredentialPair.id.collate("C"))
+        .execution_options(yield_per=batch_size)
+    )
+    yield from db_session.scalars(stmt)
+
+
 def get_documents_for_connector_credential_pair_limited_columns(
     db_session: Session,
     connector_id: int,
@@ -581,6 +616,20 @@ def mark_document_as_synced(document_id: str, db_session: Session) -> None:
     db_session.commit()
 
 
+def mark_documents_as_synced(document_ids: list[str], db_session: Session) -> None:
+    """Bulk version of `mark_document_as_synced`, unknown document ids are ignored."""
+    if not document_ids:
+        return
+
+    stmt = (
+        update(DbDocument)
+        .where(DbDocument.id.in_(document_ids))
+        .values(last_synced=datetime.now(timezone.utc))
+    )
+    db_session.execute(stmt)
+    db_session.commit()
+
+
 def delete_document_by_connector_credential_pair__no_commit(
     db_session: Session,
     document_id: str,
@@ -937,6 +986,34 @@ def fetch_chunk_count_for_document(
     return db_session.execute(stmt).scalar_one_or_none()
 
 
+def fetch_synced_document_versions(
+    document_ids: list[str],
+    db_session: Session,
+) -> dict[str, tuple[datetime | None, datetime | None, int | None]]:
+    """
+    Return document_id -> (last_modified, last_synced, chunk_count) for the given
+    documents whose latest changes have been synced to the document index.
+    Documents that are unknown or still waiting on a sync are left out.
+    """
+    if not document_ids:
+        return {}
+
+    stmt = select(
+        DbDocument.id,
+        DbDocument.last_modified,
+        DbDocument.last_synced,
+        DbDocument.chunk_count,
+    ).where(
+        DbDocument.id.in_(document_ids),
+        DbDocument.last_synced.is_not(None),
+        DbDocument.last_modified <= DbDocument.last_synced,
+    )
+    return {
+        row.id: (row.last_modified, row.last_synced, row.chunk_count)
+        for row in db_session.execute(stmt)
+    }
+
+
 def get_unprocessed_kg_document_batch_for_connector(
     db_session: Session,
     connector_id: int,
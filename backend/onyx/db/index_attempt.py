@@ -95,6 +95,66 @@ def get_recent_attempts_for_cc_pair(
     )
 
 
+def get_recent_attempts_for_cc_pairs(
+    cc_pair_ids: list[int],
+    search_settings_id: int,
+    limit: int,
+    db_session: Session,
+) -> dict[int, list[IndexAttempt]]:
+    """Up to `limit` attempts per cc_pair, most recent to least recent, in a single
+    query. cc_pairs without attempts are not in the result."""
+    ranked_attempts = (
+        select(
+            IndexAttempt.id,
+            func.row_number()
+            .over(
+                partition_by=IndexAttempt.connector_credential_pair_id,
+                order_by=IndexAttempt.time_updated.desc(),
+            )
+            .label("rank"),
+        )
+        .where(
+            IndexAttempt.connector_credential_pair_id.in_(cc_pair_ids),
+            IndexAttempt.search_settings_id == search_settings_id,
+        )
+        .subquery()
+    )
+    attempts = db_session.scalars(
+        select(IndexAttempt)
+        .join(ranked_attempts, IndexAttempt.id == ranked_attempts.c.id)
+        .where(ranked_attempts.c.rank <= limit)
+        .order_by(ranked_attempts.c.rank)
+    ).all()
+
+    attempts_by_cc_pair: dict[int, list[IndexAttempt]] = {}
+    for attempt in attempts:
+        attempts_by_cc_pair.setdefault(
+            attempt.connector_credential_pair_id, []
+        ).append(attempt)
+    return attempts_by_cc_pair
+
+
+def get_cc_pair_ids_with_active_attempts(
+    cc_pair_ids: list[int],
+    search_settings_id: int,
+    db_session: Session,
+) -> set[int]:
+    """The cc_pairs with a NOT_STARTED or IN_PROGRESS attempt for the search settings."""
+    return set(
+        db_session.scalars(
+            select(IndexAttempt.connector_credential_pair_id)
+            .where(
+                IndexAttempt.connector_credential_pair_id.in_(cc_pair_ids),
+                IndexAttempt.search_settings_id == search_settings_id,
+                IndexAttempt.status.in_(
+                    [IndexingStatus.NOT_STARTED, IndexingStatus.IN_PROGRESS]
+                ),
+            )
+            .distinct()
+        ).all()
+    )
+
+
 def get_index_attempt(
     db_session: Session,
     index_attempt_id: int,
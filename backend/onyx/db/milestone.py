@@ -1,5 +1,6 @@
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy.orm.attributes import flag_modified
 
@@ -52,6 +53,38 @@ def create_milestone_if_not_exists(
         return milestone, False
 
 
+async def create_milestone_if_not_exists_async(
+    user: User | None, event_type: MilestoneRecordType, db_session: AsyncSession
+) -> tuple[Milestone, bool]:
+    """Same as `create_milestone_if_not_exists`, for async endpoints"""
+    milestone = (
+        await db_session.execute(
+            select(Milestone).where(Milestone.event_type == event_type)
+        )
+    ).scalar_one_or_none()
+
+    if milestone is not None:
+        return milestone, False
+
+    try:
+        milestone = Milestone(
+            event_type=event_type,
+            user_id=user.id if user else None,
+        )
+        db_session.add(milestone)
+        await db_session.commit()
+        return milestone, True
+    except IntegrityError:
+        # Another thread or process inserted it in the meantime
+        await db_session.rollback()
+        milestone = (
+            await db_session.execute(
+                select(Milestone).where(Milestone.event_type == event_type)
+            )
+        ).scalar_one()
+        return milestone, False
+
+
 def update_user_assistant_milestone(
     milestone: Milestone,
     user_id: str | None,
@@ -3438,6 +3438,11 @@ class UserFile(Base):
     document_id_migrated: Mapped[bool] = mapped_column(
         Boolean, nullable=False, default=True
     )
+    # sha256 of the uploaded file's bytes, used to reuse the processing results
+    # of identical uploads
+    content_hash: Mapped[str | None] = mapped_column(
+        String, nullable=True, index=True
+    )
 
     projects: Mapped[list["UserProject"]] = relationship(
         "UserProject",
@@ -1,6 +1,7 @@
 from typing import List
 
 from sqlalchemy import or_
+from sqlalchemy import tuple_
 from sqlalchemy.dialects import postgresql
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
@@ -219,6 +220,64 @@ def transfer_relationship(
     return new_relationship
 
 
+def transfer_relationships(
+    db_session: Session,
+    relationships: list[KGRelationshipExtractionStaging],
+    entity_translations: dict[str, str],
+) -> None:
+    """
+    Bulk version of `transfer_relationship`, transfers all relationships with a single
+    upsert. Relationships that translate to the same normalized relationship are
+    combined beforehand, as one upsert can't affect the same row twice.
+    """
+    if not relationships:
+        return
+
+    values_by_key: dict[tuple[str, str | None], dict] = {}
+    for relationship in relationships:
+        source_node = entity_translations[relationship.source_node]
+        target_node = entity_translations[relationship.target_node]
+        relationship_id_name = make_relationship_id(
+            source_node, relationship.type, target_node
+        )
+        key = (relationship_id_name, relationship.source_document)
+        if key in values_by_key:
+            values_by_key[key]["occurrences"] += relationship.occurrences
+            continue
+        values_by_key[key] = dict(
+            id_name=relationship_id_name,
+            source_node=source_node,
+            target_node=target_node,
+            source_node_type=relationship.source_node_type,
+            target_node_type=relationship.target_node_type,
+            type=relationship.type,
+            relationship_type_id_name=relationship.relationship_type_id_name,
+            source_document=relationship.source_document,
+            occurrences=relationship.occurrences,
+        )
+
+    stmt = pg_insert(KGRelationship).values(list(values_by_key.values()))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["id_name", "source_document"],
+        set_=dict(occurrences=KGRelationship.occurrences + stmt.excluded.occurrences),
+    )
+    db_session.execute(stmt)
+
+    # Update transferred
+    db_session.query(KGRelationshipExtractionStaging).filter(
+        tuple_(
+            KGRelationshipExtractionStaging.id_name,
+            KGRelationshipExtractionStaging.source_document,
+        ).in_(
+            [
+                (relationship.id_name, relationship.source_document)
+                for relationship in relationships
+            ]
+        )
+    ).update({"transferred": True}, synchronize_session=False)
+    db_session.flush()
+
+
 def upsert_staging_relationship_type(
     db_session: Session,
     source_entity_type: str,
@@ -5,6 +5,7 @@ from sqlalchemy import func
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from onyx.db.enums import UserFileStatus
 from onyx.db.models import UserFile
 
 
@@ -85,3 +86,27 @@ def get_file_id_by_user_file_id(user_file_id: str, db_session: Session) -> str |
     if user_file:
         return user_file.file_id
     return None
+
+
+def get_processed_user_file_by_content_hash(
+    content_hash: str,
+    name: str,
+    exclude_user_file_id: UUID,
+    db_session: Session,
+) -> UserFile | None:
+    """Return the oldest successfully processed user file with identical content
+    and name (the name is part of what gets embedded), if any."""
+    stmt = (
+        select(UserFile)
+        .where(
+            UserFile.content_hash == content_hash,
+            UserFile.name == name,
+            UserFile.id != exclude_user_file_id,
+            UserFile.status == UserFileStatus.COMPLETED,
+            UserFile.chunk_count > 0,
+            UserFile.document_id_migrated.is_(True),
+        )
+        .order_by(UserFile.created_at)
+        .limit(1)
+    )
+    return db_session.execute(stmt).scalars().first()
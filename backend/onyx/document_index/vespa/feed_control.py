@@ -0,0 +1,120 @@
+import math
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from onyx.utils.logger import setup_logger
+
+logger = setup_logger()
+
+
+class FeedThrottledError(Exception):
+    """Raised when Vespa pushes back on a feed operation (429 / 503)."""
+
+
+class AdaptiveConcurrencyLimiter:
+    """Caps the number of in-flight feed requests with an AIMD policy.
+
+    Every successful request nudges the limit up by `1 / limit` (so roughly +1 per
+    "round" of requests), a throttled request halves it. The requests in flight when
+    Vespa starts shedding load are all throttled together, so the limit is halved at
+    most once per `decrease_interval_seconds` rather than once per throttled request.
+    This lets the feed ramp up to whatever Vespa can absorb and back off as soon as it
+    starts to shed load, instead of hammering it with a fixed number of threads."""
+
+    def __init__(
+        self,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        decrease_interval_seconds: float = 1.0,
+    ):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.decrease_interval_seconds = decrease_interval_seconds
+        self._limit = float(min(max(initial_limit, self.min_limit), self.max_limit))
+        self._last_decrease_at: float | None = None
+        self._in_flight = 0
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @contextmanager
+    def acquire(self) -> Iterator[None]:
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                self._condition.wait()
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._in_flight -= 1
+                self._condition.notify_all()
+
+    def on_success(self) -> None:
+        with self._condition:
+            self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+            self._condition.notify_all()
+
+    def on_throttled(self) -> None:
+        with self._condition:
+            now = time.monotonic()
+            if (
+                self._last_decrease_at is not None
+                and now - self._last_decrease_at < self.decrease_interval_seconds
+            ):
+                # part of a burst that was already backed off from
+                return
+            self._last_decrease_at = now
+
+            new_limit = max(self.min_limit, self._limit / 2)
+            if int(new_limit) < int(self._limit):
+                logger.info(
+                    f"Vespa is throttling feed requests, lowering feed concurrency "
+                    f"from {int(self._limit)} to {int(new_limit)}"
+                )
+            self._limit = new_limit
+
+
+class FeedStats:
+    """Thread-safe collector of per-request feed latencies for a single feed call."""
+
+    def __init__(self) -> None:
+        self._latencies: list[float] = []
+        self._lock = threading.Lock()
+        self.throttled = 0
+        self.start_time = time.monotonic()
+
+    def record(self, latency: float) -> None:
+        with self._lock:
+            self._latencies.append(latency)
+
+    def record_throttled(self) -> None:
+        with self._lock:
+            self.throttled += 1
+
+    def percentile(self, pct: float) -> float:
+        with self._lock:
+            if not self._latencies:
+                return 0.0
+            latencies = sorted(self._latencies)
+        # nearest-rank percentile
+        ind = max(0, math.ceil(pct / 100 * len(latencies)) - 1)
+        return latencies[ind]
+
+    def summary(self) -> str:
+        elapsed = time.monotonic() - self.start_time
+        with self._lock:
+            num_docs = len(self._latencies)
+        rate = num_docs / elapsed if elapsed > 0 else 0.0
+        return (
+            f"fed {num_docs} chunks in {elapsed:.2f}s ({rate:.1f} chunks/s), "
+            f"latency p50={self.percentile(50) * 1000:.0f}ms "
+            f"p95={self.percentile(95) * 1000:.0f}ms "
+            f"p99={self.percentile(99) * 1000:.0f}ms, "
+            f"throttled={self.throttled}"
+        )
@@ -1,4 +1,5 @@
 import concurrent.futures
+import contextvars
 import io
 import logging
 import os
@@ -22,6 +23,7 @@ from pydantic import BaseModel
 from retry import retry
 
 from onyx.agents.agent_search.shared_graph_utils.models import QueryExpansionType
+from onyx.configs.app_configs import VESPA_FEED_MAX_CONCURRENCY
 from onyx.configs.chat_configs import DOC_TIME_DECAY
 from onyx.configs.chat_configs import NUM_RETURNED_HITS
 from onyx.configs.chat_configs import TITLE_CONTENT_RATIO
@@ -31,6 +33,7 @@ from onyx.context.search.models import IndexFilters
 from onyx.context.search.models import InferenceChunkUncleaned
 from onyx.db.enums import EmbeddingPrecision
 from onyx.document_index.document_index_utils import get_document_chunk_ids
+from onyx.document_index.document_index_utils import get_uuid_from_chunk
 from onyx.document_index.document_index_utils import get_uuid_from_chunk_info
 from onyx.document_index.interfaces import DocumentIndex
 from onyx.document_index.interfaces import DocumentInsertionRecord
@@ -452,8 +455,14 @@ class VespaIndex(DocumentIndex):
 
         # NOTE: using `httpx` here since `requests` doesn't support HTTP2. This is beneficial for
         # indexing / updates / deletes since we have to make a large volume of requests.
+        # Chunk range discovery and deletes aren't gated by the feed's adaptive
+        # concurrency limit, keep them at NUM_THREADS. Only the feed, which is gated by
+        # the limit, gets a pool wide enough for the limit's maximum
         with (
             concurrent.futures.ThreadPoolExecutor(max_workers=NUM_THREADS) as executor,
+            concurrent.futures.ThreadPoolExecutor(
+                max_workers=VESPA_FEED_MAX_CONCURRENCY
+            ) as feed_executor,
             self.httpx_client_context as http_client,
         ):
             # We require the start and end index for each document in order to
@@ -461,16 +470,22 @@ class VespaIndex(DocumentIndex):
             # documents that have `chunk_count` in the database, but not for
             # `old_version` documents.
 
-            enriched_doc_infos: list[EnrichedDocumentIndexingInfo] = [
-                VespaIndex.enrich_basic_chunk_info(
-                    index_name=self.index_name,
-                    http_client=http_client,
-                    document_id=doc_id,
-                    previous_chunk_count=doc_id_to_previous_chunk_cnt.get(doc_id, 0),
-                    new_chunk_count=doc_id_to_new_chunk_cnt.get(doc_id, 0),
+            # Only documents without a `chunk_count` need a round trip to Vespa here,
+            # run those lookups in parallel rather than one document at a time
+            enriched_doc_infos: list[EnrichedDocumentIndexingInfo] = list(
+                executor.map(
+                    lambda doc_id: VespaIndex.enrich_basic_chunk_info(
+                        index_name=self.index_name,
+                        http_client=http_client,
+                        document_id=doc_id,
+                        previous_chunk_count=doc_id_to_previous_chunk_cnt.get(
+                            doc_id, 0
+                        ),
+                        new_chunk_count=doc_id_to_new_chunk_cnt.get(doc_id, 0),
+                    ),
+                    doc_id_to_new_chunk_cnt.keys(),
                 )
-                for doc_id in doc_id_to_new_chunk_cnt.keys()
-            ]
+            )
 
             for cleaned_doc_info in enriched_doc_infos:
                 # If the document has previously indexed chunks, we know it previously existed
@@ -478,31 +493,52 @@ class VespaIndex(DocumentIndex):
                     existing_docs.add(cleaned_doc_info.doc_id)
 
             # Now, for each doc, we know exactly where to start and end our deletion
-            # So let's generate the chunk IDs for each chunk to delete
-            chunks_to_delete = get_document_chunk_ids(
-                enriched_document_info_list=enriched_doc_infos,
-                tenant_id=tenant_id,
-                large_chunks_enabled=large_chunks_enabled,
-            )
+            # So let's generate the chunk IDs for each chunk to delete.
+            # Chunks that are about to be re-fed are overwritten anyway, leaving them out
+            # makes the deletes and feeds disjoint so they can safely run concurrently
+            new_chunk_ids = {get_uuid_from_chunk(chunk) for chunk in cleaned_chunks}
+            chunks_to_delete = [
+                chunk_id
+                for chunk_id in get_document_chunk_ids(
+                    enriched_document_info_list=enriched_doc_infos,
+                    tenant_id=tenant_id,
+                    large_chunks_enabled=large_chunks_enabled,
+                )
+                if chunk_id not in new_chunk_ids
+            ]
 
-            # Delete old Vespa documents
-            for doc_chunk_ids_batch in batch_generator(chunks_to_delete, BATCH_SIZE):
-                delete_vespa_chunks(
-                    doc_chunk_ids=doc_chunk_ids_batch,
-                    index_name=self.index_name,
-                    http_client=http_client,
-                    executor=executor,
+            def _delete_old_chunks() -> None:
+                for doc_chunk_ids_batch in batch_generator(
+                    chunks_to_delete, BATCH_SIZE
+                ):
+                    delete_vespa_chunks(
+                        doc_chunk_ids=doc_chunk_ids_batch,
+                        index_name=self.index_name,
+                        http_client=http_client,
+                        executor=executor,
+                    )
+
+            # Delete old Vespa documents in the background while the new ones are fed.
+            # All chunks are handed to the feed at once, the number of in-flight feed
+            # requests is governed by its adaptive concurrency limit
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=1
+            ) as delete_executor:
+                delete_future = delete_executor.submit(
+                    contextvars.copy_context().run, _delete_old_chunks
                 )
 
-            for chunk_batch in batch_generator(cleaned_chunks, BATCH_SIZE):
                 batch_index_vespa_chunks(
-                    chunks=chunk_batch,
+                    chunks=cleaned_chunks,
                     index_name=self.index_name,
                     http_client=http_client,
                     multitenant=self.multitenant,
-                    executor=executor,
+                    executor=feed_executor,
                 )
 
+                # Will raise exception if any deletion raised an exception
+                delete_future.result()
+
         all_cleaned_doc_ids = {chunk.source_document.id for chunk in cleaned_chunks}
 
         return {
@@ -1,22 +1,31 @@
 import concurrent.futures
 import json
+import time
 import uuid
 from abc import ABC
 from abc import abstractmethod
 from collections.abc import Callable
 from datetime import datetime
 from datetime import timezone
+from functools import partial
 from http import HTTPStatus
+from typing import Any
 
 import httpx
 from retry import retry
 
+from onyx.configs.app_configs import LOG_VESPA_TIMING_INFORMATION
+from onyx.configs.app_configs import VESPA_FEED_MAX_CONCURRENCY
+from onyx.configs.app_configs import VESPA_FEED_MIN_CONCURRENCY
 from onyx.connectors.cross_connector_utils.miscellaneous_utils import (
     get_experts_stores_representations,
 )
 from onyx.document_index.document_index_utils import get_uuid_from_chunk
 from onyx.document_index.document_index_utils import get_uuid_from_chunk_info_old
 from onyx.document_index.interfaces import MinimalDocumentIndexingInfo
+from onyx.document_index.vespa.feed_control import AdaptiveConcurrencyLimiter
+from onyx.document_index.vespa.feed_control import FeedStats
+from onyx.document_index.vespa.feed_control import FeedThrottledError
 from onyx.document_index.vespa.shared_utils.utils import remove_invalid_unicode_chars
 from onyx.document_index.vespa.shared_utils.utils import (
     replace_invalid_doc_id_characters,
@@ -58,6 +67,19 @@ from onyx.utils.logger import setup_logger
 
 logger = setup_logger()
 
+_FEED_THROTTLED_STATUS_CODES = {
+    HTTPStatus.TOO_MANY_REQUESTS,
+    HTTPStatus.SERVICE_UNAVAILABLE,
+}
+
+# shared by every feed in the process, so the learned concurrency carries over
+# from one batch to the next
+_feed_concurrency_limiter = AdaptiveConcurrencyLimiter(
+    initial_limit=NUM_THREADS,
+    min_limit=VESPA_FEED_MIN_CONCURRENCY,
+    max_limit=VESPA_FEED_MAX_CONCURRENCY,
+)
+
 
 @retry(tries=3, delay=1, backoff=2)
 def _does_doc_chunk_exist(
@@ -125,22 +147,14 @@ def get_existing_documents_from_chunks(
     return document_ids
 
 
-@retry(tries=5, delay=1, backoff=2)
-def _index_vespa_chunk(
-    chunk: DocMetadataAwareIndexChunk,
-    index_name: str,
-    http_client: httpx.Client,
-    multitenant: bool,
-) -> None:
-    json_header = {
-        "Content-Type": "application/json",
-    }
+def _build_vespa_chunk_body(
+    chunk: DocMetadataAwareIndexChunk, multitenant: bool
+) -> bytes:
+    """Serializes a chunk into the JSON body of a Vespa document put."""
     document = chunk.source_document
 
     # No minichunk documents in vespa, minichunk vectors are stored in the chunk itself
 
-    vespa_chunk_id = str(get_uuid_from_chunk(chunk))
-
     embeddings = chunk.embeddings
 
     embeddings_name_vector_map = {"full_chunk": embeddings.full_embedding}
@@ -215,16 +229,46 @@ def _index_vespa_chunk(
     if multitenant:
         if chunk.tenant_id:
             vespa_document_fields[TENANT_ID] = chunk.tenant_id
+
+    # compact separators, the embeddings make up most of the body
+    return json.dumps({"fields": vespa_document_fields}, separators=(",", ":")).encode(
+        "utf-8"
+    )
+
+
+@retry(tries=5, delay=1, backoff=2)
+def _feed_vespa_chunk(
+    vespa_chunk_id: uuid.UUID,
+    document_id: str,
+    body: bytes,
+    index_name: str,
+    http_client: httpx.Client,
+    feed_stats: FeedStats,
+) -> None:
     vespa_url = f"{DOCUMENT_ID_ENDPOINT.format(index_name=index_name)}/{vespa_chunk_id}"
     logger.debug(f'Indexing to URL "{vespa_url}"')
-    res = http_client.post(
-        vespa_url, headers=json_header, json={"fields": vespa_document_fields}
-    )
+
+    with _feed_concurrency_limiter.acquire():
+        start_time = time.monotonic()
+        res = http_client.post(
+            vespa_url, headers={"Content-Type": "application/json"}, content=body
+        )
+        latency = time.monotonic() - start_time
+
+    if res.status_code in _FEED_THROTTLED_STATUS_CODES:
+        _feed_concurrency_limiter.on_throttled()
+        feed_stats.record_throttled()
+        # retried with backoff by the decorator
+        raise FeedThrottledError(
+            f"Vespa throttled indexing of document '{document_id}' "
+            f"with status {res.status_code}"
+        )
+
     try:
         res.raise_for_status()
     except Exception as e:
         logger.exception(
-            f"Failed to index document: '{document.id}'. Got response: '{res.text}'"
+            f"Failed to index document: '{document_id}'. Got response: '{res.text}'"
         )
         if isinstance(e, httpx.HTTPStatusError):
             if e.response.status_code == HTTPStatus.INSUFFICIENT_STORAGE:
@@ -236,13 +280,45 @@ def _index_vespa_chunk(
 
         raise e
 
+    _feed_concurrency_limiter.on_success()
+    feed_stats.record(latency)
 
-def batch_index_vespa_chunks(
-    chunks: list[DocMetadataAwareIndexChunk],
+
+def _index_vespa_chunk(
+    chunk: DocMetadataAwareIndexChunk,
     index_name: str,
     http_client: httpx.Client,
     multitenant: bool,
-    executor: concurrent.futures.ThreadPoolExecutor | None = None,
+    feed_stats: FeedStats,
+) -> None:
+    # serialized on the worker thread so the caller only has to schedule the chunks
+    body = _build_vespa_chunk_body(chunk, multitenant)
+    _feed_vespa_chunk(
+        get_uuid_from_chunk(chunk),
+        chunk.source_document.id,
+        body,
+        index_name,
+        http_client,
+        feed_stats,
+    )
+
+
+def _feed_vespa_chunk_fields(
+    vespa_chunk_id: uuid.UUID,
+    fields: dict[str, Any],
+    index_name: str,
+    http_client: httpx.Client,
+    feed_stats: FeedStats,
+) -> None:
+    body = json.dumps({"fields": fields}, separators=(",", ":")).encode("utf-8")
+    _feed_vespa_chunk(
+        vespa_chunk_id, fields[DOCUMENT_ID], body, index_name, http_client, feed_stats
+    )
+
+
+def _run_feed(
+    feed_functions: list[Callable[[FeedStats], None]],
+    executor: concurrent.futures.ThreadPoolExecutor | None,
 ) -> None:
     external_executor = True
 
@@ -250,14 +326,13 @@ def batch_index_vespa_chunks(
         external_executor = False
         executor = concurrent.futures.ThreadPoolExecutor(max_workers=NUM_THREADS)
 
+    feed_stats = FeedStats()
     try:
-        chunk_index_future = {
-            executor.submit(
-                _index_vespa_chunk, chunk, index_name, http_client, multitenant
-            ): chunk
-            for chunk in chunks
-        }
-        for future in concurrent.futures.as_completed(chunk_index_future):
+        feed_futures = [
+            executor.submit(feed_function, feed_stats)
+            for feed_function in feed_functions
+        ]
+        for future in concurrent.futures.as_completed(feed_futures):
             # Will raise exception if any indexing raised an exception
             future.result()
 
@@ -265,6 +340,55 @@ def batch_index_vespa_chunks(
         if not external_executor:
             executor.shutdown(wait=True)
 
+    summary = (
+        f"Vespa feed: {feed_stats.summary()}, "
+        f"concurrency limit={_feed_concurrency_limiter.limit}"
+    )
+    if LOG_VESPA_TIMING_INFORMATION:
+        logger.info(summary)
+    else:
+        logger.debug(summary)
+
+
+def batch_index_vespa_chunks(
+    chunks: list[DocMetadataAwareIndexChunk],
+    index_name: str,
+    http_client: httpx.Client,
+    multitenant: bool,
+    executor: concurrent.futures.ThreadPoolExecutor | None = None,
+) -> None:
+    _run_feed(
+        [
+            partial(_index_vespa_chunk, chunk, index_name, http_client, multitenant)
+            for chunk in chunks
+        ],
+        executor,
+    )
+
+
+def batch_feed_vespa_chunk_fields(
+    chunk_fields: dict[uuid.UUID, dict[str, Any]],
+    index_name: str,
+    http_client: httpx.Client,
+    executor: concurrent.futures.ThreadPoolExecutor | None = None,
+) -> None:
+    """Feeds chunks whose Vespa fields are already built (e.g. copied from another
+    document), with the same concurrency control and retries as
+    `batch_index_vespa_chunks`."""
+    _run_feed(
+        [
+            partial(
+                _feed_vespa_chunk_fields,
+                vespa_chunk_id,
+                fields,
+                index_name,
+                http_client,
+            )
+            for vespa_chunk_id, fields in chunk_fields.items()
+        ],
+        executor,
+    )
+
 
 def clean_chunk_id_copy(
     chunk: DocMetadataAwareIndexChunk,
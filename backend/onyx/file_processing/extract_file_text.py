@@ -266,9 +266,11 @@ def read_pdf_file(
     pdf_pass: str | None = None,
     extract_images: bool = False,
     image_callback: Callable[[bytes, str], None] | None = None,
+    page_range: tuple[int, int] | None = None,
 ) -> tuple[str, dict[str, Any], Sequence[tuple[bytes, str]]]:
     """
     Returns the text, basic PDF metadata, and optionally extracted images.
+    If `page_range` (start inclusive, end exclusive) is given, only those pages are read.
     """
     from pypdf import PdfReader
     from pypdf.errors import PdfStreamError
@@ -302,12 +304,15 @@ def read_pdf_file(
                 ):
                     metadata[clean_key] = ", ".join(value)
 
+        start, end = page_range or (0, len(pdf_reader.pages))
+        page_nums = range(start, min(end, len(pdf_reader.pages)))
         text = TEXT_SECTION_SEPARATOR.join(
-            page.extract_text() for page in pdf_reader.pages
+            pdf_reader.pages[page_num].extract_text() for page_num in page_nums
         )
 
         if extract_images:
-            for page_num, page in enumerate(pdf_reader.pages):
+            for page_num in page_nums:
+                page = pdf_reader.pages[page_num]
                 for image_file_object in page.images:
                     image = Image.open(io.BytesIO(image_file_object.data))
                     img_byte_arr = io.BytesIO()
@@ -665,9 +670,31 @@ def _extract_text_and_images(
     if content_type == TEXT_MIME_TYPE:
         return extract_result_from_text_file(file)
 
+    return parse_file(
+        file,
+        file_name,
+        get_file_ext(file_name),
+        pdf_pass=pdf_pass,
+        image_callback=image_callback,
+        extract_pdf_images=get_image_extraction_and_analysis_enabled(),
+    )
+
+
+def parse_file(
+    file: IO[Any],
+    file_name: str,
+    extension: str,
+    pdf_pass: str | None = None,
+    image_callback: Callable[[bytes, str], None] | None = None,
+    extract_pdf_images: bool = False,
+) -> ExtractionResult:
+    """
+    Parses the file with the local parser for its extension. Unlike
+    `extract_text_and_images`, doesn't look up any settings, so it can run in a
+    process without database access.
+    """
     # Default processing
     try:
-        extension = get_file_ext(file_name)
         # docx example for embedded images
         if extension == ".docx":
             text_content, images = docx_to_text_and_images(
@@ -683,7 +710,7 @@ def _extract_text_and_images(
             text_content, pdf_metadata, images = read_pdf_file(
                 file,
                 pdf_pass,
-                extract_images=get_image_extraction_and_analysis_enabled(),
+                extract_images=extract_pdf_images,
                 image_callback=image_callback,
             )
             return ExtractionResult(
@@ -0,0 +1,341 @@
+"""
+Text extraction for the connectors, isolated from the calling process.
+
+PDF and Office files are parsed in a bounded pool of worker processes with a hard time
+limit and an address space limit per file, so that a single pathological file can't pin
+the (docfetching) process that is running the connector. Large PDFs are split into page
+ranges that are parsed in parallel. Results are cached in Redis by content hash, so
+re-syncs of unchanged files and re-uploads of identical files are not parsed again.
+
+The pool is built on billiard (celery's fork of multiprocessing) rather than
+multiprocessing, because the indexing jobs run in daemonic processes, which
+multiprocessing doesn't allow to have children.
+"""
+
+import atexit
+import gzip
+import hashlib
+import io
+import json
+import tempfile
+import threading
+from collections.abc import Callable
+from typing import Any
+from typing import cast
+from typing import IO
+
+from onyx.configs.app_configs import FILE_EXTRACTION_CACHE_TTL_SECONDS
+from onyx.configs.app_configs import FILE_EXTRACTION_MAX_MEMORY_MB
+from onyx.configs.app_configs import FILE_EXTRACTION_NUM_PROCESSES
+from onyx.configs.app_configs import FILE_EXTRACTION_PDF_PAGES_PER_TASK
+from onyx.configs.app_configs import FILE_EXTRACTION_PDF_SPLIT_MIN_BYTES
+from onyx.configs.app_configs import FILE_EXTRACTION_TIMEOUT_SECONDS
+from onyx.configs.llm_configs import get_image_extraction_and_analysis_enabled
+from onyx.file_processing.extract_file_text import (
+    extract_text_and_images as extract_text_and_images_inline,
+)
+from onyx.file_processing.extract_file_text import ExtractionResult
+from onyx.file_processing.extract_file_text import get_file_ext
+from onyx.file_processing.extract_file_text import parse_file
+from onyx.file_processing.extract_file_text import read_pdf_file
+from onyx.file_processing.extract_file_text import TEXT_SECTION_SEPARATOR
+from onyx.file_processing.file_validation import TEXT_MIME_TYPE
+from onyx.file_processing.unstructured import get_unstructured_api_key
+from onyx.redis.redis_pool import get_redis_client
+from onyx.utils.file_types import PDF_MIME_TYPE
+from onyx.utils.file_types import PRESENTATION_MIME_TYPE
+from onyx.utils.file_types import SPREADSHEET_MIME_TYPE
+from onyx.utils.file_types import WORD_PROCESSING_MIME_TYPE
+from onyx.utils.logger import setup_logger
+
+logger = setup_logger()
+
+# Files that are expensive (and risky) to parse, everything else is parsed inline
+_ISOLATED_EXTENSIONS = {".pdf", ".docx", ".pptx", ".xlsx", ".epub"}
+
+_CONTENT_TYPE_TO_EXTENSION = {
+    PDF_MIME_TYPE: ".pdf",
+    WORD_PROCESSING_MIME_TYPE: ".docx",
+    PRESENTATION_MIME_TYPE: ".pptx",
+    SPREADSHEET_MIME_TYPE: ".xlsx",
+}
+
+_EXTRACTION_CACHE_KEY_PREFIX = "file_extraction"
+# bump when the parsers change in a way that changes their output
+_EXTRACTION_CACHE_VERSION = 1
+# compressed, larger results are not cached
+_MAX_CACHED_RESULT_BYTES = 8 * 1024 * 1024
+
+_pool: Any = None
+_pool_lock = threading.Lock()
+
+
+def _init_worker(max_memory_mb: int) -> None:
+    if max_memory_mb > 0:
+        import resource
+
+        max_memory_bytes = max_memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (max_memory_bytes, max_memory_bytes))
+
+
+def _parse_file_in_worker(
+    data: bytes,
+    file_name: str,
+    extension: str,
+    pdf_pass: str | None,
+    extract_pdf_images: bool,
+) -> ExtractionResult:
+    return parse_file(
+        io.BytesIO(data),
+        file_name,
+        extension,
+        pdf_pass=pdf_pass,
+        extract_pdf_images=extract_pdf_images,
+    )
+
+
+def _count_pdf_pages_in_worker(path: str, pdf_pass: str | None) -> int:
+    from pypdf import PdfReader
+
+    pdf_reader = PdfReader(path)
+    if pdf_reader.is_encrypted:
+        if pdf_pass is None or pdf_reader.decrypt(pdf_pass) == 0:
+            return 0
+    return len(pdf_reader.pages)
+
+
+def _parse_pdf_pages_in_worker(
+    path: str, pdf_pass: str | None, start: int, end: int, extract_images: bool
+) -> ExtractionResult:
+    with open(path, "rb") as f:
+        text_content, metadata, images = read_pdf_file(
+            f, pdf_pass, extract_images=extract_images, page_range=(start, end)
+        )
+    return ExtractionResult(
+        text_content=text_content, embedded_images=images, metadata=metadata
+    )
+
+
+def _get_pool() -> Any:
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            from billiard import get_context  # type: ignore
+
+            _pool = get_context("spawn").Pool(
+                processes=FILE_EXTRACTION_NUM_PROCESSES,
+                initializer=_init_worker,
+                initargs=(FILE_EXTRACTION_MAX_MEMORY_MB,),
+                # guards against parsers leaking memory
+                maxtasksperchild=100,
+                # workers exceeding the time limit are killed and replaced
+                timeout=FILE_EXTRACTION_TIMEOUT_SECONDS,
+            )
+            atexit.register(_pool.terminate)
+        return _pool
+
+
+def _run_in_pool(func: Callable[..., Any], *args: Any) -> Any:
+    """Runs the function in a worker process, raises if it fails or times out."""
+    async_result = _get_pool().apply_async(func, args)
+    # the pool kills the worker at the time limit, this only guards against the
+    # result getting lost
+    return async_result.get(timeout=FILE_EXTRACTION_TIMEOUT_SECONDS + 60)
+
+
+def _pdf_page_ranges(num_pages: int, pages_per_task: int) -> list[tuple[int, int]]:
+    pages_per_task = max(1, pages_per_task)
+    return [
+        (start, min(start + pages_per_task, num_pages))
+        for start in range(0, num_pages, pages_per_task)
+    ]
+
+
+def _parse_large_pdf(
+    data: bytes, pdf_pass: str | None, extract_images: bool
+) -> ExtractionResult | None:
+    """Parses the page ranges of the PDF in parallel, returns None if the PDF can't be
+    split."""
+    with tempfile.NamedTemporaryFile(suffix=".pdf") as tmp_file:
+        tmp_file.write(data)
+        tmp_file.flush()
+
+        num_pages = _run_in_pool(_count_pdf_pages_in_worker, tmp_file.name, pdf_pass)
+        page_ranges = _pdf_page_ranges(num_pages, FILE_EXTRACTION_PDF_PAGES_PER_TASK)
+        if len(page_ranges) <= 1:
+            return None
+
+        pool = _get_pool()
+        async_results = [
+            pool.apply_async(
+                _parse_pdf_pages_in_worker,
+                (tmp_file.name, pdf_pass, start, end, extract_images),
+            )
+            for start, end in page_ranges
+        ]
+        results: list[ExtractionResult] = [
+            async_result.get(timeout=FILE_EXTRACTION_TIMEOUT_SECONDS + 60)
+            for async_result in async_results
+        ]
+
+    return ExtractionResult(
+        text_content=TEXT_SECTION_SEPARATOR.join(
+            result.text_content for result in results
+        ),
+        embedded_images=[
+            image for result in results for image in result.embedded_images
+        ],
+        metadata=results[0].metadata,
+    )
+
+
+def _parse_isolated(
+    data: bytes,
+    file_name: str,
+    extension: str,
+    pdf_pass: str | None,
+    extract_pdf_images: bool,
+) -> ExtractionResult:
+    if extension == ".pdf" and len(data) >= FILE_EXTRACTION_PDF_SPLIT_MIN_BYTES:
+        result = _parse_large_pdf(data, pdf_pass, extract_pdf_images)
+        if result is not None:
+            return result
+
+    return cast(
+        ExtractionResult,
+        _run_in_pool(
+            _parse_file_in_worker,
+            data,
+            file_name,
+            extension,
+            pdf_pass,
+            extract_pdf_images,
+        ),
+    )
+
+
+def _cache_key(
+    data: bytes, extension: str, pdf_pass: str | None, extract_pdf_images: bool
+) -> str:
+    params = json.dumps(
+        [
+            _EXTRACTION_CACHE_VERSION,
+            extension,
+            hashlib.sha256(pdf_pass.encode()).hexdigest() if pdf_pass else None,
+            extract_pdf_images,
+        ]
+    )
+    content_hash = hashlib.sha256(data).hexdigest()
+    params_hash = hashlib.sha256(params.encode()).hexdigest()[:16]
+    # tenant prefix is added by the redis client
+    return f"{_EXTRACTION_CACHE_KEY_PREFIX}:{content_hash}:{params_hash}"
+
+
+def _get_cached_result(key: str) -> ExtractionResult | None:
+    try:
+        raw_value = get_redis_client().get(key)
+    except Exception:
+        logger.warning("Failed to read cached extraction result", exc_info=True)
+        return None
+    if not raw_value:
+        return None
+
+    cached = json.loads(gzip.decompress(cast(bytes, raw_value)))
+    return ExtractionResult(
+        text_content=cached["text_content"],
+        embedded_images=[],
+        metadata=cached["metadata"],
+    )
+
+
+def _cache_result(key: str, result: ExtractionResult) -> None:
+    if result.embedded_images:
+        # images are too large to cache, these files are parsed every time
+        return
+
+    value = gzip.compress(
+        json.dumps(
+            {"text_content": result.text_content, "metadata": result.metadata}
+        ).encode()
+    )
+    if len(value) > _MAX_CACHED_RESULT_BYTES:
+        return
+    try:
+        get_redis_client().set(key, value, ex=FILE_EXTRACTION_CACHE_TTL_SECONDS)
+    except Exception:
+        logger.warning("Failed to cache extraction result", exc_info=True)
+
+
+def extract_text_and_images(
+    file: IO[Any],
+    file_name: str,
+    pdf_pass: str | None = None,
+    content_type: str | None = None,
+    image_callback: Callable[[bytes, str], None] | None = None,
+) -> ExtractionResult:
+    """
+    Drop-in replacement of `extract_file_text.extract_text_and_images` for the
+    connectors. PDF and Office files are parsed in the extraction worker pool and
+    cached by content, everything else is handled by the inline implementation.
+
+    Files exceeding the time or memory limit are logged and result in empty text, the
+    same way files the parsers fail on do.
+    """
+    extension = get_file_ext(file_name)
+    if extension not in _ISOLATED_EXTENSIONS and content_type:
+        # e.g. Google Drive file names don't need to have an extension
+        extension = _CONTENT_TYPE_TO_EXTENSION.get(content_type, extension)
+
+    if (
+        extension not in _ISOLATED_EXTENSIONS
+        or content_type == TEXT_MIME_TYPE
+        or get_unstructured_api_key()
+    ):
+        return extract_text_and_images_inline(
+            file, file_name, pdf_pass, content_type, image_callback
+        )
+
+    file.seek(0)
+    data = file.read()
+    extract_pdf_images = (
+        extension == ".pdf" and get_image_extraction_and_analysis_enabled()
+    )
+
+    cache_key = None
+    if FILE_EXTRACTION_CACHE_TTL_SECONDS > 0:
+        cache_key = _cache_key(data, extension, pdf_pass, extract_pdf_images)
+        cached_result = _get_cached_result(cache_key)
+        if cached_result is not None:
+            logger.debug(f"Using cached extraction result for {file_name}")
+            return cached_result
+
+    if FILE_EXTRACTION_NUM_PROCESSES > 0:
+        try:
+            result = _parse_isolated(
+                data, file_name, extension, pdf_pass, extract_pdf_images
+            )
+        except Exception as e:
+            # includes files exceeding the time limit
+            logger.warning(f"Failed to extract text/images from {file_name}: {e!r}")
+            return ExtractionResult(text_content="", embedded_images=[], metadata={})
+    else:
+        # images are collected so that cacheability can be determined below
+        result = parse_file(
+            io.BytesIO(data),
+            file_name,
+            extension,
+            pdf_pass=pdf_pass,
+            extract_pdf_images=extract_pdf_images,
+        )
+
+    # failed parses are retried on the next sync
+    if cache_key is not None and result.text_content:
+        _cache_result(cache_key, result)
+
+    if image_callback is not None and result.embedded_images:
+        for image_bytes, image_name in result.embedded_images:
+            image_callback(image_bytes, image_name)
+        result = result._replace(embedded_images=[])
+
+    return result
@@ -1,8 +1,11 @@
+import gzip
 import json
+import tempfile
 from abc import ABC
 from abc import abstractmethod
 from enum import Enum
-from io import StringIO
+from typing import cast
+from typing import IO
 from typing import List
 from typing import Optional
 from typing import TypeAlias
@@ -25,6 +28,16 @@ class DocumentBatchStorageStateType(str, Enum):
     INDEXING = "indexing"
 
 
+# Batches are stored as gzipped JSON lines, see `DocumentBatchStorage._serialize_documents`.
+# Bump the version when changing the format and keep reading the previous one.
+BATCH_FORMAT_VERSION = 1
+BATCH_FILE_TYPE = "application/x-onyx-document-batch+gzip"
+# batches written before the compact format, a single indented JSON array
+LEGACY_BATCH_FILE_TYPE = "application/json"
+# batches up to this size are serialized in memory, larger ones spill to disk
+_SPOOL_MAX_SIZE = 16 * 1024 * 1024
+
+
 DocumentStorageState: TypeAlias = DocExtractionContext | DocIndexingContext
 
 STATE_TYPE_TO_MODEL: dict[str, type[DocumentStorageState]] = {
@@ -83,13 +96,33 @@ class DocumentBatchStorage(ABC):
     def extract_path_info(self, path: str) -> BatchStoragePathInfo | None:
         """Extract path info from a path."""
 
-    def _serialize_documents(self, documents: list[Document]) -> str:
-        """Serialize documents to JSON string."""
-        # Use mode='json' to properly serialize datetime and other complex types
-        return json.dumps([doc.model_dump(mode="json") for doc in documents], indent=2)
+    def _serialize_documents(self, documents: list[Document]) -> IO[bytes]:
+        """Serialize documents into the compact batch format.
+
+        The format is gzipped JSON lines: a header line with the format version followed by
+        one compact JSON document per line. Documents are written one at a time into a
+        spooled temp file, so the batch is never held in memory as a single string."""
+        buffer = tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX_SIZE)
+        with gzip.GzipFile(fileobj=buffer, mode="wb", compresslevel=6) as gz:
+            gz.write(json.dumps({"version": BATCH_FORMAT_VERSION}).encode() + b"\n")
+            for doc in documents:
+                gz.write(doc.model_dump_json().encode() + b"\n")
+        buffer.seek(0)
+        return cast(IO[bytes], buffer)
+
+    def _deserialize_documents(self, content: IO[bytes]) -> list[Document]:
+        """Deserialize documents from the compact batch format, one line at a time."""
+        with gzip.GzipFile(fileobj=content, mode="rb") as gz:
+            header = json.loads(gz.readline())
+            version = header.get("version")
+            if version != BATCH_FORMAT_VERSION:
+                raise ValueError(
+                    f"Unsupported document batch format version: {version}"
+                )
+            return [Document.model_validate_json(line) for line in gz if line.strip()]
 
-    def _deserialize_documents(self, data: str) -> list[Document]:
-        """Deserialize documents from JSON string."""
+    def _deserialize_legacy_documents(self, data: str) -> list[Document]:
+        """Deserialize documents from the legacy JSON array format."""
         doc_dicts = json.loads(data)
         return [Document.model_validate(doc_dict) for doc_dict in doc_dicts]
 
@@ -107,26 +140,26 @@ class FileStoreDocumentBatchStorage(DocumentBatchStorage):
 
     def _get_batch_file_name(self, batch_num: int) -> str:
         """Generate file name for a document batch."""
+        # NOTE: the name is kept regardless of the batch format (which is tracked by the
+        # file type) so batches written before the compact format can still be found
         return f"{self.base_path}/{batch_num}.json"
 
     def store_batch(self, batch_num: int, documents: list[Document]) -> None:
         """Store a batch of documents using FileStore."""
         file_name = self._get_batch_file_name(batch_num)
         try:
-            data = self._serialize_documents(documents)
-            content = StringIO(data)
-
-            self.file_store.save_file(
-                file_id=file_name,
-                content=content,
-                display_name=f"Document Batch {batch_num}",
-                file_origin=FileOrigin.OTHER,
-                file_type="application/json",
-                file_metadata={
-                    "batch_num": batch_num,
-                    "document_count": str(len(documents)),
-                },
-            )
+            with self._serialize_documents(documents) as content:
+                self.file_store.save_file(
+                    file_id=file_name,
+                    content=content,
+                    display_name=f"Document Batch {batch_num}",
+                    file_origin=FileOrigin.OTHER,
+                    file_type=BATCH_FILE_TYPE,
+                    file_metadata={
+                        "batch_num": batch_num,
+                        "document_count": str(len(documents)),
+                    },
+                )
 
             logger.debug(
                 f"Stored batch {batch_num} with {len(documents)} documents to FileStore as {file_name}"
@@ -139,21 +172,28 @@ class FileStoreDocumentBatchStorage(DocumentBatchStorage):
         """Retrieve a batch of documents from FileStore."""
         file_name = self._get_batch_file_name(batch_num)
         try:
-            # Check if file exists
-            if not self.file_store.has_file(
+            # Check if file exists, in either the compact or the legacy JSON format
+            if self.file_store.has_file(
+                file_id=file_name,
+                file_origin=FileOrigin.OTHER,
+                file_type=BATCH_FILE_TYPE,
+            ):
+                with self.file_store.read_file(file_name, mode="b") as content_io:
+                    documents = self._deserialize_documents(content_io)
+            elif self.file_store.has_file(
                 file_id=file_name,
                 file_origin=FileOrigin.OTHER,
-                file_type="application/json",
+                file_type=LEGACY_BATCH_FILE_TYPE,
             ):
+                content_io = self.file_store.read_file(file_name)
+                data = content_io.read().decode("utf-8")
+                documents = self._deserialize_legacy_documents(data)
+            else:
                 logger.warning(
                     f"Batch {batch_num} not found in FileStore with name {file_name}"
                 )
                 return None
 
-            content_io = self.file_store.read_file(file_name)
-            data = content_io.read().decode("utf-8")
-
-            documents = self._deserialize_documents(data)
             logger.debug(
                 f"Retrieved batch {batch_num} with {len(documents)} documents from FileStore"
             )
@@ -7,6 +7,9 @@ from uuid import UUID
 import requests
 from sqlalchemy.orm import Session
 
+from onyx.configs.chat_configs import USER_FILE_PLAINTEXT_CACHE_MAX_FILE_BYTES
+from onyx.configs.chat_configs import USER_FILE_PLAINTEXT_CACHE_MAX_SIZE
+from onyx.configs.chat_configs import USER_FILE_PLAINTEXT_CACHE_TTL_SECONDS
 from onyx.configs.constants import FileOrigin
 from onyx.db.models import ChatMessage
 from onyx.db.models import UserFile
@@ -16,11 +19,19 @@ from onyx.file_store.models import FileDescriptor
 from onyx.file_store.models import InMemoryChatFile
 from onyx.server.query_and_chat.chat_utils import mime_type_to_chat_file_type
 from onyx.utils.b64 import get_image_type
+from onyx.utils.cache import TTLCache
 from onyx.utils.logger import setup_logger
 from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
+from shared_configs.contextvars import get_current_tenant_id
 
 logger = setup_logger()
 
+# (tenant_id, user file id, user file version) -> plaintext bytes
+_user_file_plaintext_cache: TTLCache[tuple[str, UUID, tuple], bytes] = TTLCache(
+    max_size=USER_FILE_PLAINTEXT_CACHE_MAX_SIZE,
+    ttl_seconds=USER_FILE_PLAINTEXT_CACHE_TTL_SECONDS,
+)
+
 
 def user_file_id_to_plaintext_file_name(user_file_id: UUID) -> str:
     """Generate a consistent file name for storing plaintext content of a user file."""
@@ -92,49 +103,56 @@ def load_all_chat_files(
     return files
 
 
-def load_user_file(file_id: UUID, db_session: Session) -> InMemoryChatFile:
+def _user_file_version(user_file: UserFile) -> tuple:
+    """Changes whenever the plaintext of the user file may have been (re)written,
+    `last_project_sync_at` is bumped every time the file finishes processing."""
+    return (
+        user_file.file_id,
+        user_file.last_project_sync_at,
+        user_file.token_count,
+    )
+
+
+def _load_user_file_content(user_file: UserFile) -> InMemoryChatFile:
     chat_file_type = ChatFileType.USER_KNOWLEDGE
     status = "not_loaded"
 
-    user_file = db_session.query(UserFile).filter(UserFile.id == file_id).first()
-    if not user_file:
-        raise ValueError(f"User file with id {file_id} not found")
-
-    # Get the file record to determine the appropriate chat file type
     file_store = get_default_file_store()
-    file_record = file_store.read_file_record(user_file.file_id)
-
-    # Determine appropriate chat file type based on the original file's MIME type
-    chat_file_type = mime_type_to_chat_file_type(file_record.file_type)
-
-    # Try to load plaintext version first
-    plaintext_file_name = user_file_id_to_plaintext_file_name(file_id)
+    cache_key = (
+        get_current_tenant_id(),
+        user_file.id,
+        _user_file_version(user_file),
+    )
 
     # check for plain text normalized version first, then use original file otherwise
     try:
-        file_io = file_store.read_file(plaintext_file_name, mode="b")
-        # For plaintext versions, use PLAIN_TEXT type (unless it's an image which doesn't have plaintext)
-        plaintext_chat_file_type = (
-            ChatFileType.PLAIN_TEXT
-            if chat_file_type != ChatFileType.IMAGE
-            else chat_file_type
-        )
-
-        # if we have plaintext for image (which happens when image extraction is enabled), we use PLAIN_TEXT type
-        if file_io is not None:
-            plaintext_chat_file_type = ChatFileType.PLAIN_TEXT
+        # plaintext exists for every processed file, including images when image
+        # extraction is enabled, and is always passed on as PLAIN_TEXT
+        chat_file_type = ChatFileType.PLAIN_TEXT
+        content = _user_file_plaintext_cache.get(cache_key)
+        if content is not None:
+            status = "plaintext_cached"
+        else:
+            file_io = file_store.read_file(
+                user_file_id_to_plaintext_file_name(user_file.id), mode="b"
+            )
+            content = file_io.read()
+            if len(content) <= USER_FILE_PLAINTEXT_CACHE_MAX_FILE_BYTES:
+                _user_file_plaintext_cache.set(cache_key, content)
+            status = "plaintext"
 
-        chat_file = InMemoryChatFile(
+        return InMemoryChatFile(
             file_id=str(user_file.file_id),
-            content=file_io.read(),
-            file_type=plaintext_chat_file_type,
+            content=content,
+            file_type=chat_file_type,
             filename=user_file.name,
         )
-        status = "plaintext"
-        return chat_file
     except Exception as e:
         logger.warning(f"Failed to load plaintext for user file {user_file.id}: {e}")
-        # Fall back to original file if plaintext not available
+        # Fall back to original file if plaintext not available, using the chat file
+        # type of the original file's MIME type
+        file_record = file_store.read_file_record(user_file.file_id)
+        chat_file_type = mime_type_to_chat_file_type(file_record.file_type)
         file_io = file_store.read_file(user_file.file_id, mode="b")
 
         chat_file = InMemoryChatFile(
@@ -153,6 +171,14 @@ def load_user_file(file_id: UUID, db_session: Session) -> InMemoryChatFile:
         )
 
 
+def load_user_file(file_id: UUID, db_session: Session) -> InMemoryChatFile:
+    user_file = db_session.query(UserFile).filter(UserFile.id == file_id).first()
+    if not user_file:
+        raise ValueError(f"User file with id {file_id} not found")
+
+    return _load_user_file_content(user_file)
+
+
 def load_in_memory_chat_files(
     user_file_ids: list[UUID],
     db_session: Session,
@@ -167,14 +193,31 @@ def load_in_memory_chat_files(
 
     Returns:
         A list of InMemoryChatFile objects, each containing the file content (as bytes),
-        file ID, file type, and filename. Prioritizes loading plaintext versions if available.
+        file ID, file type, and filename. Prioritizes loading plaintext versions if available,
+        recently loaded plaintext is served from an in-process cache.
     """
+    if not user_file_ids:
+        return []
+
+    # Fetch all records up front, the session must not be shared with the threads below
+    id_to_user_file = {
+        str(user_file.id): user_file
+        for user_file in db_session.query(UserFile)
+        .filter(UserFile.id.in_(user_file_ids))
+        .all()
+    }
+    for file_id in user_file_ids:
+        if str(file_id) not in id_to_user_file:
+            raise ValueError(f"User file with id {file_id} not found")
+
     # Use parallel execution to load files concurrently
     return cast(
         list[InMemoryChatFile],
         run_functions_tuples_in_parallel(
-            # 1. Load files specified by individual IDs
-            [(load_user_file, (file_id, db_session)) for file_id in user_file_ids]
+            [
+                (_load_user_file_content, (id_to_user_file[str(file_id)],))
+                for file_id in user_file_ids
+            ]
         ),
     )
 
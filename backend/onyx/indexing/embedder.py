@@ -2,11 +2,15 @@ import time
 from abc import ABC
 from abc import abstractmethod
 from collections import defaultdict
+from collections.abc import Callable
+from typing import cast
 
+from onyx.configs.app_configs import ENABLE_EMBEDDING_CACHE
 from onyx.connectors.models import ConnectorFailure
 from onyx.connectors.models import ConnectorStopSignal
 from onyx.connectors.models import DocumentFailure
 from onyx.db.models import SearchSettings
+from onyx.indexing.embedding_cache import EmbeddingCache
 from onyx.indexing.indexing_heartbeat import IndexingHeartbeatInterface
 from onyx.indexing.models import ChunkEmbedding
 from onyx.indexing.models import DocAwareChunk
@@ -16,6 +20,7 @@ from onyx.utils.logger import setup_logger
 from onyx.utils.timing import log_function_time
 from shared_configs.configs import INDEXING_MODEL_SERVER_HOST
 from shared_configs.configs import INDEXING_MODEL_SERVER_PORT
+from shared_configs.contextvars import get_current_tenant_id
 from shared_configs.enums import EmbeddingProvider
 from shared_configs.enums import EmbedTextType
 from shared_configs.model_server_models import Embedding
@@ -94,6 +99,7 @@ class DefaultIndexingEmbedder(IndexingEmbedder):
         deployment_name: str | None = None,
         reduced_dimension: int | None = None,
         callback: IndexingHeartbeatInterface | None = None,
+        embedding_cache: EmbeddingCache | None = None,
     ):
         super().__init__(
             model_name,
@@ -108,6 +114,46 @@ class DefaultIndexingEmbedder(IndexingEmbedder):
             reduced_dimension,
             callback,
         )
+        self.embedding_cache = embedding_cache
+
+    def _encode_passages(
+        self,
+        texts: list[str],
+        encode: Callable[[list[str]], list[Embedding]],
+        large_chunks_present: bool = False,
+    ) -> list[Embedding]:
+        """Encodes the texts with `encode`, only sending the ones not in the embedding
+        cache (if enabled) to the embedding model."""
+        if self.embedding_cache is None:
+            return encode(texts)
+
+        embeddings = self.embedding_cache.get_many(
+            texts, large_chunks_present=large_chunks_present
+        )
+        # the same text (e.g. a shared title or boilerplate chunk) only needs to be embedded once
+        missing_texts = list(
+            dict.fromkeys(
+                text for text, embedding in zip(texts, embeddings) if embedding is None
+            )
+        )
+        logger.debug(
+            f"Embedding cache: {len(texts) - len(missing_texts)} hits, "
+            f"{len(missing_texts)} texts to embed "
+            f"(lifetime hit rate {self.embedding_cache.hit_rate:.1%})"
+        )
+        if not missing_texts:
+            return cast(list[Embedding], embeddings)
+
+        new_embeddings = encode(missing_texts)
+        self.embedding_cache.put_many(
+            missing_texts, new_embeddings, large_chunks_present=large_chunks_present
+        )
+
+        text_to_new_embedding = dict(zip(missing_texts, new_embeddings))
+        return [
+            embedding if embedding is not None else text_to_new_embedding[text]
+            for text, embedding in zip(texts, embeddings)
+        ]
 
     @log_function_time()
     def embed_chunks(
@@ -144,12 +190,16 @@ class DefaultIndexingEmbedder(IndexingEmbedder):
                     raise RuntimeError("Large chunk contains mini chunks")
                 flat_chunk_texts.extend(chunk.mini_chunk_texts)
 
-        embeddings = self.embedding_model.encode(
-            texts=flat_chunk_texts,
-            text_type=EmbedTextType.PASSAGE,
+        embeddings = self._encode_passages(
+            flat_chunk_texts,
+            encode=lambda texts: self.embedding_model.encode(
+                texts=texts,
+                text_type=EmbedTextType.PASSAGE,
+                large_chunks_present=large_chunks_present,
+                tenant_id=tenant_id,
+                request_id=request_id,
+            ),
             large_chunks_present=large_chunks_present,
-            tenant_id=tenant_id,
-            request_id=request_id,
         )
 
         chunk_titles = {
@@ -164,11 +214,14 @@ class DefaultIndexingEmbedder(IndexingEmbedder):
         # Cache the Title embeddings to only have to do it once
         title_embed_dict: dict[str, Embedding] = {}
         if chunk_titles_list:
-            title_embeddings = self.embedding_model.encode(
+            title_embeddings = self._encode_passages(
                 chunk_titles_list,
-                text_type=EmbedTextType.PASSAGE,
-                tenant_id=tenant_id,
-                request_id=request_id,
+                encode=lambda titles: self.embedding_model.encode(
+                    titles,
+                    text_type=EmbedTextType.PASSAGE,
+                    tenant_id=tenant_id,
+                    request_id=request_id,
+                ),
             )
             title_embed_dict.update(
                 {
@@ -238,6 +291,18 @@ class DefaultIndexingEmbedder(IndexingEmbedder):
             deployment_name=search_settings.deployment_name,
             reduced_dimension=search_settings.reduced_dimension,
             callback=callback,
+            embedding_cache=(
+                EmbeddingCache(
+                    model_name=search_settings.model_name,
+                    normalize=search_settings.normalize,
+                    passage_prefix=search_settings.passage_prefix,
+                    provider_type=search_settings.provider_type,
+                    reduced_dimension=search_settings.reduced_dimension,
+                    tenant_id=get_current_tenant_id(),
+                )
+                if ENABLE_EMBEDDING_CACHE
+                else None
+            ),
         )
 
 
@@ -0,0 +1,149 @@
+import array
+import hashlib
+import time
+from typing import cast
+
+from redis import Redis
+
+from onyx.configs.app_configs import EMBEDDING_CACHE_MAX_ENTRIES
+from onyx.configs.app_configs import EMBEDDING_CACHE_TTL_SECONDS
+from onyx.redis.redis_pool import get_redis_client
+from onyx.utils.logger import setup_logger
+from shared_configs.enums import EmbeddingProvider
+from shared_configs.model_server_models import Embedding
+
+logger = setup_logger()
+
+_EMBEDDING_CACHE_PREFIX = "embedding_cache"
+# sorted set of cache keys scored by last access time, used for size-bounded eviction
+_EMBEDDING_CACHE_LRU_SUFFIX = "lru"
+
+
+def _hash(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8", errors="replace")).hexdigest()
+
+
+def serialize_embedding(embedding: Embedding) -> bytes:
+    return array.array("f", embedding).tobytes()
+
+
+def deserialize_embedding(raw: bytes) -> Embedding:
+    embedding = array.array("f")
+    embedding.frombytes(raw)
+    return embedding.tolist()
+
+
+class EmbeddingCache:
+    """Redis backed cache of passage embeddings keyed by the exact text that was embedded.
+
+    Entries are namespaced by everything that changes the produced vector (model, provider,
+    normalization, passage prefix, reduced dimension) so a model swap never reuses stale vectors.
+    Vectors are stored as packed float32, which is the precision the vector DB stores anyway.
+
+    The cache is strictly best effort: any Redis error is logged and treated as a miss.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        normalize: bool,
+        passage_prefix: str | None,
+        provider_type: EmbeddingProvider | None,
+        reduced_dimension: int | None,
+        tenant_id: str,
+        max_entries: int = EMBEDDING_CACHE_MAX_ENTRIES,
+        ttl_seconds: int = EMBEDDING_CACHE_TTL_SECONDS,
+        redis_client: Redis | None = None,
+    ):
+        self.tenant_id = tenant_id
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.redis_client = redis_client or get_redis_client(tenant_id=tenant_id)
+
+        namespace = _hash(
+            f"{model_name}|{provider_type}|{normalize}|{passage_prefix or ''}|{reduced_dimension}"
+        )[:16]
+        # pipelines don't automatically add the tenant_id prefix
+        self._key_prefix = f"{tenant_id}:{_EMBEDDING_CACHE_PREFIX}:{namespace}"
+        self._lru_key = f"{self._key_prefix}:{_EMBEDDING_CACHE_LRU_SUFFIX}"
+
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, text: str, large_chunks_present: bool) -> str:
+        # large chunks change the max sequence length, and therefore how the
+        # text is trimmed before it is embedded
+        return f"{self._key_prefix}:{int(large_chunks_present)}:{_hash(text)}"
+
+    def get_many(
+        self, texts: list[str], large_chunks_present: bool = False
+    ) -> list[Embedding | None]:
+        """Returns the cached embedding for each text, or None for misses."""
+        if not texts:
+            return []
+
+        keys = [self._key(text, large_chunks_present) for text in texts]
+        try:
+            pipeline = self.redis_client.pipeline()
+            for key in keys:
+                pipeline.get(key)
+            raw_values = cast(list[bytes | None], pipeline.execute())
+
+            now = time.time()
+            hit_keys = {key: now for key, raw in zip(keys, raw_values) if raw}
+            if hit_keys:
+                pipeline = self.redis_client.pipeline()
+                pipeline.zadd(self._lru_key, hit_keys)
+                for key in hit_keys:
+                    pipeline.expire(key, self.ttl_seconds)
+                pipeline.execute()
+        except Exception:
+            logger.warning("Failed to read from the embedding cache", exc_info=True)
+            self.misses += len(texts)
+            return [None] * len(texts)
+
+        embeddings = [deserialize_embedding(raw) if raw else None for raw in raw_values]
+        num_hits = sum(1 for embedding in embeddings if embedding is not None)
+        self.hits += num_hits
+        self.misses += len(texts) - num_hits
+        return embeddings
+
+    def put_many(
+        self,
+        texts: list[str],
+        embeddings: list[Embedding],
+        large_chunks_present: bool = False,
+    ) -> None:
+        if not texts:
+            return
+
+        now = time.time()
+        try:
+            pipeline = self.redis_client.pipeline()
+            lru_entries: dict[str, float] = {}
+            for text, embedding in zip(texts, embeddings):
+                key = self._key(text, large_chunks_present)
+                pipeline.set(key, serialize_embedding(embedding), ex=self.ttl_seconds)
+                lru_entries[key] = now
+            pipeline.zadd(self._lru_key, lru_entries)
+            pipeline.expire(self._lru_key, self.ttl_seconds)
+            pipeline.zcard(self._lru_key)
+            num_entries = cast(int, pipeline.execute()[-1])
+
+            if num_entries > self.max_entries:
+                self._evict(num_entries - self.max_entries)
+        except Exception:
+            logger.warning("Failed to write to the embedding cache", exc_info=True)
+
+    def _evict(self, count: int) -> None:
+        """Drops the `count` least recently used entries."""
+        evicted = cast(
+            list[tuple[bytes, float]], self.redis_client.zpopmin(self._lru_key, count)
+        )
+        if evicted:
+            self.redis_client.delete(*[key for key, _ in evicted])
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
@@ -1,3 +1,4 @@
+import time
 from collections import defaultdict
 from collections.abc import Callable
 from typing import Protocol
@@ -9,6 +10,8 @@ from sqlalchemy.orm import Session
 from onyx.configs.app_configs import DEFAULT_CONTEXTUAL_RAG_LLM_NAME
 from onyx.configs.app_configs import DEFAULT_CONTEXTUAL_RAG_LLM_PROVIDER
 from onyx.configs.app_configs import ENABLE_CONTEXTUAL_RAG
+from onyx.configs.app_configs import INDEXING_PIPELINE_MAX_IN_FLIGHT
+from onyx.configs.app_configs import INDEXING_PIPELINE_SUB_BATCH_SIZE
 from onyx.configs.app_configs import MAX_DOCUMENT_CHARS
 from onyx.configs.app_configs import MAX_TOKENS_FOR_FULL_INCLUSION
 from onyx.configs.app_configs import USE_CHUNK_SUMMARY
@@ -38,6 +41,7 @@ from onyx.document_index.document_index_utils import (
     get_multipass_config,
 )
 from onyx.document_index.interfaces import DocumentIndex
+from onyx.document_index.interfaces import DocumentInsertionRecord
 from onyx.document_index.interfaces import DocumentMetadata
 from onyx.document_index.interfaces import IndexBatchParams
 from onyx.file_processing.image_summarization import summarize_image_with_error_handling
@@ -67,6 +71,7 @@ from onyx.prompts.chat_prompts import CONTEXTUAL_RAG_PROMPT2
 from onyx.prompts.chat_prompts import DOCUMENT_SUMMARY_PROMPT
 from onyx.utils.logger import setup_logger
 from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
+from onyx.utils.threadpool_concurrency import run_pipelined_stages
 from onyx.utils.timing import log_function_time
 from shared_configs.configs import (
     INDEXING_INFORMATION_CONTENT_CLASSIFICATION_CUTOFF_LENGTH,
@@ -657,40 +662,34 @@ def add_contextual_summaries(
     return chunks
 
 
-@log_function_time(debug_only=True)
-def index_doc_batch(
-    *,
-    document_batch: list[Document],
-    chunker: Chunker,
-    embedder: IndexingEmbedder,
-    information_content_classification_model: InformationContentClassificationModel,
-    document_index: DocumentIndex,
-    request_id: str | None,
-    tenant_id: str,
-    adapter: IndexingBatchAdapter,
-    enable_contextual_rag: bool = False,
-    llm: LLM | None = None,
-    ignore_time_skip: bool = False,
-    filter_fnc: Callable[[list[Document]], list[Document]] = filter_documents,
-) -> IndexingPipelineResult:
-    """End-to-end indexing for a pre-batched set of documents."""
-    """Takes different pieces of the indexing pipeline and applies it to a batch of documents
-    Note that the documents should already be batched at this point so that it does not inflate the
-    memory requirements
+class _ChunkedSubBatch(BaseModel):
+    context: DocumentBatchPrepareContext
+    chunks: list[DocAwareChunk]
+    model_config = ConfigDict(arbitrary_types_allowed=True)
 
-    Returns a tuple where the first element is the number of new docs and the
-    second element is the number of chunks."""
 
-    filtered_documents = filter_fnc(document_batch)
-    context = adapter.prepare(filtered_documents, ignore_time_skip)
-    if not context:
-        return IndexingPipelineResult(
-            new_docs=0,
-            total_docs=len(filtered_documents),
-            total_chunks=0,
-            failures=[],
-        )
+class _EmbeddedSubBatch(BaseModel):
+    context: DocumentBatchPrepareContext
+    chunks_with_embeddings: list[IndexChunk]
+    embedding_failures: list[ConnectorFailure]
+    chunk_content_scores: list[float]
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+
+class _WrittenSubBatch(BaseModel):
+    insertion_records: list[DocumentInsertionRecord]
+    failures: list[ConnectorFailure]
+    total_chunks: int
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
 
+def _chunk_documents(
+    context: DocumentBatchPrepareContext,
+    chunker: Chunker,
+    enable_contextual_rag: bool,
+    llm: LLM | None,
+) -> _ChunkedSubBatch:
+    """Processes image sections, chunks the docs and (optionally) adds contextual RAG summaries."""
     # Convert documents to IndexingDocument objects with processed section
     # logger.debug("Processing image sections")
     context.indexable_docs = process_image_sections(context.updatable_docs)
@@ -727,15 +726,26 @@ def index_doc_batch(
             chunk_token_limit=chunker.chunk_token_limit * 2,
         )
 
+    return _ChunkedSubBatch(context=context, chunks=chunks)
+
+
+def _embed_chunks(
+    chunked: _ChunkedSubBatch,
+    embedder: IndexingEmbedder,
+    information_content_classification_model: InformationContentClassificationModel,
+    tenant_id: str,
+    request_id: str | None,
+) -> _EmbeddedSubBatch:
+    """Embeds the chunks and computes their content classification boost scores."""
     logger.debug("Starting embedding")
     chunks_with_embeddings, embedding_failures = (
         embed_chunks_with_failure_handling(
-            chunks=chunks,
+            chunks=chunked.chunks,
             embedder=embedder,
             tenant_id=tenant_id,
             request_id=request_id,
         )
-        if chunks
+        if chunked.chunks
         else ([], [])
     )
 
@@ -747,6 +757,30 @@ def index_doc_batch(
         else [1.0] * len(chunks_with_embeddings)
     )
 
+    return _EmbeddedSubBatch(
+        context=chunked.context,
+        chunks_with_embeddings=chunks_with_embeddings,
+        embedding_failures=embedding_failures,
+        chunk_content_scores=chunk_content_scores,
+    )
+
+
+def _write_embedded_chunks(
+    embedded: _EmbeddedSubBatch,
+    document_index: DocumentIndex,
+    adapter: IndexingBatchAdapter,
+    tenant_id: str,
+    filtered_documents: list[Document],
+    large_chunks_enabled: bool,
+) -> _WrittenSubBatch:
+    """Writes the embedded chunks to the vector DB and finalizes the DB state.
+
+    Uses the adapter (and therefore its DB session), so this must be run on the
+    thread that owns the session."""
+    context = embedded.context
+    chunks_with_embeddings = embedded.chunks_with_embeddings
+    embedding_failures = embedded.embedding_failures
+
     updatable_ids = [doc.id for doc in context.updatable_docs]
     updatable_chunk_data = [
         UpdatableChunkData(
@@ -754,7 +788,7 @@ def index_doc_batch(
             document_id=chunk.source_document.id,
             boost_score=score,
         )
-        for chunk, score in zip(chunks_with_embeddings, chunk_content_scores)
+        for chunk, score in zip(chunks_with_embeddings, embedded.chunk_content_scores)
     ]
 
     # Acquires a lock on the documents so that no other process can modify them
@@ -768,7 +802,7 @@ def index_doc_batch(
         # always triggers a final metadata sync via the celery queue
         result = adapter.build_metadata_aware_chunks(
             chunks_with_embeddings=chunks_with_embeddings,
-            chunk_content_scores=chunk_content_scores,
+            chunk_content_scores=embedded.chunk_content_scores,
             tenant_id=tenant_id,
             context=context,
         )
@@ -790,7 +824,7 @@ def index_doc_batch(
                 doc_id_to_previous_chunk_cnt=result.doc_id_to_previous_chunk_cnt,
                 doc_id_to_new_chunk_cnt=result.doc_id_to_new_chunk_cnt,
                 tenant_id=tenant_id,
-                large_chunks_enabled=chunker.enable_large_chunks,
+                large_chunks_enabled=large_chunks_enabled,
             ),
         )
 
@@ -826,11 +860,207 @@ def index_doc_batch(
             result=result,
         )
 
+    return _WrittenSubBatch(
+        insertion_records=insertion_records,
+        failures=vector_db_write_failures + embedding_failures,
+        total_chunks=len(chunks_with_embeddings),
+    )
+
+
+def _split_context(
+    context: DocumentBatchPrepareContext, sub_batch_size: int
+) -> list[DocumentBatchPrepareContext]:
+    return [
+        DocumentBatchPrepareContext(
+            updatable_docs=context.updatable_docs[i : i + sub_batch_size],
+            id_to_boost_map=context.id_to_boost_map,
+        )
+        for i in range(0, len(context.updatable_docs), sub_batch_size)
+    ]
+
+
+def _index_doc_batch_pipelined(
+    *,
+    context: DocumentBatchPrepareContext,
+    filtered_documents: list[Document],
+    chunker: Chunker,
+    embedder: IndexingEmbedder,
+    information_content_classification_model: InformationContentClassificationModel,
+    document_index: DocumentIndex,
+    request_id: str | None,
+    tenant_id: str,
+    adapter: IndexingBatchAdapter,
+    enable_contextual_rag: bool,
+    llm: LLM | None,
+    sub_batch_size: int,
+    max_in_flight: int,
+) -> IndexingPipelineResult:
+    """Streams sub-batches of the documents through chunking -> embedding -> vector DB
+    write, with each stage running concurrently on a different sub-batch. The write
+    stage runs on the calling thread since it uses the adapter's DB session.
+
+    Documents which were filtered but not updatable (e.g. up to date) are marked as
+    indexed together with the last sub-batch."""
+    sub_contexts = _split_context(context, sub_batch_size)
+    updatable_ids = {doc.id for doc in context.updatable_docs}
+    non_updatable_docs = [
+        doc for doc in filtered_documents if doc.id not in updatable_ids
+    ]
+
+    stage_timings: dict[str, float] = {}
+    start_time = time.monotonic()
+
+    insertion_records: list[DocumentInsertionRecord] = []
+    failures: list[ConnectorFailure] = []
+    total_chunks = 0
+    embedded_sub_batches = run_pipelined_stages(
+        items=sub_contexts,
+        stages=[
+            (
+                "chunking",
+                lambda sub_context: _chunk_documents(
+                    context=sub_context,
+                    chunker=chunker,
+                    enable_contextual_rag=enable_contextual_rag,
+                    llm=llm,
+                ),
+            ),
+            (
+                "embedding",
+                lambda chunked: _embed_chunks(
+                    chunked=chunked,
+                    embedder=embedder,
+                    information_content_classification_model=information_content_classification_model,
+                    tenant_id=tenant_id,
+                    request_id=request_id,
+                ),
+            ),
+        ],
+        max_in_flight=max_in_flight,
+        stage_timings=stage_timings,
+    )
+    for sub_batch_num, embedded in enumerate(embedded_sub_batches):
+        is_last_sub_batch = sub_batch_num == len(sub_contexts) - 1
+        write_start = time.monotonic()
+        written = _write_embedded_chunks(
+            embedded=embedded,
+            document_index=document_index,
+            adapter=adapter,
+            tenant_id=tenant_id,
+            filtered_documents=(
+                embedded.context.updatable_docs
+                + (non_updatable_docs if is_last_sub_batch else [])
+            ),
+            large_chunks_enabled=chunker.enable_large_chunks,
+        )
+        stage_timings["vector_db_write"] = stage_timings.get("vector_db_write", 0.0) + (
+            time.monotonic() - write_start
+        )
+
+        insertion_records.extend(written.insertion_records)
+        failures.extend(written.failures)
+        total_chunks += written.total_chunks
+
+    elapsed = time.monotonic() - start_time
+    stage_timings_str = " ".join(
+        f"{name}={stage_time:.2f}s" for name, stage_time in stage_timings.items()
+    )
+    logger.info(
+        f"Pipelined indexing of {len(context.updatable_docs)} docs in "
+        f"{len(sub_contexts)} sub-batches took {elapsed:.2f}s: {stage_timings_str}"
+    )
+
     return IndexingPipelineResult(
         new_docs=len([r for r in insertion_records if not r.already_existed]),
         total_docs=len(filtered_documents),
-        total_chunks=len(chunks_with_embeddings),
-        failures=vector_db_write_failures + embedding_failures,
+        total_chunks=total_chunks,
+        failures=failures,
+    )
+
+
+@log_function_time(debug_only=True)
+def index_doc_batch(
+    *,
+    document_batch: list[Document],
+    chunker: Chunker,
+    embedder: IndexingEmbedder,
+    information_content_classification_model: InformationContentClassificationModel,
+    document_index: DocumentIndex,
+    request_id: str | None,
+    tenant_id: str,
+    adapter: IndexingBatchAdapter,
+    enable_contextual_rag: bool = False,
+    llm: LLM | None = None,
+    ignore_time_skip: bool = False,
+    filter_fnc: Callable[[list[Document]], list[Document]] = filter_documents,
+    pipeline_sub_batch_size: int = INDEXING_PIPELINE_SUB_BATCH_SIZE,
+) -> IndexingPipelineResult:
+    """End-to-end indexing for a pre-batched set of documents."""
+    """Takes different pieces of the indexing pipeline and applies it to a batch of documents
+    Note that the documents should already be batched at this point so that it does not inflate the
+    memory requirements
+
+    If `pipeline_sub_batch_size` is set and the batch is larger than it, the batch is
+    processed as a stream of sub-batches with chunking, embedding and the vector DB
+    write overlapping (see `_index_doc_batch_pipelined`).
+
+    Returns a tuple where the first element is the number of new docs and the
+    second element is the number of chunks."""
+
+    filtered_documents = filter_fnc(document_batch)
+    context = adapter.prepare(filtered_documents, ignore_time_skip)
+    if not context:
+        return IndexingPipelineResult(
+            new_docs=0,
+            total_docs=len(filtered_documents),
+            total_chunks=0,
+            failures=[],
+        )
+
+    if 0 < pipeline_sub_batch_size < len(context.updatable_docs):
+        return _index_doc_batch_pipelined(
+            context=context,
+            filtered_documents=filtered_documents,
+            chunker=chunker,
+            embedder=embedder,
+            information_content_classification_model=information_content_classification_model,
+            document_index=document_index,
+            request_id=request_id,
+            tenant_id=tenant_id,
+            adapter=adapter,
+            enable_contextual_rag=enable_contextual_rag,
+            llm=llm,
+            sub_batch_size=pipeline_sub_batch_size,
+            max_in_flight=INDEXING_PIPELINE_MAX_IN_FLIGHT,
+        )
+
+    chunked = _chunk_documents(
+        context=context,
+        chunker=chunker,
+        enable_contextual_rag=enable_contextual_rag,
+        llm=llm,
+    )
+    embedded = _embed_chunks(
+        chunked=chunked,
+        embedder=embedder,
+        information_content_classification_model=information_content_classification_model,
+        tenant_id=tenant_id,
+        request_id=request_id,
+    )
+    written = _write_embedded_chunks(
+        embedded=embedded,
+        document_index=document_index,
+        adapter=adapter,
+        tenant_id=tenant_id,
+        filtered_documents=filtered_documents,
+        large_chunks_enabled=chunker.enable_large_chunks,
+    )
+
+    return IndexingPipelineResult(
+        new_docs=len([r for r in written.insertion_records if not r.already_existed]),
+        total_docs=len(filtered_documents),
+        total_chunks=written.total_chunks,
+        failures=written.failures,
     )
 
 
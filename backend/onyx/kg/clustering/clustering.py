@@ -1,4 +1,6 @@
 import time
+from collections import Counter
+from collections import defaultdict
 from collections.abc import Generator
 from typing import cast
 
@@ -6,9 +8,13 @@ from rapidfuzz.fuzz import ratio
 from redis.lock import Lock as RedisLock
 from sqlalchemy import func
 from sqlalchemy import text
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session
 
 from onyx.background.celery.tasks.kg_processing.utils import extend_lock
 from onyx.configs.constants import CELERY_GENERIC_BEAT_LOCK_TIMEOUT
+from onyx.configs.kg_configs import KG_CLUSTERING_BATCH_MODE
+from onyx.configs.kg_configs import KG_CLUSTERING_BATCH_SIZE
 from onyx.configs.kg_configs import KG_CLUSTERING_RETRIEVE_THRESHOLD
 from onyx.configs.kg_configs import KG_CLUSTERING_THRESHOLD
 from onyx.db.engine.sql_engine import get_session_with_current_tenant
@@ -24,12 +30,14 @@ from onyx.db.models import KGRelationshipExtractionStaging
 from onyx.db.models import KGRelationshipTypeExtractionStaging
 from onyx.db.relationships import transfer_relationship
 from onyx.db.relationships import transfer_relationship_type
+from onyx.db.relationships import transfer_relationships
 from onyx.db.relationships import upsert_relationship
 from onyx.db.relationships import upsert_relationship_type
 from onyx.document_index.vespa.kg_interactions import (
     get_kg_vespa_info_update_requests_for_document,
 )
 from onyx.document_index.vespa.kg_interactions import update_kg_chunks_vespa_info
+from onyx.kg.clustering.trigram_index import TrigramIndex
 from onyx.kg.models import KGGroundingType
 from onyx.kg.utils.formatting_utils import make_relationship_id
 from onyx.utils.logger import setup_logger
@@ -82,16 +90,34 @@ def _get_batch_untransferred_relationship_types(
 def _get_batch_untransferred_relationships(
     batch_size: int,
 ) -> Generator[list[KGRelationshipExtractionStaging], None, None]:
+    # page by primary key so that relationships which can't be transferred (and thus
+    # stay untransferred) are not fetched again
+    last_key: tuple[str, str | None] | None = None
+
     while True:
         with get_session_with_current_tenant() as db_session:
+            query = db_session.query(KGRelationshipExtractionStaging).filter(
+                KGRelationshipExtractionStaging.transferred.is_(False)
+            )
+            if last_key is not None:
+                query = query.filter(
+                    tuple_(
+                        KGRelationshipExtractionStaging.id_name,
+                        KGRelationshipExtractionStaging.source_document,
+                    )
+                    > tuple_(*last_key)
+                )
             batch = (
-                db_session.query(KGRelationshipExtractionStaging)
-                .filter(KGRelationshipExtractionStaging.transferred.is_(False))
+                query.order_by(
+                    KGRelationshipExtractionStaging.id_name,
+                    KGRelationshipExtractionStaging.source_document,
+                )
                 .limit(batch_size)
                 .all()
             )
             if not batch:
                 break
+            last_key = (batch[-1].id_name, batch[-1].source_document)
             yield batch
 
 
@@ -294,6 +320,229 @@ def _transfer_one_relationship(
         db_session.commit()
 
 
+class _EntityCandidateIndex:
+    """The existing entities of one entity type that staged entities can be clustered
+    into, indexed by name trigrams. Mirrors the pg_trgm lookup of
+    `_cluster_one_grounded_entity` without a query per staged entity."""
+
+    def __init__(self) -> None:
+        self._trigram_index = TrigramIndex()
+        self._names: dict[str, str] = {}
+        self._document_ids: dict[str, str | None] = {}
+
+    @classmethod
+    def load(
+        cls, db_session: Session, entity_type_id_name: str
+    ) -> "_EntityCandidateIndex":
+        candidate_index = cls()
+        for id_name, name, document_id in db_session.query(
+            KGEntity.id_name, KGEntity.name, KGEntity.document_id
+        ).filter(KGEntity.entity_type_id_name == entity_type_id_name):
+            candidate_index.add(id_name, name, document_id)
+        return candidate_index
+
+    def add(self, id_name: str, name: str, document_id: str | None) -> None:
+        # skip those with numbers so we don't cluster version1 and version2, etc.
+        if any(char.isdigit() for char in name):
+            return
+        self._trigram_index.add(id_name, name)
+        self._names[id_name] = name
+        self._document_ids[id_name] = document_id
+
+    def find_best_match(self, entity_name: str, document_id: str | None) -> str | None:
+        best_score = -1.0
+        best_id_name = None
+        for id_name, _ in self._trigram_index.search(
+            entity_name, KG_CLUSTERING_RETRIEVE_THRESHOLD
+        ):
+            # entities with a document can only be merged into ones without
+            if document_id is not None and self._document_ids[id_name] is not None:
+                continue
+            score = ratio(self._names[id_name], entity_name)
+            if score >= KG_CLUSTERING_THRESHOLD * 100 and score > best_score:
+                best_score = score
+                best_id_name = id_name
+        return best_id_name
+
+
+def _cluster_grounded_entities_batch(
+    entities: list[KGEntityExtractionStaging],
+    candidate_indices: dict[str, _EntityCandidateIndex],
+) -> None:
+    """
+    Batch version of `_cluster_one_grounded_entity`. Matches against the in-memory
+    candidate indices (loaded once per entity type and kept up to date with the
+    merges / transfers of this run) and writes the whole batch in one transaction.
+    """
+    with get_session_with_current_tenant() as db_session:
+        document_ids = {
+            entity.document_id for entity in entities if entity.document_id is not None
+        }
+        doc_id_to_semantic_id: dict[str, str] = (
+            dict(
+                db_session.query(Document.id, Document.semantic_id)
+                .filter(Document.id.in_(document_ids))
+                .all()
+            )
+            if document_ids
+            else {}
+        )
+
+        for entity in entities:
+            if entity.document_id is not None:
+                entity_name = doc_id_to_semantic_id[entity.document_id].lower()
+            else:
+                entity_name = entity.name.lower()
+
+            candidate_index = candidate_indices.get(entity.entity_type_id_name)
+            if candidate_index is None:
+                candidate_index = _EntityCandidateIndex.load(
+                    db_session, entity.entity_type_id_name
+                )
+                candidate_indices[entity.entity_type_id_name] = candidate_index
+
+            # skip those with numbers so we don't cluster version1 and version2, etc.
+            best_id_name = None
+            if not any(char.isdigit() for char in entity_name):
+                best_id_name = candidate_index.find_best_match(
+                    entity_name, entity.document_id
+                )
+
+            if best_id_name is not None:
+                # reload, the entity may have been merged into earlier in this batch
+                best_entity = db_session.get(
+                    KGEntity, best_id_name, populate_existing=True
+                )
+                logger.debug(f"Merged {entity.name} with {best_id_name}")
+                transferred_entity = merge_entities(
+                    db_session=db_session,
+                    parent=cast(KGEntity, best_entity),
+                    child=entity,
+                )
+            else:
+                transferred_entity = transfer_entity(
+                    db_session=db_session, entity=entity
+                )
+
+            candidate_index.add(
+                transferred_entity.id_name,
+                transferred_entity.name,
+                transferred_entity.document_id,
+            )
+
+        db_session.commit()
+
+
+def _create_parent_child_relationships_batch(
+    entities: list[KGEntityExtractionStaging],
+) -> None:
+    """
+    Batch version of `_create_one_parent_child_relationship`, looks up all parents with
+    one query and writes the whole batch in one transaction.
+    """
+    if not entities:
+        return
+
+    with get_session_with_current_tenant() as db_session:
+        parent_keys = {cast(str, entity.parent_key) for entity in entities}
+        key_to_parent: dict[str, KGEntity] = {}
+        for parent in db_session.query(KGEntity).filter(
+            KGEntity.entity_key.in_(parent_keys)
+        ):
+            key_to_parent.setdefault(cast(str, parent.entity_key), parent)
+
+        relationship_type_counts: Counter[tuple[str, str]] = Counter()
+        relationship_counts: Counter[tuple[str, str | None]] = Counter()
+        next_ancestor_to_id_names: defaultdict[str, list[str]] = defaultdict(list)
+        for entity in entities:
+            parent = key_to_parent.get(cast(str, entity.parent_key))
+            if parent is not None:
+                relationship_type_counts[
+                    (parent.entity_type_id_name, entity.entity_type_id_name)
+                ] += 1
+                relationship_id_name = make_relationship_id(
+                    parent.id_name,
+                    "has_subcomponent",
+                    cast(str, entity.transferred_id_name),
+                )
+                relationship_counts[(relationship_id_name, entity.document_id)] += 1
+                next_ancestor = parent.parent_key or ""
+            else:
+                next_ancestor = ""
+            next_ancestor_to_id_names[next_ancestor].append(entity.id_name)
+
+        # create parent child relationships and relationship types
+        for (
+            source_entity_type,
+            target_entity_type,
+        ), count in relationship_type_counts.items():
+            upsert_relationship_type(
+                db_session=db_session,
+                source_entity_type=source_entity_type,
+                relationship_type="has_subcomponent",
+                target_entity_type=target_entity_type,
+                extraction_count=count,
+            )
+        for (
+            relationship_id_name,
+            source_document_id,
+        ), count in relationship_counts.items():
+            upsert_relationship(
+                db_session=db_session,
+                relationship_id_name=relationship_id_name,
+                source_document_id=source_document_id,
+                occurrences=count,
+            )
+
+        # set the staging entities' parents to the next ancestors (see
+        # `_create_one_parent_child_relationship` for why "" rather than None)
+        for next_ancestor, id_names in next_ancestor_to_id_names.items():
+            db_session.query(KGEntityExtractionStaging).filter(
+                KGEntityExtractionStaging.id_name.in_(id_names)
+            ).update({"parent_key": next_ancestor}, synchronize_session=False)
+        db_session.commit()
+
+
+def _transfer_relationships_batch(
+    relationships: list[KGRelationshipExtractionStaging],
+) -> int:
+    """
+    Batch version of `_transfer_one_relationship`, translates all relationships with
+    one query and transfers them with a single upsert. Returns the number transferred.
+    """
+    with get_session_with_current_tenant() as db_session:
+        staging_entity_id_names = {
+            node
+            for relationship in relationships
+            for node in (relationship.source_node, relationship.target_node)
+        }
+        entity_translations: dict[str, str] = {
+            entity.id_name: entity.transferred_id_name
+            for entity in db_session.query(KGEntityExtractionStaging)
+            .filter(KGEntityExtractionStaging.id_name.in_(staging_entity_id_names))
+            .all()
+            if entity.transferred_id_name is not None
+        }
+        missing_translations = staging_entity_id_names - entity_translations.keys()
+        if missing_translations:
+            logger.error(f"Missing entity translations for {missing_translations}")
+
+        transferable_relationships = [
+            relationship
+            for relationship in relationships
+            if relationship.source_node in entity_translations
+            and relationship.target_node in entity_translations
+        ]
+        transfer_relationships(
+            db_session=db_session,
+            relationships=transferable_relationships,
+            entity_translations=entity_translations,
+        )
+        db_session.commit()
+
+    return len(transferable_relationships)
+
+
 def kg_clustering(
     tenant_id: str,
     index_name: str,
@@ -319,16 +568,28 @@ def kg_clustering(
 
     last_lock_time = time.monotonic()
 
+    # in batch mode, each batch is written in one transaction
+    batch_size = (
+        KG_CLUSTERING_BATCH_SIZE
+        if KG_CLUSTERING_BATCH_MODE
+        else processing_chunk_batch_size
+    )
+
     # Cluster and transfer grounded entities sequentially
     start_time = time.monotonic()
     i_batch = 0
+    # entity type -> existing entities of that type, only used in batch mode
+    candidate_indices: dict[str, _EntityCandidateIndex] = {}
     for i_batch, untransferred_grounded_entities in enumerate(
-        _get_batch_untransferred_grounded_entities(
-            batch_size=processing_chunk_batch_size
-        )
+        _get_batch_untransferred_grounded_entities(batch_size=batch_size)
     ):
-        for entity in untransferred_grounded_entities:
-            _cluster_one_grounded_entity(entity)
+        if KG_CLUSTERING_BATCH_MODE:
+            _cluster_grounded_entities_batch(
+                untransferred_grounded_entities, candidate_indices
+            )
+        else:
+            for entity in untransferred_grounded_entities:
+                _cluster_one_grounded_entity(entity)
         last_lock_time = extend_lock(
             lock, CELERY_GENERIC_BEAT_LOCK_TIMEOUT, last_lock_time
         )
@@ -341,15 +602,16 @@ def kg_clustering(
 
     # Create parent-child relationships in parallel
     for _ in range(kg_config_settings.KG_MAX_PARENT_RECURSION_DEPTH):
-        for root_entities in _get_batch_entities_with_parent(
-            batch_size=processing_chunk_batch_size
-        ):
-            run_functions_tuples_in_parallel(
-                [
-                    (_create_one_parent_child_relationship, (root_entity,))
-                    for root_entity in root_entities
-                ]
-            )
+        for root_entities in _get_batch_entities_with_parent(batch_size=batch_size):
+            if KG_CLUSTERING_BATCH_MODE:
+                _create_parent_child_relationships_batch(root_entities)
+            else:
+                run_functions_tuples_in_parallel(
+                    [
+                        (_create_one_parent_child_relationship, (root_entity,))
+                        for root_entity in root_entities
+                    ]
+                )
             last_lock_time = extend_lock(
                 lock, CELERY_GENERIC_BEAT_LOCK_TIMEOUT, last_lock_time
             )
@@ -359,9 +621,7 @@ def kg_clustering(
     start_time = time.monotonic()
     i_batch = 0
     for i_batch, relationship_types in enumerate(
-        _get_batch_untransferred_relationship_types(
-            batch_size=processing_chunk_batch_size
-        )
+        _get_batch_untransferred_relationship_types(batch_size=batch_size)
     ):
         with get_session_with_current_tenant() as db_session:
             for relationship_type in relationship_types:
@@ -380,14 +640,17 @@ def kg_clustering(
     start_time = time.monotonic()
     i_batch = 0
     for i_batch, relationships in enumerate(
-        _get_batch_untransferred_relationships(batch_size=processing_chunk_batch_size)
+        _get_batch_untransferred_relationships(batch_size=batch_size)
     ):
-        run_functions_tuples_in_parallel(
-            [
-                (_transfer_one_relationship, (relationship,))
-                for relationship in relationships
-            ]
-        )
+        if KG_CLUSTERING_BATCH_MODE:
+            _transfer_relationships_batch(relationships)
+        else:
+            run_functions_tuples_in_parallel(
+                [
+                    (_transfer_one_relationship, (relationship,))
+                    for relationship in relationships
+                ]
+            )
         last_lock_time = extend_lock(
             lock, CELERY_GENERIC_BEAT_LOCK_TIMEOUT, last_lock_time
         )
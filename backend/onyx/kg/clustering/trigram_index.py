@@ -0,0 +1,74 @@
+import re
+from collections import Counter
+from collections import defaultdict
+
+# pg_trgm only considers alphanumeric characters, everything else separates words
+_WORD_PATTERN = re.compile(r"[^\W_]+")
+
+
+def make_trigrams(text: str) -> set[str]:
+    """Trigrams of the text, the same way pg_trgm's `show_trgm` extracts them: each word
+    is lowercased and padded with two spaces in front and one at the end."""
+    trigrams: set[str] = set()
+    for word in _WORD_PATTERN.findall(text.lower()):
+        padded = f"  {word} "
+        trigrams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return trigrams
+
+
+def trigram_similarity(trigrams_a: set[str], trigrams_b: set[str]) -> float:
+    """Equivalent of pg_trgm's `similarity`: shared trigrams over all distinct trigrams."""
+    if not trigrams_a or not trigrams_b:
+        return 0.0
+    shared = len(trigrams_a & trigrams_b)
+    return shared / (len(trigrams_a) + len(trigrams_b) - shared)
+
+
+class TrigramIndex:
+    """In-memory inverted trigram index, used to find the names similar to a given name
+    without a pg_trgm query per lookup. Trigrams act as blocking keys: only entries that
+    share at least one trigram with the query are scored."""
+
+    def __init__(self) -> None:
+        self._key_to_trigrams: dict[str, set[str]] = {}
+        self._trigram_to_keys: defaultdict[str, set[str]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        return len(self._key_to_trigrams)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._key_to_trigrams
+
+    def add(self, key: str, text: str) -> None:
+        self.remove(key)
+        trigrams = make_trigrams(text)
+        self._key_to_trigrams[key] = trigrams
+        for trigram in trigrams:
+            self._trigram_to_keys[trigram].add(key)
+
+    def remove(self, key: str) -> None:
+        for trigram in self._key_to_trigrams.pop(key, ()):
+            keys = self._trigram_to_keys[trigram]
+            keys.discard(key)
+            if not keys:
+                del self._trigram_to_keys[trigram]
+
+    def search(self, text: str, threshold: float) -> list[tuple[str, float]]:
+        """Returns the (key, similarity) of all entries whose trigram similarity with
+        the text is at least `threshold`, like pg_trgm's `%` operator would."""
+        query_trigrams = make_trigrams(text)
+        if not query_trigrams:
+            return []
+
+        shared_counts: Counter[str] = Counter()
+        for trigram in query_trigrams:
+            shared_counts.update(self._trigram_to_keys.get(trigram, ()))
+
+        matches: list[tuple[str, float]] = []
+        for key, shared in shared_counts.items():
+            similarity = shared / (
+                len(query_trigrams) + len(self._key_to_trigrams[key]) - shared
+            )
+            if similarity >= threshold:
+                matches.append((key, similarity))
+        return matches
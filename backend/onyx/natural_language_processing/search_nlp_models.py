@@ -1,5 +1,6 @@
 import asyncio
 import json
+import os
 import threading
 import time
 from collections.abc import Callable
@@ -18,9 +19,6 @@ import voyageai  # type: ignore
 from cohere import AsyncClient as CohereAsyncClient
 from google.oauth2 import service_account  # type: ignore
 from httpx import HTTPError
-from requests import JSONDecodeError
-from requests import RequestException
-from requests import Response
 from retry import retry
 
 from onyx.configs.app_configs import INDEXING_EMBEDDING_MODEL_NUM_THREADS
@@ -30,8 +28,11 @@ from onyx.configs.model_configs import (
     BATCH_SIZE_ENCODE_CHUNKS_FOR_API_EMBEDDING_SERVICES,
 )
 from onyx.configs.model_configs import DOC_EMBEDDING_CONTEXT_SIZE
+from onyx.configs.model_configs import EMBEDDING_BATCH_TOKEN_BUDGET
+from onyx.configs.model_configs import EMBEDDING_LENGTH_BUCKETED_BATCHING
 from onyx.connectors.models import ConnectorStopSignal
 from onyx.db.models import SearchSettings
+from onyx.httpx.httpx_pool import HttpxPool
 from onyx.indexing.indexing_heartbeat import IndexingHeartbeatInterface
 from onyx.natural_language_processing.constants import DEFAULT_COHERE_MODEL
 from onyx.natural_language_processing.constants import DEFAULT_OPENAI_MODEL
@@ -49,6 +50,7 @@ from shared_configs.configs import API_BASED_EMBEDDING_TIMEOUT
 from shared_configs.configs import INDEXING_MODEL_SERVER_HOST
 from shared_configs.configs import INDEXING_MODEL_SERVER_PORT
 from shared_configs.configs import INDEXING_ONLY
+from shared_configs.configs import MODEL_SERVER_EMBEDDING_RESPONSE_ENCODING
 from shared_configs.configs import MODEL_SERVER_HOST
 from shared_configs.configs import MODEL_SERVER_PORT
 from shared_configs.configs import OPENAI_EMBEDDING_TIMEOUT
@@ -69,6 +71,9 @@ from shared_configs.model_server_models import IntentResponse
 from shared_configs.model_server_models import RerankRequest
 from shared_configs.model_server_models import RerankResponse
 from shared_configs.utils import batch_list
+from shared_configs.utils import BINARY_EMBEDDINGS_MEDIA_TYPE
+from shared_configs.utils import decode_embeddings
+from shared_configs.utils import EMBEDDING_DIM_HEADER
 
 logger = setup_logger()
 
@@ -88,6 +93,8 @@ _AUTH_ERROR_INVALID_API_KEY = "invalid api key"
 _AUTH_ERROR_PERMISSION = "permission"
 
 
+_MODEL_SERVER_HTTPX_CLIENT_NAME = "model_server"
+
 WARM_UP_STRINGS = [
     "Onyx is amazing!",
     "Check out our easy deployment guide at",
@@ -95,6 +102,16 @@ WARM_UP_STRINGS = [
 ]
 
 
+def get_model_server_client() -> httpx.Client:
+    """Keep-alive client shared by the embedding and reranking calls of this process.
+
+    Keyed by pid so that forked workers never share the connections of their parent.
+    No timeout, embedding large batches on CPU can take a long time."""
+    client_name = f"{_MODEL_SERVER_HTTPX_CLIENT_NAME}_{os.getpid()}"
+    HttpxPool.init_client(name=client_name, http2=False, timeout=None)
+    return HttpxPool.get(client_name)
+
+
 def clean_model_name(model_str: str) -> str:
     return model_str.replace("/", "_").replace("-", "_").replace(".", "_")
 
@@ -496,6 +513,36 @@ async def litellm_rerank(
         ]
 
 
+def build_length_bucketed_batches(
+    text_lengths: list[int],
+    max_batch_size: int,
+    token_budget: int | None = None,
+) -> list[list[int]]:
+    """Groups text indices into batches of similarly sized texts by sorting on length.
+
+    A batch is closed once it holds `max_batch_size` texts or, if `token_budget` is set,
+    once adding the next text would push its padded size (number of texts * longest
+    text) over the budget. A single text longer than the budget gets its own batch."""
+    sorted_indices = sorted(range(len(text_lengths)), key=lambda i: text_lengths[i])
+
+    batches: list[list[int]] = []
+    current_batch: list[int] = []
+    for ind in sorted_indices:
+        # texts are sorted ascending, so the new text is the longest in the batch
+        padded_size = (len(current_batch) + 1) * max(text_lengths[ind], 1)
+        if current_batch and (
+            len(current_batch) >= max_batch_size
+            or (token_budget and padded_size > token_budget)
+        ):
+            batches.append(current_batch)
+            current_batch = []
+        current_batch.append(ind)
+
+    if current_batch:
+        batches.append(current_batch)
+    return batches
+
+
 class EmbeddingModel:
     def __init__(
         self,
@@ -620,7 +667,11 @@ class EmbeddingModel:
         # Store the endpoint in a local variable to help mypy understand it's not None
         endpoint = self.embed_server_endpoint
 
-        def _make_request() -> Response:
+        embed_request = embed_request.model_copy(
+            update={"response_encoding": MODEL_SERVER_EMBEDDING_RESPONSE_ENCODING}
+        )
+
+        def _make_request() -> httpx.Response:
             headers = {}
             if tenant_id:
                 headers["X-Onyx-Tenant-ID"] = tenant_id
@@ -628,10 +679,10 @@ class EmbeddingModel:
             if request_id:
                 headers["X-Onyx-Request-ID"] = request_id
 
-            response = requests.post(
+            response = get_model_server_client().post(
                 endpoint,
                 headers=headers,
-                json=embed_request.model_dump(),
+                json=embed_request.model_dump(mode="json"),
             )
             # signify that this is a rate limit error
             if response.status_code == 429:
@@ -648,30 +699,36 @@ class EmbeddingModel:
             final_make_request_func = retry(
                 tries=3,
                 delay=5,
-                exceptions=(RequestException, ValueError, JSONDecodeError),
+                exceptions=(HTTPError, ValueError),
             )(final_make_request_func)
             # use 10 second delay as per Azure suggestion
             final_make_request_func = retry(
                 tries=10, delay=10, exceptions=ModelServerRateLimitError
             )(final_make_request_func)
 
-        response: Response | None = None
-
         try:
             response = final_make_request_func()
-            return EmbedResponse(**response.json())
-        except requests.HTTPError as e:
-            if not response:
-                raise HTTPError("HTTP error occurred - response is None.") from e
-
+        except httpx.HTTPStatusError as e:
             try:
-                error_detail = response.json().get("detail", str(e))
+                error_detail = e.response.json().get("detail", str(e))
             except Exception:
-                error_detail = response.text
+                error_detail = e.response.text
             raise HTTPError(f"HTTP error occurred: {error_detail}") from e
-        except requests.RequestException as e:
+        except httpx.RequestError as e:
             raise HTTPError(f"Request failed: {str(e)}") from e
 
+        # servers predating binary responses ignore the requested encoding
+        if response.headers.get("content-type") == BINARY_EMBEDDINGS_MEDIA_TYPE:
+            embeddings = decode_embeddings(
+                response.content,
+                dim=int(response.headers[EMBEDDING_DIM_HEADER]),
+                encoding=embed_request.response_encoding,
+            )
+            # the chunk models and the Vespa feed need plain lists, tolist() builds
+            # them in C and skips validating every value again
+            return EmbedResponse.model_construct(embeddings=embeddings.tolist())
+        return EmbedResponse(**response.json())
+
     def _batch_encode_texts(
         self,
         texts: list[str],
@@ -681,8 +738,16 @@ class EmbeddingModel:
         num_threads: int = INDEXING_EMBEDDING_MODEL_NUM_THREADS,
         tenant_id: str | None = None,
         request_id: str | None = None,
+        batch_indices: list[list[int]] | None = None,
     ) -> list[Embedding]:
-        text_batches = batch_list(texts, batch_size)
+        """If `batch_indices` is provided, it defines which texts are sent together
+        (instead of fixed size batches in arrival order). The returned embeddings are
+        always in the order of `texts`."""
+        text_batches = (
+            [[texts[ind] for ind in batch] for batch in batch_indices]
+            if batch_indices is not None
+            else batch_list(texts, batch_size)
+        )
 
         logger.debug(f"Encoding {len(texts)} texts in {len(text_batches)} batches")
 
@@ -793,6 +858,14 @@ class EmbeddingModel:
                 )
                 embeddings.extend(batch_embeddings)
 
+        if batch_indices is not None:
+            # restore the original order of the texts
+            ordered_embeddings: list[Embedding] = [[] for _ in texts]
+            flat_indices = [ind for batch in batch_indices for ind in batch]
+            for ind, embedding in zip(flat_indices, embeddings):
+                ordered_embeddings[ind] = embedding
+            return ordered_embeddings
+
         return embeddings
 
     def encode(
@@ -831,6 +904,19 @@ class EmbeddingModel:
             else local_embedding_batch_size
         )
 
+        # Padding only costs compute for local models, API providers are billed per token
+        batch_indices: list[list[int]] | None = None
+        if (
+            EMBEDDING_LENGTH_BUCKETED_BATCHING
+            and not self.provider_type
+            and len(texts) > 1
+        ):
+            batch_indices = build_length_bucketed_batches(
+                text_lengths=[len(self.tokenizer.encode(text)) for text in texts],
+                max_batch_size=batch_size,
+                token_budget=EMBEDDING_BATCH_TOKEN_BUDGET or None,
+            )
+
         return self._batch_encode_texts(
             texts=texts,
             text_type=text_type,
@@ -838,6 +924,7 @@ class EmbeddingModel:
             max_seq_length=max_seq_length,
             tenant_id=tenant_id,
             request_id=request_id,
+            batch_indices=batch_indices,
         )
 
     @classmethod
@@ -955,8 +1042,8 @@ class RerankingModel:
                 api_url=self.api_url,
             )
 
-            response = requests.post(
-                self.rerank_server_endpoint, json=rerank_request.model_dump()
+            response = get_model_server_client().post(
+                self.rerank_server_endpoint, json=rerank_request.model_dump(mode="json")
             )
             response.raise_for_status()
 
@@ -10,6 +10,7 @@ from pydantic import BaseModel
 from redis.lock import Lock as RedisLock
 
 from onyx.access.models import DocExternalAccess
+from onyx.configs.app_configs import DOC_PERMISSION_SYNC_DB_BATCH_SIZE
 from onyx.configs.constants import CELERY_GENERIC_BEAT_LOCK_TIMEOUT
 from onyx.configs.constants import CELERY_PERMISSIONS_SYNC_LOCK_TIMEOUT
 from onyx.configs.constants import OnyxRedisConstants
@@ -23,10 +24,12 @@ class PermissionSyncResult(NamedTuple):
     Attributes:
         num_updated: Number of documents successfully updated
         num_errors: Number of documents that failed to update
+        num_changed: Number of updated documents whose permissions actually changed
     """
 
     num_updated: int
     num_errors: int
+    num_changed: int = 0
 
 
 class RedisConnectorPermissionSyncPayload(BaseModel):
@@ -173,29 +176,21 @@ class RedisConnectorPermissionSync:
         credential_id: int,
         task_logger: Logger | None = None,
     ) -> PermissionSyncResult:
-        """Update permissions for documents.
+        """Update permissions for documents, in batches of DOC_PERMISSION_SYNC_DB_BATCH_SIZE.
+        Only the documents whose permissions changed are written.
 
         Returns:
             PermissionSyncResult containing counts of successful updates and errors
         """
         last_lock_time = time.monotonic()
 
-        document_update_permissions_fn = fetch_versioned_implementation(
+        document_update_permissions_batch_fn = fetch_versioned_implementation(
             "onyx.background.celery.tasks.doc_permission_syncing.tasks",
-            "document_update_permissions",
+            "document_update_permissions_batch",
         )
 
-        num_permissions = 0
-        num_errors = 0
-        # Create a task for each document permission sync
+        permissions_to_write: list[DocExternalAccess] = []
         for permissions in new_permissions:
-            current_time = time.monotonic()
-            if lock and current_time - last_lock_time >= (
-                CELERY_GENERIC_BEAT_LOCK_TIMEOUT / 4
-            ):
-                lock.reacquire()
-                last_lock_time = current_time
-
             if (
                 permissions.external_access.num_entries
                 > permissions.external_access.MAX_NUM_ENTRIES
@@ -212,33 +207,66 @@ class RedisConnectorPermissionSync:
                         f"{permissions.external_access.MAX_NUM_ENTRIES=}"
                     )
                 continue
+            permissions_to_write.append(permissions)
+
+        num_permissions = 0
+        num_errors = 0
+        num_changed = 0
+        for i in range(0, len(permissions_to_write), DOC_PERMISSION_SYNC_DB_BATCH_SIZE):
+            current_time = time.monotonic()
+            if lock and current_time - last_lock_time >= (
+                CELERY_GENERIC_BEAT_LOCK_TIMEOUT / 4
+            ):
+                lock.reacquire()
+                last_lock_time = current_time
+
+            batch = permissions_to_write[i : i + DOC_PERMISSION_SYNC_DB_BATCH_SIZE]
 
             # NOTE(rkuo): this used to fire a task instead of directly writing to the DB,
             # but the permissions can be excessively large if sent over the wire.
             # On the other hand, the downside of doing db updates here is that we can
             # block and fail if we can't make the calls to the DB ... but that's probably
             # a rare enough case to be acceptable.
-
-            # This can internally exception due to db issues but still continue
-            # Catch exceptions per-document to avoid breaking the entire sync
             try:
-                document_update_permissions_fn(
+                num_changed += document_update_permissions_batch_fn(
                     self.tenant_id,
-                    permissions,
+                    batch,
                     source_string,
                     connector_id,
                     credential_id,
                 )
-                num_permissions += 1
+                num_permissions += len(batch)
+                continue
             except Exception:
-                num_errors += 1
                 if task_logger:
                     task_logger.exception(
-                        f"Failed to update permissions for document {permissions.doc_id}"
+                        f"Failed to update permissions for a batch of {len(batch)} "
+                        "documents, retrying them one at a time"
                     )
-                # Continue processing other documents
 
-        return PermissionSyncResult(num_updated=num_permissions, num_errors=num_errors)
+            # Retry per-document to isolate the failing documents without breaking
+            # the entire sync
+            for permissions in batch:
+                try:
+                    num_changed += document_update_permissions_batch_fn(
+                        self.tenant_id,
+                        [permissions],
+                        source_string,
+                        connector_id,
+                        credential_id,
+                    )
+                    num_permissions += 1
+                except Exception:
+                    num_errors += 1
+                    if task_logger:
+                        task_logger.exception(
+                            f"Failed to update permissions for document {permissions.doc_id}"
+                        )
+                    # Continue processing other documents
+
+        return PermissionSyncResult(
+            num_updated=num_permissions, num_errors=num_errors, num_changed=num_changed
+        )
 
     def reset(self) -> None:
         self.redis.srem(OnyxRedisConstants.ACTIVE_FENCES, self.fence_key)
@@ -1,12 +1,21 @@
+import time
 from abc import ABC
 from abc import abstractmethod
+from collections.abc import Iterable
+from uuid import uuid4
 
 from celery import Celery
 from redis import Redis
 from redis.lock import Lock as RedisLock
 from sqlalchemy.orm import Session
 
+from onyx.configs.app_configs import VESPA_SYNC_BATCH_SIZE
+from onyx.configs.constants import CELERY_VESPA_SYNC_BEAT_LOCK_TIMEOUT
+from onyx.configs.constants import OnyxCeleryPriority
+from onyx.configs.constants import OnyxCeleryQueues
+from onyx.configs.constants import OnyxCeleryTask
 from onyx.redis.redis_pool import get_redis_client
+from onyx.utils.batching import batch_generator
 
 
 class RedisObjectHelper(ABC):
@@ -96,3 +105,65 @@ class RedisObjectHelper(ABC):
         connectors. In a single pass across multiple cc pairs, we only want a task
         for be created for a particular document id the first time we see it.
         The rest can be skipped."""
+
+    def _generate_metadata_sync_tasks(
+        self,
+        doc_ids: Iterable[str],
+        celery_app: Celery,
+        redis_client: Redis,
+        lock: RedisLock,
+        tenant_id: str,
+    ) -> tuple[int, int]:
+        """Sends metadata sync tasks for the given documents, in batches of
+        VESPA_SYNC_BATCH_SIZE documents per task (1 sends one task per document).
+        Every task is added to the taskset before it is sent.
+
+        Returns (number of tasks sent, number of documents)."""
+        last_lock_time = time.monotonic()
+        num_tasks_sent = 0
+        num_docs = 0
+
+        for doc_ids_batch in batch_generator(doc_ids, max(1, VESPA_SYNC_BATCH_SIZE)):
+            current_time = time.monotonic()
+            if current_time - last_lock_time >= (
+                CELERY_VESPA_SYNC_BEAT_LOCK_TIMEOUT / 4
+            ):
+                lock.reacquire()
+                last_lock_time = current_time
+
+            # celery's default task id format is "dd32ded3-00aa-4884-8b21-42f8332e7fac"
+            # the key for the result is "celery-task-meta-dd32ded3-00aa-4884-8b21-42f8332e7fac"
+            # we prefix the task id so it's easier to keep track of who created the task
+            # aka "documentset_1_6dd32ded3-00aa-4884-8b21-42f8332e7fac"
+            custom_task_id = f"{self.task_id_prefix}_{uuid4()}"
+
+            # add to the set BEFORE creating the task.
+            redis_client.sadd(self.taskset_key, custom_task_id)
+
+            if VESPA_SYNC_BATCH_SIZE > 1:
+                celery_app.send_task(
+                    OnyxCeleryTask.VESPA_METADATA_SYNC_BATCH_TASK,
+                    # the documents' last_modified isn't bumped by a document set or
+                    # user group change, so they must be synced even if they look synced
+                    kwargs=dict(
+                        document_ids=doc_ids_batch,
+                        tenant_id=tenant_id,
+                        skip_synced=False,
+                    ),
+                    queue=OnyxCeleryQueues.VESPA_METADATA_SYNC,
+                    task_id=custom_task_id,
+                    priority=OnyxCeleryPriority.MEDIUM,
+                )
+            else:
+                celery_app.send_task(
+                    OnyxCeleryTask.VESPA_METADATA_SYNC_TASK,
+                    kwargs=dict(document_id=doc_ids_batch[0], tenant_id=tenant_id),
+                    queue=OnyxCeleryQueues.VESPA_METADATA_SYNC,
+                    task_id=custom_task_id,
+                    priority=OnyxCeleryPriority.MEDIUM,
+                )
+
+            num_tasks_sent += 1
+            num_docs += len(doc_ids_batch)
+
+        return num_tasks_sent, num_docs
@@ -4,6 +4,7 @@ from fastapi import HTTPException
 from sqlalchemy.orm import Session
 
 from onyx.auth.users import current_admin_user
+from onyx.context.search.query_embedding_cache import invalidate_search_settings_cache
 from onyx.db.engine.sql_engine import get_session
 from onyx.db.llm import fetch_existing_embedding_providers
 from onyx.db.llm import remove_embedding_provider
@@ -106,4 +107,7 @@ def put_cloud_embedding_provider(
     _: User = Depends(current_admin_user),
     db_session: Session = Depends(get_session),
 ) -> CloudEmbeddingProvider:
-    return upsert_cloud_embedding_provider(db_session, provider)
+    embedding_provider = upsert_cloud_embedding_provider(db_session, provider)
+    # the API key of the active provider may have changed
+    invalidate_search_settings_cache()
+    return embedding_provider
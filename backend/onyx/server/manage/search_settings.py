@@ -9,6 +9,7 @@ from onyx.auth.users import current_user
 from onyx.configs.app_configs import DISABLE_INDEX_UPDATE_ON_SWAP
 from onyx.context.search.models import SavedSearchSettings
 from onyx.context.search.models import SearchSettingsCreationRequest
+from onyx.context.search.query_embedding_cache import invalidate_search_settings_cache
 from onyx.db.connector_credential_pair import get_connector_credential_pairs
 from onyx.db.connector_credential_pair import resync_cc_pair
 from onyx.db.engine.sql_engine import get_session
@@ -220,6 +221,7 @@ def update_saved_search_settings(
     update_current_search_settings(
         search_settings=search_settings, db_session=db_session
     )
+    invalidate_search_settings_cache()
 
 
 @router.get("/unstructured-api-key-set")
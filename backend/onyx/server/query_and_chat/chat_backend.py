@@ -2,6 +2,8 @@ import asyncio
 import datetime
 import json
 import os
+import threading
+from collections.abc import AsyncGenerator
 from collections.abc import Callable
 from collections.abc import Generator
 from datetime import timedelta
@@ -28,6 +30,7 @@ from onyx.chat.prompt_builder.citations_prompt import (
 )
 from onyx.chat.stop_signal_checker import set_fence
 from onyx.configs.app_configs import WEB_DOMAIN
+from onyx.configs.chat_configs import CHAT_ASYNC_STREAMING_ENABLED
 from onyx.configs.chat_configs import HARD_DELETE_CHATS
 from onyx.configs.constants import MessageType
 from onyx.configs.constants import MilestoneRecordType
@@ -47,8 +50,8 @@ from onyx.db.chat import set_as_latest_chat_message
 from onyx.db.chat import translate_db_message_to_chat_message_detail
 from onyx.db.chat import update_chat_session
 from onyx.db.chat_search import search_chat_sessions
+from onyx.db.engine.async_sql_engine import get_async_session_context_manager
 from onyx.db.engine.sql_engine import get_session
-from onyx.db.engine.sql_engine import get_session_with_tenant
 from onyx.db.feedback import create_chat_message_feedback
 from onyx.db.feedback import create_doc_retrieval_feedback
 from onyx.db.models import User
@@ -90,13 +93,16 @@ from onyx.server.query_and_chat.streaming_utils import translate_db_message_to_p
 from onyx.server.query_and_chat.token_limit import check_token_rate_limits
 from onyx.utils.headers import get_custom_tool_additional_request_headers
 from onyx.utils.logger import setup_logger
-from onyx.utils.telemetry import create_milestone_and_report
+from onyx.utils.telemetry import create_milestone_and_report_async
+from onyx.utils.threadpool_concurrency import iterate_in_background_thread
 from shared_configs.contextvars import get_current_tenant_id
 
 logger = setup_logger()
 
 router = APIRouter(prefix="/chat")
 
+_DISCONNECT_POLL_INTERVAL_SECONDS = 0.5
+
 
 @router.get("/get-user-chat-sessions")
 def get_user_chat_sessions(
@@ -422,8 +428,18 @@ async def is_connected(request: Request) -> Callable[[], bool]:
     return is_connected_sync
 
 
+async def _watch_for_disconnect(
+    request: Request, disconnected: threading.Event
+) -> None:
+    while not disconnected.is_set():
+        if await request.is_disconnected():
+            disconnected.set()
+            return
+        await asyncio.sleep(_DISCONNECT_POLL_INTERVAL_SECONDS)
+
+
 @router.post("/send-message")
-def handle_new_chat_message(
+async def handle_new_chat_message(
     chat_message_req: CreateChatMessageRequest,
     request: Request,
     user: User | None = Depends(current_chat_accessible_user),
@@ -445,7 +461,8 @@ def handle_new_chat_message(
         user (User | None): The current user, obtained via dependency injection.
         _ (None): Rate limit check is run if user/group/global rate limits are enabled.
         is_connected_func (Callable[[], bool]): Function to check client disconnection,
-            used to stop the streaming response if the client disconnects.
+            used to stop the streaming response if the client disconnects. Replaced by
+            a non-blocking check when CHAT_ASYNC_STREAMING_ENABLED is set.
 
     Returns:
         StreamingResponse: Streams the response to the new chat message.
@@ -456,28 +473,52 @@ def handle_new_chat_message(
     if not chat_message_req.message and not chat_message_req.use_existing_user_message:
         raise HTTPException(status_code=400, detail="Empty chat message is invalid")
 
-    with get_session_with_tenant(tenant_id=tenant_id) as db_session:
-        create_milestone_and_report(
+    async with get_async_session_context_manager(tenant_id) as async_db_session:
+        await create_milestone_and_report_async(
             user=user,
             distinct_id=user.email if user else tenant_id or "N/A",
             event_type=MilestoneRecordType.RAN_QUERY,
             properties=None,
-            db_session=db_session,
+            db_session=async_db_session,
         )
 
+    disconnected = threading.Event()
+
+    def is_not_disconnected() -> bool:
+        return not disconnected.is_set()
+
+    if CHAT_ASYNC_STREAMING_ENABLED:
+        # the flag is set by the event loop, checking it never blocks the stream
+        is_connected_func = is_not_disconnected
+
+    packets = stream_chat_message(
+        new_msg_req=chat_message_req,
+        user=user,
+        litellm_additional_headers=extract_headers(
+            request.headers, LITELLM_PASS_THROUGH_HEADERS
+        ),
+        custom_tool_additional_headers=get_custom_tool_additional_request_headers(
+            request.headers
+        ),
+        is_connected=is_connected_func,
+    )
+
     def stream_generator() -> Generator[str, None, None]:
         try:
-            for packet in stream_chat_message(
-                new_msg_req=chat_message_req,
-                user=user,
-                litellm_additional_headers=extract_headers(
-                    request.headers, LITELLM_PASS_THROUGH_HEADERS
-                ),
-                custom_tool_additional_headers=get_custom_tool_additional_request_headers(
-                    request.headers
-                ),
-                is_connected=is_connected_func,
-            ):
+            for packet in packets:
+                yield packet
+
+        except Exception as e:
+            logger.exception("Error in chat message streaming")
+            yield json.dumps({"error": str(e)})
+
+        finally:
+            logger.debug("Stream generator finished")
+
+    async def async_stream_generator() -> AsyncGenerator[str, None]:
+        watcher = asyncio.create_task(_watch_for_disconnect(request, disconnected))
+        try:
+            async for packet in iterate_in_background_thread(packets):
                 yield packet
 
         except Exception as e:
@@ -485,8 +526,14 @@ def handle_new_chat_message(
             yield json.dumps({"error": str(e)})
 
         finally:
+            disconnected.set()
+            watcher.cancel()
             logger.debug("Stream generator finished")
 
+    if CHAT_ASYNC_STREAMING_ENABLED:
+        return StreamingResponse(
+            async_stream_generator(), media_type="text/event-stream"
+        )
     return StreamingResponse(stream_generator(), media_type="text/event-stream")
 
 
@@ -7,6 +7,9 @@ from pydantic import BaseModel
 
 from onyx.agents.agent_search.dr.models import IterationAnswer
 from onyx.agents.agent_search.dr.models import IterationInstructions
+from onyx.agents.agent_search.dr.sub_agents.web_search.content_fetcher import (
+    fetch_web_contents,
+)
 from onyx.agents.agent_search.dr.sub_agents.web_search.providers import (
     get_default_provider,
 )
@@ -221,7 +224,7 @@ def _web_fetch_core(
         )
     )
 
-    docs = search_provider.contents(urls)
+    docs = fetch_web_contents(search_provider, urls)
     out = []
     for i, d in enumerate(docs):
         out.append(
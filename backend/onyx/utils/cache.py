@@ -0,0 +1,128 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from collections.abc import Hashable
+from collections.abc import Sequence
+from concurrent.futures import Future
+from typing import Generic
+from typing import TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """Thread-safe, size-bounded LRU cache whose entries expire after `ttl_seconds`.
+
+    Meant for small per-process caches in front of a slower shared store
+    (Postgres, Redis, a remote API). Not shared across processes."""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: K, value: V, ttl_seconds: float | None = None) -> None:
+        if self.max_size <= 0:
+            return
+
+        expires_at = time.monotonic() + (
+            ttl_seconds if ttl_seconds is not None else self.ttl_seconds
+        )
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: K) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class RequestCoalescer(Generic[K, V]):
+    """Deduplicates concurrent computations of the same keys.
+
+    The first caller for a key computes it, any caller asking for the same key
+    while that computation is in flight waits for (and shares) its result or exception.
+    Results are not kept once the computation finishes, pair this with a cache for that.
+    """
+
+    def __init__(self) -> None:
+        self._in_flight: dict[K, Future[V]] = {}
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: K, compute: Callable[[], V]) -> V:
+        return self.get_or_compute_many([key], lambda _: [compute()])[0]
+
+    def get_or_compute_many(
+        self,
+        keys: Sequence[K],
+        compute: Callable[[list[K]], list[V]],
+        timeout: float | None = None,
+    ) -> list[V]:
+        """`compute` is called at most once, with the (deduplicated) keys not already
+        being computed by another caller, and must return one value per key."""
+        futures: dict[K, Future[V]] = {}
+        owned_keys: list[K] = []
+        with self._lock:
+            for key in keys:
+                if key in futures:
+                    continue
+                future = self._in_flight.get(key)
+                if future is None:
+                    future = Future()
+                    self._in_flight[key] = future
+                    owned_keys.append(key)
+                futures[key] = future
+
+        if owned_keys:
+            try:
+                values = compute(owned_keys)
+                if len(values) != len(owned_keys):
+                    raise ValueError(
+                        f"Expected {len(owned_keys)} computed values, got {len(values)}"
+                    )
+                for key, value in zip(owned_keys, values):
+                    futures[key].set_result(value)
+            except BaseException as e:
+                for key in owned_keys:
+                    if not futures[key].done():
+                        futures[key].set_exception(e)
+                raise
+            finally:
+                with self._lock:
+                    for key in owned_keys:
+                        self._in_flight.pop(key, None)
+
+        return [futures[key].result(timeout=timeout) for key in keys]
@@ -1,3 +1,4 @@
+import asyncio
 import contextvars
 import threading
 import uuid
@@ -5,6 +6,7 @@ from enum import Enum
 from typing import cast
 
 import requests
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from onyx.configs.app_configs import DISABLE_TELEMETRY
@@ -14,6 +16,7 @@ from onyx.configs.constants import KV_INSTANCE_DOMAIN_KEY
 from onyx.configs.constants import MilestoneRecordType
 from onyx.db.engine.sql_engine import get_session_with_current_tenant
 from onyx.db.milestone import create_milestone_if_not_exists
+from onyx.db.milestone import create_milestone_if_not_exists_async
 from onyx.db.models import User
 from onyx.key_value_store.factory import get_kv_store
 from onyx.key_value_store.interface import KvKeyNotFoundError
@@ -176,3 +179,20 @@ def create_milestone_and_report(
             event=event_type,
             properties=properties,
         )
+
+
+async def create_milestone_and_report_async(
+    user: User | None,
+    distinct_id: str,
+    event_type: MilestoneRecordType,
+    properties: dict | None,
+    db_session: AsyncSession,
+) -> None:
+    _, is_new = await create_milestone_if_not_exists_async(user, event_type, db_session)
+    if is_new:
+        await asyncio.to_thread(
+            mt_cloud_telemetry,
+            distinct_id=distinct_id,
+            event=event_type,
+            properties=properties,
+        )
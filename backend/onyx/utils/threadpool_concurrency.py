@@ -3,10 +3,13 @@ import collections.abc
 import concurrent
 import contextvars
 import copy
+import queue
 import threading
+import time
 import uuid
 from collections.abc import Awaitable
 from collections.abc import Callable
+from collections.abc import Iterable
 from collections.abc import Iterator
 from collections.abc import MutableMapping
 from collections.abc import Sequence
@@ -422,3 +425,167 @@ def parallel_yield_from_funcs(
     yield from parallel_yield(
         [func_wrapper(func) for func in funcs], max_workers=max_workers
     )
+
+
+class _StageError:
+    def __init__(self, exception: BaseException):
+        self.exception = exception
+
+
+_STAGE_DONE = object()
+_STAGE_PUT_POLL_INTERVAL = 0.1
+
+
+def run_pipelined_stages(
+    items: Iterable[Any],
+    stages: Sequence[tuple[str, Callable[[Any], Any]]],
+    max_in_flight: int = 1,
+    stage_timings: dict[str, float] | None = None,
+) -> Iterator[Any]:
+    """
+    Streams `items` through `stages`, running every stage in its own background
+    thread so that stage i of item N overlaps with stage i+1 of item N-1.
+    Stages are connected by bounded queues of size `max_in_flight`, so a slow
+    downstream stage applies backpressure instead of letting work pile up in memory.
+
+    Outputs of the final stage are yielded, in order, on the calling thread. This
+    means work that is not thread-safe (e.g. anything using a DB session) should
+    be done by the consumer of this generator rather than inside a stage.
+
+    If a stage raises, the exception is re-raised from this generator and the
+    remaining stages are stopped. If `stage_timings` is provided, the total time
+    spent inside each stage function (keyed by stage name) is accumulated into it.
+    """
+    stop_event = threading.Event()
+    queues: list[queue.Queue[Any]] = [
+        queue.Queue(maxsize=max(1, max_in_flight)) for _ in range(len(stages) + 1)
+    ]
+    timings_lock = threading.Lock()
+
+    def _put(q: queue.Queue[Any], item: Any) -> bool:
+        while not stop_event.is_set():
+            try:
+                q.put(item, timeout=_STAGE_PUT_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _feed() -> None:
+        try:
+            for item in items:
+                if not _put(queues[0], item):
+                    return
+        except BaseException as e:
+            _put(queues[0], _StageError(e))
+            return
+        _put(queues[0], _STAGE_DONE)
+
+    def _run_stage(ind: int, name: str, func: Callable[[Any], Any]) -> None:
+        in_q, out_q = queues[ind], queues[ind + 1]
+        while not stop_event.is_set():
+            try:
+                item = in_q.get(timeout=_STAGE_PUT_POLL_INTERVAL)
+            except queue.Empty:
+                continue
+            if item is _STAGE_DONE or isinstance(item, _StageError):
+                _put(out_q, item)
+                return
+            start = time.monotonic()
+            try:
+                result = func(item)
+            except BaseException as e:
+                _put(out_q, _StageError(e))
+                return
+            finally:
+                if stage_timings is not None:
+                    with timings_lock:
+                        stage_timings[name] = stage_timings.get(name, 0.0) + (
+                            time.monotonic() - start
+                        )
+            if not _put(out_q, result):
+                return
+
+    threads = [
+        threading.Thread(target=contextvars.copy_context().run, args=(_feed,))
+    ] + [
+        threading.Thread(
+            target=contextvars.copy_context().run,
+            args=(_run_stage, ind, name, func),
+        )
+        for ind, (name, func) in enumerate(stages)
+    ]
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+
+    try:
+        while True:
+            item = queues[-1].get()
+            if item is _STAGE_DONE:
+                return
+            if isinstance(item, _StageError):
+                raise item.exception
+            yield item
+    finally:
+        stop_event.set()
+        for thread in threads:
+            thread.join()
+
+
+_ITERATION_DONE = object()
+
+
+async def iterate_in_background_thread(
+    iterator: Iterator[R],
+) -> collections.abc.AsyncGenerator[R, None]:
+    """
+    Async iteration over a blocking iterator (e.g. a generator streaming an LLM
+    response), which is advanced in its own background thread.
+
+    Unlike Starlette's `iterate_in_threadpool`, waiting for the next item doesn't
+    hold a token of the shared (size limited) AnyIO threadpool, so the number of
+    concurrently streamed responses isn't capped by the threadpool size and long
+    streams don't starve the sync endpoints. Items are handed to the event loop
+    without blocking either side.
+
+    Closing the async generator stops the iteration once the item currently being
+    produced is done. The iterator should check for this itself if producing an
+    item can take long (e.g. via an `is_connected` callback).
+    """
+    loop = asyncio.get_running_loop()
+    items: asyncio.Queue[Any] = asyncio.Queue()
+    stop_event = threading.Event()
+
+    def _put(item: Any) -> None:
+        try:
+            loop.call_soon_threadsafe(items.put_nowait, item)
+        except RuntimeError:
+            # the event loop is closed, nobody is listening anymore
+            stop_event.set()
+
+    def _produce() -> None:
+        try:
+            for item in iterator:
+                if stop_event.is_set():
+                    break
+                _put(item)
+        except BaseException as e:
+            _put(_StageError(e))
+            return
+        finally:
+            if isinstance(iterator, collections.abc.Generator):
+                iterator.close()
+        _put(_ITERATION_DONE)
+
+    run_in_background(_produce)
+    try:
+        while True:
+            item = await items.get()
+            if item is _ITERATION_DONE:
+                return
+            if isinstance(item, _StageError):
+                raise item.exception
+            yield item
+    finally:
+        stop_event.set()
@@ -0,0 +1,150 @@
+"""Load benchmark for the streaming modes of /chat/send-message.
+
+Usage (from the backend directory):
+
+python -m scripts.benchmark_chat_streaming --concurrency 20 40 80 160
+
+Serves N concurrent streams from a single in-process ASGI app, the way one API worker
+would. Each stream is a blocking generator standing in for the answer generation (a
+token every --token-interval seconds). It is streamed either the sync way
+(StreamingResponse over a sync generator, advanced in the shared AnyIO threadpool)
+or the async way (CHAT_ASYNC_STREAMING_ENABLED, advanced in a dedicated thread per
+stream). While the streams run, a sync endpoint is pinged to show whether the
+streams starve the rest of the API.
+
+With the sync mode, the wall time grows in steps of the threadpool size (40 by
+default) and pings wait for a free thread. With the async mode, all streams run at
+once and pings stay fast.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from collections.abc import AsyncGenerator
+from collections.abc import Generator
+from typing import Any
+
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+
+from onyx.utils.threadpool_concurrency import iterate_in_background_thread
+
+
+def _make_app(num_tokens: int, token_interval: float) -> FastAPI:
+    app = FastAPI()
+
+    def _answer_tokens() -> Generator[str, None, None]:
+        for i in range(num_tokens):
+            time.sleep(token_interval)  # blocking, like the LLM / tool calls
+            yield f'{{"ind": {i}, "obj": {{"type": "message_delta"}}}}\n'
+
+    @app.post("/sync-stream")
+    def sync_stream() -> StreamingResponse:
+        return StreamingResponse(_answer_tokens(), media_type="text/event-stream")
+
+    @app.post("/async-stream")
+    async def async_stream() -> StreamingResponse:
+        async def _stream() -> AsyncGenerator[str, None]:
+            async for packet in iterate_in_background_thread(_answer_tokens()):
+                yield packet
+
+        return StreamingResponse(_stream(), media_type="text/event-stream")
+
+    @app.get("/ping")
+    def ping() -> dict[str, str]:
+        return {"status": "ok"}
+
+    return app
+
+
+async def _request(app: FastAPI, method: str, path: str) -> float:
+    """Calls the ASGI app directly, returns the time until the response is complete."""
+    scope: dict[str, Any] = {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.3"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [],
+        "client": ("127.0.0.1", 12345),
+        "server": ("testserver", 80),
+    }
+    request_sent = False
+    response_done = asyncio.Event()
+
+    async def receive() -> dict[str, Any]:
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await response_done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: dict[str, Any]) -> None:
+        if message["type"] == "http.response.body" and not message.get("more_body"):
+            response_done.set()
+
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    return time.perf_counter() - start
+
+
+async def _run(
+    app: FastAPI, mode: str, concurrency: int, ping_interval: float
+) -> tuple[float, list[float]]:
+    streams = [
+        asyncio.create_task(_request(app, "POST", f"/{mode}-stream"))
+        for _ in range(concurrency)
+    ]
+
+    ping_latencies: list[float] = []
+    start = time.perf_counter()
+    while not all(stream.done() for stream in streams):
+        ping_latencies.append(await _request(app, "GET", "/ping"))
+        await asyncio.sleep(ping_interval)
+    await asyncio.gather(*streams)
+    return time.perf_counter() - start, ping_latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        nargs="+",
+        default=[20, 40, 80, 160],
+        help="Numbers of concurrent streams to benchmark",
+    )
+    parser.add_argument("--num-tokens", type=int, default=50)
+    parser.add_argument("--token-interval", type=float, default=0.02)
+    parser.add_argument("--ping-interval", type=float, default=0.05)
+    args = parser.parse_args()
+
+    app = _make_app(args.num_tokens, args.token_interval)
+    single_stream_time = args.num_tokens * args.token_interval
+    print(f"A single stream takes ~{single_stream_time:.2f}s")
+
+    for concurrency in args.concurrency:
+        for mode in ("sync", "async"):
+            wall_time, ping_latencies = asyncio.run(
+                _run(app, mode, concurrency, args.ping_interval)
+            )
+            p95_ping = (
+                statistics.quantiles(ping_latencies, n=20)[-1]
+                if len(ping_latencies) >= 2
+                else ping_latencies[0]
+            )
+            print(
+                f"{mode:<5} {concurrency:>4} streams: {wall_time:6.2f}s wall time, "
+                f"{concurrency / wall_time:6.1f} streams/s, "
+                f"p95 ping {p95_ping * 1000:7.1f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
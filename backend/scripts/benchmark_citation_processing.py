@@ -0,0 +1,118 @@
+"""Micro-benchmark for the streaming citation processors.
+
+Usage (from the backend directory):
+
+python -m scripts.benchmark_citation_processing --num-tokens 10000 20000 40000
+
+Feeds long synthetic answers with dense citations and code blocks token by token
+through CitationProcessor and CitationProcessorGraph. Per-token time should stay flat
+as the answer grows, if it increases with the answer length, processing has become
+quadratic again.
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime
+
+from onyx.chat.models import LlmDoc
+from onyx.chat.stream_processing.citation_processing import CitationProcessor
+from onyx.chat.stream_processing.citation_processing import CitationProcessorGraph
+from onyx.chat.stream_processing.utils import DocumentIdOrderMapping
+from onyx.configs.constants import DocumentSource
+
+NUM_DOCS = 20
+
+_WORDS = ["The", " answer", " is", " in", " the", " docs", ",", " see", ".", "\n"]
+_CITATIONS = ["[1]", " [2]", "[3, 4]", "[[5]]", " [12]", "[1,2,16]", "[99]"]
+_CODE_BLOCK = ["\n```", "\n", "print", "(x[1])", "\n", "```", "\n"]
+
+
+def _make_docs() -> list[LlmDoc]:
+    return [
+        LlmDoc(
+            document_id=f"doc_{i}",
+            content="Document content",
+            blurb=f"Document #{i}",
+            semantic_identifier=f"Doc {i}",
+            source_type=DocumentSource.WEB,
+            metadata={},
+            updated_at=datetime.now(),
+            link=f"https://{i}.com",
+            source_links={0: f"https://{i}.com"},
+            match_highlights=[],
+        )
+        for i in range(NUM_DOCS)
+    ]
+
+
+def _make_tokens(num_tokens: int, seed: int = 0) -> list[str]:
+    """Synthetic answer where roughly one in five tokens is a citation,
+    with a code block every few hundred tokens."""
+    rng = random.Random(seed)
+    tokens: list[str] = []
+    while len(tokens) < num_tokens:
+        roll = rng.random()
+        if roll < 0.2:
+            citation = rng.choice(_CITATIONS)
+            # split some citations across tokens like LLMs do
+            split_at = rng.randint(0, len(citation))
+            tokens.extend(t for t in (citation[:split_at], citation[split_at:]) if t)
+        elif roll < 0.203:
+            tokens.extend(_CODE_BLOCK)
+        else:
+            tokens.append(rng.choice(_WORDS))
+    return tokens[:num_tokens]
+
+
+def _time_processor(tokens: list[str], graph: bool) -> float:
+    docs = _make_docs()
+    start = time.perf_counter()
+    if graph:
+        graph_processor = CitationProcessorGraph(context_docs=docs, stop_stream=None)
+        for token in tokens:
+            graph_processor.process_token(token)
+        graph_processor.process_token(None)
+    else:
+        mapping = DocumentIdOrderMapping(
+            order_mapping={doc.document_id: i + 1 for i, doc in enumerate(docs)}
+        )
+        processor = CitationProcessor(
+            context_docs=docs,
+            final_doc_id_to_rank_map=mapping,
+            display_doc_id_to_rank_map=mapping,
+            stop_stream=None,
+        )
+        for token in tokens:
+            for _ in processor.process_token(token):
+                pass
+        for _ in processor.process_token(None):
+            pass
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--num-tokens",
+        type=int,
+        nargs="+",
+        default=[10_000, 20_000, 40_000],
+        help="Answer lengths (in tokens) to benchmark",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for num_tokens in args.num_tokens:
+        tokens = _make_tokens(num_tokens)
+        for graph in (False, True):
+            best = min(_time_processor(tokens, graph) for _ in range(args.repeat))
+            name = "CitationProcessorGraph" if graph else "CitationProcessor"
+            print(
+                f"{name:<24} {num_tokens:>7} tokens: {best * 1000:8.1f}ms total, "
+                f"{best / num_tokens * 1e6:6.2f}us/token"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,8 @@ from typing import Any
 from typing import List
 from urllib.parse import urlparse
 
+from shared_configs.enums import EmbeddingResponseEncoding
+
 # Used for logging
 SLACK_CHANNEL_ID = "channel_id"
 
@@ -54,6 +56,26 @@ DISABLE_RERANK_FOR_STREAMING = (
 # model. If torch finds more threads on its own, this value is not used.
 MIN_THREADS_ML_MODELS = int(os.environ.get("MIN_THREADS_ML_MODELS") or 1)
 
+# Gather concurrent small /bi-encoder-embed requests for the same local model into a
+# single forward pass. Requests are held for at most MODEL_SERVER_MICRO_BATCH_MAX_WAIT_MS
+# and batches are capped at MODEL_SERVER_MICRO_BATCH_MAX_SIZE texts.
+MODEL_SERVER_MICRO_BATCHING_ENABLED = (
+    os.environ.get("MODEL_SERVER_MICRO_BATCHING_ENABLED", "").lower() == "true"
+)
+MODEL_SERVER_MICRO_BATCH_MAX_SIZE = int(
+    os.environ.get("MODEL_SERVER_MICRO_BATCH_MAX_SIZE") or 32
+)
+MODEL_SERVER_MICRO_BATCH_MAX_WAIT_MS = float(
+    os.environ.get("MODEL_SERVER_MICRO_BATCH_MAX_WAIT_MS") or 5
+)
+
+# Encoding of the embeddings returned by /bi-encoder-embed: "json" (lists of floats) or a
+# raw "float32" / "float16" buffer, which is much cheaper to encode and decode for large
+# batches. float16 halves the payload at the cost of precision.
+MODEL_SERVER_EMBEDDING_RESPONSE_ENCODING = EmbeddingResponseEncoding(
+    os.environ.get("MODEL_SERVER_EMBEDDING_RESPONSE_ENCODING") or "json"
+)
+
 # Model server that has indexing only set will throw exception if used for reranking
 # or intent classification
 INDEXING_ONLY = os.environ.get("INDEXING_ONLY", "").lower() == "true"
@@ -19,3 +19,10 @@ class RerankerProvider(str, Enum):
 class EmbedTextType(str, Enum):
     QUERY = "query"
     PASSAGE = "passage"
+
+
+class EmbeddingResponseEncoding(str, Enum):
+    JSON = "json"
+    # raw little-endian buffer of the (num_texts, dim) embedding matrix
+    FLOAT32 = "float32"
+    FLOAT16 = "float16"
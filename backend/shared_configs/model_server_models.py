@@ -1,6 +1,7 @@
 from pydantic import BaseModel
 
 from shared_configs.enums import EmbeddingProvider
+from shared_configs.enums import EmbeddingResponseEncoding
 from shared_configs.enums import EmbedTextType
 from shared_configs.enums import RerankerProvider
 
@@ -37,6 +38,9 @@ class EmbedRequest(BaseModel):
     # will be ignored for other providers.
     reduced_dimension: int | None = None
 
+    # how the model server returns the embeddings, see shared_configs.utils.encode_embeddings
+    response_encoding: EmbeddingResponseEncoding = EmbeddingResponseEncoding.JSON
+
     # This disables the "model_" protected namespace for pydantic
     model_config = {"protected_namespaces": ()}
 
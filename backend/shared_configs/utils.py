@@ -1,11 +1,46 @@
 from typing import TypeVar
 
+import numpy as np
+
+from shared_configs.enums import EmbeddingResponseEncoding
+
 
 T = TypeVar("T")
 
+# sent along with binary encoded embeddings, the number of embeddings follows from it
+EMBEDDING_DIM_HEADER = "X-Onyx-Embedding-Dim"
+BINARY_EMBEDDINGS_MEDIA_TYPE = "application/octet-stream"
+
 
 def batch_list(
     lst: list[T],
     batch_size: int,
 ) -> list[list[T]]:
     return [lst[i : i + batch_size] for i in range(0, len(lst), batch_size)]
+
+
+def _embedding_dtype(encoding: EmbeddingResponseEncoding) -> np.dtype:
+    if encoding == EmbeddingResponseEncoding.FLOAT32:
+        return np.dtype("<f4")
+    if encoding == EmbeddingResponseEncoding.FLOAT16:
+        return np.dtype("<f2")
+    raise ValueError(f"{encoding} is not a binary embedding encoding")
+
+
+def encode_embeddings(
+    embeddings: list[list[float]] | np.ndarray, encoding: EmbeddingResponseEncoding
+) -> tuple[bytes, int]:
+    """Returns the raw buffer of the embeddings and their dimension."""
+    matrix = np.asarray(embeddings, dtype=_embedding_dtype(encoding))
+    if matrix.ndim != 2:
+        raise ValueError(f"Expected a 2D embedding matrix, got shape {matrix.shape}")
+    return matrix.tobytes(), matrix.shape[1]
+
+
+def decode_embeddings(
+    buffer: bytes, dim: int, encoding: EmbeddingResponseEncoding
+) -> np.ndarray:
+    """Returns the embeddings as a read-only (num_embeddings, dim) matrix backed by
+    `buffer`, no values are copied. Callers that need lists convert the rows with
+    `tolist()` themselves."""
+    return np.frombuffer(buffer, dtype=_embedding_dtype(encoding)).reshape(-1, dim)
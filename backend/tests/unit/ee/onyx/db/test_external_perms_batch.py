@@ -0,0 +1,151 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from sqlalchemy.dialects import postgresql
+
+from ee.onyx.db.document import external_access_fingerprint
+from ee.onyx.db.document import upsert_document_external_perms_batch
+from onyx.access.models import DocExternalAccess
+from onyx.access.models import ExternalAccess
+from onyx.configs.constants import DocumentSource
+from onyx.redis.redis_connector_doc_perm_sync import RedisConnectorPermissionSync
+
+
+def _access(
+    doc_id: str,
+    emails: set[str] | None = None,
+    groups: set[str] | None = None,
+    is_public: bool = False,
+) -> DocExternalAccess:
+    return DocExternalAccess(
+        doc_id=doc_id,
+        external_access=ExternalAccess(
+            external_user_emails=emails or set(),
+            external_user_group_ids=groups or set(),
+            is_public=is_public,
+        ),
+    )
+
+
+def test_external_access_fingerprint_ignores_order_and_duplicates() -> None:
+    assert external_access_fingerprint(
+        ["b@x.com", "a@x.com", "a@x.com"], ["g2", "g1"], False
+    ) == external_access_fingerprint({"a@x.com", "b@x.com"}, ["g1", "g2"], False)
+    assert external_access_fingerprint([], [], False) != external_access_fingerprint(
+        [], [], True
+    )
+    # an email must not be confused with a group
+    assert external_access_fingerprint(["a"], [], False) != external_access_fingerprint(
+        [], ["a"], False
+    )
+
+
+def test_upsert_batch_only_writes_changed_documents() -> None:
+    stored_rows = [
+        SimpleNamespace(
+            id="unchanged",
+            external_user_emails=["a@x.com"],
+            external_user_group_ids=["google_drive_g1"],
+            is_public=False,
+        ),
+        SimpleNamespace(
+            id="changed",
+            external_user_emails=["a@x.com"],
+            external_user_group_ids=[],
+            is_public=False,
+        ),
+    ]
+    db_session = MagicMock()
+    db_session.execute.side_effect = [stored_rows, None]
+
+    result = upsert_document_external_perms_batch(
+        db_session=db_session,
+        doc_external_accesses=[
+            _access("unchanged", {"a@x.com"}, {"g1"}),
+            _access("changed", {"a@x.com", "b@x.com"}),
+            _access("new", is_public=True),
+        ],
+        source_type=DocumentSource.GOOGLE_DRIVE,
+    )
+
+    assert result.changed_doc_ids == ["changed"]
+    assert result.new_doc_ids == ["new"]
+    # one select and a single multi-row upsert
+    assert db_session.execute.call_count == 2
+    upsert_params = (
+        db_session.execute.call_args_list[1]
+        .args[0]
+        .compile(dialect=postgresql.dialect())
+        .params
+    )
+    assert "unchanged" not in upsert_params.values()
+    db_session.commit.assert_called_once()
+
+
+def test_upsert_batch_skips_the_write_when_nothing_changed() -> None:
+    db_session = MagicMock()
+    db_session.execute.return_value = [
+        SimpleNamespace(
+            id="doc",
+            external_user_emails=None,
+            external_user_group_ids=None,
+            is_public=True,
+        )
+    ]
+
+    result = upsert_document_external_perms_batch(
+        db_session=db_session,
+        doc_external_accesses=[_access("doc", is_public=True)],
+        source_type=DocumentSource.GOOGLE_DRIVE,
+    )
+
+    assert result.changed_doc_ids == [] and result.new_doc_ids == []
+    assert db_session.execute.call_count == 1
+    db_session.commit.assert_not_called()
+
+
+def test_update_db_batches_and_isolates_failing_documents() -> None:
+    calls: list[list[str]] = []
+
+    def _update_batch(
+        tenant_id: str,
+        permissions_batch: list[DocExternalAccess],
+        source_type_str: str,
+        connector_id: int,
+        credential_id: int,
+    ) -> int:
+        doc_ids = [permissions.doc_id for permissions in permissions_batch]
+        calls.append(doc_ids)
+        if "bad" in doc_ids:
+            raise RuntimeError("write failed")
+        return len(doc_ids)
+
+    permissions = [_access(f"doc_{i}") for i in range(3)] + [_access("bad")]
+    with (
+        patch(
+            "onyx.redis.redis_connector_doc_perm_sync.fetch_versioned_implementation",
+            return_value=_update_batch,
+        ),
+        patch(
+            "onyx.redis.redis_connector_doc_perm_sync.DOC_PERMISSION_SYNC_DB_BATCH_SIZE",
+            2,
+        ),
+    ):
+        result = RedisConnectorPermissionSync("tenant", 1, MagicMock()).update_db(
+            lock=None,
+            new_permissions=permissions,
+            source_string=DocumentSource.GOOGLE_DRIVE.value,
+            connector_id=1,
+            credential_id=1,
+        )
+
+    assert calls == [
+        ["doc_0", "doc_1"],
+        ["doc_2", "bad"],
+        ["doc_2"],
+        ["bad"],
+    ]
+    assert result.num_updated == 3
+    assert result.num_errors == 1
+    assert result.num_changed == 3
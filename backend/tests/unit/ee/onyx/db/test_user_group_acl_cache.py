@@ -0,0 +1,71 @@
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import MagicMock
+from unittest.mock import patch
+from uuid import uuid4
+
+from ee.onyx.db.user_group import update_user_group
+from ee.onyx.server.user_group.models import UserGroupUpdate
+from onyx.access import acl_cache
+from onyx.access.acl_cache import get_cached_acl
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.values: dict[str, Any] = {}
+
+    def get(self, key: str) -> Any:
+        return self.values.get(key)
+
+    def set(self, key: str, value: Any, ex: int | None = None) -> None:
+        self.values[key] = value.encode() if isinstance(value, str) else value
+
+    def incrby(self, key: str, amount: int) -> None:
+        self.values[key] = str(int(self.values.get(key, 0)) + amount).encode()
+
+
+def test_removing_a_group_member_invalidates_their_cached_acl() -> None:
+    removed_user_id = uuid4()
+    remaining_user_id = uuid4()
+    user_group = SimpleNamespace(
+        id=1,
+        is_up_to_date=True,
+        users=[
+            SimpleNamespace(id=removed_user_id),
+            SimpleNamespace(id=remaining_user_id),
+        ],
+        cc_pairs=[],
+    )
+    db_session = MagicMock()
+    db_session.scalar.return_value = user_group
+
+    group_members = {removed_user_id, remaining_user_id}
+
+    def _resolve_acl() -> set[str]:
+        acl = {"user_email:removed@x.com"}
+        if removed_user_id in group_members:
+            acl.add("group:engineering")
+        return acl
+
+    redis_client = _FakeRedis()
+    acl_cache._acl_cache.clear()
+    with patch.object(
+        acl_cache, "get_redis_client", lambda tenant_id=None: redis_client
+    ), patch.object(acl_cache, "get_current_tenant_id", lambda: "tenant"):
+        assert "group:engineering" in get_cached_acl(str(removed_user_id), _resolve_acl)
+
+        group_members.discard(removed_user_id)
+        update_user_group(
+            db_session=db_session,
+            user=None,
+            user_group_id=user_group.id,
+            user_group_update=UserGroupUpdate(
+                user_ids=[remaining_user_id], cc_pair_ids=[]
+            ),
+        )
+
+        db_session.commit.assert_called_once()
+        assert get_cached_acl(str(removed_user_id), _resolve_acl) == {
+            "user_email:removed@x.com"
+        }
+    acl_cache._acl_cache.clear()
@@ -10,8 +10,12 @@ import pytest
 from model_server.encoders import embed_text
 from model_server.encoders import local_rerank
 from model_server.encoders import process_embed_request
+from model_server.encoders import route_bi_encoder_embed
+from shared_configs.enums import EmbeddingResponseEncoding
 from shared_configs.enums import EmbedTextType
 from shared_configs.model_server_models import EmbedRequest
+from shared_configs.utils import decode_embeddings
+from shared_configs.utils import EMBEDDING_DIM_HEADER
 
 
 @pytest.mark.asyncio
@@ -103,3 +107,42 @@ async def test_concurrent_embeddings() -> None:
         # However, the developer may still introduce unnecessary blocking above the mock and this test will
         # still pass as long as it's less than (7 - 5) / 5 seconds
         assert end_time - start_time < 7
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "encoding,tolerance",
+    [
+        (EmbeddingResponseEncoding.FLOAT32, 1e-7),
+        (EmbeddingResponseEncoding.FLOAT16, 1e-3),
+    ],
+)
+async def test_bi_encoder_embed_binary_response(
+    encoding: EmbeddingResponseEncoding, tolerance: float
+) -> None:
+    embed_request = EmbedRequest(
+        texts=["test1", "test2"],
+        model_name="fake-local-model",
+        max_context_length=512,
+        normalize_embeddings=True,
+        text_type=EmbedTextType.PASSAGE,
+        response_encoding=encoding,
+    )
+    request = MagicMock()
+    request.app.state.gpu_type = "NONE"
+
+    with patch("model_server.encoders.get_embedding_model") as mock_get_model:
+        mock_model = MagicMock()
+        mock_model.encode.return_value = [[0.1, 0.2, 0.3], [0.4, 0.5, 0.6]]
+        mock_get_model.return_value = mock_model
+
+        response = await route_bi_encoder_embed(request, embed_request)
+
+    embeddings = decode_embeddings(
+        response.body,  # type: ignore[union-attr]
+        dim=int(response.headers[EMBEDDING_DIM_HEADER]),  # type: ignore[union-attr]
+        encoding=encoding,
+    )
+    assert embeddings.shape == (2, 3)
+    for embedding, expected in zip(embeddings, [[0.1, 0.2, 0.3], [0.4, 0.5, 0.6]]):
+        assert embedding == pytest.approx(expected, abs=tolerance)
@@ -0,0 +1,118 @@
+import asyncio
+from collections.abc import Callable
+
+import pytest
+
+from model_server.micro_batching import EmbeddingMicroBatcher
+from shared_configs.model_server_models import Embedding
+
+
+def _fake_encode(calls: list[list[str]]) -> Callable[[list[str]], list[Embedding]]:
+    def encode(texts: list[str]) -> list[Embedding]:
+        calls.append(texts)
+        return [[float(len(text))] for text in texts]
+
+    return encode
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_encode() -> None:
+    batcher = EmbeddingMicroBatcher(max_batch_size=32, max_wait_ms=20)
+    calls: list[list[str]] = []
+    encode = _fake_encode(calls)
+
+    results = await asyncio.gather(
+        batcher.embed("model", ["a"], encode),
+        batcher.embed("model", ["bb", "ccc"], encode),
+        batcher.embed("model", ["dddd"], encode),
+    )
+
+    assert results == [[[1.0]], [[2.0], [3.0]], [[4.0]]]
+    assert calls == [["a", "bb", "ccc", "dddd"]]
+
+
+@pytest.mark.asyncio
+async def test_requests_for_different_keys_are_not_mixed() -> None:
+    batcher = EmbeddingMicroBatcher(max_batch_size=32, max_wait_ms=20)
+    calls: list[list[str]] = []
+    encode = _fake_encode(calls)
+
+    await asyncio.gather(
+        batcher.embed(("model", True), ["a"], encode),
+        batcher.embed(("model", False), ["bb"], encode),
+    )
+
+    assert sorted(calls) == [["a"], ["bb"]]
+
+
+@pytest.mark.asyncio
+async def test_full_batch_is_flushed_without_waiting() -> None:
+    batcher = EmbeddingMicroBatcher(max_batch_size=2, max_wait_ms=10_000)
+    calls: list[list[str]] = []
+    encode = _fake_encode(calls)
+
+    results = await asyncio.wait_for(
+        asyncio.gather(
+            batcher.embed("model", ["a"], encode),
+            batcher.embed("model", ["bb"], encode),
+            # already a full batch on its own
+            batcher.embed("model", ["x", "yy"], encode),
+        ),
+        timeout=5,
+    )
+
+    assert results == [[[1.0]], [[2.0]], [[1.0], [2.0]]]
+    assert sorted(calls) == [["a", "bb"], ["x", "yy"]]
+
+
+@pytest.mark.asyncio
+async def test_encode_errors_are_propagated_to_every_request() -> None:
+    batcher = EmbeddingMicroBatcher(max_batch_size=32, max_wait_ms=5)
+
+    def failing_encode(texts: list[str]) -> list[Embedding]:
+        raise RuntimeError("encode failure")
+
+    results = await asyncio.gather(
+        batcher.embed("model", ["a"], failing_encode),
+        batcher.embed("model", ["b"], failing_encode),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_request_that_does_not_fit_starts_the_next_batch() -> None:
+    batcher = EmbeddingMicroBatcher(max_batch_size=4, max_wait_ms=20)
+    calls: list[list[str]] = []
+    encode = _fake_encode(calls)
+
+    results = await asyncio.gather(
+        batcher.embed("model", ["a", "bb", "ccc"], encode),
+        batcher.embed("model", ["x", "yy"], encode),
+        batcher.embed("model", ["z"], encode),
+    )
+
+    assert results == [[[1.0], [2.0], [3.0]], [[1.0], [2.0]], [[1.0]]]
+    assert calls == [["a", "bb", "ccc"], ["x", "yy", "z"]]
+    assert all(len(call) <= 4 for call in calls)
+
+
+@pytest.mark.asyncio
+async def test_running_batches_are_referenced_until_done() -> None:
+    batcher = EmbeddingMicroBatcher(max_batch_size=2, max_wait_ms=10_000)
+    calls: list[list[str]] = []
+    encode = _fake_encode(calls)
+
+    request = asyncio.ensure_future(batcher.embed("model", ["a"], encode))
+    await asyncio.sleep(0)
+    full = asyncio.ensure_future(batcher.embed("model", ["c"], encode))
+    await asyncio.sleep(0)
+    assert len(batcher._running_batches) == 1
+
+    assert await asyncio.wait_for(asyncio.gather(request, full), timeout=5) == [
+        [[1.0]],
+        [[1.0]],
+    ]
+    await asyncio.sleep(0)
+    assert not batcher._running_batches
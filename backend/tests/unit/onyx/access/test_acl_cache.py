@@ -0,0 +1,64 @@
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from onyx.access import acl_cache
+from onyx.access.acl_cache import get_cached_acl
+from onyx.access.acl_cache import invalidate_acl_cache
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.values: dict[str, Any] = {}
+
+    def get(self, key: str) -> Any:
+        return self.values.get(key)
+
+    def set(self, key: str, value: Any, ex: int | None = None) -> None:
+        self.values[key] = value.encode() if isinstance(value, str) else value
+
+    def incrby(self, key: str, amount: int) -> None:
+        self.values[key] = str(int(self.values.get(key, 0)) + amount).encode()
+
+
+@pytest.fixture
+def fake_redis() -> Any:
+    redis_client = _FakeRedis()
+    acl_cache._acl_cache.clear()
+    with patch.object(
+        acl_cache, "get_redis_client", lambda tenant_id=None: redis_client
+    ):
+        yield redis_client
+    acl_cache._acl_cache.clear()
+
+
+def test_acl_is_cached_until_invalidated(fake_redis: _FakeRedis) -> None:
+    num_computes = 0
+
+    def _compute() -> set[str]:
+        nonlocal num_computes
+        num_computes += 1
+        return {"user_email:a@b.com", f"group:{num_computes}"}
+
+    assert get_cached_acl("user_1", _compute) == {"user_email:a@b.com", "group:1"}
+    assert get_cached_acl("user_1", _compute) == {"user_email:a@b.com", "group:1"}
+    assert num_computes == 1
+
+    # another process only has the Redis layer
+    acl_cache._acl_cache.clear()
+    assert get_cached_acl("user_1", _compute) == {"user_email:a@b.com", "group:1"}
+    assert num_computes == 1
+
+    invalidate_acl_cache("tenant")
+    assert get_cached_acl("user_1", _compute) == {"user_email:a@b.com", "group:2"}
+    assert num_computes == 2
+
+
+def test_acl_cache_falls_back_without_redis() -> None:
+    def _broken_redis(tenant_id: str | None = None) -> Any:
+        raise ConnectionError("redis is down")
+
+    with patch.object(acl_cache, "get_redis_client", _broken_redis):
+        assert get_cached_acl("user_1", lambda: {"PUBLIC"}) == {"PUBLIC"}
+        invalidate_acl_cache("tenant")
@@ -0,0 +1,76 @@
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from typing import Any
+from unittest.mock import MagicMock
+
+from onyx.background.celery.tasks.docprocessing.utils import IndexingScheduleState
+from onyx.configs.constants import DocumentSource
+from onyx.db.enums import ConnectorCredentialPairStatus
+from onyx.db.enums import IndexingStatus
+from onyx.db.enums import IndexModelStatus
+
+_NOW = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def _cc_pair(cc_pair_id: int, refresh_freq: int | None = 3600) -> Any:
+    cc_pair = MagicMock()
+    cc_pair.id = cc_pair_id
+    cc_pair.status = ConnectorCredentialPairStatus.ACTIVE
+    cc_pair.indexing_trigger = None
+    cc_pair.connector.id = cc_pair_id
+    cc_pair.connector.source = DocumentSource.WEB
+    cc_pair.connector.refresh_freq = refresh_freq
+    return cc_pair
+
+
+def _attempt(status: IndexingStatus, age: timedelta) -> Any:
+    attempt = MagicMock()
+    attempt.status = status
+    attempt.time_updated = _NOW - age
+    return attempt
+
+
+def _state(
+    cc_pairs: list[Any], recent_attempts: dict[int, list[Any]]
+) -> IndexingScheduleState:
+    search_settings = MagicMock()
+    search_settings.status = IndexModelStatus.PRESENT
+    return IndexingScheduleState(
+        search_settings=search_settings,
+        cc_pairs={cc_pair.id: cc_pair for cc_pair in cc_pairs},
+        recent_attempts=recent_attempts,
+        cc_pair_ids_with_active_attempts={3},
+        current_db_time=_NOW,
+    )
+
+
+def test_repeated_error_state_depends_on_refresh_freq() -> None:
+    failed = _attempt(IndexingStatus.FAILED, timedelta(hours=2))
+    state = _state(
+        [_cc_pair(1), _cc_pair(2, refresh_freq=None)],
+        {1: [failed] * 4, 2: [failed]},
+    )
+
+    assert not state.is_in_repeated_error_state(1)
+    assert state.is_in_repeated_error_state(2)
+
+    state.recent_attempts[1].append(failed)
+    assert state.is_in_repeated_error_state(1)
+
+
+def test_should_index_uses_last_attempt_and_refresh_freq() -> None:
+    state = _state(
+        [_cc_pair(1), _cc_pair(2), _cc_pair(3)],
+        {
+            1: [_attempt(IndexingStatus.SUCCESS, timedelta(minutes=5))],
+            2: [_attempt(IndexingStatus.SUCCESS, timedelta(hours=2))],
+        },
+    )
+
+    assert not state.should_index(1, secondary_index_building=False)
+    assert state.should_index(2, secondary_index_building=False)
+    # never indexed
+    assert state.should_index(3, secondary_index_building=False)
+    assert state.has_active_attempt(3)
+    assert not state.has_active_attempt(1)
@@ -0,0 +1,33 @@
+import random
+
+from onyx.background.celery.tasks.pruning.streaming_diff import (
+    generate_ids_missing_from_source,
+)
+from onyx.background.celery.tasks.pruning.streaming_diff import SortedIdSpool
+
+
+def test_sorted_id_spool_spills_and_merges() -> None:
+    ids = [f"doc_{i}" for i in range(100)] + ["with\nnewline", "ünïcode"]
+    shuffled_ids = ids * 2
+    random.Random(0).shuffle(shuffled_ids)
+
+    with SortedIdSpool(max_ids_in_memory=7) as spool:
+        for start in range(0, len(shuffled_ids), 5):
+            spool.add(shuffled_ids[start : start + 5])
+
+        assert spool.num_runs > 1
+        assert spool.max_buffered_ids <= 7
+        assert list(spool) == sorted(ids)
+
+
+def test_generate_ids_missing_from_source() -> None:
+    indexed_ids = ["a", "b", "c", "e", "g"]
+    source_ids = ["b", "d", "e", "f", "h"]
+
+    assert list(generate_ids_missing_from_source(indexed_ids, source_ids)) == [
+        "a",
+        "c",
+        "g",
+    ]
+    assert list(generate_ids_missing_from_source(indexed_ids, [])) == indexed_ids
+    assert list(generate_ids_missing_from_source([], source_ids)) == []
@@ -0,0 +1,188 @@
+from collections.abc import Iterator
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import MagicMock
+from unittest.mock import patch
+from uuid import UUID
+from uuid import uuid4
+
+import pytest
+
+from onyx.background.celery.tasks.user_file_processing import tasks
+from onyx.background.celery.tasks.user_file_processing.tasks import (
+    _reuse_processed_duplicate,
+)
+from onyx.configs.app_configs import LARGE_CHUNK_RATIO
+from onyx.db.enums import UserFileStatus
+from onyx.document_index.document_index_utils import get_uuid_from_chunk_info
+
+
+def _donor_chunk(
+    donor_id: UUID, chunk_id: int, large_chunk_reference_ids: list[int] | None = None
+) -> dict[str, Any]:
+    return {
+        "fields": {
+            "document_id": str(donor_id),
+            "chunk_id": chunk_id,
+            "content": f"chunk {chunk_id}",
+            "embeddings": {"full_chunk": [0.1, 0.2]},
+            "access_control_list": {"user_email:donor@x.com": 1},
+            "user_project": [1],
+            "document_sets": {},
+            "large_chunk_reference_ids": large_chunk_reference_ids or [],
+        }
+    }
+
+
+@pytest.fixture
+def donor() -> SimpleNamespace:
+    return SimpleNamespace(id=uuid4(), chunk_count=3, token_count=42)
+
+
+@pytest.fixture
+def fed_fields(donor: SimpleNamespace) -> Iterator[list[dict[str, Any]]]:
+    fed: list[dict[str, Any]] = []
+    with (
+        patch.object(tasks, "HttpxPool"),
+        patch.object(
+            tasks, "get_processed_user_file_by_content_hash", return_value=donor
+        ),
+        patch.object(
+            tasks,
+            "get_access_for_user_files",
+            side_effect=lambda user_file_ids, db_session: {
+                user_file_ids[0]: SimpleNamespace(
+                    to_acl=lambda: {"user_email:new@x.com"}
+                )
+            },
+        ),
+        patch.object(
+            tasks,
+            "fetch_user_project_ids_for_user_files",
+            side_effect=lambda user_file_ids, db_session: {user_file_ids[0]: [7]},
+        ),
+        patch.object(tasks, "get_default_file_store"),
+        patch.object(tasks, "store_user_file_plaintext"),
+        patch.object(
+            tasks,
+            "batch_feed_vespa_chunk_fields",
+            side_effect=lambda **kwargs: fed.extend(kwargs["chunk_fields"].values()),
+        ),
+    ):
+        yield fed
+
+
+def _user_file() -> SimpleNamespace:
+    return SimpleNamespace(
+        id=uuid4(),
+        file_id="file",
+        name="report.pdf",
+        content_hash="abc",
+        chunk_count=None,
+        token_count=None,
+        status=UserFileStatus.PROCESSING,
+        last_project_sync_at=None,
+    )
+
+
+def test_copies_donor_chunks_with_the_new_files_access_fields(
+    donor: SimpleNamespace, fed_fields: list[dict[str, Any]]
+) -> None:
+    user_file = _user_file()
+    donor_chunks = [_donor_chunk(donor.id, i) for i in range(2)] + [
+        _donor_chunk(donor.id, 0, large_chunk_reference_ids=[0, 1])
+    ]
+    with patch.object(tasks, "_visit_chunks", return_value=(donor_chunks, None)):
+        reused = _reuse_processed_duplicate(
+            user_file=user_file,  # type: ignore[arg-type]
+            index_name="test_index",
+            tenant_id="tenant",
+            db_session=MagicMock(),
+        )
+
+    assert reused
+    assert len(fed_fields) == 3
+    for fields in fed_fields:
+        assert fields["document_id"] == str(user_file.id)
+        assert fields["access_control_list"] == {"user_email:new@x.com": 1}
+        assert fields["user_project"] == [7]
+        assert fields["embeddings"] == {"full_chunk": [0.1, 0.2]}
+    # the donor's chunks are left untouched
+    assert donor_chunks[0]["fields"]["document_id"] == str(donor.id)
+
+    assert user_file.status == UserFileStatus.COMPLETED
+    assert user_file.chunk_count == donor.chunk_count
+    assert user_file.token_count == donor.token_count
+
+
+def test_incomplete_donor_chunks_fall_back_to_processing(
+    donor: SimpleNamespace, fed_fields: list[dict[str, Any]]
+) -> None:
+    user_file = _user_file()
+    donor_chunks = [_donor_chunk(donor.id, 0), _donor_chunk(donor.id, 2)]
+    with patch.object(tasks, "_visit_chunks", return_value=(donor_chunks, None)):
+        reused = _reuse_processed_duplicate(
+            user_file=user_file,  # type: ignore[arg-type]
+            index_name="test_index",
+            tenant_id="tenant",
+            db_session=MagicMock(),
+        )
+
+    assert not reused
+    assert fed_fields == []
+    assert user_file.status == UserFileStatus.PROCESSING
+
+
+def test_failed_copy_removes_the_copied_chunks(
+    donor: SimpleNamespace, fed_fields: list[dict[str, Any]]
+) -> None:
+    user_file = _user_file()
+    donor_chunks = [_donor_chunk(donor.id, i) for i in range(3)]
+    with (
+        patch.object(tasks, "_visit_chunks", return_value=(donor_chunks, None)),
+        patch.object(
+            tasks,
+            "batch_feed_vespa_chunk_fields",
+            side_effect=RuntimeError("vespa is down"),
+        ),
+        patch.object(tasks, "delete_vespa_chunks") as delete_chunks,
+    ):
+        reused = _reuse_processed_duplicate(
+            user_file=user_file,  # type: ignore[arg-type]
+            index_name="test_index",
+            tenant_id="tenant",
+            db_session=MagicMock(),
+        )
+
+    assert not reused
+    assert sorted(delete_chunks.call_args.kwargs["doc_chunk_ids"]) == sorted(
+        get_uuid_from_chunk_info(
+            document_id=str(user_file.id),
+            chunk_id=chunk_id,
+            tenant_id="tenant",
+            large_chunk_id=None,
+        )
+        for chunk_id in range(3)
+    )
+    assert user_file.status == UserFileStatus.PROCESSING
+    assert user_file.chunk_count is None
+
+
+def test_copied_large_chunks_keep_their_large_chunk_uuid() -> None:
+    chunk_uuid = tasks._get_copied_chunk_uuid(
+        {
+            "document_id": "doc",
+            "chunk_id": LARGE_CHUNK_RATIO,
+            "large_chunk_reference_ids": list(
+                range(LARGE_CHUNK_RATIO, 2 * LARGE_CHUNK_RATIO)
+            ),
+        },
+        tenant_id="tenant",
+    )
+
+    assert chunk_uuid == get_uuid_from_chunk_info(
+        document_id="doc",
+        chunk_id=LARGE_CHUNK_RATIO,
+        tenant_id="tenant",
+        large_chunk_id=1,
+    )
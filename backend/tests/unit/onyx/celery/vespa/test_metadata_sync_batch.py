@@ -0,0 +1,153 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime
+from datetime import timezone
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+
+from onyx.background.celery.tasks.vespa import tasks
+from onyx.background.celery.tasks.vespa.tasks import vespa_metadata_sync_batch_task
+from onyx.configs.constants import OnyxCeleryTask
+from onyx.redis.redis_document_set import RedisDocumentSet
+
+_NOW = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def _doc(doc_id: str, synced: bool = False) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=doc_id,
+        chunk_count=1,
+        boost=0,
+        hidden=False,
+        last_modified=_NOW,
+        last_synced=_NOW if synced else None,
+    )
+
+
+@contextmanager
+def _patched_sync(
+    docs: list[SimpleNamespace], failing_doc_ids: set[str]
+) -> Iterator[dict[str, Any]]:
+    state: dict[str, Any] = {"updated": [], "synced": []}
+
+    def _update_single(doc_id: str, **kwargs: Any) -> int:
+        state["updated"].append((doc_id, kwargs["fields"].access))
+        if doc_id in failing_doc_ids:
+            raise RuntimeError(f"failed to update {doc_id}")
+        return 1
+
+    retry_index = MagicMock()
+    retry_index.update_single.side_effect = _update_single
+    with (
+        patch.object(tasks, "get_session_with_current_tenant"),
+        patch.object(tasks, "get_active_search_settings"),
+        patch.object(tasks, "get_default_document_index"),
+        patch.object(tasks, "HttpxPool"),
+        patch.object(tasks, "RetryDocumentIndex", return_value=retry_index),
+        patch.object(
+            tasks,
+            "get_documents_by_ids",
+            side_effect=lambda db_session, document_ids: [
+                doc for doc in docs if doc.id in document_ids
+            ],
+        ),
+        patch.object(tasks, "fetch_document_sets_for_documents", return_value=[]),
+        # the access resolver leaves out "no_access"
+        patch.object(
+            tasks,
+            "get_access_for_documents",
+            side_effect=lambda doc_ids, db_session: {
+                doc_id: f"access_{doc_id}"
+                for doc_id in doc_ids
+                if doc_id != "no_access"
+            },
+        ),
+        patch.object(tasks, "get_null_document_access", return_value="null_access"),
+        patch.object(
+            tasks,
+            "mark_documents_as_synced",
+            side_effect=lambda doc_ids, db_session: state["synced"].extend(doc_ids),
+        ),
+        patch.object(vespa_metadata_sync_batch_task, "retry") as retry,
+    ):
+        state["retry"] = retry
+        yield state
+
+
+def test_batch_marks_successful_docs_synced_and_retries_only_failures() -> None:
+    docs = [_doc("ok_1"), _doc("bad"), _doc("no_access"), _doc("already", synced=True)]
+    with _patched_sync(docs, failing_doc_ids={"bad"}) as state:
+        result = vespa_metadata_sync_batch_task.run(
+            [doc.id for doc in docs], tenant_id="tenant"
+        )
+
+    assert result is False
+    assert sorted(doc_id for doc_id, _ in state["updated"]) == [
+        "bad",
+        "no_access",
+        "ok_1",
+    ]
+    assert dict(state["updated"])["no_access"] == "null_access"
+    assert sorted(state["synced"]) == ["no_access", "ok_1"]
+    assert state["retry"].call_args.kwargs["kwargs"] == {
+        "document_ids": ["bad"],
+        "tenant_id": "tenant",
+        "skip_synced": True,
+    }
+
+
+def test_batch_without_skip_synced_syncs_every_doc() -> None:
+    docs = [_doc("a", synced=True), _doc("b", synced=True)]
+    with _patched_sync(docs, failing_doc_ids=set()) as state:
+        result = vespa_metadata_sync_batch_task.run(
+            ["a", "b"], tenant_id="tenant", skip_synced=False
+        )
+
+    assert result is True
+    assert sorted(state["synced"]) == ["a", "b"]
+    state["retry"].assert_not_called()
+
+
+@pytest.mark.parametrize("batch_size,expected_batches", [(2, 3), (1, 5)])
+def test_document_set_generator_sends_batched_tasks(
+    batch_size: int, expected_batches: int
+) -> None:
+    doc_ids = [f"doc_{i}" for i in range(5)]
+    db_session = MagicMock()
+    db_session.scalars.return_value.yield_per.return_value = iter(doc_ids)
+    celery_app = MagicMock()
+    redis_client = MagicMock()
+
+    with (
+        patch("onyx.redis.redis_object_helper.get_redis_client"),
+        patch("onyx.redis.redis_object_helper.VESPA_SYNC_BATCH_SIZE", batch_size),
+        patch("onyx.redis.redis_document_set.construct_document_id_select_by_docset"),
+    ):
+        result = RedisDocumentSet("tenant", 1).generate_tasks(
+            max_tasks=1000,
+            celery_app=celery_app,
+            db_session=db_session,
+            redis_client=redis_client,
+            lock=MagicMock(),
+            tenant_id="tenant",
+        )
+
+    assert result == (expected_batches, len(doc_ids))
+    assert redis_client.sadd.call_count == expected_batches
+    sent = celery_app.send_task.call_args_list
+    if batch_size > 1:
+        assert {call.args[0] for call in sent} == {
+            OnyxCeleryTask.VESPA_METADATA_SYNC_BATCH_TASK
+        }
+        assert [call.kwargs["kwargs"]["document_ids"] for call in sent] == [
+            ["doc_0", "doc_1"],
+            ["doc_2", "doc_3"],
+            ["doc_4"],
+        ]
+        assert all(call.kwargs["kwargs"]["skip_synced"] is False for call in sent)
+    else:
+        assert [call.kwargs["kwargs"]["document_id"] for call in sent] == doc_ids
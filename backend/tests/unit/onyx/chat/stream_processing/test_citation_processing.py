@@ -5,6 +5,11 @@ import pytest
 from onyx.chat.models import LlmDoc
 from onyx.chat.models import OnyxAnswerPiece
 from onyx.chat.stream_processing.citation_processing import CitationProcessor
+from onyx.chat.stream_processing.citation_processing import CodeFenceTracker
+from onyx.chat.stream_processing.citation_processing import (
+    ends_with_possible_citation,
+)
+from onyx.chat.stream_processing.citation_processing import in_code_block
 from onyx.chat.stream_processing.utils import DocumentIdOrderMapping
 from onyx.configs.constants import DocumentSource
 from onyx.server.query_and_chat.streaming_models import CitationInfo
@@ -537,3 +542,45 @@ def test_citation_extraction(
     ] == expected_citations, (
         f"Test '{test_name}' failed: Citations do not match expected output."
     )
+
+
+@pytest.mark.parametrize(
+    "tokens",
+    [
+        ["text ", "```", "python\n", "code", "\n```", " after"],
+        ["`", "`", "`", "\ncode\n", "``", "`"],
+        ["````", "text", "``````", "`````", "``", "a```b```c"],
+    ],
+)
+def test_code_fence_tracker_matches_full_scan(tokens: list[str]) -> None:
+    tracker = CodeFenceTracker()
+    text = ""
+    for token in tokens:
+        tracker.update(token)
+        text += token
+        assert tracker.in_code_block == in_code_block(text)
+
+
+@pytest.mark.parametrize(
+    "text,expected",
+    [
+        ("some text [", True),
+        ("some text [[1", True),
+        ("some text [1, 2", True),
+        ("some text [1,", True),
+        ("some text [1]", False),
+        ("some text [a", False),
+        ("no brackets", False),
+        ("digits [" + "1" * 5000 + "x", False),
+    ],
+)
+def test_ends_with_possible_citation(text: str, expected: bool) -> None:
+    processor = CitationProcessor(
+        context_docs=mock_docs,
+        final_doc_id_to_rank_map=DocumentIdOrderMapping(order_mapping={}),
+        display_doc_id_to_rank_map=DocumentIdOrderMapping(order_mapping={}),
+    )
+    assert (
+        ends_with_possible_citation(text, processor.possible_citation_tail_pattern)
+        == expected
+    )
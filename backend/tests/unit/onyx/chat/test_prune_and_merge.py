@@ -1,10 +1,16 @@
+from unittest.mock import patch
+
 import pytest
 
+from onyx.chat.prune_and_merge import _apply_pruning
 from onyx.chat.prune_and_merge import _merge_sections
+from onyx.chat.prune_and_merge import _section_token_count_cache
 from onyx.configs.constants import DocumentSource
 from onyx.context.search.models import InferenceChunk
 from onyx.context.search.models import InferenceSection
 from onyx.context.search.utils import inference_section_from_chunks
+from onyx.llm.interfaces import LLMConfig
+from onyx.natural_language_processing.utils import BaseTokenizer
 
 
 # This large test accounts for all of the following:
@@ -224,3 +230,60 @@ def test_merge_minimal_sections(
     merged_sections = _merge_sections(sections)
     assert merged_sections[0].combined_content == expected_content
     assert merged_sections[0].center_chunk == expected_center_chunk
+
+
+class _WordTokenizer(BaseTokenizer):
+    """One token per whitespace separated word, counts encode calls."""
+
+    def __init__(self) -> None:
+        self.encode_calls = 0
+
+    def encode(self, string: str) -> list[int]:
+        self.encode_calls += 1
+        return list(range(len(string.split())))
+
+    def tokenize(self, string: str) -> list[str]:
+        return string.split()
+
+    def decode(self, tokens: list[int]) -> str:
+        return " ".join("word" for _ in tokens)
+
+
+def test_apply_pruning_memoizes_token_counts_and_copies_sections() -> None:
+    _section_token_count_cache.clear()
+    tokenizer = _WordTokenizer()
+    sections = [
+        inference_section_from_chunks(
+            center_chunk=chunk,
+            chunks=[chunk],
+        )
+        for chunk in [DOC_1_TOP_CHUNK, DOC_1_MID_CHUNK, DOC_1_BOTTOM_CHUNK]
+    ]
+    original_contents = [section.combined_content for section in sections]
+    llm_config = LLMConfig(
+        model_provider="openai", model_name="gpt-4o", temperature=0.0
+    )
+
+    def _prune() -> list[InferenceSection]:
+        return _apply_pruning(
+            sections=sections,
+            section_relevance_list=None,
+            keep_sections=[],
+            token_limit=10_000,
+            is_manually_selected_docs=False,
+            use_sections=True,
+            using_tool_message=False,
+            llm_config=llm_config,
+        )
+
+    with patch("onyx.chat.prune_and_merge.get_tokenizer", return_value=tokenizer):
+        first = _prune()
+        num_encode_calls = tokenizer.encode_calls
+        second = _prune()
+
+    assert num_encode_calls == len(sections)
+    # second turn over the same sections is served from the cache
+    assert tokenizer.encode_calls == num_encode_calls
+    assert [s.combined_content for s in first] == [s.combined_content for s in second]
+    assert not any(pruned is section for pruned in first for section in sections)
+    assert [section.combined_content for section in sections] == original_contents
@@ -0,0 +1,74 @@
+import threading
+import time
+from typing import Any
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+
+from onyx.connectors.slack import metadata_cache
+from onyx.connectors.slack.metadata_cache import SlackMetadataCache
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.values: dict[str, Any] = {}
+
+    def get(self, key: str) -> Any:
+        return self.values.get(key)
+
+    def set(self, key: str, value: Any, ex: int | None = None) -> None:
+        self.values[key] = value.encode() if isinstance(value, str) else value
+
+
+@pytest.fixture
+def fake_redis() -> Any:
+    redis_client = _FakeRedis()
+    metadata_cache._local_cache.clear()
+    metadata_cache._workspace_ids.clear()
+    with patch.object(
+        metadata_cache, "get_redis_client", lambda tenant_id=None: redis_client
+    ):
+        yield redis_client
+    metadata_cache._local_cache.clear()
+    metadata_cache._workspace_ids.clear()
+
+
+def _make_client() -> MagicMock:
+    client = MagicMock()
+    client.token = "xoxp-token"
+    client.auth_test.return_value = {"team_id": "T123"}
+
+    def _users_info(user: str) -> MagicMock:
+        # slow enough for concurrent lookups to overlap
+        time.sleep(0.05)
+        response = MagicMock()
+        response.__getitem__.side_effect = lambda key: {
+            "user": {"id": user, "profile": {"display_name": f"name_{user}"}}
+        }[key]
+        return response
+
+    client.users_info.side_effect = _users_info
+    return client
+
+
+def test_user_info_is_cached_per_workspace(fake_redis: _FakeRedis) -> None:
+    client = _make_client()
+    cache = SlackMetadataCache(client)
+
+    threads = [
+        threading.Thread(target=cache.get_user_info, args=("U1",)) for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert cache.get_user_info("U1")["profile"]["display_name"] == "name_U1"
+    assert client.users_info.call_count == 1
+    assert client.auth_test.call_count == 1
+
+    # another process only has the Redis layer
+    metadata_cache._local_cache.clear()
+    other_client = _make_client()
+    assert SlackMetadataCache(other_client).get_user_info("U1")["id"] == "U1"
+    assert other_client.users_info.call_count == 0
@@ -0,0 +1,54 @@
+from onyx.connectors.web.crawl_frontier import CrawlFrontier
+from onyx.connectors.web.crawl_frontier import normalize_url
+
+
+def test_normalize_url() -> None:
+    assert (
+        normalize_url("HTTPS://Docs.Example.com:443/guide/?b=2&a=1#section")
+        == "https://docs.example.com/guide?a=1&b=2"
+    )
+    assert normalize_url("http://example.com") == "http://example.com/"
+    assert normalize_url("http://example.com:8080/") == "http://example.com:8080/"
+    assert normalize_url("https://example.com/#!/page") == "https://example.com/#!/page"
+
+
+def test_frontier_deduplicates_equivalent_urls() -> None:
+    frontier = CrawlFrontier(max_in_flight_per_host=1)
+    assert frontier.add("https://example.com/docs/")
+    assert not frontier.add("https://EXAMPLE.com/docs#intro")
+    assert frontier.num_seen() == 1
+
+    # e.g. the target of a redirect
+    assert frontier.mark_seen("https://example.com/other")
+    assert not frontier.add("https://example.com/other/")
+
+
+def test_frontier_limits_in_flight_requests_per_host() -> None:
+    frontier = CrawlFrontier(max_in_flight_per_host=1)
+    for url in [
+        "https://a.com/1",
+        "https://a.com/2",
+        "https://b.com/1",
+    ]:
+        frontier.add(url)
+
+    assert frontier.next_url() == "https://a.com/1"
+    assert frontier.next_url() == "https://b.com/1"
+    # a.com is busy and b.com has nothing left
+    assert frontier.next_url() is None
+    assert frontier.seconds_until_ready() is None
+
+    frontier.release("https://a.com/1")
+    assert frontier.next_url() == "https://a.com/2"
+    assert not frontier.has_pending()
+
+
+def test_frontier_enforces_host_request_interval() -> None:
+    frontier = CrawlFrontier(max_in_flight_per_host=2, min_host_interval_seconds=60)
+    frontier.add("https://a.com/1")
+    frontier.add("https://a.com/2")
+
+    assert frontier.next_url() == "https://a.com/1"
+    assert frontier.next_url() is None
+    seconds_until_ready = frontier.seconds_until_ready()
+    assert seconds_until_ready is not None and 59 < seconds_until_ready <= 60
@@ -0,0 +1,168 @@
+from collections.abc import Iterator
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from onyx.configs.constants import DocumentSource
+from onyx.connectors.models import Document
+from onyx.connectors.models import TextSection
+from onyx.connectors.web import connector as web_connector
+from onyx.connectors.web.connector import _CrawledPage
+from onyx.connectors.web.connector import _CrawlWorkerState
+from onyx.connectors.web.connector import WEB_CONNECTOR_VALID_SETTINGS
+from onyx.connectors.web.connector import WebConnector
+
+_PAGE_TEXT = "Static documentation content. " * 20
+
+
+def _html_response(url: str, text: str = _PAGE_TEXT) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response.url = url
+    response.headers = CaseInsensitiveDict({"Content-Type": "text/html"})
+    response._content = (
+        f"<html><head><title>Docs</title></head><body><p>{text}</p></body></html>"
+    ).encode()
+    response.encoding = "utf-8"
+    return response
+
+
+def _doc(url: str, text: str) -> Document:
+    return Document(
+        id=url,
+        sections=[TextSection(link=url, text=text)],
+        source=DocumentSource.WEB,
+        semantic_identifier="Docs",
+        metadata={},
+    )
+
+
+@pytest.fixture
+def connector() -> WebConnector:
+    return WebConnector(
+        base_url="https://example.com/",
+        web_connector_type=WEB_CONNECTOR_VALID_SETTINGS.SINGLE.value,
+    )
+
+
+@pytest.fixture
+def worker() -> Iterator[_CrawlWorkerState]:
+    worker = _CrawlWorkerState("https://example.com/")
+    worker._http_session = MagicMock()
+    worker._http_session.cookies = requests.cookies.RequestsCookieJar()
+    yield worker
+
+
+def test_http_session_matches_browser_settings() -> None:
+    with patch.object(
+        web_connector,
+        "_get_oauth_headers",
+        return_value={"Authorization": "Bearer token"},
+    ):
+        session = _CrawlWorkerState("https://example.com/").http_session()
+
+    assert session.headers["Authorization"] == "Bearer token"
+    assert session.verify is False
+
+    web_connector._handle_session_cookies(session, "https://example.com/docs")
+    assert session.cookies.get("consent", domain="example.com") == "true"
+
+
+def test_static_page_is_fetched_without_browser(
+    connector: WebConnector, worker: _CrawlWorkerState
+) -> None:
+    worker._http_session.get.return_value = _html_response("https://example.com/new")
+
+    with patch.object(connector, "_crawl_page_with_browser") as crawl_with_browser:
+        crawled_page = connector._crawl_page("https://example.com/old", worker, None)
+
+    crawl_with_browser.assert_not_called()
+    assert crawled_page.final_url == "https://example.com/new"
+    # documents are identified by the URL after redirects, like in the browser
+    assert crawled_page.doc is not None
+    assert crawled_page.doc.id == "https://example.com/new"
+    assert worker._http_session.cookies.get("consent") == "true"
+
+
+@pytest.mark.parametrize(
+    "http_result",
+    [
+        requests.exceptions.SSLError("certificate verify failed"),
+        _html_response("https://example.com/app", text="Loading..."),
+    ],
+)
+def test_browser_is_used_if_fetching_without_it_fails(
+    connector: WebConnector,
+    worker: _CrawlWorkerState,
+    http_result: Exception | requests.Response,
+) -> None:
+    if isinstance(http_result, Exception):
+        worker._http_session.get.side_effect = http_result
+    else:
+        worker._http_session.get.return_value = http_result
+    browser_page = _CrawledPage(
+        url="https://example.com/app",
+        final_url="https://example.com/app",
+        doc=_doc("https://example.com/app", _PAGE_TEXT),
+    )
+
+    with patch.object(
+        connector, "_crawl_page_with_browser", return_value=browser_page
+    ) as crawl_with_browser:
+        crawled_page = connector._crawl_page("https://example.com/app", worker, None)
+
+    # a single attempt, TLS errors are not retried without the browser
+    worker._http_session.get.assert_called_once()
+    crawl_with_browser.assert_called_once_with("https://example.com/app", worker)
+    assert crawled_page is browser_page
+
+
+def test_concurrent_crawl_deduplicates_redirects_and_content(
+    connector: WebConnector,
+) -> None:
+    crawled_pages = {
+        "https://example.com/a": _CrawledPage(
+            url="https://example.com/a",
+            final_url="https://example.com/a",
+            doc=_doc("https://example.com/a", "page a"),
+        ),
+        # redirects to an already indexed page
+        "https://example.com/old-a": _CrawledPage(
+            url="https://example.com/old-a",
+            final_url="https://example.com/a",
+            doc=_doc("https://example.com/a", "page a"),
+        ),
+        # same content under another URL
+        "https://example.com/a#!/copy": _CrawledPage(
+            url="https://example.com/a#!/copy",
+            final_url="https://example.com/a#!/copy",
+            doc=_doc("https://example.com/a#!/copy", "page a"),
+        ),
+        "https://example.com/b": _CrawledPage(
+            url="https://example.com/b",
+            final_url="https://example.com/b",
+            doc=_doc("https://example.com/b", "page b"),
+        ),
+    }
+    connector.to_visit_list = list(crawled_pages)
+
+    with patch.object(web_connector, "check_internet_connection"), patch.object(
+        web_connector, "WEB_CONNECTOR_CONCURRENCY", 1
+    ), patch.object(
+        web_connector, "WEB_CONNECTOR_PAGE_CACHE_TTL_SECONDS", 0
+    ), patch.object(
+        web_connector, "WEB_CONNECTOR_MIN_HOST_REQUEST_INTERVAL_SECONDS", 0
+    ), patch.object(
+        connector,
+        "_crawl_page",
+        side_effect=lambda url, worker, page_cache: crawled_pages[url],
+    ):
+        docs = [doc for batch in connector._load_concurrently() for doc in batch]
+
+    assert sorted(doc.id for doc in docs) == [
+        "https://example.com/a",
+        "https://example.com/b",
+    ]
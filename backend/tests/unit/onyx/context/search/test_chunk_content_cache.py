@@ -0,0 +1,203 @@
+from collections.abc import Iterator
+from datetime import datetime
+from datetime import timezone
+from typing import Any
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+
+from onyx.configs.constants import DocumentSource
+from onyx.context.search import chunk_content_cache
+from onyx.context.search.chunk_content_cache import cached_id_based_retrieval
+from onyx.context.search.models import IndexFilters
+from onyx.context.search.models import InferenceChunkUncleaned
+from onyx.document_index.interfaces import VespaChunkRequest
+
+_SYNCED_AT = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+class _FakeDocumentIndex:
+    def __init__(self, doc_id_to_num_chunks: dict[str, int]) -> None:
+        self.index_name = "test_index"
+        self.doc_id_to_num_chunks = doc_id_to_num_chunks
+        self.requests: list[VespaChunkRequest] = []
+
+    def id_based_retrieval(
+        self,
+        chunk_requests: list[VespaChunkRequest],
+        filters: IndexFilters,
+        batch_retrieval: bool = False,
+    ) -> list[InferenceChunkUncleaned]:
+        self.requests.extend(chunk_requests)
+        chunks = []
+        for request in chunk_requests:
+            num_chunks = self.doc_id_to_num_chunks.get(request.document_id, 0)
+            max_chunk_ind = (
+                num_chunks - 1
+                if request.max_chunk_ind is None
+                else min(request.max_chunk_ind, num_chunks - 1)
+            )
+            for chunk_id in range(request.min_chunk_ind or 0, max_chunk_ind + 1):
+                chunks.append(_make_chunk(request.document_id, chunk_id))
+        return chunks
+
+
+def _make_chunk(document_id: str, chunk_id: int) -> InferenceChunkUncleaned:
+    return InferenceChunkUncleaned(
+        chunk_id=chunk_id,
+        document_id=document_id,
+        semantic_identifier=document_id,
+        title=document_id,
+        blurb="",
+        content=f"{document_id}\n{document_id} chunk {chunk_id}",
+        source_links={0: ""},
+        section_continuation=chunk_id > 0,
+        source_type=DocumentSource.WEB,
+        boost=0,
+        recency_bias=1.0,
+        score=None,
+        hidden=False,
+        metadata={},
+        match_highlights=[],
+        updated_at=None,
+        image_file_id=None,
+        doc_summary="",
+        chunk_context="",
+        metadata_suffix=None,
+    )
+
+
+@pytest.fixture
+def document_versions() -> Iterator[dict[str, Any]]:
+    versions: dict[str, Any] = {}
+    chunk_content_cache._chunk_cache.clear()
+    chunk_content_cache._last_chunk_id_cache.clear()
+    with patch.object(
+        chunk_content_cache,
+        "fetch_synced_document_versions",
+        side_effect=lambda document_ids, db_session: {
+            document_id: versions[document_id]
+            for document_id in document_ids
+            if document_id in versions
+        },
+    ):
+        yield versions
+
+
+def _retrieve(
+    document_index: _FakeDocumentIndex,
+    chunk_requests: list[VespaChunkRequest],
+    access_control_list: list[str] | None = None,
+) -> list[tuple[str, int]]:
+    chunks = cached_id_based_retrieval(
+        document_index=document_index,  # type: ignore[arg-type]
+        chunk_requests=chunk_requests,
+        filters=IndexFilters(access_control_list=access_control_list),
+        db_session=MagicMock(),
+    )
+    return sorted((chunk.document_id, chunk.chunk_id) for chunk in chunks)
+
+
+def test_serves_cached_content_until_the_document_changes(
+    document_versions: dict[str, Any],
+) -> None:
+    document_index = _FakeDocumentIndex({"doc": 5})
+    document_versions["doc"] = (_SYNCED_AT, _SYNCED_AT, 5)
+    request = VespaChunkRequest(document_id="doc", min_chunk_ind=1, max_chunk_ind=3)
+
+    first = _retrieve(document_index, [request])
+    second = _retrieve(document_index, [request])
+
+    assert first == second == [("doc", 1), ("doc", 2), ("doc", 3)]
+    assert len(document_index.requests) == 1
+
+    # re-indexed and synced again
+    document_versions["doc"] = (_SYNCED_AT, datetime.now(timezone.utc), 5)
+    _retrieve(document_index, [request])
+    assert len(document_index.requests) == 2
+
+
+def test_cached_chunks_are_cleaned_copies(
+    document_versions: dict[str, Any],
+) -> None:
+    document_index = _FakeDocumentIndex({"doc": 1})
+    document_versions["doc"] = (_SYNCED_AT, _SYNCED_AT, 1)
+    request = VespaChunkRequest(document_id="doc")
+
+    first = cached_id_based_retrieval(
+        document_index=document_index,  # type: ignore[arg-type]
+        chunk_requests=[request],
+        filters=IndexFilters(access_control_list=None),
+        db_session=MagicMock(),
+    )
+    first[0].score = 10
+    second = cached_id_based_retrieval(
+        document_index=document_index,  # type: ignore[arg-type]
+        chunk_requests=[request],
+        filters=IndexFilters(access_control_list=None),
+        db_session=MagicMock(),
+    )
+
+    assert second[0].content == "doc chunk 0"
+    assert second[0].score is None
+    assert len(document_index.requests) == 1
+
+
+def test_ranges_past_the_end_of_the_document_are_served_once_the_end_is_known(
+    document_versions: dict[str, Any],
+) -> None:
+    document_index = _FakeDocumentIndex({"doc": 3})
+    document_versions["doc"] = (_SYNCED_AT, _SYNCED_AT, 3)
+
+    _retrieve(
+        document_index,
+        [VespaChunkRequest(document_id="doc", min_chunk_ind=0, max_chunk_ind=10)],
+    )
+    assert _retrieve(document_index, [VespaChunkRequest(document_id="doc")]) == [
+        ("doc", 0),
+        ("doc", 1),
+        ("doc", 2),
+    ]
+    assert _retrieve(
+        document_index,
+        [VespaChunkRequest(document_id="doc", min_chunk_ind=2, max_chunk_ind=4)],
+    ) == [("doc", 2)]
+    assert len(document_index.requests) == 1
+
+
+def test_only_missing_requests_are_fetched(
+    document_versions: dict[str, Any],
+) -> None:
+    document_index = _FakeDocumentIndex({"a": 2, "b": 2})
+    document_versions["a"] = (_SYNCED_AT, _SYNCED_AT, 2)
+    document_versions["b"] = (_SYNCED_AT, _SYNCED_AT, 2)
+    request_a = VespaChunkRequest(document_id="a", min_chunk_ind=0, max_chunk_ind=1)
+    request_b = VespaChunkRequest(document_id="b", min_chunk_ind=0, max_chunk_ind=1)
+
+    _retrieve(document_index, [request_a])
+    assert _retrieve(document_index, [request_a, request_b]) == [
+        ("a", 0),
+        ("a", 1),
+        ("b", 0),
+        ("b", 1),
+    ]
+    assert document_index.requests == [request_a, request_b]
+
+
+def test_unsynced_documents_and_access_filtered_requests_bypass_the_cache(
+    document_versions: dict[str, Any],
+) -> None:
+    document_index = _FakeDocumentIndex({"synced": 1, "unsynced": 1})
+    document_versions["synced"] = (_SYNCED_AT, _SYNCED_AT, 1)
+    unsynced_request = VespaChunkRequest(document_id="unsynced")
+    synced_request = VespaChunkRequest(document_id="synced")
+
+    _retrieve(document_index, [unsynced_request])
+    _retrieve(document_index, [unsynced_request])
+    assert len(document_index.requests) == 2
+
+    _retrieve(document_index, [synced_request], access_control_list=["user"])
+    _retrieve(document_index, [synced_request], access_control_list=["user"])
+    assert len(document_index.requests) == 4
+    assert len(chunk_content_cache._chunk_cache) == 0
@@ -0,0 +1,70 @@
+import threading
+import time
+
+from onyx.document_index.vespa.feed_control import AdaptiveConcurrencyLimiter
+from onyx.document_index.vespa.feed_control import FeedStats
+
+
+def test_limiter_backs_off_and_recovers() -> None:
+    limiter = AdaptiveConcurrencyLimiter(
+        initial_limit=16, min_limit=2, max_limit=20, decrease_interval_seconds=0
+    )
+
+    limiter.on_throttled()
+    assert limiter.limit == 8
+    for _ in range(10):
+        limiter.on_throttled()
+    assert limiter.limit == 2
+
+    for _ in range(1000):
+        limiter.on_success()
+    assert limiter.limit == 20
+
+
+def test_limiter_halves_once_per_burst_of_throttled_requests() -> None:
+    limiter = AdaptiveConcurrencyLimiter(
+        initial_limit=16, min_limit=2, max_limit=20, decrease_interval_seconds=0.05
+    )
+
+    for _ in range(10):
+        limiter.on_throttled()
+    assert limiter.limit == 8
+
+    time.sleep(0.06)
+    limiter.on_throttled()
+    assert limiter.limit == 4
+
+
+def test_limiter_caps_in_flight() -> None:
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=3, min_limit=1, max_limit=3)
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    def _work() -> None:
+        nonlocal in_flight, max_in_flight
+        with limiter.acquire():
+            with lock:
+                in_flight += 1
+                max_in_flight = max(max_in_flight, in_flight)
+            time.sleep(0.01)
+            with lock:
+                in_flight -= 1
+
+    threads = [threading.Thread(target=_work) for _ in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert max_in_flight == 3
+
+
+def test_feed_stats_percentiles() -> None:
+    stats = FeedStats()
+    for latency_ms in range(1, 101):
+        stats.record(latency_ms / 1000)
+
+    assert stats.percentile(50) == 0.05
+    assert stats.percentile(99) == 0.099
+    assert "fed 100 chunks" in stats.summary()
@@ -0,0 +1,26 @@
+import json
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+from onyx.document_index.vespa.indexing_utils import batch_feed_vespa_chunk_fields
+
+
+def test_batch_feed_posts_every_chunk_to_its_uuid() -> None:
+    chunk_fields = {
+        uuid4(): {"document_id": "doc", "chunk_id": chunk_id} for chunk_id in range(3)
+    }
+    http_client = MagicMock()
+    http_client.post.return_value.status_code = 200
+
+    batch_feed_vespa_chunk_fields(
+        chunk_fields=chunk_fields, index_name="test_index", http_client=http_client
+    )
+
+    fed = {
+        call.args[0].rsplit("/", 1)[-1]: json.loads(call.kwargs["content"])
+        for call in http_client.post.call_args_list
+    }
+    assert fed == {
+        str(chunk_uuid): {"fields": fields}
+        for chunk_uuid, fields in chunk_fields.items()
+    }
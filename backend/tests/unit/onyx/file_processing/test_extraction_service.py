@@ -0,0 +1,84 @@
+import io
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from onyx.file_processing import extraction_service
+from onyx.file_processing.extract_file_text import ExtractionResult
+from onyx.file_processing.extraction_service import _pdf_page_ranges
+from onyx.file_processing.extraction_service import extract_text_and_images
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.values: dict[str, Any] = {}
+
+    def get(self, key: str) -> Any:
+        return self.values.get(key)
+
+    def set(self, key: str, value: Any, ex: int | None = None) -> None:
+        self.values[key] = value
+
+
+@pytest.fixture
+def parsed_files() -> Any:
+    """Parses inline, records the (file name, extension) of every parsed file."""
+    parsed: list[tuple[str, str]] = []
+
+    def _parse_file(
+        file: Any, file_name: str, extension: str, **kwargs: Any
+    ) -> ExtractionResult:
+        parsed.append((file_name, extension))
+        return ExtractionResult(
+            text_content=file.read().decode(), embedded_images=[], metadata={}
+        )
+
+    redis_client = _FakeRedis()
+    with (
+        patch.object(extraction_service, "FILE_EXTRACTION_NUM_PROCESSES", 0),
+        patch.object(extraction_service, "parse_file", _parse_file),
+        patch.object(
+            extraction_service, "get_redis_client", lambda tenant_id=None: redis_client
+        ),
+        patch.object(extraction_service, "get_unstructured_api_key", lambda: None),
+        patch.object(
+            extraction_service,
+            "get_image_extraction_and_analysis_enabled",
+            lambda: False,
+        ),
+    ):
+        yield parsed
+
+
+def test_identical_files_are_parsed_once(parsed_files: list) -> None:
+    for file_name in ["a.pdf", "b.pdf"]:
+        result = extract_text_and_images(io.BytesIO(b"same content"), file_name)
+        assert result.text_content == "same content"
+    assert parsed_files == [("a.pdf", ".pdf")]
+
+    extract_text_and_images(io.BytesIO(b"other content"), "a.pdf")
+    assert len(parsed_files) == 2
+
+    # the same bytes parsed by another parser are a different result
+    extract_text_and_images(io.BytesIO(b"same content"), "a.docx")
+    assert len(parsed_files) == 3
+
+
+def test_empty_results_are_not_cached(parsed_files: list) -> None:
+    extract_text_and_images(io.BytesIO(b""), "a.pdf")
+    extract_text_and_images(io.BytesIO(b""), "a.pdf")
+    assert len(parsed_files) == 2
+
+
+def test_extension_from_content_type(parsed_files: list) -> None:
+    extract_text_and_images(
+        io.BytesIO(b"content"), "Quarterly Report", content_type="application/pdf"
+    )
+    assert parsed_files == [("Quarterly Report", ".pdf")]
+
+
+def test_pdf_page_ranges() -> None:
+    assert _pdf_page_ranges(0, 100) == []
+    assert _pdf_page_ranges(250, 100) == [(0, 100), (100, 200), (200, 250)]
+    assert _pdf_page_ranges(3, 0) == [(0, 1), (1, 2), (2, 3)]
@@ -0,0 +1,71 @@
+import json
+from datetime import datetime
+from datetime import timezone
+from io import BytesIO
+from typing import Any
+from unittest.mock import MagicMock
+
+from onyx.configs.constants import DocumentSource
+from onyx.connectors.models import Document
+from onyx.connectors.models import TextSection
+from onyx.file_store.document_batch_storage import BATCH_FILE_TYPE
+from onyx.file_store.document_batch_storage import FileStoreDocumentBatchStorage
+from onyx.file_store.document_batch_storage import LEGACY_BATCH_FILE_TYPE
+
+
+def _make_documents() -> list[Document]:
+    return [
+        Document(
+            id=f"doc_{i}",
+            source=DocumentSource.WEB,
+            semantic_identifier=f"Document {i}",
+            metadata={"tags": ["tag1", "tag2"]},
+            doc_updated_at=datetime(2025, 1, 1, tzinfo=timezone.utc),
+            sections=[TextSection(text=f"Some text for document {i}", link="link")],
+        )
+        for i in range(3)
+    ]
+
+
+def _make_storage() -> tuple[FileStoreDocumentBatchStorage, dict[str, Any]]:
+    """Storage backed by an in-memory mock file store."""
+    saved: dict[str, Any] = {}
+    file_store = MagicMock()
+
+    def _save_file(file_id: str, content: Any, file_type: str, **_: Any) -> str:
+        saved[file_id] = (file_type, content.read())
+        return file_id
+
+    file_store.save_file.side_effect = _save_file
+    file_store.has_file.side_effect = (
+        lambda file_id, file_origin, file_type: file_id in saved
+        and saved[file_id][0] == file_type
+    )
+    file_store.read_file.side_effect = lambda file_id, **_: BytesIO(saved[file_id][1])
+
+    return FileStoreDocumentBatchStorage(1, 2, file_store), saved
+
+
+def test_store_and_get_batch_round_trip() -> None:
+    storage, saved = _make_storage()
+    documents = _make_documents()
+
+    storage.store_batch(0, documents)
+
+    file_type, _ = saved["iab/1/2/0.json"]
+    assert file_type == BATCH_FILE_TYPE
+    assert storage.get_batch(0) == documents
+    assert storage.get_batch(1) is None
+
+
+def test_get_batch_reads_legacy_json() -> None:
+    storage, saved = _make_storage()
+    documents = _make_documents()
+    saved["iab/1/2/0.json"] = (
+        LEGACY_BATCH_FILE_TYPE,
+        json.dumps(
+            [doc.model_dump(mode="json") for doc in documents], indent=2
+        ).encode(),
+    )
+
+    assert storage.get_batch(0) == documents
@@ -0,0 +1,124 @@
+import datetime
+from collections.abc import Iterator
+from io import BytesIO
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import MagicMock
+from unittest.mock import patch
+from uuid import uuid4
+
+import pytest
+
+from onyx.chat.user_files.parse_user_files import parse_user_files
+from onyx.file_store import utils
+from onyx.file_store.models import ChatFileType
+from onyx.file_store.utils import load_in_memory_chat_files
+from onyx.file_store.utils import user_file_id_to_plaintext_file_name
+
+_SYNCED_AT = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def _user_file(token_count: int = 10) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=uuid4(),
+        file_id=f"file_{uuid4()}",
+        name="notes.txt",
+        user_id=None,
+        token_count=token_count,
+        last_project_sync_at=_SYNCED_AT,
+    )
+
+
+def _db_session(user_files: list[SimpleNamespace]) -> MagicMock:
+    db_session = MagicMock()
+    db_session.query.return_value.filter.return_value.all.return_value = user_files
+    return db_session
+
+
+@pytest.fixture
+def file_store() -> Iterator[MagicMock]:
+    utils._user_file_plaintext_cache.clear()
+    file_store = MagicMock()
+    file_store.read_file.side_effect = lambda file_id, mode=None: BytesIO(
+        f"text of {file_id}".encode()
+    )
+    with patch.object(utils, "get_default_file_store", return_value=file_store):
+        yield file_store
+
+
+def test_plaintext_is_cached_until_the_file_is_reprocessed(
+    file_store: MagicMock,
+) -> None:
+    user_file = _user_file()
+    plaintext_name = user_file_id_to_plaintext_file_name(user_file.id)
+
+    for _ in range(2):
+        chat_files = load_in_memory_chat_files(
+            [user_file.id], _db_session([user_file])  # type: ignore[arg-type]
+        )
+        assert chat_files[0].content == f"text of {plaintext_name}".encode()
+        assert chat_files[0].file_type == ChatFileType.PLAIN_TEXT
+    assert file_store.read_file.call_count == 1
+
+    user_file.last_project_sync_at = datetime.datetime.now(datetime.timezone.utc)
+    load_in_memory_chat_files(
+        [user_file.id], _db_session([user_file])  # type: ignore[arg-type]
+    )
+    assert file_store.read_file.call_count == 2
+
+
+def test_missing_user_file_raises(file_store: MagicMock) -> None:
+    with pytest.raises(ValueError):
+        load_in_memory_chat_files([uuid4()], _db_session([]))
+
+
+def _parse(user_files: list[SimpleNamespace], available_tokens: int) -> Any:
+    with (
+        patch(
+            "onyx.chat.user_files.parse_user_files.get_user_files_as_user",
+            return_value=user_files,
+        ),
+        patch(
+            "onyx.chat.user_files.parse_user_files.update_last_accessed_at_for_user_files"
+        ),
+        patch(
+            "onyx.db.user_file.calculate_user_files_token_count",
+            return_value=sum(user_file.token_count for user_file in user_files),
+        ),
+        patch(
+            "onyx.chat.prompt_builder.citations_prompt.compute_max_document_tokens_for_persona",
+            return_value=available_tokens,
+        ),
+        patch(
+            "onyx.chat.user_files.parse_user_files.load_in_memory_chat_files",
+            return_value=["loaded"],
+        ) as load_files,
+    ):
+        result = parse_user_files(
+            user_file_ids=[user_file.id for user_file in user_files],
+            db_session=MagicMock(),
+            persona=MagicMock(),
+            actual_user_input="question",
+            project_id=None,
+            user_id=None,
+        )
+    return result, load_files
+
+
+def test_files_are_only_loaded_when_they_fit_in_the_prompt() -> None:
+    user_files = [_user_file(token_count=100), _user_file(token_count=100)]
+
+    (chat_files, _, override_kwargs), load_files = _parse(
+        user_files, available_tokens=1000
+    )
+    assert chat_files == ["loaded"]
+    assert override_kwargs is None
+    load_files.assert_called_once()
+
+    (chat_files, models, override_kwargs), load_files = _parse(
+        user_files, available_tokens=300
+    )
+    assert chat_files == []
+    assert models == user_files
+    assert override_kwargs is not None
+    load_files.assert_not_called()
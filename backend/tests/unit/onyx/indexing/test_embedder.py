@@ -103,3 +103,75 @@ def test_default_indexing_embedder_embed_chunks(
         tenant_id=None,
         request_id=None,
     )
+
+
+def test_default_indexing_embedder_uses_embedding_cache(
+    mock_embedding_model: Mock,
+) -> None:
+    cached_embeddings = {"Title: cached chunk": [1.0, 1.0, 1.0]}
+    embedding_cache = Mock()
+    embedding_cache.hit_rate = 0.0
+    embedding_cache.get_many.side_effect = lambda texts, large_chunks_present: [
+        cached_embeddings.get(text) for text in texts
+    ]
+
+    embedder = DefaultIndexingEmbedder(
+        model_name="test-model",
+        normalize=True,
+        query_prefix=None,
+        passage_prefix=None,
+        provider_type=EmbeddingProvider.OPENAI,
+        embedding_cache=embedding_cache,
+    )
+    mock_embedding_model.return_value.encode.side_effect = [
+        [[2.0, 2.0, 2.0]],  # the uncached chunk
+        [[3.0, 3.0, 3.0]],  # Title embedding
+    ]
+
+    source_doc = Document(
+        id="test_doc",
+        source=DocumentSource.WEB,
+        semantic_identifier="Test Document",
+        metadata={},
+        doc_updated_at=None,
+        sections=[TextSection(text="cached chunk new chunk", link="link1")],
+    )
+    chunks = [
+        DocAwareChunk(
+            chunk_id=chunk_id,
+            blurb=content,
+            content=content,
+            source_links={0: "link1"},
+            section_continuation=False,
+            source_document=source_doc,
+            title_prefix="Title: ",
+            metadata_suffix_semantic="",
+            metadata_suffix_keyword="",
+            mini_chunk_texts=None,
+            large_chunk_reference_ids=[],
+            large_chunk_id=None,
+            image_file_id=None,
+            chunk_context="",
+            doc_summary="",
+            contextual_rag_reserved_tokens=0,
+        )
+        for chunk_id, content in enumerate(["cached chunk", "new chunk"])
+    ]
+
+    result = embedder.embed_chunks(chunks)
+
+    assert [chunk.embeddings.full_embedding for chunk in result] == [
+        [1.0, 1.0, 1.0],
+        [2.0, 2.0, 2.0],
+    ]
+    # only the cache miss is sent to the embedding model
+    mock_embedding_model.return_value.encode.assert_any_call(
+        texts=["Title: new chunk"],
+        text_type=EmbedTextType.PASSAGE,
+        large_chunks_present=False,
+        tenant_id=None,
+        request_id=None,
+    )
+    embedding_cache.put_many.assert_any_call(
+        ["Title: new chunk"], [[2.0, 2.0, 2.0]], large_chunks_present=False
+    )
@@ -1,3 +1,7 @@
+from collections.abc import Callable
+from collections.abc import Iterator
+from contextlib import contextmanager
+from types import SimpleNamespace
 from typing import Any
 from typing import cast
 from typing import List
@@ -11,14 +15,19 @@ from onyx.connectors.models import Document
 from onyx.connectors.models import DocumentSource
 from onyx.connectors.models import ImageSection
 from onyx.connectors.models import TextSection
+from onyx.document_index.interfaces import DocumentInsertionRecord
 from onyx.indexing.chunker import Chunker
 from onyx.indexing.embedder import DefaultIndexingEmbedder
 from onyx.indexing.indexing_pipeline import _get_aggregated_chunk_boost_factor
 from onyx.indexing.indexing_pipeline import add_contextual_summaries
+from onyx.indexing.indexing_pipeline import DocumentBatchPrepareContext
 from onyx.indexing.indexing_pipeline import filter_documents
+from onyx.indexing.indexing_pipeline import index_doc_batch
+from onyx.indexing.indexing_pipeline import IndexingPipelineResult
 from onyx.indexing.indexing_pipeline import process_image_sections
 from onyx.indexing.models import ChunkEmbedding
 from onyx.indexing.models import IndexChunk
+from onyx.indexing.models import IndexingBatchAdapter
 from onyx.llm.utils import get_max_input_tokens
 from onyx.natural_language_processing.search_nlp_models import (
     ContentClassificationPrediction,
@@ -338,3 +347,147 @@ def test_contextual_rag(
             count += 1
         assert chunk.doc_summary == doc_summary
         assert chunk.chunk_context == chunk_context
+
+
+class _RecordingAdapter:
+    """Every doc but `up_to_date_id` needs to be (re)indexed, records which docs each
+    write finalized."""
+
+    def __init__(self, up_to_date_id: str) -> None:
+        self.up_to_date_id = up_to_date_id
+        self.post_indexed_doc_ids: list[list[str]] = []
+
+    def prepare(
+        self, documents: list[Document], ignore_time_skip: bool
+    ) -> DocumentBatchPrepareContext:
+        return DocumentBatchPrepareContext(
+            updatable_docs=[doc for doc in documents if doc.id != self.up_to_date_id],
+            id_to_boost_map={},
+        )
+
+    @contextmanager
+    def lock_context(self, documents: list[Document]) -> Iterator[None]:
+        yield
+
+    def build_metadata_aware_chunks(
+        self, chunks_with_embeddings: list[IndexChunk], **kwargs: Any
+    ) -> SimpleNamespace:
+        return SimpleNamespace(
+            chunks=chunks_with_embeddings,
+            doc_id_to_previous_chunk_cnt={},
+            doc_id_to_new_chunk_cnt={},
+        )
+
+    def post_index(self, filtered_documents: list[Document], **kwargs: Any) -> None:
+        self.post_indexed_doc_ids.append([doc.id for doc in filtered_documents])
+
+
+def _chunk_per_section(docs: list[Document]) -> list[IndexChunk]:
+    return [
+        IndexChunk.model_construct(chunk_id=chunk_id, source_document=doc)
+        for doc in docs
+        for chunk_id in range(len(doc.sections))
+    ]
+
+
+def _write_chunks(chunks: list[IndexChunk], **kwargs: Any) -> tuple[list, list]:
+    doc_ids = dict.fromkeys(chunk.source_document.id for chunk in chunks)
+    return [
+        DocumentInsertionRecord(doc_id, already_existed=False) for doc_id in doc_ids
+    ], []
+
+
+def _run_index_doc_batch(
+    adapter: _RecordingAdapter,
+    pipeline_sub_batch_size: int,
+    write_chunks: Callable[..., tuple[list, list]] = _write_chunks,
+) -> IndexingPipelineResult:
+    documents = [
+        create_test_document(
+            doc_id=f"doc_{i}",
+            sections=[
+                TextSection(text=f"section {j}", link=None) for j in range(i + 1)
+            ],
+        )
+        for i in range(5)
+    ]
+    chunker = Mock(enable_large_chunks=False)
+    chunker.chunk.side_effect = _chunk_per_section
+    with (
+        patch(
+            "onyx.indexing.indexing_pipeline.get_image_extraction_and_analysis_enabled",
+            return_value=False,
+        ),
+        patch(
+            "onyx.indexing.indexing_pipeline.embed_chunks_with_failure_handling",
+            side_effect=lambda chunks, **kwargs: (chunks, []),
+        ),
+        patch(
+            "onyx.indexing.indexing_pipeline.USE_INFORMATION_CONTENT_CLASSIFICATION",
+            False,
+        ),
+        patch(
+            "onyx.indexing.indexing_pipeline.write_chunks_to_vector_db_with_backoff",
+            side_effect=write_chunks,
+        ),
+    ):
+        return index_doc_batch(
+            document_batch=documents,
+            chunker=chunker,
+            embedder=Mock(),
+            information_content_classification_model=Mock(),
+            document_index=Mock(),
+            request_id=None,
+            tenant_id="tenant",
+            adapter=cast(IndexingBatchAdapter, adapter),
+            filter_fnc=lambda docs: docs,
+            pipeline_sub_batch_size=pipeline_sub_batch_size,
+        )
+
+
+def test_pipelined_index_doc_batch_matches_single_batch() -> None:
+    single_batch_adapter = _RecordingAdapter(up_to_date_id="doc_2")
+    single_batch_result = _run_index_doc_batch(
+        single_batch_adapter, pipeline_sub_batch_size=0
+    )
+    pipelined_adapter = _RecordingAdapter(up_to_date_id="doc_2")
+    pipelined_result = _run_index_doc_batch(
+        pipelined_adapter, pipeline_sub_batch_size=2
+    )
+
+    assert pipelined_result == single_batch_result
+    assert single_batch_result.new_docs == 4
+    assert single_batch_result.total_docs == 5
+    assert single_batch_result.total_chunks == 1 + 2 + 4 + 5
+
+    assert single_batch_adapter.post_indexed_doc_ids == [
+        ["doc_0", "doc_1", "doc_2", "doc_3", "doc_4"]
+    ]
+    # one write per sub-batch, the up to date doc is finalized with the last one
+    assert pipelined_adapter.post_indexed_doc_ids == [
+        ["doc_0", "doc_1"],
+        ["doc_3", "doc_4", "doc_2"],
+    ]
+
+
+def test_pipelined_index_doc_batch_keeps_earlier_sub_batches_on_failure() -> None:
+    num_writes = 0
+
+    def _fail_second_write(
+        chunks: list[IndexChunk], **kwargs: Any
+    ) -> tuple[list, list]:
+        nonlocal num_writes
+        num_writes += 1
+        if num_writes == 2:
+            raise RuntimeError("vector DB write failed")
+        return _write_chunks(chunks)
+
+    adapter = _RecordingAdapter(up_to_date_id="doc_2")
+    with pytest.raises(RuntimeError, match="vector DB write failed"):
+        _run_index_doc_batch(
+            adapter, pipeline_sub_batch_size=2, write_chunks=_fail_second_write
+        )
+
+    # the first sub-batch stays committed, the rest (including the up to date doc)
+    # is left for the retry of the batch
+    assert adapter.post_indexed_doc_ids == [["doc_0", "doc_1"]]
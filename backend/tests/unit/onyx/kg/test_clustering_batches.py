@@ -0,0 +1,52 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from sqlalchemy.dialects import postgresql
+
+from onyx.kg.clustering import clustering
+
+
+def _relationship(id_name: str, source_document: str) -> SimpleNamespace:
+    return SimpleNamespace(id_name=id_name, source_document=source_document)
+
+
+def test_untransferred_relationships_are_paged_by_primary_key() -> None:
+    pages = [
+        [_relationship("rel_1", "doc_a"), _relationship("rel_1", "doc_b")],
+        [_relationship("rel_2", "doc_a")],
+        [],
+    ]
+    query = MagicMock()
+    query.filter.return_value = query
+    query.order_by.return_value = query
+    query.limit.return_value = query
+    query.all.side_effect = pages
+    db_session = MagicMock()
+    db_session.query.return_value = query
+
+    @contextmanager
+    def _session() -> Iterator[MagicMock]:
+        yield db_session
+
+    with patch.object(clustering, "get_session_with_current_tenant", _session):
+        # nothing gets transferred in between, paging must still move on and end
+        batches = list(clustering._get_batch_untransferred_relationships(batch_size=2))
+
+    assert batches == pages[:2]
+    assert query.all.call_count == 3
+
+    keyset_filters = [
+        str(
+            call.args[0].compile(
+                dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+            )
+        )
+        for call in query.filter.call_args_list
+        if "source_document" in str(call.args[0])
+    ]
+    assert len(keyset_filters) == 2
+    assert keyset_filters[0].endswith("> ('rel_1', 'doc_b')")
+    assert keyset_filters[1].endswith("> ('rel_2', 'doc_a')")
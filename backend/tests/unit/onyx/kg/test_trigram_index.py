@@ -0,0 +1,39 @@
+import pytest
+
+from onyx.kg.clustering.trigram_index import make_trigrams
+from onyx.kg.clustering.trigram_index import trigram_similarity
+from onyx.kg.clustering.trigram_index import TrigramIndex
+
+
+def test_make_trigrams_matches_pg_trgm() -> None:
+    # SELECT show_trgm('Word');
+    assert make_trigrams("Word") == {"  w", " wo", "wor", "ord", "rd "}
+    # non-alphanumeric characters separate words
+    assert make_trigrams("a-b") == {"  a", " a ", "  b", " b "}
+    assert make_trigrams("--") == set()
+
+
+def test_trigram_similarity_matches_pg_trgm() -> None:
+    # SELECT similarity('word', 'two words');
+    assert trigram_similarity(
+        make_trigrams("word"), make_trigrams("two words")
+    ) == pytest.approx(0.363636, abs=1e-6)
+
+
+def test_index_search() -> None:
+    index = TrigramIndex()
+    index.add("1", "onyx platform")
+    index.add("2", "onyx platforms")
+    index.add("3", "something else")
+
+    matches = dict(index.search("onyx platform", threshold=0.6))
+    assert set(matches) == {"1", "2"}
+    assert matches["1"] == 1.0
+
+    index.remove("2")
+    index.add("3", "onyx platform")
+    assert {key for key, _ in index.search("onyx platform", threshold=0.6)} == {
+        "1",
+        "3",
+    }
+    assert index.search("", threshold=0.0) == []
@@ -8,6 +8,9 @@ import pytest
 from httpx import AsyncClient
 from litellm.exceptions import RateLimitError
 
+from onyx.natural_language_processing.search_nlp_models import (
+    build_length_bucketed_batches,
+)
 from onyx.natural_language_processing.search_nlp_models import CloudEmbedding
 from shared_configs.enums import EmbeddingProvider
 from shared_configs.enums import EmbedTextType
@@ -81,3 +84,17 @@ async def test_rate_limit_handling() -> None:
                 model_name="fake-model",
                 text_type=EmbedTextType.QUERY,
             )
+
+
+def test_build_length_bucketed_batches() -> None:
+    lengths = [500, 10, 480, 12, 11, 490]
+
+    batches = build_length_bucketed_batches(lengths, max_batch_size=3)
+    assert batches == [[1, 4, 3], [2, 5, 0]]
+
+    # padded size of a batch is capped, an over-budget text still gets its own batch
+    batches = build_length_bucketed_batches(lengths, max_batch_size=8, token_budget=990)
+    assert batches == [[1, 4, 3], [2, 5], [0]]
+    assert build_length_bucketed_batches(
+        [2000, 5], max_batch_size=8, token_budget=990
+    ) == [[1], [0]]
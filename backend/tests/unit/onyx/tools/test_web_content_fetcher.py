@@ -0,0 +1,110 @@
+import threading
+import time
+from collections.abc import Iterator
+from typing import List
+from unittest.mock import patch
+
+import pytest
+
+from onyx.agents.agent_search.dr.sub_agents.web_search import content_fetcher
+from onyx.agents.agent_search.dr.sub_agents.web_search.content_fetcher import (
+    fetch_web_contents,
+)
+from onyx.agents.agent_search.dr.sub_agents.web_search.models import WebContent
+from onyx.agents.agent_search.dr.sub_agents.web_search.models import (
+    WebSearchProvider,
+)
+from onyx.agents.agent_search.dr.sub_agents.web_search.models import (
+    WebSearchResult,
+)
+from onyx.connectors.web.crawl_frontier import normalize_url
+
+
+class _FakeProvider(WebSearchProvider):
+    def __init__(
+        self,
+        slow_urls: set[str] | None = None,
+        failing_urls: set[str] | None = None,
+    ) -> None:
+        self.slow_urls = slow_urls or set()
+        self.failing_urls = failing_urls or set()
+        self.fetched_urls: list[str] = []
+        self._lock = threading.Lock()
+
+    def search(self, query: str) -> List[WebSearchResult]:
+        return []
+
+    def contents(self, urls: List[str]) -> List[WebContent]:
+        with self._lock:
+            self.fetched_urls.extend(urls)
+        if self.failing_urls.intersection(urls):
+            raise Exception("fetch failed")
+        if self.slow_urls.intersection(urls):
+            time.sleep(1)
+        return [
+            WebContent(
+                title=url,
+                link=url,
+                full_content=f"content of {url}",
+                published_date=None,
+            )
+            for url in urls
+        ]
+
+
+@pytest.fixture(autouse=True)
+def in_memory_cache() -> Iterator[dict[str, WebContent]]:
+    cache: dict[str, WebContent] = {}
+    with (
+        patch.object(
+            content_fetcher,
+            "_get_cached_content",
+            side_effect=lambda url: cache.get(normalize_url(url)),
+        ),
+        patch.object(
+            content_fetcher,
+            "_cache_content",
+            side_effect=lambda url, content: cache.update(
+                {normalize_url(url): content}
+            ),
+        ),
+    ):
+        yield cache
+
+
+def test_fetch_web_contents_preserves_order_and_deduplicates() -> None:
+    provider = _FakeProvider()
+    urls = ["https://a.com/1", "https://b.com/2", "https://A.com/1/"]
+
+    results = fetch_web_contents(provider, urls)
+
+    assert [result.link for result in results] == urls[:2]
+    assert sorted(provider.fetched_urls) == urls[:2]
+
+
+def test_fetch_web_contents_reuses_cached_content() -> None:
+    provider = _FakeProvider()
+    fetch_web_contents(provider, ["https://a.com/1"])
+    results = fetch_web_contents(provider, ["https://a.com/1#section"])
+
+    assert results[0].full_content == "content of https://a.com/1"
+    assert provider.fetched_urls == ["https://a.com/1"]
+
+
+def test_fetch_web_contents_skips_slow_and_failing_urls() -> None:
+    provider = _FakeProvider(
+        slow_urls={"https://slow.com/"}, failing_urls={"https://fail.com/"}
+    )
+    urls = ["https://slow.com/", "https://fail.com/", "https://ok.com/"]
+
+    results = fetch_web_contents(provider, urls, timeout=0.2)
+
+    assert [result.scrape_successful for result in results] == [False, False, True]
+    assert results[2].full_content == "content of https://ok.com/"
+
+
+def test_fetch_web_contents_raises_when_every_url_fails() -> None:
+    provider = _FakeProvider(failing_urls={"https://fail.com/"})
+
+    with pytest.raises(Exception, match="fetch failed"):
+        fetch_web_contents(provider, ["https://fail.com/"])
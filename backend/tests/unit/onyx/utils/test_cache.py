@@ -0,0 +1,81 @@
+import threading
+import time
+
+import pytest
+
+from onyx.utils.cache import RequestCoalescer
+from onyx.utils.cache import TTLCache
+
+
+def test_ttl_cache_evicts_least_recently_used() -> None:
+    cache: TTLCache[str, int] = TTLCache(max_size=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    # touch "a" so that "b" is the least recently used entry
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_ttl_cache_expires_entries() -> None:
+    cache: TTLCache[str, int] = TTLCache(max_size=10, ttl_seconds=0.05)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl_seconds=60)
+    time.sleep(0.1)
+
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_request_coalescer_shares_in_flight_computation() -> None:
+    coalescer: RequestCoalescer[str, str] = RequestCoalescer()
+    computed_keys: list[list[str]] = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_compute(keys: list[str]) -> list[str]:
+        computed_keys.append(keys)
+        started.set()
+        release.wait(timeout=5)
+        return [key.upper() for key in keys]
+
+    results: dict[str, list[str]] = {}
+
+    def run(name: str, keys: list[str]) -> None:
+        results[name] = coalescer.get_or_compute_many(keys, slow_compute)
+
+    leader = threading.Thread(target=run, args=("leader", ["a", "b"]))
+    leader.start()
+    assert started.wait(timeout=5)
+
+    follower = threading.Thread(target=run, args=("follower", ["b", "c", "c"]))
+    follower.start()
+    # give the follower time to attach to the in-flight computation of "b"
+    time.sleep(0.1)
+    release.set()
+    leader.join(timeout=5)
+    follower.join(timeout=5)
+
+    assert results["leader"] == ["A", "B"]
+    assert results["follower"] == ["B", "C", "C"]
+    # "b" is only computed once, "c" is deduplicated within the request
+    assert sorted(computed_keys) == [["a", "b"], ["c"]]
+
+
+def test_request_coalescer_propagates_exceptions() -> None:
+    coalescer: RequestCoalescer[str, int] = RequestCoalescer()
+
+    def failing_compute(keys: list[str]) -> list[int]:
+        raise ValueError("compute failure")
+
+    with pytest.raises(ValueError, match="compute failure"):
+        coalescer.get_or_compute_many(["a"], failing_compute)
+
+    # the failed key is not stuck in flight
+    assert coalescer.get_or_compute("a", lambda: 1) == 1
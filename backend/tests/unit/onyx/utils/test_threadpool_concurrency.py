@@ -1,3 +1,4 @@
+import asyncio
 import contextvars
 import threading
 import time
@@ -7,8 +8,10 @@ from concurrent.futures import ThreadPoolExecutor
 
 import pytest
 
+from onyx.utils.threadpool_concurrency import iterate_in_background_thread
 from onyx.utils.threadpool_concurrency import parallel_yield
 from onyx.utils.threadpool_concurrency import run_in_background
+from onyx.utils.threadpool_concurrency import run_pipelined_stages
 from onyx.utils.threadpool_concurrency import run_with_timeout
 from onyx.utils.threadpool_concurrency import ThreadSafeDict
 from onyx.utils.threadpool_concurrency import wait_on_background
@@ -389,3 +392,123 @@ def test_parallel_yield_non_blocking() -> None:
     # Verify no values are missing
     assert len(results) == 300  # Should have all values from 0 to 299
     assert sorted(results) == list(range(300))
+
+
+def test_run_pipelined_stages_preserves_order() -> None:
+    """Test that items flow through every stage and come out in order."""
+    stage_timings: dict[str, float] = {}
+    results = list(
+        run_pipelined_stages(
+            items=range(20),
+            stages=[("double", lambda x: x * 2), ("increment", lambda x: x + 1)],
+            stage_timings=stage_timings,
+        )
+    )
+
+    assert results == [x * 2 + 1 for x in range(20)]
+    assert set(stage_timings) == {"double", "increment"}
+
+
+def test_run_pipelined_stages_overlaps_stages() -> None:
+    """Test that different stages work on different items at the same time."""
+
+    def slow_stage(x: int) -> int:
+        time.sleep(0.1)
+        return x
+
+    start = time.monotonic()
+    results = list(
+        run_pipelined_stages(
+            items=range(4),
+            stages=[("a", slow_stage), ("b", slow_stage), ("c", slow_stage)],
+        )
+    )
+    elapsed = time.monotonic() - start
+
+    assert results == [0, 1, 2, 3]
+    # sequential would take 4 * 3 * 0.1 = 1.2s, pipelined ~ (4 + 2) * 0.1 = 0.6s
+    assert elapsed < 1.0
+
+
+def test_run_pipelined_stages_propagates_exceptions() -> None:
+    """Test that an exception in a stage is re-raised to the consumer."""
+
+    def failing_stage(x: int) -> int:
+        if x == 3:
+            raise ValueError("Stage failure")
+        return x
+
+    with pytest.raises(ValueError, match="Stage failure"):
+        list(run_pipelined_stages(items=range(10), stages=[("failing", failing_stage)]))
+
+
+def test_run_pipelined_stages_preserves_contextvars() -> None:
+    """Test that stages see the context variables of the caller."""
+    token = test_context_var.set("pipeline_value")
+    try:
+        results = list(
+            run_pipelined_stages(
+                items=range(3), stages=[("ctx", lambda _: test_context_var.get())]
+            )
+        )
+    finally:
+        test_context_var.reset(token)
+
+    assert results == ["pipeline_value"] * 3
+
+
+@pytest.mark.asyncio
+async def test_iterate_in_background_thread_does_not_block_the_loop() -> None:
+    """Blocking iterators are streamed concurrently, without blocking the event loop."""
+
+    def slow_gen(name: str) -> Generator[str, None, None]:
+        for i in range(3):
+            time.sleep(0.1)
+            yield f"{name}-{i}"
+
+    async def collect(name: str) -> list[str]:
+        return [item async for item in iterate_in_background_thread(slow_gen(name))]
+
+    start = time.monotonic()
+    results = await asyncio.gather(*(collect(str(i)) for i in range(20)))
+    elapsed = time.monotonic() - start
+
+    assert results == [[f"{i}-0", f"{i}-1", f"{i}-2"] for i in range(20)]
+    # all 20 streams run at the same time
+    assert elapsed < 1.5
+
+
+@pytest.mark.asyncio
+async def test_iterate_in_background_thread_propagates_exceptions() -> None:
+    def failing_gen() -> Generator[int, None, None]:
+        yield 1
+        raise ValueError("boom")
+
+    items = []
+    with pytest.raises(ValueError, match="boom"):
+        async for item in iterate_in_background_thread(failing_gen()):
+            items.append(item)
+    assert items == [1]
+
+
+@pytest.mark.asyncio
+async def test_iterate_in_background_thread_stops_when_closed() -> None:
+    closed = threading.Event()
+
+    def infinite_gen() -> Generator[int, None, None]:
+        try:
+            i = 0
+            while True:
+                time.sleep(0.01)
+                yield i
+                i += 1
+        finally:
+            closed.set()
+
+    stream = iterate_in_background_thread(infinite_gen())
+    async for item in stream:
+        if item == 2:
+            break
+    await stream.aclose()
+
+    assert await asyncio.to_thread(closed.wait, 2)